@@ -0,0 +1,183 @@
+"""Build-free static asset pipeline.
+
+At startup every file under static/js, static/css and static/images is copied to
+static/dist under a content-hashed name, text assets are precompressed (gzip, and
+brotli when the brotli package is installed) and the dartboard gets resized WebP
+variants (when Pillow is installed). Hashed files are served from /assets with
+cache-forever headers, so browsers only ever download a changed file once.
+"""
+import os
+import gzip
+import shutil
+import hashlib
+import mimetypes
+from flask import request, send_from_directory, url_for, abort
+
+try:
+    import brotli  # Optional: smaller downloads than gzip
+except ImportError:
+    brotli = None
+
+try:
+    from PIL import Image  # Optional: responsive image variants
+except ImportError:
+    Image = None
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+SOURCE_DIRS = ['js', 'css', 'images']
+COMPRESSIBLE_EXTENSIONS = ('.js', '.css', '.svg')
+CACHE_FOREVER = 'public, max-age=31536000, immutable'
+
+# Widths (in pixels) of the resized variants generated for each image
+IMAGE_VARIANT_WIDTHS = {
+    'images/dartboard.png': [320, 640, 960],
+}
+
+manifest = {}  # Logical path -> fingerprinted path inside DIST_DIR
+srcsets = {}   # Logical path -> srcset attribute value
+
+
+def file_hash(path):
+    """Return a short content hash for a file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+def fingerprinted_name(logical_path, digest, suffix=None):
+    """Insert the hash into a file name, e.g. js/app.js -> js/app.1a2b3c4d5e6f.js"""
+    base, ext = os.path.splitext(logical_path)
+    if suffix:
+        return f"{base}.{digest}.{suffix}"
+    return f"{base}.{digest}{ext}"
+
+
+def precompress(dist_path):
+    """Write .gz (and .br if available) siblings for a text asset"""
+    with open(dist_path, 'rb') as f:
+        data = f.read()
+
+    if not os.path.exists(dist_path + '.gz'):
+        with open(dist_path + '.gz', 'wb') as f:
+            f.write(gzip.compress(data, compresslevel=9))
+
+    if brotli is not None and not os.path.exists(dist_path + '.br'):
+        with open(dist_path + '.br', 'wb') as f:
+            f.write(brotli.compress(data, quality=11))
+
+
+def build_image_variants(logical_path, source_path, digest, built):
+    """Create resized WebP variants of an image and record its srcset"""
+    if Image is None:
+        return
+
+    entries = []
+    with Image.open(source_path) as image:
+        full_width = image.width
+        for width in IMAGE_VARIANT_WIDTHS[logical_path]:
+            # Never upscale beyond the original
+            if width >= image.width:
+                continue
+            variant = fingerprinted_name(logical_path, digest, f"{width}w.webp")
+            variant_path = os.path.join(DIST_DIR, variant)
+            if not os.path.exists(variant_path):
+                height = round(image.height * width / image.width)
+                resized = image.resize((width, height), Image.LANCZOS)
+                resized.save(variant_path, 'WEBP', quality=80, method=6)
+            built.add(variant)
+            entries.append(f"{url_for('serve_asset', filename=variant)} {width}w")
+
+    # Include the full-size original as the largest candidate
+    entries.append(f"{url_for('serve_asset', filename=manifest[logical_path])} {full_width}w")
+    srcsets[logical_path] = ', '.join(entries)
+
+
+def build_assets(app):
+    """Fingerprint, precompress and resize everything under the static source folders"""
+    built = set()
+    manifest.clear()
+    srcsets.clear()
+
+    for source_dir in SOURCE_DIRS:
+        for root, _, files in os.walk(os.path.join(STATIC_DIR, source_dir)):
+            for name in files:
+                source_path = os.path.join(root, name)
+                logical_path = os.path.relpath(source_path, STATIC_DIR).replace(os.sep, '/')
+                digest = file_hash(source_path)
+                dist_name = fingerprinted_name(logical_path, digest)
+                dist_path = os.path.join(DIST_DIR, dist_name)
+
+                # Hashed names never change content, so existing files can be reused
+                if not os.path.exists(dist_path):
+                    os.makedirs(os.path.dirname(dist_path), exist_ok=True)
+                    shutil.copyfile(source_path, dist_path)
+
+                built.add(dist_name)
+                manifest[logical_path] = dist_name
+
+                if name.lower().endswith(COMPRESSIBLE_EXTENSIONS):
+                    precompress(dist_path)
+                    built.update([dist_name + '.gz', dist_name + '.br'])
+
+    # url_for needs an app context to build the srcset URLs
+    with app.test_request_context():
+        for logical_path in IMAGE_VARIANT_WIDTHS:
+            if logical_path in manifest:
+                digest = manifest[logical_path].rsplit('.', 2)[1]
+                build_image_variants(logical_path, os.path.join(STATIC_DIR, logical_path), digest, built)
+
+    # Remove files left over from older versions of the assets
+    for root, _, files in os.walk(DIST_DIR):
+        for name in files:
+            dist_name = os.path.relpath(os.path.join(root, name), DIST_DIR).replace(os.sep, '/')
+            if dist_name not in built:
+                os.remove(os.path.join(root, name))
+
+    print(f"Built {len(manifest)} static assets ({'brotli+gzip' if brotli else 'gzip'}, "
+          f"{'with' if Image else 'without'} image variants)")
+
+
+def serve_asset(filename):
+    """Serve a fingerprinted asset, preferring a precompressed copy the client accepts"""
+    if '..' in filename.split('/'):
+        abort(404)
+
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    encodings = request.accept_encodings
+    chosen, encoding = filename, None
+
+    if 'br' in encodings and os.path.exists(os.path.join(DIST_DIR, filename + '.br')):
+        chosen, encoding = filename + '.br', 'br'
+    elif 'gzip' in encodings and os.path.exists(os.path.join(DIST_DIR, filename + '.gz')):
+        chosen, encoding = filename + '.gz', 'gzip'
+
+    response = send_from_directory(DIST_DIR, chosen, mimetype=mimetype, max_age=31536000)
+    response.headers['Cache-Control'] = CACHE_FOREVER
+    response.headers['Vary'] = 'Accept-Encoding'
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def asset_url(logical_path):
+    """URL for a static file, fingerprinted when the pipeline knows about it"""
+    dist_name = manifest.get(logical_path)
+    if dist_name is None:
+        return url_for('static', filename=logical_path)
+    return url_for('serve_asset', filename=dist_name)
+
+
+def image_srcset(logical_path):
+    """srcset attribute value for an image, or an empty string without variants"""
+    return srcsets.get(logical_path, '')
+
+
+def init_assets(app):
+    """Build the assets and register the /assets route and template helpers"""
+    app.add_url_rule('/assets/<path:filename>', 'serve_asset', serve_asset)
+    app.add_template_global(asset_url)
+    app.add_template_global(image_srcset)
+    build_assets(app)
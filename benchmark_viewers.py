@@ -0,0 +1,94 @@
+"""Concurrent viewer benchmark for the scoreboard web server.
+
+Simulates N scoreboard screens, each polling /sync once a second like
+static/js/game_scripts.js does. Like the browser, each viewer sends back the
+ETag of its last response in If-None-Match, so unchanged polls come back as
+304s. Reports throughput, latency and how many polls were 304s.
+
+Usage:
+    python benchmark_viewers.py --url http://localhost:5000 --viewers 50 --duration 30
+"""
+import argparse
+import threading
+import time
+import urllib.error
+import urllib.request
+
+POLL_PATH = '/sync'
+
+
+def viewer(base_url, poll_interval, stop_at, latencies, errors, not_modified, lock):
+    """Poll /sync until stop_at, revalidating with the last ETag and recording per-request latency"""
+    etag = None
+    while time.time() < stop_at:
+        tick_start = time.time()
+        request = urllib.request.Request(base_url + POLL_PATH, headers={'Cache-Control': 'no-cache'})
+        if etag:
+            request.add_header('If-None-Match', etag)
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                response.read()
+                etag = response.headers.get('ETag')
+            with lock:
+                latencies.append(time.perf_counter() - start)
+        except urllib.error.HTTPError as e:
+            # urllib reports a 304 as an error; for the scoreboard it is the cheap success
+            with lock:
+                if e.code == 304:
+                    latencies.append(time.perf_counter() - start)
+                    not_modified.append(POLL_PATH)
+                else:
+                    errors.append(POLL_PATH)
+        except Exception:
+            with lock:
+                errors.append(POLL_PATH)
+        # Keep a steady cadence like the browser's sync timer
+        time.sleep(max(0.0, poll_interval - (time.time() - tick_start)))
+
+
+def percentile(sorted_values, pct):
+    """Return the pct-th percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_benchmark(base_url, viewers, duration, poll_interval=1.0):
+    """Run the benchmark and print a summary"""
+    latencies = []
+    errors = []
+    not_modified = []
+    lock = threading.Lock()
+    stop_at = time.time() + duration
+
+    threads = [
+        threading.Thread(target=viewer, args=(base_url, poll_interval, stop_at, latencies, errors, not_modified, lock), daemon=True)
+        for _ in range(viewers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    total = len(latencies) + len(errors)
+    print(f"Viewers: {viewers}, duration: {duration}s, poll interval: {poll_interval}s")
+    print(f"Requests: {total} ({total / duration:.1f} req/s), errors: {len(errors)}, "
+          f"304 Not Modified: {len(not_modified)}")
+    print(f"Latency ms  p50: {percentile(latencies, 50) * 1000:.1f}  "
+          f"p95: {percentile(latencies, 95) * 1000:.1f}  "
+          f"p99: {percentile(latencies, 99) * 1000:.1f}  "
+          f"max: {(latencies[-1] if latencies else 0) * 1000:.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark concurrent scoreboard viewers')
+    parser.add_argument('--url', default='http://localhost:5000', help='Base URL of the running server')
+    parser.add_argument('--viewers', type=int, default=20, help='Number of simulated screens')
+    parser.add_argument('--duration', type=int, default=30, help='Benchmark length in seconds')
+    parser.add_argument('--interval', type=float, default=1.0, help='Seconds between polls per viewer')
+    args = parser.parse_args()
+
+    run_benchmark(args.url.rstrip('/'), args.viewers, args.duration, args.interval)
@@ -10,7 +10,11 @@ open numbers until at least 2 players have closed them.
 import sqlite3
 import time
 from datetime import datetime
+from leds import led_events, db_setup
 from contextlib import contextmanager
+from initialize_db import CURRENT_GAME
+import player_stats
+import event_log
 
 class DartProcessor:
     def __init__(self, cv_db_path='simulation/cv_data.db', game_db_path='game.db', 
@@ -21,6 +25,10 @@ class DartProcessor:
         self.poll_interval = poll_interval
         self.animation_duration = animation_duration
         
+        # One long-lived game.db connection with the LED databases attached, so
+        # everything a throw changes is committed in a single transaction
+        self.db = db_setup.AttachedDatabases(game_db_path, {'leds': leds_db_path})
+        
         # Cricket game specific settings
         self.cricket_numbers = [15, 16, 17, 18, 19, 20, 25]  # 25 is bullseye
         
@@ -38,7 +46,7 @@ class DartProcessor:
     @contextmanager
     def get_cv_connection(self):
         """Get a connection to the CV database"""
-        conn = sqlite3.connect(self.cv_db_path)
+        conn = db_setup.connect(self.cv_db_path)
         conn.row_factory = sqlite3.Row
         try:
             yield conn
@@ -47,23 +55,15 @@ class DartProcessor:
 
     @contextmanager
     def get_game_connection(self):
-        """Get a connection to the game database"""
-        conn = sqlite3.connect(self.game_db_path)
-        conn.row_factory = sqlite3.Row
-        try:
+        """Get the shared connection to the game database"""
+        with self.db.connection() as conn:
             yield conn
-        finally:
-            conn.close()
             
     @contextmanager
     def get_leds_connection(self):
-        """Get a connection to the LEDs database"""
-        conn = sqlite3.connect(self.leds_db_path)
-        conn.row_factory = sqlite3.Row
-        try:
+        """Get the shared connection for the LEDs database (attached to the game database)"""
+        with self.db.connection() as conn:
             yield conn
-        finally:
-            conn.close()
 
     def reset_animation_state(self):
         """Reset the animation state in the database"""
@@ -78,7 +78,9 @@ class DartProcessor:
                     throw_number = NULL, 
                     timestamp = NULL,
                     next_turn = NULL,
-                    next_player = NULL
+                    next_player = NULL,
+                    target_hit = 0,
+                    cricket_event = NULL
                 WHERE id = 1
             ''')
             conn.commit()
@@ -100,13 +102,6 @@ class DartProcessor:
         with self.get_game_connection() as conn:
             cursor = conn.cursor()
             
-            # First add a column to the animation_state table if it doesn't exist yet
-            try:
-                cursor.execute("SELECT cricket_event FROM animation_state LIMIT 1")
-            except sqlite3.OperationalError:
-                # Column doesn't exist, add it
-                cursor.execute("ALTER TABLE animation_state ADD COLUMN cricket_event TEXT DEFAULT NULL")
-            
             cursor.execute('''
                 UPDATE animation_state 
                 SET animating = 1, 
@@ -175,10 +170,11 @@ class DartProcessor:
         """Get all cricket scores for all players"""
         with self.get_game_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('''
+            cursor.execute(f'''
                 SELECT cs.player_id, cs.number, cs.marks, cs.points, cs.closed, p.name
                 FROM cricket_scores cs
-                JOIN players p ON cs.player_id = p.id
+                JOIN players p ON p.game_id = cs.game_id AND p.id = cs.player_id
+                WHERE cs.game_id = {CURRENT_GAME}
                 ORDER BY cs.player_id, cs.number
             ''')
             
@@ -214,9 +210,9 @@ class DartProcessor:
             cursor = conn.cursor()
             
             # A number is open if the player hasn't closed it yet (marks < 3)
-            cursor.execute('''
+            cursor.execute(f'''
                 SELECT marks FROM cricket_scores
-                WHERE player_id = ? AND number = ?
+                WHERE game_id = {CURRENT_GAME} AND player_id = ? AND number = ?
             ''', (player_id, number))
             
             row = cursor.fetchone()
@@ -230,9 +226,9 @@ class DartProcessor:
             cursor = conn.cursor()
             
             # Count players who have closed this number
-            cursor.execute('''
+            cursor.execute(f'''
                 SELECT COUNT(*) as closed_count FROM cricket_scores
-                WHERE number = ? AND closed = 1
+                WHERE game_id = {CURRENT_GAME} AND number = ? AND closed = 1
             ''', (number,))
             
             closed_count = cursor.fetchone()['closed_count']
@@ -246,9 +242,9 @@ class DartProcessor:
             cursor = conn.cursor()
             
             # Get current marks and closed status
-            cursor.execute('''
+            cursor.execute(f'''
                 SELECT marks, closed, points FROM cricket_scores
-                WHERE player_id = ? AND number = ?
+                WHERE game_id = {CURRENT_GAME} AND player_id = ? AND number = ?
             ''', (player_id, number))
             
             row = cursor.fetchone()
@@ -267,10 +263,10 @@ class DartProcessor:
                 new_points = current_points + score_to_add
                 
                 # Update the record
-                cursor.execute('''
+                cursor.execute(f'''
                     UPDATE cricket_scores
                     SET marks = ?, closed = ?, points = ?
-                    WHERE player_id = ? AND number = ?
+                    WHERE game_id = {CURRENT_GAME} AND player_id = ? AND number = ?
                 ''', (new_marks, new_closed, new_points, player_id, number))
                 
                 # If this was newly closed, check if all players have closed it
@@ -301,9 +297,9 @@ class DartProcessor:
         cursor = conn.cursor()
         
         # Sum all points from cricket_scores
-        cursor.execute('''
+        cursor.execute(f'''
             SELECT SUM(points) as total_points FROM cricket_scores
-            WHERE player_id = ?
+            WHERE game_id = {CURRENT_GAME} AND player_id = ?
         ''', (player_id,))
         
         row = cursor.fetchone()
@@ -311,10 +307,10 @@ class DartProcessor:
             total_points = row['total_points'] or 0
             
             # Update the players table
-            cursor.execute('''
+            cursor.execute(f'''
                 UPDATE players
                 SET total_score = ?
-                WHERE id = ?
+                WHERE game_id = {CURRENT_GAME} AND id = ?
             ''', (total_points, player_id))
 
     def update_current_throw(self, throw_number, score, multiplier, points):
@@ -327,6 +323,25 @@ class DartProcessor:
             )
             conn.commit()
 
+    def record_throw(self, turn_number, player_id, dart_index, score, multiplier, points, position_x, position_y, thrown_at):
+        """Append a dart to the throws table with its board position and CV timestamp"""
+        with self.get_game_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                INSERT OR REPLACE INTO throws
+                (game_id, turn_number, player_id, dart_index, score, multiplier, points, radius, angle, thrown_at)
+                VALUES ({CURRENT_GAME}, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (turn_number, player_id, dart_index, score, multiplier, points, position_x, position_y, thrown_at))
+            event_log.append_event(conn, event_log.THROW_SCORED, turn_number, player_id, dart_index, score, multiplier,
+                                   points=points, radius=position_x, angle=position_y, thrown_at=thrown_at)
+            conn.commit()
+
+    def update_player_stats(self, player_id, stats):
+        """Add one dart's increments (see player_stats.throw_stats) to the player's running stats"""
+        with self.get_game_connection() as conn:
+            player_stats.add_player_stats(conn, player_id, stats)
+            conn.commit()
+
     def update_last_throw(self, score, multiplier, points, player_id):
         """Update the last throw table with the most recent throw"""
         with self.get_game_connection() as conn:
@@ -359,17 +374,25 @@ class DartProcessor:
                 segment_type = "outer_single"
         
         if segment_type:
-            # Add to LEDs database
+            # Only light the dart once the throw it belongs to has committed
+            self.db.after_commit(lambda: self.send_dart_to_leds(score, multiplier, segment_type))
+        else:
+            print(f"WARNING: Could not determine segment type for throw: Score={score}, Multiplier={multiplier}")
+
+    def send_dart_to_leds(self, score, multiplier, segment_type):
+        """Send a committed dart to the LED controller"""
+        delivered = led_events.publish('dart', score=score, multiplier=multiplier, segment_type=segment_type)
+        
+        # dart_events is the fallback when the controller isn't listening, and optionally an audit log
+        if not delivered or led_events.AUDIT_LOG:
             with self.get_leds_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     INSERT INTO dart_events (score, multiplier, segment_type, processed, timestamp)
-                    VALUES (?, ?, ?, 0, CURRENT_TIMESTAMP)
-                ''', (score, multiplier, segment_type))
+                    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ''', (score, multiplier, segment_type, 1 if delivered else 0))
                 conn.commit()
-                print(f"Added throw to LEDs database: Score={score}, Multiplier={multiplier}, Segment={segment_type}")
-        else:
-            print(f"WARNING: Could not determine segment type for throw: Score={score}, Multiplier={multiplier}")
+        print(f"Sent throw to LEDs ({'event channel' if delivered else 'database'}): Score={score}, Multiplier={multiplier}, Segment={segment_type}")
 
     def advance_to_next_player(self):
         """Move to the next player, and possibly next turn"""
@@ -386,7 +409,7 @@ class DartProcessor:
                 return None, None
             
             # Get player count from the players table
-            cursor.execute('SELECT COUNT(*) as count FROM players')
+            cursor.execute(f'SELECT COUNT(*) as count FROM players WHERE game_id = {CURRENT_GAME}')
             player_count = cursor.fetchone()['count']
             
             if player_count == 0:
@@ -409,6 +432,7 @@ class DartProcessor:
             # Reset current throws
             # MODIFIED: Set score and multiplier to NULL instead of 0
             cursor.execute('UPDATE current_throws SET points = 0, score = NULL, multiplier = NULL')
+            event_log.append_event(conn, event_log.TURN_ADVANCED, next_turn, next_player)
             
             conn.commit()
             
@@ -467,79 +491,46 @@ class DartProcessor:
         # No winner yet
         return None
 
-    def save_throw_details_to_turn_scores(self, turn_number, player_id, current_throws):
-        """Store throw details in the turn_scores table for animation handling"""
+    def save_turn_score(self, turn_number, player_id):
+        """Store the turn's total in the turn_scores table for animation handling"""
         with self.get_game_connection() as conn:
             cursor = conn.cursor()
             
             # Make sure the turn exists
-            cursor.execute('SELECT 1 FROM turns WHERE turn_number = ?', (turn_number,))
+            cursor.execute(f'SELECT 1 FROM turns WHERE game_id = {CURRENT_GAME} AND turn_number = ?', (turn_number,))
             if not cursor.fetchone():
-                cursor.execute('INSERT INTO turns (turn_number) VALUES (?)', (turn_number,))
+                cursor.execute(f'INSERT INTO turns (game_id, turn_number) VALUES ({CURRENT_GAME}, ?)', (turn_number,))
             
-            # Map throws to their respective columns
-            throw_columns = {}
-            for throw in current_throws:
-                throw_num = throw['throw_number']
-                throw_columns[f'throw{throw_num}'] = throw['score']
-                throw_columns[f'throw{throw_num}_multiplier'] = throw['multiplier']
-                throw_columns[f'throw{throw_num}_points'] = throw['points']
-            
-            # Calculate total points for these throws
-            total_points = sum(throw['points'] for throw in current_throws)
+            # Calculate total points from the darts recorded for this turn
+            cursor.execute(
+                f'SELECT COALESCE(SUM(points), 0) AS total_points FROM throws WHERE game_id = {CURRENT_GAME} AND turn_number = ? AND player_id = ?',
+                (turn_number, player_id)
+            )
+            total_points = cursor.fetchone()['total_points']
             
             # Check if player already has a score for this turn
             cursor.execute(
-                'SELECT points FROM turn_scores WHERE turn_number = ? AND player_id = ?',
+                f'SELECT points FROM turn_scores WHERE game_id = {CURRENT_GAME} AND turn_number = ? AND player_id = ?',
                 (turn_number, player_id)
             )
             existing = cursor.fetchone()
             
             if existing:
-                # Update existing score with individual throw details
-                update_query = '''
-                UPDATE turn_scores 
-                SET points = ?, 
-                    throw1 = ?, throw1_multiplier = ?, throw1_points = ?,
-                    throw2 = ?, throw2_multiplier = ?, throw2_points = ?,
-                    throw3 = ?, throw3_multiplier = ?, throw3_points = ?,
-                    bust = 0
-                WHERE turn_number = ? AND player_id = ?
-                '''
+                # Update existing score
                 cursor.execute(
-                    update_query,
-                    (
-                        total_points,
-                        throw_columns.get('throw1', 0), throw_columns.get('throw1_multiplier', 0), throw_columns.get('throw1_points', 0),
-                        throw_columns.get('throw2', 0), throw_columns.get('throw2_multiplier', 0), throw_columns.get('throw2_points', 0),
-                        throw_columns.get('throw3', 0), throw_columns.get('throw3_multiplier', 0), throw_columns.get('throw3_points', 0),
-                        turn_number, player_id
-                    )
+                    f'UPDATE turn_scores SET points = ?, bust = 0 WHERE game_id = {CURRENT_GAME} AND turn_number = ? AND player_id = ?',
+                    (total_points, turn_number, player_id)
                 )
             else:
-                # Insert new score with individual throw details
-                insert_query = '''
-                INSERT INTO turn_scores (
-                    turn_number, player_id, points,
-                    throw1, throw1_multiplier, throw1_points,
-                    throw2, throw2_multiplier, throw2_points,
-                    throw3, throw3_multiplier, throw3_points,
-                    bust
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)
-                '''
+                # Insert new score
                 cursor.execute(
-                    insert_query,
-                    (
-                        turn_number, player_id, total_points,
-                        throw_columns.get('throw1', 0), throw_columns.get('throw1_multiplier', 0), throw_columns.get('throw1_points', 0),
-                        throw_columns.get('throw2', 0), throw_columns.get('throw2_multiplier', 0), throw_columns.get('throw2_points', 0),
-                        throw_columns.get('throw3', 0), throw_columns.get('throw3_multiplier', 0), throw_columns.get('throw3_points', 0)
-                    )
+                    f'INSERT INTO turn_scores (game_id, turn_number, player_id, points, bust) VALUES ({CURRENT_GAME}, ?, ?, ?, 0)',
+                    (turn_number, player_id, total_points)
                 )
             
             conn.commit()
             
-            print(f"Saved throw details to turn_scores for player {player_id}, turn {turn_number}")
+            print(f"Saved turn score to turn_scores for player {player_id}, turn {turn_number}")
 
     def apply_pending_player_change(self):
         """Check if animation has completed and apply any pending player change to LEDs.db."""
@@ -566,7 +557,9 @@ class DartProcessor:
                         WHERE id = 1
                     """, (self.pending_player_change,))
                     conn.commit()
-                    
+                
+                pending_player = self.pending_player_change
+                self.db.after_commit(lambda: led_events.publish('player', current_player=pending_player))
                 print(f"Animation completed - Updated current player in LEDs.db to {self.pending_player_change}")
                 
                 # Clear the pending player change
@@ -622,6 +615,11 @@ class DartProcessor:
         
         # Update the current throw with score, multiplier, and points
         self.update_current_throw(throw_position, score, multiplier, points)
+        self.record_throw(current_turn, current_player, throw_position, score, multiplier, points,
+                          position_x, position_y, throw['timestamp'])
+        self.update_player_stats(current_player, player_stats.throw_stats(
+            current_turn, throw_position, score, multiplier, points,
+            marks=player_stats.cricket_marks(score, multiplier)))
         
         # Update the last throw record
         self.update_last_throw(score, multiplier, points, current_player)
@@ -666,9 +664,9 @@ class DartProcessor:
                     # Calculate how many marks can be applied before closing (max 3 total)
                     with self.get_game_connection() as conn:
                         cursor = conn.cursor()
-                        cursor.execute('''
+                        cursor.execute(f'''
                             SELECT marks FROM cricket_scores
-                            WHERE player_id = ? AND number = ?
+                            WHERE game_id = {CURRENT_GAME} AND player_id = ? AND number = ?
                         ''', (current_player, score))
                         
                         row = cursor.fetchone()
@@ -692,9 +690,9 @@ class DartProcessor:
                         # Count how many players have closed this number AFTER this update
                         with self.get_game_connection() as conn:
                             cursor = conn.cursor()
-                            cursor.execute('''
+                            cursor.execute(f'''
                                 SELECT COUNT(*) as closed_count FROM cricket_scores
-                                WHERE number = ? AND closed = 1
+                                WHERE game_id = {CURRENT_GAME} AND number = ? AND closed = 1
                             ''', (score,))
                             
                             closed_count = cursor.fetchone()['closed_count']
@@ -746,20 +744,13 @@ class DartProcessor:
         if throw_position == 3:
             print(f"Third throw detected! Processing game logic...")
             
-            # CRITICAL FIX: Explicitly refresh current_throws to include the latest throw
-            refreshed_current_throws = []
-            with self.get_game_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute('SELECT throw_number, points, score, multiplier FROM current_throws ORDER BY throw_number')
-                refreshed_current_throws = [dict(t) for t in cursor.fetchall()]
-            
-            # Save throw details to turn_scores for third throw animation
-            self.save_throw_details_to_turn_scores(current_turn, current_player, refreshed_current_throws)
+            # Save the turn to turn_scores for third throw animation
+            self.save_turn_score(current_turn, current_player)
             
             # Calculate next player and turn
             with self.get_game_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('SELECT COUNT(*) as count FROM players')
+                cursor.execute(f'SELECT COUNT(*) as count FROM players WHERE game_id = {CURRENT_GAME}')
                 player_count = cursor.fetchone()['count']
             
             next_player = current_player % player_count + 1  # Cycle to next player (1-based)
@@ -821,88 +812,98 @@ class DartProcessor:
             # Get current game state
             game_state = self.get_current_game_state()
             
-            # Open connection to LEDs.db
-            leds_conn = sqlite3.connect('leds/LEDs.db')
-            leds_cursor = leds_conn.cursor()
+            # Update LEDs.db through the shared connection (part of the throw's transaction)
+            with self.get_leds_connection() as leds_conn:
+                leds_cursor = leds_conn.cursor()
             
-            # Update player_state - BUT ONLY IF NOT ANIMATING or there's no pending player change
-            if not is_animating or self.pending_player_change is None:
-                leds_cursor.execute("""
-                    UPDATE player_state 
-                    SET current_player = ?, player_count = ?, updated_at = CURRENT_TIMESTAMP
-                    WHERE id = 1
-                """, (game_state['current_player'], len(cricket_scores)))
-            else:
-                # If animating, only update player_count but not current_player
-                leds_cursor.execute("""
-                    UPDATE player_state 
-                    SET player_count = ?, updated_at = CURRENT_TIMESTAMP
-                    WHERE id = 1
-                """, (len(cricket_scores),))
-                print(f"Animation in progress - delaying player update to LEDs.db. Current: {game_state['current_player']}, Pending: {self.pending_player_change}")
+                # Update player_state - BUT ONLY IF NOT ANIMATING or there's no pending player change
+                if not is_animating or self.pending_player_change is None:
+                    leds_cursor.execute("""
+                        UPDATE player_state 
+                        SET current_player = ?, player_count = ?, updated_at = CURRENT_TIMESTAMP
+                        WHERE id = 1
+                    """, (game_state['current_player'], len(cricket_scores)))
+                else:
+                    # If animating, only update player_count but not current_player
+                    leds_cursor.execute("""
+                        UPDATE player_state 
+                        SET player_count = ?, updated_at = CURRENT_TIMESTAMP
+                        WHERE id = 1
+                    """, (len(cricket_scores),))
+                    print(f"Animation in progress - delaying player update to LEDs.db. Current: {game_state['current_player']}, Pending: {self.pending_player_change}")
             
-            # Update cricket state for each segment
-            for segment in [15, 16, 17, 18, 19, 20, 25]:  # Cricket segments
-                player_closed_values = {}
+                # Update cricket state for each segment
+                led_segments = {}
+                for segment in [15, 16, 17, 18, 19, 20, 25]:  # Cricket segments
+                    player_closed_values = {}
                 
-                # Count how many players have closed this segment
-                closed_count = 0
+                    # Count how many players have closed this segment
+                    closed_count = 0
                 
-                # Check for each player if they've closed this segment
-                for player_id, player_data in cricket_scores.items():
-                    player_id = int(player_id)  # Convert from string key
-                    has_closed = False
+                    # Check for each player if they've closed this segment
+                    for player_id, player_data in cricket_scores.items():
+                        player_id = int(player_id)  # Convert from string key
+                        has_closed = False
                     
-                    # Check segment closed status for this player
-                    if 'scores' in player_data and segment in player_data['scores']:
-                        has_closed = player_data['scores'][segment]['closed']
-                        if has_closed:
-                            closed_count += 1
+                        # Check segment closed status for this player
+                        if 'scores' in player_data and segment in player_data['scores']:
+                            has_closed = player_data['scores'][segment]['closed']
+                            if has_closed:
+                                closed_count += 1
                     
-                    # Update player_closed for this segment
-                    player_closed_values[player_id] = has_closed
-                
-                # Number is globally closed if at least 2 players have closed it
-                all_closed = closed_count >= 2
-                
-                # Prepare update query with player values
-                update_query = """
-                    UPDATE cricket_state 
-                    SET all_closed = ?, updated_at = CURRENT_TIMESTAMP
-                """
-                
-                # Add player closed values to the query based on how many exist
-                params = [1 if all_closed else 0]
-                
-                # Add each player's closed status up to player count
-                for i in range(1, 9):  # Support up to 8 players
-                    if i in player_closed_values:
-                        update_query += f", player{i}_closed = ?"
-                        params.append(1 if player_closed_values[i] else 0)
-                    else:
-                        update_query += f", player{i}_closed = 0"  # Set to 0 for non-existent players
-                
-                # Complete the query with WHERE clause
-                update_query += " WHERE segment = ?"
-                params.append(segment)
-                
-                # Execute the update
-                leds_cursor.execute(update_query, params)
+                        # Update player_closed for this segment
+                        player_closed_values[player_id] = has_closed
+                
+                    # Number is globally closed if at least 2 players have closed it
+                    all_closed = closed_count >= 2
+                
+                    # Prepare update query with player values
+                    update_query = """
+                        UPDATE cricket_state 
+                        SET all_closed = ?, updated_at = CURRENT_TIMESTAMP
+                    """
+                
+                    # Add player closed values to the query based on how many exist
+                    params = [1 if all_closed else 0]
+                
+                    # Add each player's closed status up to player count
+                    for i in range(1, 9):  # Support up to 8 players
+                        if i in player_closed_values:
+                            update_query += f", player{i}_closed = ?"
+                            params.append(1 if player_closed_values[i] else 0)
+                        else:
+                            update_query += f", player{i}_closed = 0"  # Set to 0 for non-existent players
+                
+                    # Complete the query with WHERE clause
+                    update_query += " WHERE segment = ?"
+                    params.append(segment)
+                
+                    # Execute the update
+                    leds_cursor.execute(update_query, params)
+                    led_segments[segment] = {
+                        'player_closed': {i: player_closed_values.get(i, False) for i in range(1, 9)},
+                        'all_closed': all_closed
+                    }
                 
-                # Print debug info for segments that just became all_closed
-                if all_closed and closed_count == 2:
-                    print(f"Segment {segment} is now globally closed (2 players have closed it)")
+                    # Print debug info for segments that just became all_closed
+                    if all_closed and closed_count == 2:
+                        print(f"Segment {segment} is now globally closed (2 players have closed it)")
                 
-            # Update the game mode
-            leds_cursor.execute("""
-                UPDATE game_mode 
-                SET mode = ?, updated_at = CURRENT_TIMESTAMP
-                WHERE id = 1
-            """, ('cricket',))
+                # Update the game mode
+                leds_cursor.execute("""
+                    UPDATE game_mode 
+                    SET mode = ?, updated_at = CURRENT_TIMESTAMP
+                    WHERE id = 1
+                """, ('cricket',))
+            
+                leds_conn.commit()
             
-            # Commit and close
-            leds_conn.commit()
-            leds_conn.close()
+            # Tell the LED controller once the state is committed, instead of waiting for its next poll
+            if not is_animating or self.pending_player_change is None:
+                self.db.after_commit(lambda: led_events.publish(
+                    'player', current_player=game_state['current_player'], player_count=len(cricket_scores)
+                ))
+            self.db.after_commit(lambda: led_events.publish('cricket', segments=led_segments))
             
             print("Cricket state synchronized to LEDs database")
             
@@ -928,7 +929,9 @@ class DartProcessor:
                 
                 # Process each new throw
                 for throw in new_throws:
-                    self.process_throw(throw)
+                    # Everything the throw changes is committed together
+                    with self.db.transaction():
+                        self.process_throw(throw)
                 
                 # Even if no animation was cleared, periodically check for pending player changes
                 # This handles cases where we might have missed the animation clearing
@@ -9,7 +9,11 @@ followed by bullseye to win.
 import sqlite3
 import time
 from datetime import datetime
+from leds import led_events, db_setup
 from contextlib import contextmanager
+from initialize_db import CURRENT_GAME
+import player_stats
+import event_log
 
 class DartProcessor:
     def __init__(self, cv_db_path='simulation/cv_data.db', game_db_path='game.db', 
@@ -20,6 +24,10 @@ class DartProcessor:
         self.poll_interval = poll_interval
         self.animation_duration = animation_duration
         
+        # One long-lived game.db connection with the LED databases attached, so
+        # everything a throw changes is committed in a single transaction
+        self.db = db_setup.AttachedDatabases(game_db_path, {'leds': leds_db_path})
+        
         # Initialize timestamp to current local time
         self.last_throw_timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         
@@ -31,7 +39,7 @@ class DartProcessor:
     @contextmanager
     def get_cv_connection(self):
         """Get a connection to the CV database"""
-        conn = sqlite3.connect(self.cv_db_path)
+        conn = db_setup.connect(self.cv_db_path)
         conn.row_factory = sqlite3.Row
         try:
             yield conn
@@ -40,23 +48,15 @@ class DartProcessor:
 
     @contextmanager
     def get_game_connection(self):
-        """Get a connection to the game database"""
-        conn = sqlite3.connect(self.game_db_path)
-        conn.row_factory = sqlite3.Row
-        try:
+        """Get the shared connection to the game database"""
+        with self.db.connection() as conn:
             yield conn
-        finally:
-            conn.close()
             
     @contextmanager
     def get_leds_connection(self):
-        """Get a connection to the LEDs database"""
-        conn = sqlite3.connect(self.leds_db_path)
-        conn.row_factory = sqlite3.Row
-        try:
+        """Get the shared connection for the LEDs database (attached to the game database)"""
+        with self.db.connection() as conn:
             yield conn
-        finally:
-            conn.close()
 
     def reset_animation_state(self):
         """Reset the animation state in the database"""
@@ -71,7 +71,9 @@ class DartProcessor:
                     throw_number = NULL, 
                     timestamp = NULL,
                     next_turn = NULL,
-                    next_player = NULL
+                    next_player = NULL,
+                    target_hit = 0,
+                    cricket_event = NULL
                 WHERE id = 1
             ''')
             conn.commit()
@@ -93,13 +95,6 @@ class DartProcessor:
         with self.get_game_connection() as conn:
             cursor = conn.cursor()
             
-            # First add a column to the animation_state table if it doesn't exist yet
-            try:
-                cursor.execute("SELECT target_hit FROM animation_state LIMIT 1")
-            except sqlite3.OperationalError:
-                # Column doesn't exist, add it
-                cursor.execute("ALTER TABLE animation_state ADD COLUMN target_hit INTEGER DEFAULT 0")
-            
             cursor.execute('''
                 UPDATE animation_state 
                 SET animating = 1, 
@@ -169,7 +164,7 @@ class DartProcessor:
         with self.get_game_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                'SELECT current_number, completed FROM around_clock_progress WHERE player_id = ?',
+                f'SELECT current_number, completed FROM around_clock_progress WHERE game_id = {CURRENT_GAME} AND player_id = ?',
                 (player_id,)
             )
             row = cursor.fetchone()
@@ -191,15 +186,15 @@ class DartProcessor:
         current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         with self.get_game_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('''
+            cursor.execute(f'''
                 UPDATE around_clock_progress
                 SET current_number = ?, completed = ?, last_update = ?
-                WHERE player_id = ?
+                WHERE game_id = {CURRENT_GAME} AND player_id = ?
             ''', (current_number, 1 if completed else 0, current_time, player_id))
             
             # Update player's total_score to reflect current_number - 1
             # This makes the UI display current_number as the target
-            cursor.execute('UPDATE players SET total_score = ? WHERE id = ?', 
+            cursor.execute(f'UPDATE players SET total_score = ? WHERE game_id = {CURRENT_GAME} AND id = ?', 
                         (current_number - 1, player_id))
             
             conn.commit()
@@ -217,6 +212,25 @@ class DartProcessor:
             )
             conn.commit()
 
+    def record_throw(self, turn_number, player_id, dart_index, score, multiplier, points, position_x, position_y, thrown_at):
+        """Append a dart to the throws table with its board position and CV timestamp"""
+        with self.get_game_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                INSERT OR REPLACE INTO throws
+                (game_id, turn_number, player_id, dart_index, score, multiplier, points, radius, angle, thrown_at)
+                VALUES ({CURRENT_GAME}, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (turn_number, player_id, dart_index, score, multiplier, points, position_x, position_y, thrown_at))
+            event_log.append_event(conn, event_log.THROW_SCORED, turn_number, player_id, dart_index, score, multiplier,
+                                   points=points, radius=position_x, angle=position_y, thrown_at=thrown_at)
+            conn.commit()
+
+    def update_player_stats(self, player_id, stats):
+        """Add one dart's increments (see player_stats.throw_stats) to the player's running stats"""
+        with self.get_game_connection() as conn:
+            player_stats.add_player_stats(conn, player_id, stats)
+            conn.commit()
+
     def update_last_throw(self, score, multiplier, points, player_id):
         """Update the last throw table with the most recent throw"""
         with self.get_game_connection() as conn:
@@ -249,17 +263,25 @@ class DartProcessor:
                 segment_type = "outer_single"
         
         if segment_type:
-            # Add to LEDs database
+            # Only light the dart once the throw it belongs to has committed
+            self.db.after_commit(lambda: self.send_dart_to_leds(score, multiplier, segment_type))
+        else:
+            print(f"WARNING: Could not determine segment type for throw: Score={score}, Multiplier={multiplier}")
+
+    def send_dart_to_leds(self, score, multiplier, segment_type):
+        """Send a committed dart to the LED controller"""
+        delivered = led_events.publish('dart', score=score, multiplier=multiplier, segment_type=segment_type)
+        
+        # dart_events is the fallback when the controller isn't listening, and optionally an audit log
+        if not delivered or led_events.AUDIT_LOG:
             with self.get_leds_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     INSERT INTO dart_events (score, multiplier, segment_type, processed, timestamp)
-                    VALUES (?, ?, ?, 0, CURRENT_TIMESTAMP)
-                ''', (score, multiplier, segment_type))
+                    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ''', (score, multiplier, segment_type, 1 if delivered else 0))
                 conn.commit()
-                print(f"Added throw to LEDs database: Score={score}, Multiplier={multiplier}, Segment={segment_type}")
-        else:
-            print(f"WARNING: Could not determine segment type for throw: Score={score}, Multiplier={multiplier}")
+        print(f"Sent throw to LEDs ({'event channel' if delivered else 'database'}): Score={score}, Multiplier={multiplier}, Segment={segment_type}")
 
     def update_leds_player_state(self, player_id, player_count):
         """Update the LEDs database player_state table with current player information."""
@@ -272,7 +294,8 @@ class DartProcessor:
                     WHERE id = 1
                 """, (player_id, player_count))
                 conn.commit()
-                print(f"Updated LEDs.db player_state: current_player={player_id}, player_count={player_count}")
+            self.db.after_commit(lambda: led_events.publish('player', current_player=player_id, player_count=player_count))
+            print(f"Updated LEDs.db player_state: current_player={player_id}, player_count={player_count}")
         except Exception as e:
             print(f"Error updating LEDs.db player_state: {e}")
 
@@ -291,7 +314,7 @@ class DartProcessor:
                 return None, None
             
             # Get player count from the players table
-            cursor.execute('SELECT COUNT(*) as count FROM players')
+            cursor.execute(f'SELECT COUNT(*) as count FROM players WHERE game_id = {CURRENT_GAME}')
             player_count = cursor.fetchone()['count']
             
             if player_count == 0:
@@ -314,6 +337,7 @@ class DartProcessor:
             # Reset current throws
             # MODIFIED: Set score and multiplier to NULL instead of 0
             cursor.execute('UPDATE current_throws SET points = 0, score = NULL, multiplier = NULL')
+            event_log.append_event(conn, event_log.TURN_ADVANCED, next_turn, next_player)
             
             conn.commit()
             
@@ -326,7 +350,7 @@ class DartProcessor:
             cursor = conn.cursor()
             
             # Find players who have completed all numbers
-            cursor.execute('SELECT player_id FROM around_clock_progress WHERE completed = 1')
+            cursor.execute(f'SELECT player_id FROM around_clock_progress WHERE game_id = {CURRENT_GAME} AND completed = 1')
             winners = cursor.fetchall()
             
             if winners:
@@ -334,7 +358,7 @@ class DartProcessor:
                 winner_id = winners[0]['player_id']
                 
                 # Get the winner's name
-                cursor.execute('SELECT name FROM players WHERE id = ?', (winner_id,))
+                cursor.execute(f'SELECT name FROM players WHERE game_id = {CURRENT_GAME} AND id = ?', (winner_id,))
                 winner_name = cursor.fetchone()['name']
                 
                 # Set game_over flag
@@ -346,80 +370,44 @@ class DartProcessor:
             
             return None
 
-    def save_throw_details_to_turn_scores(self, turn_number, player_id, current_throws):
-        """Store throw details in the turn_scores table for animation handling"""
+    def save_turn_score(self, turn_number, player_id):
+        """Store the player's target in the turn_scores table for animation handling"""
         with self.get_game_connection() as conn:
             cursor = conn.cursor()
             
             # Make sure the turn exists
-            cursor.execute('SELECT 1 FROM turns WHERE turn_number = ?', (turn_number,))
+            cursor.execute(f'SELECT 1 FROM turns WHERE game_id = {CURRENT_GAME} AND turn_number = ?', (turn_number,))
             if not cursor.fetchone():
-                cursor.execute('INSERT INTO turns (turn_number) VALUES (?)', (turn_number,))
+                cursor.execute(f'INSERT INTO turns (game_id, turn_number) VALUES ({CURRENT_GAME}, ?)', (turn_number,))
             
             # Get player's current target for this turn
             player_progress = self.get_player_progress(player_id)
             current_target = player_progress['current_number']
             
-            # Map throws to their respective columns
-            throw_columns = {}
-            for throw in current_throws:
-                throw_num = throw['throw_number']
-                throw_columns[f'throw{throw_num}'] = throw['score']
-                throw_columns[f'throw{throw_num}_multiplier'] = throw['multiplier']
-                throw_columns[f'throw{throw_num}_points'] = throw['points']
-            
             # Check if player already has a score for this turn
             cursor.execute(
-                'SELECT points FROM turn_scores WHERE turn_number = ? AND player_id = ?',
+                f'SELECT points FROM turn_scores WHERE game_id = {CURRENT_GAME} AND turn_number = ? AND player_id = ?',
                 (turn_number, player_id)
             )
             existing = cursor.fetchone()
             
+            # For Around the Clock, points represent the current target
             if existing:
-                # Update existing score with individual throw details
-                update_query = '''
-                UPDATE turn_scores 
-                SET points = ?, 
-                    throw1 = ?, throw1_multiplier = ?, throw1_points = ?,
-                    throw2 = ?, throw2_multiplier = ?, throw2_points = ?,
-                    throw3 = ?, throw3_multiplier = ?, throw3_points = ?,
-                    bust = 0
-                WHERE turn_number = ? AND player_id = ?
-                '''
+                # Update existing score
                 cursor.execute(
-                    update_query,
-                    (
-                        current_target,  # For Around the Clock, points represent the current target
-                        throw_columns.get('throw1', 0), throw_columns.get('throw1_multiplier', 0), throw_columns.get('throw1_points', 0),
-                        throw_columns.get('throw2', 0), throw_columns.get('throw2_multiplier', 0), throw_columns.get('throw2_points', 0),
-                        throw_columns.get('throw3', 0), throw_columns.get('throw3_multiplier', 0), throw_columns.get('throw3_points', 0),
-                        turn_number, player_id
-                    )
+                    f'UPDATE turn_scores SET points = ?, bust = 0 WHERE game_id = {CURRENT_GAME} AND turn_number = ? AND player_id = ?',
+                    (current_target, turn_number, player_id)
                 )
             else:
-                # Insert new score with individual throw details
-                insert_query = '''
-                INSERT INTO turn_scores (
-                    turn_number, player_id, points,
-                    throw1, throw1_multiplier, throw1_points,
-                    throw2, throw2_multiplier, throw2_points,
-                    throw3, throw3_multiplier, throw3_points,
-                    bust
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)
-                '''
+                # Insert new score
                 cursor.execute(
-                    insert_query,
-                    (
-                        turn_number, player_id, current_target,  # For Around the Clock, points represent the current target
-                        throw_columns.get('throw1', 0), throw_columns.get('throw1_multiplier', 0), throw_columns.get('throw1_points', 0),
-                        throw_columns.get('throw2', 0), throw_columns.get('throw2_multiplier', 0), throw_columns.get('throw2_points', 0),
-                        throw_columns.get('throw3', 0), throw_columns.get('throw3_multiplier', 0), throw_columns.get('throw3_points', 0)
-                    )
+                    f'INSERT INTO turn_scores (game_id, turn_number, player_id, points, bust) VALUES ({CURRENT_GAME}, ?, ?, ?, 0)',
+                    (turn_number, player_id, current_target)
                 )
             
             conn.commit()
             
-            print(f"Saved throw details to turn_scores for player {player_id}, turn {turn_number}")
+            print(f"Saved turn score to turn_scores for player {player_id}, turn {turn_number}")
 
     def process_throw(self, throw):
         """Process a single throw for Around the Clock game mode"""
@@ -467,6 +455,8 @@ class DartProcessor:
         
         # Update the current throw with score, multiplier, and points
         self.update_current_throw(throw_position, score, multiplier, points)
+        self.record_throw(current_turn, current_player, throw_position, score, multiplier, points,
+                          position_x, position_y, throw['timestamp'])
         
         # Update the last throw record
         self.update_last_throw(score, multiplier, points, current_player)
@@ -486,6 +476,10 @@ class DartProcessor:
                 # Bullseye (current_number = 21)
                 hit_target = (score == 25)  # 25 is bullseye
         
+        # Count the dart in the player's running stats
+        self.update_player_stats(current_player, player_stats.throw_stats(
+            current_turn, throw_position, score, multiplier, points, hit_target=hit_target))
+        
         # If player hit their target, advance to next number
         if hit_target:
             print(f"Player {current_player} hit their target: {score}")
@@ -535,15 +529,8 @@ class DartProcessor:
         
         # Process game logic when player has used their three throws
         if throw_position == 3:
-            # CRITICAL FIX: Explicitly refresh current_throws to include the latest throw
-            refreshed_current_throws = []
-            with self.get_game_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute('SELECT throw_number, points, score, multiplier FROM current_throws ORDER BY throw_number')
-                refreshed_current_throws = [dict(t) for t in cursor.fetchall()]
-            
-            # Save throw details to turn_scores for third throw animation
-            self.save_throw_details_to_turn_scores(current_turn, current_player, refreshed_current_throws)
+            # Save the turn to turn_scores for third throw animation
+            self.save_turn_score(current_turn, current_player)
             
             # KEY FIX: Always use third_throw animation type for third throws, regardless of target hit
             animation_type = "third_throw"
@@ -552,7 +539,7 @@ class DartProcessor:
             # Calculate next player and turn
             with self.get_game_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('SELECT COUNT(*) as count FROM players')
+                cursor.execute(f'SELECT COUNT(*) as count FROM players WHERE game_id = {CURRENT_GAME}')
                 player_count = cursor.fetchone()['count']
             
             next_player = current_player % player_count + 1  # Cycle to next player (1-based)
@@ -604,7 +591,9 @@ class DartProcessor:
                 
                 # Process each new throw
                 for throw in new_throws:
-                    self.process_throw(throw)
+                    # Everything the throw changes is committed together
+                    with self.db.transaction():
+                        self.process_throw(throw)
                     
                 # Sleep for a bit before next poll
                 time.sleep(self.poll_interval)
@@ -621,26 +610,26 @@ class DartProcessor:
             cursor = conn.cursor()
             
             # Check if this turn exists
-            cursor.execute('SELECT 1 FROM turns WHERE turn_number = ?', (turn_number,))
+            cursor.execute(f'SELECT 1 FROM turns WHERE game_id = {CURRENT_GAME} AND turn_number = ?', (turn_number,))
             if not cursor.fetchone():
-                cursor.execute('INSERT INTO turns (turn_number) VALUES (?)', (turn_number,))
+                cursor.execute(f'INSERT INTO turns (game_id, turn_number) VALUES ({CURRENT_GAME}, ?)', (turn_number,))
             
             # Check if player already has a score for this turn
             cursor.execute(
-                'SELECT 1 FROM turn_scores WHERE turn_number = ? AND player_id = ?',
+                f'SELECT 1 FROM turn_scores WHERE game_id = {CURRENT_GAME} AND turn_number = ? AND player_id = ?',
                 (turn_number, player_id)
             )
             
             if cursor.fetchone():
                 # Update existing record
                 cursor.execute(
-                    'UPDATE turn_scores SET points = ? WHERE turn_number = ? AND player_id = ?',
+                    f'UPDATE turn_scores SET points = ? WHERE game_id = {CURRENT_GAME} AND turn_number = ? AND player_id = ?',
                     (target_number, turn_number, player_id)
                 )
             else:
                 # Insert new record
                 cursor.execute(
-                    'INSERT INTO turn_scores (turn_number, player_id, points) VALUES (?, ?, ?)',
+                    f'INSERT INTO turn_scores (game_id, turn_number, player_id, points) VALUES ({CURRENT_GAME}, ?, ?, ?)',
                     (turn_number, player_id, target_number)
                 )
             
@@ -652,20 +641,7 @@ class DartProcessor:
             with self.get_leds_connection() as conn:
                 cursor = conn.cursor()
                 
-                # Check if the around_clock_state table exists
-                cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='around_clock_state'")
-                if cursor.fetchone() is None:
-                    # Create the table if it doesn't exist
-                    cursor.execute('''
-                    CREATE TABLE around_clock_state (
-                        player_id INTEGER PRIMARY KEY,
-                        current_target INTEGER DEFAULT 1,
-                        completed BOOLEAN DEFAULT 0,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                    ''')
-                
-                # Update or insert the player's state
+                # Update or insert the player's state (LEDs_db_init always creates the table)
                 cursor.execute('''
                     INSERT OR REPLACE INTO around_clock_state 
                     (player_id, current_target, completed, updated_at)
@@ -673,7 +649,8 @@ class DartProcessor:
                 ''', (player_id, current_number, 1 if completed else 0))
                 
                 conn.commit()
-                print(f"Updated LEDs.db around_clock_state for player {player_id}: target={current_number}, completed={completed}")
+            self.db.after_commit(lambda: led_events.publish('around_clock', player_id=player_id, current_target=current_number))
+            print(f"Updated LEDs.db around_clock_state for player {player_id}: target={current_number}, completed={completed}")
         except sqlite3.Error as e:
             print(f"SQLite error updating around_clock_led_state: {e}")
         except Exception as e:
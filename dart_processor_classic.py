@@ -1,7 +1,11 @@
 import sqlite3
 import time
 from datetime import datetime
+from leds import led_events, db_setup
 from contextlib import contextmanager
+from initialize_db import CURRENT_GAME
+import player_stats
+import event_log
 
 class DartProcessor:
     def __init__(self, cv_db_path='simulation/cv_data.db', game_db_path='game.db', 
@@ -12,6 +16,10 @@ class DartProcessor:
         self.poll_interval = poll_interval
         self.animation_duration = animation_duration  # Animation duration in seconds
         
+        # One long-lived game.db connection with the LED databases attached, so
+        # everything a throw changes is committed in a single transaction
+        self.db = db_setup.AttachedDatabases(game_db_path, {'leds': leds_db_path})
+        
         # Initialize timestamp to current local time
         self.last_throw_timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         
@@ -23,7 +31,7 @@ class DartProcessor:
     @contextmanager
     def get_cv_connection(self):
         """Get a connection to the CV database"""
-        conn = sqlite3.connect(self.cv_db_path)
+        conn = db_setup.connect(self.cv_db_path)
         conn.row_factory = sqlite3.Row
         try:
             yield conn
@@ -32,23 +40,15 @@ class DartProcessor:
 
     @contextmanager
     def get_game_connection(self):
-        """Get a connection to the game database"""
-        conn = sqlite3.connect(self.game_db_path)
-        conn.row_factory = sqlite3.Row
-        try:
+        """Get the shared connection to the game database"""
+        with self.db.connection() as conn:
             yield conn
-        finally:
-            conn.close()
             
     @contextmanager
     def get_leds_connection(self):
-        """Get a connection to the LEDs database"""
-        conn = sqlite3.connect(self.leds_db_path)
-        conn.row_factory = sqlite3.Row
-        try:
+        """Get the shared connection for the LEDs database (attached to the game database)"""
+        with self.db.connection() as conn:
             yield conn
-        finally:
-            conn.close()
 
     def reset_animation_state(self):
         """Reset the animation state in the database"""
@@ -63,7 +63,9 @@ class DartProcessor:
                     throw_number = NULL, 
                     timestamp = NULL,
                     next_turn = NULL,
-                    next_player = NULL
+                    next_player = NULL,
+                    target_hit = 0,
+                    cricket_event = NULL
                 WHERE id = 1
             ''')
             conn.commit()
@@ -158,6 +160,25 @@ class DartProcessor:
             )
             conn.commit()
 
+    def record_throw(self, turn_number, player_id, dart_index, score, multiplier, points, position_x, position_y, thrown_at):
+        """Append a dart to the throws table with its board position and CV timestamp"""
+        with self.get_game_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                INSERT OR REPLACE INTO throws
+                (game_id, turn_number, player_id, dart_index, score, multiplier, points, radius, angle, thrown_at)
+                VALUES ({CURRENT_GAME}, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (turn_number, player_id, dart_index, score, multiplier, points, position_x, position_y, thrown_at))
+            event_log.append_event(conn, event_log.THROW_SCORED, turn_number, player_id, dart_index, score, multiplier,
+                                   points=points, radius=position_x, angle=position_y, thrown_at=thrown_at)
+            conn.commit()
+
+    def update_player_stats(self, player_id, stats):
+        """Add one dart's increments (see player_stats.throw_stats) to the player's running stats"""
+        with self.get_game_connection() as conn:
+            player_stats.add_player_stats(conn, player_id, stats)
+            conn.commit()
+
     def update_last_throw(self, score, multiplier, points, player_id):
         """Update the last throw table with the most recent throw"""
         with self.get_game_connection() as conn:
@@ -191,7 +212,7 @@ class DartProcessor:
             
             # Get the total points scored by this player before this turn
             cursor.execute(
-                'SELECT SUM(points) as total_points FROM turn_scores WHERE player_id = ? AND turn_number < ? AND bust = 0',
+                f'SELECT SUM(points) as total_points FROM turn_scores WHERE game_id = {CURRENT_GAME} AND player_id = ? AND turn_number < ? AND bust = 0',
                 (player_id, turn_number)
             )
             
@@ -202,15 +223,15 @@ class DartProcessor:
             
             return score_before_turn
 
-    def add_score_to_turn(self, turn_number, player_id, total_points, current_throws):
-        """Add or update a player's score for a specific turn with individual throw details"""
+    def add_score_to_turn(self, turn_number, player_id, total_points):
+        """Add or update a player's score for a specific turn"""
         with self.get_game_connection() as conn:
             cursor = conn.cursor()
             
             # Check if this turn exists
-            cursor.execute('SELECT 1 FROM turns WHERE turn_number = ?', (turn_number,))
+            cursor.execute(f'SELECT 1 FROM turns WHERE game_id = {CURRENT_GAME} AND turn_number = ?', (turn_number,))
             if not cursor.fetchone():
-                cursor.execute('INSERT INTO turns (turn_number) VALUES (?)', (turn_number,))
+                cursor.execute(f'INSERT INTO turns (game_id, turn_number) VALUES ({CURRENT_GAME}, ?)', (turn_number,))
             
             # Get player's score before this turn
             score_before_turn = self.get_player_score_before_turn(player_id, turn_number)
@@ -222,63 +243,25 @@ class DartProcessor:
             # If it's a bust, set the points to 0 since none of the throws count
             points_to_record = 0 if is_bust else total_points
             
-            # Map throws to their respective columns
-            throw_columns = {}
-            for throw in current_throws:
-                throw_num = throw['throw_number']
-                throw_columns[f'throw{throw_num}'] = throw['score']
-                throw_columns[f'throw{throw_num}_multiplier'] = throw['multiplier']
-                throw_columns[f'throw{throw_num}_points'] = throw['points']
-            
             # Check if player already has a score for this turn
             cursor.execute(
-                'SELECT points, bust FROM turn_scores WHERE turn_number = ? AND player_id = ?',
+                f'SELECT points, bust FROM turn_scores WHERE game_id = {CURRENT_GAME} AND turn_number = ? AND player_id = ?',
                 (turn_number, player_id)
             )
             existing = cursor.fetchone()
             
+            # The individual darts are already in the throws table (see record_throw)
             if existing:
-                # Update existing score with individual throw details and bust flag
-                update_query = '''
-                UPDATE turn_scores 
-                SET points = ?, 
-                    throw1 = ?, throw1_multiplier = ?, throw1_points = ?,
-                    throw2 = ?, throw2_multiplier = ?, throw2_points = ?,
-                    throw3 = ?, throw3_multiplier = ?, throw3_points = ?,
-                    bust = ?
-                WHERE turn_number = ? AND player_id = ?
-                '''
+                # Update existing score and bust flag
                 cursor.execute(
-                    update_query,
-                    (
-                        points_to_record,
-                        throw_columns.get('throw1', 0), throw_columns.get('throw1_multiplier', 0), throw_columns.get('throw1_points', 0),
-                        throw_columns.get('throw2', 0), throw_columns.get('throw2_multiplier', 0), throw_columns.get('throw2_points', 0),
-                        throw_columns.get('throw3', 0), throw_columns.get('throw3_multiplier', 0), throw_columns.get('throw3_points', 0),
-                        1 if is_bust else 0,
-                        turn_number, player_id
-                    )
+                    f'UPDATE turn_scores SET points = ?, bust = ? WHERE game_id = {CURRENT_GAME} AND turn_number = ? AND player_id = ?',
+                    (points_to_record, 1 if is_bust else 0, turn_number, player_id)
                 )
             else:
-                # Insert new score with individual throw details and bust flag
-                insert_query = '''
-                INSERT INTO turn_scores (
-                    turn_number, player_id, points,
-                    throw1, throw1_multiplier, throw1_points,
-                    throw2, throw2_multiplier, throw2_points,
-                    throw3, throw3_multiplier, throw3_points,
-                    bust
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                '''
+                # Insert new score and bust flag
                 cursor.execute(
-                    insert_query,
-                    (
-                        turn_number, player_id, points_to_record,
-                        throw_columns.get('throw1', 0), throw_columns.get('throw1_multiplier', 0), throw_columns.get('throw1_points', 0),
-                        throw_columns.get('throw2', 0), throw_columns.get('throw2_multiplier', 0), throw_columns.get('throw2_points', 0),
-                        throw_columns.get('throw3', 0), throw_columns.get('throw3_multiplier', 0), throw_columns.get('throw3_points', 0),
-                        1 if is_bust else 0
-                    )
+                    f'INSERT INTO turn_scores (game_id, turn_number, player_id, points, bust) VALUES ({CURRENT_GAME}, ?, ?, ?, ?)',
+                    (turn_number, player_id, points_to_record, 1 if is_bust else 0)
                 )
             
             # Get starting score from game_config
@@ -299,7 +282,7 @@ class DartProcessor:
             # Update player's total score based on game mode
             # Get sum of all points scored by this player from non-busted turns
             cursor.execute(
-                'SELECT SUM(points) as total_points FROM turn_scores WHERE player_id = ? AND bust = 0',
+                f'SELECT SUM(points) as total_points FROM turn_scores WHERE game_id = {CURRENT_GAME} AND player_id = ? AND bust = 0',
                 (player_id,)
             )
             total_player_points = cursor.fetchone()['total_points'] or 0
@@ -309,7 +292,7 @@ class DartProcessor:
             
             # Update player's total score
             cursor.execute(
-                'UPDATE players SET total_score = ? WHERE id = ?',
+                f'UPDATE players SET total_score = ? WHERE game_id = {CURRENT_GAME} AND id = ?',
                 (new_score, player_id)
             )
             
@@ -342,7 +325,7 @@ class DartProcessor:
                 return None, None
             
             # Get player count from the players table
-            cursor.execute('SELECT COUNT(*) as count FROM players')
+            cursor.execute(f'SELECT COUNT(*) as count FROM players WHERE game_id = {CURRENT_GAME}')
             player_count = cursor.fetchone()['count']
             
             if player_count == 0:
@@ -365,6 +348,7 @@ class DartProcessor:
             # Reset current throws
             # MODIFIED: Set score and multiplier to NULL instead of 0
             cursor.execute('UPDATE current_throws SET points = 0, score = NULL, multiplier = NULL')
+            event_log.append_event(conn, event_log.TURN_ADVANCED, next_turn, next_player)
             
             conn.commit()
             
@@ -392,17 +376,25 @@ class DartProcessor:
                 segment_type = "outer_single"
         
         if segment_type:
-            # Add to LEDs database
+            # Only light the dart once the throw it belongs to has committed
+            self.db.after_commit(lambda: self.send_dart_to_leds(score, multiplier, segment_type))
+        else:
+            print(f"WARNING: Could not determine segment type for throw: Score={score}, Multiplier={multiplier}")
+
+    def send_dart_to_leds(self, score, multiplier, segment_type):
+        """Send a committed dart to the LED controller"""
+        delivered = led_events.publish('dart', score=score, multiplier=multiplier, segment_type=segment_type)
+        
+        # dart_events is the fallback when the controller isn't listening, and optionally an audit log
+        if not delivered or led_events.AUDIT_LOG:
             with self.get_leds_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     INSERT INTO dart_events (score, multiplier, segment_type, processed, timestamp)
-                    VALUES (?, ?, ?, 0, CURRENT_TIMESTAMP)
-                ''', (score, multiplier, segment_type))
+                    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ''', (score, multiplier, segment_type, 1 if delivered else 0))
                 conn.commit()
-                print(f"Added throw to LEDs database: Score={score}, Multiplier={multiplier}, Segment={segment_type}")
-        else:
-            print(f"WARNING: Could not determine segment type for throw: Score={score}, Multiplier={multiplier}")
+        print(f"Sent throw to LEDs ({'event channel' if delivered else 'database'}): Score={score}, Multiplier={multiplier}, Segment={segment_type}")
 
     def process_throw(self, throw):
         """Process a single throw and update game state"""
@@ -451,6 +443,8 @@ class DartProcessor:
         
         # Update the current throw with score, multiplier, and points
         self.update_current_throw(throw_position, score, multiplier, points)
+        self.record_throw(current_turn, current_player, throw_position, score, multiplier, points,
+                          position_x, position_y, throw['timestamp'])
         
         # Update the last throw record
         self.update_last_throw(score, multiplier, points, current_player)
@@ -462,21 +456,19 @@ class DartProcessor:
         player_score_before_turn = self.get_player_score_before_turn(current_player, current_turn)
         new_score = player_score_before_turn - total_current_points
         is_bust = (new_score < 0)
+        
+        # Count the dart in the player's running stats; a bust takes back the earlier darts of the turn
+        earlier_points = total_current_points - points
+        self.update_player_stats(current_player, player_stats.throw_stats(
+            current_turn, throw_position, score, multiplier, points,
+            remaining=player_score_before_turn - earlier_points, turn_points=earlier_points))
 
         # Check if this would result in a win (score exactly 0)
         if new_score == 0:
             print(f"WIN detected! Player {current_player} has won with a perfect score of 0!")
             
-            # Explicitly refresh current_throws to include the latest throw
-            current_throws = []
-            with self.get_game_connection() as conn:
-                cursor = conn.cursor()
-                # Get the updated current_throws after our update above
-                cursor.execute('SELECT throw_number, points, score, multiplier FROM current_throws ORDER BY throw_number')
-                current_throws = [dict(t) for t in cursor.fetchall()]
-            
             # Record the score in the database
-            self.add_score_to_turn(current_turn, current_player, total_current_points, current_throws)
+            self.add_score_to_turn(current_turn, current_player, total_current_points)
             
             # Set game_over to 1
             with self.get_game_connection() as conn:
@@ -502,16 +494,8 @@ class DartProcessor:
             animation_type = "bust" if is_bust else "third_throw"
             print(f"{animation_type.upper()} detected! Processing game logic...")
             
-            # **** CRITICAL FIX: Explicitly refresh current_throws to include the latest throw ****
-            current_throws = []
-            with self.get_game_connection() as conn:
-                cursor = conn.cursor()
-                # Get the updated current_throws after our update above
-                cursor.execute('SELECT throw_number, points, score, multiplier FROM current_throws ORDER BY throw_number')
-                current_throws = [dict(t) for t in cursor.fetchall()]
-            
             # Record the score in the database
-            self.add_score_to_turn(current_turn, current_player, total_current_points, current_throws)
+            self.add_score_to_turn(current_turn, current_player, total_current_points)
             
             # Only advance if game isn't over
             with self.get_game_connection() as conn:
@@ -523,7 +507,7 @@ class DartProcessor:
                 # Calculate next player and turn
                 with self.get_game_connection() as conn:
                     cursor = conn.cursor()
-                    cursor.execute('SELECT COUNT(*) as count FROM players')
+                    cursor.execute(f'SELECT COUNT(*) as count FROM players WHERE game_id = {CURRENT_GAME}')
                     player_count = cursor.fetchone()['count']
                 
                 next_player = current_player % player_count + 1  # Cycle to next player (1-based)
@@ -562,7 +546,9 @@ class DartProcessor:
                 
                 # Process each new throw
                 for throw in new_throws:
-                    self.process_throw(throw)
+                    # Everything the throw changes is committed together
+                    with self.db.transaction():
+                        self.process_throw(throw)
                     
                 # Sleep for a bit before next poll
                 time.sleep(self.poll_interval)
@@ -10,7 +10,11 @@ The first player to reach 5 points wins.
 import sqlite3
 import time
 from datetime import datetime
+from leds import led_events, db_setup
 from contextlib import contextmanager
+from initialize_db import CURRENT_GAME
+import player_stats
+import event_log
 
 class DartProcessor:
     def __init__(self, cv_db_path='simulation/cv_data.db', game_db_path='game.db', 
@@ -23,6 +27,10 @@ class DartProcessor:
         self.poll_interval = poll_interval
         self.animation_duration = animation_duration
         
+        # One long-lived game.db connection with the LED databases attached, so
+        # everything a throw changes is committed in a single transaction
+        self.db = db_setup.AttachedDatabases(game_db_path, {'leds': leds_db_path, 'moving_target': moving_target_db_path})
+        
         # Initialize timestamp to current local time
         self.last_throw_timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         
@@ -34,7 +42,7 @@ class DartProcessor:
     @contextmanager
     def get_cv_connection(self):
         """Get a connection to the CV database"""
-        conn = sqlite3.connect(self.cv_db_path)
+        conn = db_setup.connect(self.cv_db_path)
         conn.row_factory = sqlite3.Row
         try:
             yield conn
@@ -43,33 +51,21 @@ class DartProcessor:
 
     @contextmanager
     def get_game_connection(self):
-        """Get a connection to the game database"""
-        conn = sqlite3.connect(self.game_db_path)
-        conn.row_factory = sqlite3.Row
-        try:
+        """Get the shared connection to the game database"""
+        with self.db.connection() as conn:
             yield conn
-        finally:
-            conn.close()
             
     @contextmanager
     def get_leds_connection(self):
-        """Get a connection to the LEDs database"""
-        conn = sqlite3.connect(self.leds_db_path)
-        conn.row_factory = sqlite3.Row
-        try:
+        """Get the shared connection for the LEDs database (attached to the game database)"""
+        with self.db.connection() as conn:
             yield conn
-        finally:
-            conn.close()
             
     @contextmanager
     def get_moving_target_connection(self):
-        """Get a connection to the Moving Target database"""
-        conn = sqlite3.connect(self.moving_target_db_path)
-        conn.row_factory = sqlite3.Row
-        try:
+        """Get the shared connection for the Moving Target database (attached to the game database)"""
+        with self.db.connection() as conn:
             yield conn
-        finally:
-            conn.close()
 
     def reset_animation_state(self):
         """Reset the animation state in the database"""
@@ -84,7 +80,9 @@ class DartProcessor:
                     throw_number = NULL, 
                     timestamp = NULL,
                     next_turn = NULL,
-                    next_player = NULL
+                    next_player = NULL,
+                    target_hit = 0,
+                    cricket_event = NULL
                 WHERE id = 1
             ''')
             conn.commit()
@@ -106,13 +104,6 @@ class DartProcessor:
         with self.get_game_connection() as conn:
             cursor = conn.cursor()
             
-            # First add a column to the animation_state table if it doesn't exist yet
-            try:
-                cursor.execute("SELECT target_hit FROM animation_state LIMIT 1")
-            except sqlite3.OperationalError:
-                # Column doesn't exist, add it
-                cursor.execute("ALTER TABLE animation_state ADD COLUMN target_hit INTEGER DEFAULT 0")
-            
             cursor.execute('''
                 UPDATE animation_state 
                 SET animating = 1, 
@@ -203,6 +194,25 @@ class DartProcessor:
             )
             conn.commit()
 
+    def record_throw(self, turn_number, player_id, dart_index, score, multiplier, points, position_x, position_y, thrown_at, hit_target=False):
+        """Append a dart to the throws table with its board position and CV timestamp"""
+        with self.get_game_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                INSERT OR REPLACE INTO throws
+                (game_id, turn_number, player_id, dart_index, score, multiplier, points, radius, angle, thrown_at)
+                VALUES ({CURRENT_GAME}, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (turn_number, player_id, dart_index, score, multiplier, points, position_x, position_y, thrown_at))
+            event_log.append_event(conn, event_log.THROW_SCORED, turn_number, player_id, dart_index, score, multiplier,
+                                   points=points, radius=position_x, angle=position_y, thrown_at=thrown_at, hit_target=hit_target)
+            conn.commit()
+
+    def update_player_stats(self, player_id, stats):
+        """Add one dart's increments (see player_stats.throw_stats) to the player's running stats"""
+        with self.get_game_connection() as conn:
+            player_stats.add_player_stats(conn, player_id, stats)
+            conn.commit()
+
     def update_last_throw(self, score, multiplier, points, player_id):
         """Update the last throw table with the most recent throw"""
         with self.get_game_connection() as conn:
@@ -238,35 +248,32 @@ class DartProcessor:
                 segment_type = "outer_single"
         
         if segment_type:
-            # Add to LEDs database
+            # For Moving Target mode, we set the segment type depending on whether it hit the target
+            # This will be used by the LED controller to determine whether to blink green or red
+            animation_type = "target_hit" if hit_target else "target_miss"
+            event_segment_type = f"{segment_type}_{animation_type}"
+            
+            # Only light the dart once the throw it belongs to has committed
+            self.db.after_commit(lambda: self.send_dart_to_leds(score, multiplier, event_segment_type, hit_target))
+        else:
+            print(f"WARNING: Could not determine segment type for throw: Score={score}, Multiplier={multiplier}")
+
+    def send_dart_to_leds(self, score, multiplier, event_segment_type, hit_target):
+        """Send a committed dart to the LED controller"""
+        delivered = led_events.publish('dart', score=score, multiplier=multiplier, segment_type=event_segment_type)
+        
+        # dart_events is the fallback when the controller isn't listening, and optionally an audit log
+        if not delivered or led_events.AUDIT_LOG:
             with self.get_leds_connection() as conn:
                 cursor = conn.cursor()
-                
-                # For Moving Target mode, we set the segment type depending on whether it hit the target
-                # This will be used by the LED controller to determine whether to blink green or red
-                animation_type = "target_hit" if hit_target else "target_miss"
-                
                 cursor.execute('''
                     INSERT INTO dart_events (score, multiplier, segment_type, processed, timestamp)
-                    VALUES (?, ?, ?, 0, CURRENT_TIMESTAMP)
-                ''', (score, multiplier, segment_type))
-                
-                # Get the ID of the inserted event
-                event_id = cursor.lastrowid
-                
-                # Update the segment type to include hit or miss information
-                cursor.execute('''
-                    UPDATE dart_events
-                    SET segment_type = ?
-                    WHERE id = ?
-                ''', (f"{segment_type}_{animation_type}", event_id))
-                
+                    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ''', (score, multiplier, event_segment_type, 1 if delivered else 0))
                 conn.commit()
-                
-                hit_status = "HIT" if hit_target else "MISS"
-                print(f"Added throw to LEDs database: Score={score}, Multiplier={multiplier}, Segment={segment_type}, Target {hit_status}")
-        else:
-            print(f"WARNING: Could not determine segment type for throw: Score={score}, Multiplier={multiplier}")
+            
+        hit_status = "HIT" if hit_target else "MISS"
+        print(f"Sent throw to LEDs ({'event channel' if delivered else 'database'}): Score={score}, Multiplier={multiplier}, Segment={event_segment_type}, Target {hit_status}")
 
     def check_if_hit_target(self, score, segment_type):
         """Check if the throw hit the current active target"""
@@ -284,7 +291,7 @@ class DartProcessor:
             cursor = conn.cursor()
             
             # Get current score
-            cursor.execute('SELECT total_score FROM players WHERE id = ?', (player_id,))
+            cursor.execute(f'SELECT total_score FROM players WHERE game_id = {CURRENT_GAME} AND id = ?', (player_id,))
             row = cursor.fetchone()
             if not row:
                 print(f"Error: Player {player_id} not found")
@@ -294,7 +301,7 @@ class DartProcessor:
             new_score = current_score + points_to_add
             
             # Update the score
-            cursor.execute('UPDATE players SET total_score = ? WHERE id = ?', (new_score, player_id))
+            cursor.execute(f'UPDATE players SET total_score = ? WHERE game_id = {CURRENT_GAME} AND id = ?', (new_score, player_id))
             
             # Check for win condition (first to 5 points)
             if new_score >= 5:
@@ -320,7 +327,7 @@ class DartProcessor:
                 return None, None
             
             # Get player count from the players table
-            cursor.execute('SELECT COUNT(*) as count FROM players')
+            cursor.execute(f'SELECT COUNT(*) as count FROM players WHERE game_id = {CURRENT_GAME}')
             player_count = cursor.fetchone()['count']
             
             if player_count == 0:
@@ -342,29 +349,22 @@ class DartProcessor:
             
             # Reset current throws
             cursor.execute('UPDATE current_throws SET points = 0, score = NULL, multiplier = NULL')
+            event_log.append_event(conn, event_log.TURN_ADVANCED, next_turn, next_player)
             
             conn.commit()
             
             print(f"Advanced to Player {next_player}, Turn {next_turn}")
             return next_player, next_turn
 
-    def save_throw_details_to_turn_scores(self, turn_number, player_id, current_throws, hit_target=False):
-        """Store throw details in the turn_scores table for animation handling"""
+    def save_turn_score(self, turn_number, player_id, hit_target=False):
+        """Store the turn's hit count in the turn_scores table for animation handling"""
         with self.get_game_connection() as conn:
             cursor = conn.cursor()
             
             # Make sure the turn exists
-            cursor.execute('SELECT 1 FROM turns WHERE turn_number = ?', (turn_number,))
+            cursor.execute(f'SELECT 1 FROM turns WHERE game_id = {CURRENT_GAME} AND turn_number = ?', (turn_number,))
             if not cursor.fetchone():
-                cursor.execute('INSERT INTO turns (turn_number) VALUES (?)', (turn_number,))
-            
-            # Map throws to their respective columns
-            throw_columns = {}
-            for throw in current_throws:
-                throw_num = throw['throw_number']
-                throw_columns[f'throw{throw_num}'] = throw['score']
-                throw_columns[f'throw{throw_num}_multiplier'] = throw['multiplier']
-                throw_columns[f'throw{throw_num}_points'] = throw['points']
+                cursor.execute(f'INSERT INTO turns (game_id, turn_number) VALUES ({CURRENT_GAME}, ?)', (turn_number,))
             
             # Calculate points - In Moving Target, points field is used to track cumulative hits
             # If this throw hit the target, add 1 point
@@ -372,59 +372,28 @@ class DartProcessor:
             
             # Check if player already has a score for this turn
             cursor.execute(
-                'SELECT points FROM turn_scores WHERE turn_number = ? AND player_id = ?',
+                f'SELECT points FROM turn_scores WHERE game_id = {CURRENT_GAME} AND turn_number = ? AND player_id = ?',
                 (turn_number, player_id)
             )
             existing = cursor.fetchone()
             
             if existing:
-                # Update existing score with individual throw details
                 # In Moving Target, we add to the existing points if a hit
                 points = existing['points'] + points_to_add
-                
-                update_query = '''
-                UPDATE turn_scores 
-                SET points = ?, 
-                    throw1 = ?, throw1_multiplier = ?, throw1_points = ?,
-                    throw2 = ?, throw2_multiplier = ?, throw2_points = ?,
-                    throw3 = ?, throw3_multiplier = ?, throw3_points = ?,
-                    bust = 0
-                WHERE turn_number = ? AND player_id = ?
-                '''
                 cursor.execute(
-                    update_query,
-                    (
-                        points,
-                        throw_columns.get('throw1', 0), throw_columns.get('throw1_multiplier', 0), throw_columns.get('throw1_points', 0),
-                        throw_columns.get('throw2', 0), throw_columns.get('throw2_multiplier', 0), throw_columns.get('throw2_points', 0),
-                        throw_columns.get('throw3', 0), throw_columns.get('throw3_multiplier', 0), throw_columns.get('throw3_points', 0),
-                        turn_number, player_id
-                    )
+                    f'UPDATE turn_scores SET points = ?, bust = 0 WHERE game_id = {CURRENT_GAME} AND turn_number = ? AND player_id = ?',
+                    (points, turn_number, player_id)
                 )
             else:
-                # Insert new score with individual throw details
-                insert_query = '''
-                INSERT INTO turn_scores (
-                    turn_number, player_id, points,
-                    throw1, throw1_multiplier, throw1_points,
-                    throw2, throw2_multiplier, throw2_points,
-                    throw3, throw3_multiplier, throw3_points,
-                    bust
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)
-                '''
+                # Insert new score
                 cursor.execute(
-                    insert_query,
-                    (
-                        turn_number, player_id, points_to_add,
-                        throw_columns.get('throw1', 0), throw_columns.get('throw1_multiplier', 0), throw_columns.get('throw1_points', 0),
-                        throw_columns.get('throw2', 0), throw_columns.get('throw2_multiplier', 0), throw_columns.get('throw2_points', 0),
-                        throw_columns.get('throw3', 0), throw_columns.get('throw3_multiplier', 0), throw_columns.get('throw3_points', 0)
-                    )
+                    f'INSERT INTO turn_scores (game_id, turn_number, player_id, points, bust) VALUES ({CURRENT_GAME}, ?, ?, ?, 0)',
+                    (turn_number, player_id, points_to_add)
                 )
             
             conn.commit()
             
-            print(f"Saved throw details to turn_scores for player {player_id}, turn {turn_number}, hit_target={hit_target}")
+            print(f"Saved turn score to turn_scores for player {player_id}, turn {turn_number}, hit_target={hit_target}")
 
     def process_throw(self, throw):
         """Process a single throw for Moving Target game mode"""
@@ -492,6 +461,10 @@ class DartProcessor:
         
         # Update the current throw with score, multiplier, and points
         self.update_current_throw(throw_position, score, multiplier, points)
+        self.record_throw(current_turn, current_player, throw_position, score, multiplier, points,
+                          position_x, position_y, throw['timestamp'], hit_target)
+        self.update_player_stats(current_player, player_stats.throw_stats(
+            current_turn, throw_position, score, multiplier, points))
         
         # Update the last throw record
         self.update_last_throw(score, multiplier, points, current_player)
@@ -505,8 +478,8 @@ class DartProcessor:
             
             # Check if player has won (reached 5 points)
             if new_score >= 5:
-                # Save the throw details
-                self.save_throw_details_to_turn_scores(current_turn, current_player, current_throws, hit_target)
+                # Save the turn's hits to turn_scores
+                self.save_turn_score(current_turn, current_player, hit_target)
                 
                 # Set the animation state for a win
                 self.set_animation_state(
@@ -526,20 +499,13 @@ class DartProcessor:
         if throw_position == 3:
             print(f"Third throw detected! Processing game logic...")
             
-            # Explicitly refresh current_throws to include the latest throw
-            current_throws = []
-            with self.get_game_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute('SELECT throw_number, points, score, multiplier FROM current_throws ORDER BY throw_number')
-                current_throws = [dict(t) for t in cursor.fetchall()]
-            
-            # Save throw details to turn_scores
-            self.save_throw_details_to_turn_scores(current_turn, current_player, current_throws, hit_target)
+            # Save the turn's hits to turn_scores
+            self.save_turn_score(current_turn, current_player, hit_target)
             
             # Calculate next player and turn
             with self.get_game_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('SELECT COUNT(*) as count FROM players')
+                cursor.execute(f'SELECT COUNT(*) as count FROM players WHERE game_id = {CURRENT_GAME}')
                 player_count = cursor.fetchone()['count']
             
             next_player = current_player % player_count + 1
@@ -566,8 +532,8 @@ class DartProcessor:
         else:
             # If not the third throw, set animation state without advancing player
             if hit_target:
-                # Save throw details to turn_scores (partial update)
-                self.save_throw_details_to_turn_scores(current_turn, current_player, current_throws, hit_target)
+                # Save the turn's hits to turn_scores (partial update)
+                self.save_turn_score(current_turn, current_player, hit_target)
                 
                 # Set animation for target hit
                 self.set_animation_state(
@@ -604,7 +570,9 @@ class DartProcessor:
                 
                 # Process each new throw
                 for throw in new_throws:
-                    self.process_throw(throw)
+                    # Everything the throw changes is committed together
+                    with self.db.transaction():
+                        self.process_throw(throw)
                     
                 # Sleep for a bit before next poll
                 time.sleep(self.poll_interval)
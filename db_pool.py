@@ -0,0 +1,47 @@
+import os
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from flask import copy_current_request_context
+
+# Maximum number of SQLite calls allowed to run at the same time
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '4'))
+
+_executor = None
+
+def using_gevent():
+    """Check whether the process has been monkey patched by gevent (see serve.py)"""
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched('threading')
+
+def run_in_db_pool(fn, *args, **kwargs):
+    """Run a blocking database call on the bounded DB thread pool and wait for the result
+
+    Under gevent only the calling greenlet waits, so other viewers keep being served
+    while a slow SD-card write is in progress.
+    """
+    global _executor
+
+    if using_gevent():
+        # gevent's hub threadpool uses real OS threads even when threading is patched
+        from gevent import get_hub
+        threadpool = get_hub().threadpool
+        if threadpool.maxsize != DB_POOL_SIZE:
+            threadpool.maxsize = DB_POOL_SIZE
+        return threadpool.apply(fn, args, kwargs)
+
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=DB_POOL_SIZE, thread_name_prefix='db')
+    return _executor.submit(fn, *args, **kwargs).result()
+
+def offload_db(view):
+    """Decorator that runs a Flask view on the DB thread pool with its request context
+
+    Offloaded views must not call other offloaded views, or a full pool can deadlock.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        return run_in_db_pool(copy_current_request_context(view), *args, **kwargs)
+    return wrapper
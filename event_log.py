@@ -0,0 +1,450 @@
+"""
+event_log.py
+
+Append-only log of everything that happens in a game. The dart processors and
+the correction routes append an event for each change they make, and the
+scoreboard tables (players.total_score, turn_scores, cricket_scores and
+around_clock_progress) are projections of the log: replaying a game's events
+through the rules of its mode gives the rows the processors write.
+
+The processors still update the projections in place as darts land, so a
+throw only costs one more insert. Corrections and undo append their event
+and rebuild the game's projections from the log instead of patching them.
+Every SNAPSHOT_EVERY events the replayed state is stored in game_snapshots,
+so reconstructing any point of a game replays at most that many events.
+
+Usage:
+    python event_log.py [--game GAME_ID]               # rebuild the projections from the log
+    python event_log.py --game GAME_ID --at EVENT_ID   # show the game as it was after an event
+"""
+
+import argparse
+import json
+
+from leds import db_setup
+
+# Event types
+GAME_STARTED = 'game_started'        # data: game_mode, starting_score, players ([id, name] pairs)
+THROW_SCORED = 'throw_scored'        # A dart from the CV feed; data: points, radius, angle, thrown_at, hit_target
+THROW_CORRECTED = 'throw_corrected'  # A dart entered or changed by hand; data: hit_target (optional)
+THROW_UNDONE = 'throw_undone'        # A dart taken back; play returns to its turn
+MISS_RECORDED = 'miss_recorded'      # Miss button pressed; the dart itself follows as THROW_SCORED
+TURN_ADVANCED = 'turn_advanced'      # Play moved to turn_number / player_id
+
+SNAPSHOT_EVERY = 50  # Events replayed at most to reconstruct any point of a game
+
+CRICKET_NUMBERS = (15, 16, 17, 18, 19, 20, 25)  # 25 is bullseye
+MOVING_TARGET_WIN = 5  # Hits needed to win Moving Target
+
+EVENT_COLUMNS = 'id, event_type, turn_number, player_id, dart_index, score, multiplier, data'
+
+
+def current_game_id(conn):
+    """Id of the game in play"""
+    return conn.execute('SELECT game_id FROM game_state WHERE id = 1').fetchone()[0]
+
+
+def append_event(conn, event_type, turn_number=None, player_id=None, dart_index=None,
+                 score=None, multiplier=None, game_id=None, **data):
+    """Append an event to the log of the game in play (or game_id); returns its id (caller commits)"""
+    if game_id is None:
+        game_id = current_game_id(conn)
+    event_id = conn.execute('''
+        INSERT INTO game_events (game_id, event_type, turn_number, player_id, dart_index, score, multiplier, data)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (game_id, event_type, turn_number, player_id, dart_index, score, multiplier,
+          json.dumps(data) if data else None)).lastrowid
+
+    # Keep the newest snapshot within SNAPSHOT_EVERY events of the end of the log
+    last_snapshot = conn.execute('SELECT MAX(event_id) FROM game_snapshots WHERE game_id = ?', (game_id,)).fetchone()[0]
+    pending = conn.execute(
+        'SELECT COUNT(*) FROM game_events WHERE game_id = ? AND id > ?', (game_id, last_snapshot or 0)
+    ).fetchone()[0]
+    if pending >= SNAPSHOT_EVERY:
+        save_snapshot(conn, game_id)
+    return event_id
+
+
+def new_state():
+    """Replay state of a game before its first event"""
+    return {
+        'event_id': 0,  # Last event applied
+        'game_mode': None,
+        'starting_score': 0,
+        'players': [],  # (id, name) in play order
+        'darts': {},  # (turn_number, player_id, dart_index) -> (score, multiplier, hit_target)
+        'current_turn': 1,
+        'current_player': 1
+    }
+
+
+def dump_state(state):
+    """State as JSON for game_snapshots"""
+    darts = [list(key) + list(dart) for key, dart in sorted(state['darts'].items())]
+    return json.dumps(dict(state, darts=darts))
+
+
+def load_state(text):
+    """State from a game_snapshots row"""
+    state = json.loads(text)
+    state['players'] = [tuple(player) for player in state['players']]
+    state['darts'] = {tuple(dart[:3]): (dart[3], dart[4], dart[5]) for dart in state['darts']}
+    return state
+
+
+def apply_event(state, event):
+    """Apply one game_events row to a replay state"""
+    event_id, event_type, turn_number, player_id, dart_index, score, multiplier, data = event
+    data = json.loads(data) if data else {}
+    key = (turn_number, player_id, dart_index)
+
+    if event_type == GAME_STARTED:
+        # Also logged when the mode is switched without a reset; the darts stay
+        state['game_mode'] = data['game_mode']
+        state['starting_score'] = data['starting_score']
+        state['players'] = [tuple(player) for player in data['players']]
+    elif event_type == THROW_SCORED:
+        state['darts'][key] = (score, multiplier, bool(data.get('hit_target')))
+        state['current_turn'], state['current_player'] = turn_number, player_id
+    elif event_type == THROW_CORRECTED:
+        # A Moving Target hit depended on where the target was, so a correction
+        # keeps it unless the hit is given with the correction
+        previous = state['darts'].get(key)
+        hit_target = data['hit_target'] if 'hit_target' in data else bool(previous and previous[2])
+        state['darts'][key] = (score, multiplier, hit_target)
+    elif event_type == THROW_UNDONE:
+        state['darts'].pop(key, None)
+        state['current_turn'], state['current_player'] = turn_number, player_id
+    elif event_type == TURN_ADVANCED:
+        state['current_turn'], state['current_player'] = turn_number, player_id
+
+    state['event_id'] = event_id
+    return state
+
+
+def replay_game(conn, game_id, upto=None):
+    """State of a game after event upto (default: its latest), starting from the nearest snapshot"""
+    if upto is None:
+        upto = conn.execute('SELECT COALESCE(MAX(id), 0) FROM game_events WHERE game_id = ?', (game_id,)).fetchone()[0]
+
+    snapshot = conn.execute('''
+        SELECT state FROM game_snapshots WHERE game_id = ? AND event_id <= ?
+        ORDER BY event_id DESC LIMIT 1
+    ''', (game_id, upto)).fetchone()
+    state = load_state(snapshot[0]) if snapshot else new_state()
+
+    events = conn.execute(f'''
+        SELECT {EVENT_COLUMNS} FROM game_events
+        WHERE game_id = ? AND id > ? AND id <= ?
+        ORDER BY id
+    ''', (game_id, state['event_id'], upto))
+    for event in events:
+        apply_event(state, event)
+    return state
+
+
+def save_snapshot(conn, game_id):
+    """Store the game's replayed state at the end of its log (caller commits)"""
+    state = replay_game(conn, game_id)
+    conn.execute('INSERT OR REPLACE INTO game_snapshots (game_id, event_id, state) VALUES (?, ?, ?)',
+                 (game_id, state['event_id'], dump_state(state)))
+
+
+def player_turns(state):
+    """((turn_number, player_id), darts, turn_over) for every turn with darts, in play order"""
+    turns = {}
+    for (turn_number, player_id, dart_index), dart in sorted(state['darts'].items()):
+        turns.setdefault((turn_number, player_id), []).append(dart)
+
+    position = (state['current_turn'], state['current_player'])
+    return [(turn, darts, turn < position) for turn, darts in turns.items()]
+
+
+def project_x01(state):
+    """Scores and turn results of a 301/501 game"""
+    totals = {player_id: state['starting_score'] for player_id, _ in state['players']}
+    turn_scores = {}
+    for (turn_number, player_id), darts, turn_over in player_turns(state):
+        remaining = totals.get(player_id, state['starting_score'])
+        turn_total = sum(score * multiplier for score, multiplier, _ in darts)
+
+        # The turn in play is only scored when it ends, or when it wins the game
+        if not turn_over and turn_total != remaining:
+            continue
+
+        # A turn that takes the player below zero is a bust and scores nothing
+        bust = turn_total > remaining
+        points = 0 if bust else turn_total
+        turn_scores[(turn_number, player_id)] = (points, bust)
+        totals[player_id] = remaining - points
+
+    return {'totals': totals, 'turn_scores': turn_scores, 'game_over': 0 in totals.values()}
+
+
+def project_cricket(state):
+    """Marks, points and turn results of an American Cricket game"""
+    player_ids = [player_id for player_id, _ in state['players']]
+    marks = {(player_id, number): 0 for player_id in player_ids for number in CRICKET_NUMBERS}
+    points = dict.fromkeys(marks, 0)
+    turn_scores = {}
+
+    for (turn_number, player_id), darts, turn_over in player_turns(state):
+        if player_id not in player_ids:
+            continue
+
+        for score, multiplier, _ in darts:
+            if score not in CRICKET_NUMBERS:
+                continue
+
+            # A number closed by two players is closed for everyone
+            closers = sum(1 for other in player_ids if marks[(other, score)] >= 3)
+            if closers >= 2:
+                continue
+
+            key = (player_id, score)
+            if marks[key] >= 3:
+                points[key] += score * multiplier
+                continue
+
+            # Marks beyond the three needed to close score points, unless this
+            # dart made the player the second to close the number
+            applied = min(multiplier, 3 - marks[key])
+            marks[key] += applied
+            excess = multiplier - applied
+            if excess and closers != 1:
+                points[key] += score * excess
+
+        # The turn's raw dart total is shown for the third throw animation
+        if turn_over:
+            turn_scores[(turn_number, player_id)] = (sum(score * multiplier for score, multiplier, _ in darts), False)
+
+    totals = {player_id: sum(points[(player_id, number)] for number in CRICKET_NUMBERS) for player_id in player_ids}
+    cricket_scores = {key: (marks[key], points[key], marks[key] >= 3) for key in marks}
+
+    # Won by closing every number with the highest (or a tied highest) score
+    highest = max(totals.values(), default=0)
+    game_over = any(
+        totals[player_id] == highest and all(marks[(player_id, number)] >= 3 for number in CRICKET_NUMBERS)
+        for player_id in player_ids
+    )
+    return {'totals': totals, 'turn_scores': turn_scores, 'cricket_scores': cricket_scores, 'game_over': game_over}
+
+
+def project_around_clock(state):
+    """Targets and turn results of an Around the Clock game"""
+    targets = {player_id: 1 for player_id, _ in state['players']}
+    completed = dict.fromkeys(targets, False)
+    turn_scores = {}
+
+    for (turn_number, player_id), darts, turn_over in player_turns(state):
+        for score, _, _ in darts:
+            target = targets.setdefault(player_id, 1)
+            if completed.get(player_id):
+                continue
+
+            # 21 stands for the bullseye, the last target
+            if score == (25 if target == 21 else target):
+                if target == 21:
+                    completed[player_id] = True
+                else:
+                    targets[player_id] = target + 1
+
+        # turn_scores holds the player's target after the turn
+        if turn_over:
+            turn_scores[(turn_number, player_id)] = (targets[player_id], False)
+
+    return {
+        'totals': {player_id: target - 1 for player_id, target in targets.items()},
+        'turn_scores': turn_scores,
+        'around_clock_progress': {player_id: (targets[player_id], completed.get(player_id, False)) for player_id in targets},
+        'game_over': any(completed.values())
+    }
+
+
+def project_moving_target(state):
+    """Hits and turn results of a Moving Target game"""
+    totals = {player_id: 0 for player_id, _ in state['players']}
+    turn_scores = {}
+
+    for (turn_number, player_id), darts, turn_over in player_turns(state):
+        hits = sum(1 for _, _, hit_target in darts if hit_target)
+        totals[player_id] = totals.get(player_id, 0) + hits
+
+        # A hit records the turn straight away, a turn without one when it ends
+        if turn_over or hits:
+            turn_scores[(turn_number, player_id)] = (hits, False)
+
+    return {
+        'totals': totals,
+        'turn_scores': turn_scores,
+        'game_over': any(total >= MOVING_TARGET_WIN for total in totals.values())
+    }
+
+
+def project(state):
+    """Projection of a replay state through the rules of its game mode"""
+    if state['game_mode'] == 'cricket':
+        return project_cricket(state)
+    if state['game_mode'] == 'around_clock':
+        return project_around_clock(state)
+    if state['game_mode'] == 'moving_target':
+        return project_moving_target(state)
+    return project_x01(state)
+
+
+def write_projections(conn, game_id, state):
+    """Replace a game's projected rows with the projection of state; returns it (caller commits)"""
+    projection = project(state)
+
+    conn.execute('DELETE FROM turn_scores WHERE game_id = ?', (game_id,))
+    conn.executemany('INSERT OR IGNORE INTO turns (game_id, turn_number) VALUES (?, ?)',
+                     sorted({(game_id, turn_number) for turn_number, _ in projection['turn_scores']}))
+    conn.executemany(
+        'INSERT INTO turn_scores (game_id, turn_number, player_id, points, bust) VALUES (?, ?, ?, ?, ?)',
+        [(game_id, turn_number, player_id, points, 1 if bust else 0)
+         for (turn_number, player_id), (points, bust) in sorted(projection['turn_scores'].items())]
+    )
+    conn.executemany('UPDATE players SET total_score = ? WHERE game_id = ? AND id = ?',
+                     [(total, game_id, player_id) for player_id, total in projection['totals'].items()])
+
+    if 'cricket_scores' in projection:
+        conn.executemany(
+            'INSERT OR REPLACE INTO cricket_scores (game_id, player_id, number, marks, points, closed) VALUES (?, ?, ?, ?, ?, ?)',
+            [(game_id, player_id, number, marks, points, 1 if closed else 0)
+             for (player_id, number), (marks, points, closed) in projection['cricket_scores'].items()]
+        )
+    if 'around_clock_progress' in projection:
+        conn.executemany(
+            'UPDATE around_clock_progress SET current_number = ?, completed = ? WHERE game_id = ? AND player_id = ?',
+            [(current_number, 1 if completed else 0, game_id, player_id)
+             for player_id, (current_number, completed) in projection['around_clock_progress'].items()]
+        )
+    return projection
+
+
+def rebuild_projections(conn, game_id=None):
+    """Rebuild a game's projections (default: the game in play) from its log; None if it has no log"""
+    if game_id is None:
+        game_id = current_game_id(conn)
+    state = replay_game(conn, game_id)
+    if state['game_mode'] is None:
+        return None
+    return write_projections(conn, game_id, state)
+
+
+def undo_last_throw(conn):
+    """Take back the last dart of the game in play and rebuild its projections (caller commits)
+
+    Returns the (turn_number, player_id, dart_index) of the dart with the
+    state and projection after the undo, or None if there is nothing to undo.
+    """
+    game_id = current_game_id(conn)
+    state = replay_game(conn, game_id)
+    if state['game_mode'] is None or not state['darts']:
+        return None
+
+    turn_number, player_id, dart_index = max(state['darts'])
+    event_id = append_event(conn, THROW_UNDONE, turn_number, player_id, dart_index, game_id=game_id)
+    apply_event(state, (event_id, THROW_UNDONE, turn_number, player_id, dart_index, None, None, None))
+    return (turn_number, player_id, dart_index), state, write_projections(conn, game_id, state)
+
+
+def backfill_game_events(conn):
+    """Write a log for games recorded before the event log, from their darts (caller commits)"""
+    position = conn.execute('SELECT game_id, current_turn, current_player FROM game_state WHERE id = 1').fetchone()
+
+    for game_id, game_mode in conn.execute('SELECT id, game_mode FROM games ORDER BY id').fetchall():
+        try:
+            starting_score = int(game_mode)  # X01 modes are named after their starting score
+        except (ValueError, TypeError):
+            starting_score = 0
+        players = conn.execute('SELECT id, name FROM players WHERE game_id = ? ORDER BY id', (game_id,)).fetchall()
+        append_event(conn, GAME_STARTED, game_id=game_id, game_mode=game_mode, starting_score=starting_score,
+                     players=[list(player) for player in players])
+
+        # Moving Target kept only the hits per turn, so they go to the first darts of the turn
+        hits = {}
+        if game_mode == 'moving_target':
+            hits = {(row[0], row[1]): row[2] for row in conn.execute(
+                'SELECT turn_number, player_id, points FROM turn_scores WHERE game_id = ?', (game_id,))}
+
+        darts = conn.execute('''
+            SELECT turn_number, player_id, dart_index, score, multiplier, points, radius, angle, thrown_at
+            FROM throws WHERE game_id = ?
+            ORDER BY turn_number, player_id, dart_index
+        ''', (game_id,)).fetchall()
+        for turn_number, player_id, dart_index, score, multiplier, points, radius, angle, thrown_at in darts:
+            data = {'points': points, 'radius': radius, 'angle': angle, 'thrown_at': thrown_at}
+            if hits.get((turn_number, player_id)):
+                hits[(turn_number, player_id)] -= 1
+                data['hit_target'] = True
+            append_event(conn, THROW_SCORED, turn_number, player_id, dart_index, score, multiplier,
+                         game_id=game_id, **data)
+
+        if position and position[0] == game_id:
+            append_event(conn, TURN_ADVANCED, position[1], position[2], game_id=game_id)
+        elif darts and players:
+            # Earlier games kept no position; their last turn had ended if its result was
+            # saved (Moving Target also saves a hit straight away, so it needs all three darts)
+            turn_number, player_id, dart_index = darts[-1][:3]
+            finished = conn.execute(
+                'SELECT 1 FROM turn_scores WHERE game_id = ? AND turn_number = ? AND player_id = ?',
+                (game_id, turn_number, player_id)
+            ).fetchone()
+            if finished and (game_mode != 'moving_target' or dart_index == 3):
+                next_player = player_id % len(players) + 1
+                append_event(conn, TURN_ADVANCED, turn_number + (1 if next_player == 1 else 0), next_player,
+                             game_id=game_id)
+
+
+def rebuild_all_projections(db_path='game.db', game_id=None):
+    """Rebuild the projections of every game (or one game) from the log; returns the number rebuilt"""
+    conn = db_setup.connect(db_path)
+    try:
+        if game_id is None:
+            game_ids = [row[0] for row in conn.execute('SELECT id FROM games ORDER BY id')]
+        else:
+            game_ids = [game_id]
+
+        # One transaction per game keeps each write lock short
+        rebuilt = 0
+        for rebuild_game in game_ids:
+            if rebuild_projections(conn, rebuild_game) is not None:
+                rebuilt += 1
+            conn.commit()
+        return rebuilt
+    finally:
+        conn.close()
+
+
+def describe_game_at(db_path, game_id, event_id):
+    """Printable summary of a game as it was after an event"""
+    conn = db_setup.connect(db_path)
+    try:
+        state = replay_game(conn, game_id, event_id)
+    finally:
+        conn.close()
+
+    projection = project(state)
+    lines = [f"Game {game_id} ({state['game_mode']}) after event {state['event_id']}: "
+             f"turn {state['current_turn']}, player {state['current_player']}"
+             + (", game over" if projection['game_over'] else "")]
+    for player_id, name in state['players']:
+        lines.append(f"  {name}: {projection['totals'].get(player_id)}")
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Rebuild the scoreboard tables from the game event log')
+    parser.add_argument('--game', type=int, help='Only this game')
+    parser.add_argument('--at', type=int, metavar='EVENT_ID', help='Show the game after this event instead of rebuilding')
+    parser.add_argument('--db', default='game.db', help='Path to game.db')
+    args = parser.parse_args()
+
+    if args.at is not None:
+        if args.game is None:
+            parser.error('--at needs --game')
+        print(describe_game_at(args.db, args.game, args.at))
+    else:
+        count = rebuild_all_projections(args.db, args.game)
+        print(f"Rebuilt projections for {count} games")
@@ -0,0 +1,100 @@
+"""
+game_history.py
+
+Retention for the game history in game.db. Starting a game only adds a row to
+games, so the per-game tables keep every earlier game for stats. A background
+thread trims the history to the newest GAME_HISTORY_KEEP games, deleting one
+game per transaction so the write lock is only ever held for a moment and the
+dart processor never waits behind it.
+
+Usage:
+    python game_history.py [--keep N]    # prune once from the command line
+"""
+
+import argparse
+import os
+import sqlite3
+import threading
+import time
+
+from db_pool import run_in_db_pool
+from initialize_db import GAME_TABLES
+from leds import db_setup
+
+# Number of most recent games kept; older ones are deleted
+GAME_HISTORY_KEEP = int(os.environ.get('GAME_HISTORY_KEEP', '500'))
+
+PRUNE_INTERVAL = 300.0  # Seconds between retention passes
+PRUNE_BATCH_GAMES = 20  # Games deleted per pass at most
+
+
+def prunable_games(conn, keep=GAME_HISTORY_KEEP, limit=PRUNE_BATCH_GAMES):
+    """Ids of the oldest games beyond the newest keep, never including the game in play"""
+    rows = conn.execute('''
+        SELECT id FROM games
+        WHERE id NOT IN (SELECT id FROM games ORDER BY id DESC LIMIT ?)
+        AND id IS NOT (SELECT game_id FROM game_state WHERE id = 1)
+        ORDER BY id
+        LIMIT ?
+    ''', (keep, limit)).fetchall()
+    return [row[0] for row in rows]
+
+
+def prune_game(conn, game_id):
+    """Delete one game and all of its rows in a single short transaction"""
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        # game_id leads every per-game primary key, so each delete is one index range
+        for table in GAME_TABLES:
+            conn.execute(f'DELETE FROM {table} WHERE game_id = ?', (game_id,))
+        conn.execute('DELETE FROM games WHERE id = ?', (game_id,))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def prune_old_games(db_path='game.db', keep=GAME_HISTORY_KEEP, limit=PRUNE_BATCH_GAMES):
+    """Delete up to limit of the oldest games beyond keep; returns how many were deleted"""
+    conn = db_setup.connect(db_path)
+    try:
+        game_ids = prunable_games(conn, keep, limit)
+        for game_id in game_ids:
+            prune_game(conn, game_id)
+        return len(game_ids)
+    finally:
+        conn.close()
+
+
+def retention_loop(db_path, interval):
+    """Run a retention pass every interval seconds, catching up without waiting while there is a backlog"""
+    while True:
+        time.sleep(interval)
+        try:
+            pruned = run_in_db_pool(prune_old_games, db_path)
+            while pruned == PRUNE_BATCH_GAMES:
+                pruned = run_in_db_pool(prune_old_games, db_path)
+        except sqlite3.Error as e:
+            print(f"Error pruning game history: {e}")
+
+
+def start_retention(db_path='game.db', interval=PRUNE_INTERVAL):
+    """Start the background retention thread"""
+    thread = threading.Thread(target=retention_loop, args=(db_path, interval), name='game-history', daemon=True)
+    thread.start()
+    return thread
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Delete old games from game.db')
+    parser.add_argument('--keep', type=int, default=GAME_HISTORY_KEEP, help='Number of most recent games to keep')
+    parser.add_argument('--db', default='game.db', help='Path to game.db')
+    args = parser.parse_args()
+
+    total = 0
+    while True:
+        pruned = prune_old_games(args.db, args.keep)
+        total += pruned
+        if pruned < PRUNE_BATCH_GAMES:
+            break
+    print(f"Deleted {total} old games, keeping the newest {args.keep}")
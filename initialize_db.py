@@ -2,9 +2,293 @@ import sqlite3
 import os
 import time
 from datetime import datetime
+from leds import db_setup
+import event_log
+
+# Tables whose rows belong to one game; every row carries the game's id from the games table.
+# Retention (game_history.py) deletes a pruned game from each of them
+GAME_TABLES = ['game_snapshots', 'game_events', 'player_stats', 'throws', 'turn_scores', 'turns',
+               'cricket_scores', 'around_clock_progress', 'players']
+
+# Per-game tables as of schema version 1; frozen so the shipped baseline migration never changes
+BASELINE_GAME_TABLES = ['player_stats', 'throws', 'turn_scores', 'turns', 'cricket_scores',
+                        'around_clock_progress', 'players']
+
+# Single-row tables holding the live state of the game in play
+LIVE_TABLES = ['current_throws', 'game_state', 'animation_state', 'last_throw', 'game_config']
+
+# Per-game rows of the game currently being played
+CURRENT_GAME = '(SELECT game_id FROM game_state WHERE id = 1)'
+
+def migrate_baseline(cursor):
+    """Schema version 1: game history (games table, game_id keys), state version and player stats"""
+    # Databases from before game history kept a single game without game ids;
+    # rebuild them (they never held more than the game in progress)
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='games'")
+    if cursor.fetchone() is None:
+        for table in BASELINE_GAME_TABLES + LIVE_TABLES:
+            cursor.execute(f"DROP TABLE IF EXISTS {table}")
+    
+    # Databases from before schema versioning may already have some of these tables
+    
+    # AUTOINCREMENT so ids of pruned games are never handed out again
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS games (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        game_mode TEXT,
+        player_count INTEGER,
+        started_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS players (
+        game_id INTEGER NOT NULL,
+        id INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        total_score INTEGER DEFAULT 0,
+        PRIMARY KEY (game_id, id),
+        FOREIGN KEY (game_id) REFERENCES games(id)
+    )
+    ''')
+    
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS turns (
+        game_id INTEGER NOT NULL,
+        turn_number INTEGER NOT NULL,
+        PRIMARY KEY (game_id, turn_number),
+        FOREIGN KEY (game_id) REFERENCES games(id)
+    )
+    ''')
+    
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS turn_scores (
+        game_id INTEGER NOT NULL,
+        turn_number INTEGER,
+        player_id INTEGER,
+        points INTEGER NOT NULL,  -- Turn result; the individual darts are in throws
+        bust BOOLEAN DEFAULT 0,
+        PRIMARY KEY (game_id, turn_number, player_id),
+        FOREIGN KEY (game_id, turn_number) REFERENCES turns(game_id, turn_number),
+        FOREIGN KEY (game_id, player_id) REFERENCES players(game_id, id)
+    )
+    ''')
+    
+    # One row per dart
+    # WITHOUT ROWID stores the rows in primary key order, so reading a turn's
+    # darts is a single range scan of the table itself
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS throws (
+        game_id INTEGER NOT NULL,
+        turn_number INTEGER NOT NULL,
+        player_id INTEGER NOT NULL,
+        dart_index INTEGER NOT NULL,  -- 1-based position within the turn
+        score INTEGER NOT NULL,
+        multiplier INTEGER NOT NULL,
+        points INTEGER NOT NULL,
+        radius REAL,  -- Polar position reported by the CV system (NULL for manual corrections)
+        angle REAL,
+        thrown_at DATETIME,  -- CV timestamp of the dart
+        recorded_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (game_id, turn_number, player_id, dart_index),
+        FOREIGN KEY (game_id, turn_number) REFERENCES turns(game_id, turn_number),
+        FOREIGN KEY (game_id, player_id) REFERENCES players(game_id, id)
+    ) WITHOUT ROWID
+    ''')
+    
+    # Per-player queries (stats, doubles/trebles rates) read only this index;
+    # in a WITHOUT ROWID table it also carries the primary key columns
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_throws_player
+    ON throws (game_id, player_id, multiplier, score, points)
+    ''')
+    
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS game_state (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        game_id INTEGER NOT NULL,  -- Game in play; per-game rows are read through it
+        current_turn INTEGER NOT NULL,
+        current_player INTEGER NOT NULL,
+        game_over BOOLEAN NOT NULL DEFAULT 0,
+        FOREIGN KEY (game_id) REFERENCES games(id)
+    )
+    ''')
+    
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS current_throws (
+        throw_number INTEGER PRIMARY KEY,
+        points INTEGER NOT NULL,
+        score INTEGER DEFAULT NULL,
+        multiplier INTEGER DEFAULT NULL
+    )
+    ''')
+    
+    # New table for tracking animation state
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS animation_state (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        animating BOOLEAN DEFAULT 0,
+        animation_type TEXT,
+        turn_number INTEGER,
+        player_id INTEGER,
+        throw_number INTEGER,
+        timestamp DATETIME,
+        next_turn INTEGER,
+        next_player INTEGER
+    )
+    ''')
+    
+    # New table for tracking the last throw
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS last_throw (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        score INTEGER DEFAULT 0,
+        multiplier INTEGER DEFAULT 0,
+        points INTEGER DEFAULT 0,
+        player_id INTEGER
+    )
+    ''')
+    
+    # Game config table with game_mode and processor_mode columns
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS game_config (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        player_count INTEGER,
+        game_mode TEXT DEFAULT '301',
+        processor_mode TEXT DEFAULT 'classic'
+    )
+    ''')
+    
+    # Create cricket_scores table for American Cricket game mode
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS cricket_scores (
+        game_id INTEGER NOT NULL,
+        player_id INTEGER,
+        number INTEGER,  -- 15-20 and 25 for bullseye
+        marks INTEGER DEFAULT 0,
+        points INTEGER DEFAULT 0,
+        closed BOOLEAN DEFAULT 0,
+        PRIMARY KEY (game_id, player_id, number),
+        FOREIGN KEY (game_id, player_id) REFERENCES players(game_id, id)
+    )
+    ''')
+    
+    # Create around_clock_progress table for Around the Clock game mode
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS around_clock_progress (
+        game_id INTEGER NOT NULL,
+        player_id INTEGER,
+        current_number INTEGER DEFAULT 1,
+        completed BOOLEAN DEFAULT 0,
+        last_update TIMESTAMP,
+        PRIMARY KEY (game_id, player_id),
+        FOREIGN KEY (game_id, player_id) REFERENCES players(game_id, id)
+    )
+    ''')
+    
+    # State version survives resets so it only ever moves forward
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS state_version (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL DEFAULT 0
+    )
+    ''')
+    cursor.execute('INSERT OR IGNORE INTO state_version (id, version) VALUES (1, 0)')
+    
+    # Running per-player counters, kept up to date by the dart processors (see player_stats.py)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS player_stats (
+        game_id INTEGER NOT NULL,
+        player_id INTEGER NOT NULL,
+        darts INTEGER NOT NULL DEFAULT 0,
+        points INTEGER NOT NULL DEFAULT 0,  -- Points that counted; busted turns score nothing
+        first9_darts INTEGER NOT NULL DEFAULT 0,
+        first9_points INTEGER NOT NULL DEFAULT 0,
+        doubles INTEGER NOT NULL DEFAULT 0,
+        trebles INTEGER NOT NULL DEFAULT 0,
+        checkout_darts INTEGER NOT NULL DEFAULT 0,  -- Darts thrown with a one-dart finish left
+        checkouts INTEGER NOT NULL DEFAULT 0,
+        turns INTEGER NOT NULL DEFAULT 0,
+        marks INTEGER NOT NULL DEFAULT 0,  -- Cricket
+        targets_hit INTEGER NOT NULL DEFAULT 0,  -- Around the Clock
+        PRIMARY KEY (game_id, player_id)
+    ) WITHOUT ROWID
+    ''')
+    
+
+def migrate_animation_event_columns(cursor):
+    """Schema version 2: animation_state columns the processors used to add while running"""
+    # Databases from before schema versioning may have had them added already
+    columns = {row[1] for row in cursor.execute('PRAGMA table_info(animation_state)')}
+    if 'target_hit' not in columns:
+        cursor.execute('ALTER TABLE animation_state ADD COLUMN target_hit INTEGER DEFAULT 0')  # Around the Clock
+    if 'cricket_event' not in columns:
+        cursor.execute('ALTER TABLE animation_state ADD COLUMN cricket_event TEXT DEFAULT NULL')  # Cricket
+
+def migrate_game_event_log(cursor):
+    """Schema version 3: append-only game event log and its replay snapshots (see event_log.py)"""
+    cursor.execute('''
+    CREATE TABLE game_events (
+        id INTEGER PRIMARY KEY,
+        game_id INTEGER NOT NULL,
+        event_type TEXT NOT NULL,
+        turn_number INTEGER,
+        player_id INTEGER,
+        dart_index INTEGER,
+        score INTEGER,
+        multiplier INTEGER,
+        data TEXT,  -- JSON with whatever else the event carries
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (game_id) REFERENCES games(id)
+    )
+    ''')
+    
+    # A game's events are always read in log order
+    cursor.execute('CREATE INDEX idx_game_events_game ON game_events (game_id, id)')
+    
+    cursor.execute('''
+    CREATE TABLE game_snapshots (
+        game_id INTEGER NOT NULL,
+        event_id INTEGER NOT NULL,  -- Last event replayed into the state
+        state TEXT NOT NULL,  -- JSON, see event_log.dump_state
+        PRIMARY KEY (game_id, event_id)
+    ) WITHOUT ROWID
+    ''')
+    
+    # Games already in the database get a log written from their darts
+    event_log.backfill_game_events(cursor.connection)
+
+
+# Schema changes in order; a database at version N has had the first N applied.
+# Add each change as a new function at the end instead of editing a shipped one.
+MIGRATIONS = [migrate_baseline, migrate_animation_event_columns, migrate_game_event_log]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+def migrate_database(conn):
+    """Bring game.db up to SCHEMA_VERSION in one transaction; returns the version it was at"""
+    cursor = conn.cursor()
+    cursor.execute('BEGIN IMMEDIATE')
+    try:
+        cursor.execute('CREATE TABLE IF NOT EXISTS schema_version (id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL)')
+        cursor.execute('INSERT OR IGNORE INTO schema_version (id, version) VALUES (1, 0)')
+        version = cursor.execute('SELECT version FROM schema_version WHERE id = 1').fetchone()[0]
+        
+        if version > SCHEMA_VERSION:
+            raise RuntimeError(f"game.db is at schema version {version}, newer than this code ({SCHEMA_VERSION})")
+        
+        for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+            print(f"Migrating game.db to schema version {number}...")
+            migration(cursor)
+            cursor.execute('UPDATE schema_version SET version = ? WHERE id = 1', (number,))
+        
+        conn.commit()
+        return version
+    except Exception:
+        conn.rollback()
+        raise
 
 def initialize_database():
-    """Initialize the game database by clearing existing tables and inserting new data."""
+    """Initialize the game database and start a new game, keeping earlier games as history."""
     print("Initializing database...")
     
     # Try to connect to the database, with retry logic
@@ -12,161 +296,41 @@ def initialize_database():
     for attempt in range(max_retries):
         try:
             # Connect to the database (creates it if it doesn't exist)
-            conn = sqlite3.connect('game.db')
+            conn = db_setup.connect('game.db')
             cursor = conn.cursor()
             
-            # Check if tables exist
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='players'")
-            tables_exist = cursor.fetchone() is not None
-            
-            if tables_exist:
-                print("Clearing existing data...")
-                # Clear existing data instead of removing the database
-                cursor.execute("DELETE FROM turn_scores")
-                cursor.execute("DELETE FROM current_throws")
-                cursor.execute("DELETE FROM game_state")
-                cursor.execute("DELETE FROM turns")
-                cursor.execute("DELETE FROM players")
-                cursor.execute("DELETE FROM animation_state")
-                cursor.execute("DELETE FROM last_throw")
-                cursor.execute("DELETE FROM game_config")
-                # Clear game-specific tables
-                cursor.execute("DELETE FROM cricket_scores")
-                cursor.execute("DELETE FROM around_clock_progress")
-            else:
-                print("Creating tables...")
-                # Create tables
-                cursor.execute('''
-                CREATE TABLE players (
-                    id INTEGER PRIMARY KEY,
-                    name TEXT NOT NULL,
-                    total_score INTEGER DEFAULT 0
-                )
-                ''')
-
-                cursor.execute('''
-                CREATE TABLE turns (
-                    turn_number INTEGER PRIMARY KEY
-                )
-                ''')
-
-                cursor.execute('''
-                CREATE TABLE turn_scores (
-                    turn_number INTEGER,
-                    player_id INTEGER,
-                    points INTEGER NOT NULL,
-                    throw1 INTEGER DEFAULT 0,
-                    throw2 INTEGER DEFAULT 0,
-                    throw3 INTEGER DEFAULT 0,
-                    throw1_multiplier INTEGER DEFAULT 0,
-                    throw2_multiplier INTEGER DEFAULT 0,
-                    throw3_multiplier INTEGER DEFAULT 0,
-                    throw1_points INTEGER DEFAULT 0,
-                    throw2_points INTEGER DEFAULT 0,
-                    throw3_points INTEGER DEFAULT 0,
-                    bust BOOLEAN DEFAULT 0,
-                    PRIMARY KEY (turn_number, player_id),
-                    FOREIGN KEY (turn_number) REFERENCES turns(turn_number),
-                    FOREIGN KEY (player_id) REFERENCES players(id)
-                )
-                ''')
-
-                cursor.execute('''
-                CREATE TABLE game_state (
-                    id INTEGER PRIMARY KEY CHECK (id = 1),
-                    current_turn INTEGER NOT NULL,
-                    current_player INTEGER NOT NULL,
-                    game_over BOOLEAN NOT NULL DEFAULT 0,
-                    FOREIGN KEY (current_turn) REFERENCES turns(turn_number),
-                    FOREIGN KEY (current_player) REFERENCES players(id)
-                )
-                ''')
-
-                cursor.execute('''
-                CREATE TABLE current_throws (
-                    throw_number INTEGER PRIMARY KEY,
-                    points INTEGER NOT NULL,
-                    score INTEGER DEFAULT NULL,
-                    multiplier INTEGER DEFAULT NULL
-                )
-                ''')
-                
-                # New table for tracking animation state
-                cursor.execute('''
-                CREATE TABLE animation_state (
-                    id INTEGER PRIMARY KEY CHECK (id = 1),
-                    animating BOOLEAN DEFAULT 0,
-                    animation_type TEXT,
-                    turn_number INTEGER,
-                    player_id INTEGER,
-                    throw_number INTEGER,
-                    timestamp DATETIME,
-                    next_turn INTEGER,
-                    next_player INTEGER
-                )
-                ''')
-                
-                # New table for tracking the last throw
-                cursor.execute('''
-                CREATE TABLE last_throw (
-                    id INTEGER PRIMARY KEY CHECK (id = 1),
-                    score INTEGER DEFAULT 0,
-                    multiplier INTEGER DEFAULT 0,
-                    points INTEGER DEFAULT 0,
-                    player_id INTEGER
-                )
-                ''')
-                
-                # Game config table with game_mode and processor_mode columns
-                cursor.execute('''
-                CREATE TABLE game_config (
-                    id INTEGER PRIMARY KEY CHECK (id = 1),
-                    player_count INTEGER,
-                    game_mode TEXT DEFAULT '301',
-                    processor_mode TEXT DEFAULT 'classic'
-                )
-                ''')
-                
-                # Create cricket_scores table for American Cricket game mode
-                cursor.execute('''
-                CREATE TABLE cricket_scores (
-                    player_id INTEGER,
-                    number INTEGER,  -- 15-20 and 25 for bullseye
-                    marks INTEGER DEFAULT 0,
-                    points INTEGER DEFAULT 0,
-                    closed BOOLEAN DEFAULT 0,
-                    PRIMARY KEY (player_id, number),
-                    FOREIGN KEY (player_id) REFERENCES players(id)
-                )
-                ''')
-                
-                # Create around_clock_progress table for Around the Clock game mode
-                cursor.execute('''
-                CREATE TABLE around_clock_progress (
-                    player_id INTEGER PRIMARY KEY,
-                    current_number INTEGER DEFAULT 1,
-                    completed BOOLEAN DEFAULT 0,
-                    last_update TIMESTAMP,
-                    FOREIGN KEY (player_id) REFERENCES players(id)
-                )
-                ''')
-                
-                print("Tables created successfully.")
+            # Create or upgrade the tables; everything after this can rely on the current schema
+            migrate_database(conn)
+            
+            print("Clearing live game state...")
+            # Finished games stay in the per-game tables; only the single-row
+            # live state is cleared before the new game is added below
+            for table in LIVE_TABLES:
+                cursor.execute(f"DELETE FROM {table}")
+            
+            # State version survives resets so it only ever moves forward
+            cursor.execute('UPDATE state_version SET version = version + 1 WHERE id = 1')
             
             # Insert initial data
             print("Inserting initial data...")
             
+            # Start a new game
+            cursor.execute("INSERT INTO games (game_mode, player_count) VALUES ('301', 4)")
+            game_id = cursor.lastrowid
+            
             # Insert players
             players_to_insert = []
             for i in range(1, 5):  # Default to 4 players initially
-                players_to_insert.append((i, f'Player {i}', 301))
-            cursor.executemany('INSERT INTO players (id, name, total_score) VALUES (?, ?, ?)', players_to_insert)
+                players_to_insert.append((game_id, i, f'Player {i}', 301))
+            cursor.executemany('INSERT INTO players (game_id, id, name, total_score) VALUES (?, ?, ?, ?)', players_to_insert)
+            event_log.append_event(conn, event_log.GAME_STARTED, game_id=game_id, game_mode='301', starting_score=301,
+                                   players=[[player_id, name] for _, player_id, name, _ in players_to_insert])
             
             # Insert first turn
-            cursor.execute('INSERT INTO turns (turn_number) VALUES (?)', (1,))
+            cursor.execute('INSERT INTO turns (game_id, turn_number) VALUES (?, ?)', (game_id, 1))
             
             # Insert game state with game_over set to 0 (false)
-            cursor.execute('INSERT INTO game_state (id, current_turn, current_player, game_over) VALUES (1, 1, 1, 0)')
+            cursor.execute('INSERT INTO game_state (id, game_id, current_turn, current_player, game_over) VALUES (1, ?, 1, 1, 0)', (game_id,))
             
             # Insert current throws
             # MODIFIED: Initialize with NULL scores and multipliers instead of 0
@@ -202,24 +366,24 @@ def initialize_database():
             cricket_data = []
             for player_id in range(1, 5):  # For all 4 default players
                 for number in cricket_numbers:
-                    cricket_data.append((player_id, number, 0, 0, 0))
+                    cricket_data.append((game_id, player_id, number, 0, 0, 0))
             
             cursor.executemany('''
                 INSERT INTO cricket_scores
-                (player_id, number, marks, points, closed)
-                VALUES (?, ?, ?, ?, ?)
+                (game_id, player_id, number, marks, points, closed)
+                VALUES (?, ?, ?, ?, ?, ?)
             ''', cricket_data)
             
             # Initialize around_clock_progress for all players
             current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             around_clock_data = []
             for player_id in range(1, 5):  # For all 4 default players
-                around_clock_data.append((player_id, 1, 0, current_time))
+                around_clock_data.append((game_id, player_id, 1, 0, current_time))
             
             cursor.executemany('''
                 INSERT INTO around_clock_progress
-                (player_id, current_number, completed, last_update)
-                VALUES (?, ?, ?, ?)
+                (game_id, player_id, current_number, completed, last_update)
+                VALUES (?, ?, ?, ?, ?)
             ''', around_clock_data)
             
             # Commit changes and close connection
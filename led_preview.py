@@ -0,0 +1,140 @@
+"""Live virtual-board preview of the LED strip.
+
+The LED controller mirrors what the strip shows to this process over a local
+socket (see leds/led_frames.py). /leds/preview draws it over the dartboard image,
+and /leds/preview/stream pushes Server-Sent Events: the pixel positions and a full
+frame when a viewer connects, then only run-length encoded pixel changes.
+"""
+import json
+import math
+import time
+from flask import Response, render_template, request
+from leds import led_frames
+
+PREVIEW_MAX_FPS = 30
+PREVIEW_DEFAULT_FPS = 15
+HEARTBEAT_INTERVAL = 15.0  # Seconds between keep-alive comments on an idle stream
+
+# Where the board sits in static/images/dartboard.png (1477x1500), in image pixels
+BOARD_IMAGE_SIZE = (1477, 1500)
+BOARD_CENTER = (737.5, 745.0)
+RING_RADII = {
+    'number': 640,         # Numbers around the board
+    'double': (525, 552),  # Inner and outer edge
+    'triple': (317, 345),
+    'outer_bull': 54,
+}
+
+# Dartboard numbers clockwise from the top
+CLOCKWISE_NUMBERS = [20, 1, 18, 4, 13, 6, 10, 15, 2, 17, 3, 19, 7, 16, 8, 11, 14, 9, 12, 5]
+
+_receiver = None
+
+
+def get_receiver():
+    """Bind the preview socket the first time a viewer needs it"""
+    global _receiver
+    if _receiver is None:
+        _receiver = led_frames.FrameReceiver()
+    return _receiver
+
+
+def ring_radius(ring, geometry):
+    """Radius (in image pixels) at which a ring's LED sits"""
+    dbl_ring, trpl_ring = geometry['dbl_ring'], geometry['trpl_ring']
+    if ring == geometry.get('num_ring'):
+        return RING_RADII['number']
+    if ring == dbl_ring:
+        return sum(RING_RADII['double']) / 2
+    if ring == trpl_ring:
+        return sum(RING_RADII['triple']) / 2
+
+    # Single rings are spread evenly across their bed, outermost ring first
+    if dbl_ring < ring < trpl_ring:
+        outer, inner, index, count = RING_RADII['double'][0], RING_RADII['triple'][1], ring - dbl_ring - 1, trpl_ring - dbl_ring - 1
+    else:
+        outer, inner, index, count = RING_RADII['triple'][0], RING_RADII['outer_bull'], ring - trpl_ring - 1, geometry['leds_per_strip'] - trpl_ring - 1
+    return outer - (index + 0.5) * (outer - inner) / count
+
+
+def pixel_positions(geometry):
+    """Position of every LED as fractions of the image width and height"""
+    width, height = BOARD_IMAGE_SIZE
+    leds_per_strip = geometry['leds_per_strip']
+    strip_numbers = {strip: int(number) for number, strip in geometry['mapping'].items()}
+
+    positions = []
+    for pixel in range(geometry['led_count']):
+        strip_num, offset = divmod(pixel, leds_per_strip)
+        if pixel in geometry['bull_pixels'] or strip_num not in strip_numbers:
+            x, y = BOARD_CENTER
+        else:
+            # Odd strips are wired inwards to outwards
+            ring = offset if strip_num % 2 == 0 else leds_per_strip - offset - 1
+            angle = math.radians(CLOCKWISE_NUMBERS.index(strip_numbers[strip_num]) * 18)
+            radius = ring_radius(ring, geometry)
+            x = BOARD_CENTER[0] + radius * math.sin(angle)
+            y = BOARD_CENTER[1] - radius * math.cos(angle)
+        positions.append([round(x / width, 4), round(y / height, 4)])
+    return positions
+
+
+def sse(payload):
+    """Format one Server-Sent Event"""
+    return f"data: {json.dumps(payload, separators=(',', ':'))}\n\n"
+
+
+def preview_page():
+    """Page drawing the LEDs over the dartboard image"""
+    return render_template('leds_preview.html')
+
+
+def preview_stream():
+    """Server-Sent Events stream of LED frame changes"""
+    fps = min(PREVIEW_MAX_FPS, max(1, request.args.get('fps', PREVIEW_DEFAULT_FPS, type=int)))
+    try:
+        receiver = get_receiver()
+    except OSError as e:
+        print(f"LED preview unavailable: {e}")
+        return Response(sse({'status': 'unavailable'}), mimetype='text/event-stream')
+
+    def events():
+        interval = 1.0 / fps
+        sent_sequence, sent_geometry, sent_frame = None, None, None
+        last_message = 0.0
+        yield sse({'status': 'waiting'})
+
+        while True:
+            sequence, geometry, frame = receiver.poll()
+            now = time.time()
+
+            if sequence != sent_sequence and frame is not None:
+                message = {}
+                if geometry != sent_geometry:
+                    # New viewer or different board: send positions and the whole frame
+                    message['positions'] = pixel_positions(geometry)
+                    sent_frame = None
+                    sent_geometry = geometry
+                runs = led_frames.encode_runs(frame, sent_frame)
+                if runs or 'positions' in message:
+                    message['runs'] = runs
+                    yield sse(message)
+                    last_message = now
+                sent_sequence, sent_frame = sequence, frame
+            elif now - last_message >= HEARTBEAT_INTERVAL:
+                # Comment line, so a closed connection is noticed and the generator stops
+                yield ": keep-alive\n\n"
+                last_message = now
+
+            time.sleep(interval)
+
+    response = Response(events(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def init_led_preview(app):
+    """Register the /leds/preview page and its event stream"""
+    app.add_url_rule('/leds/preview', 'led_preview', preview_page)
+    app.add_url_rule('/leds/preview/stream', 'led_preview_stream', preview_stream)
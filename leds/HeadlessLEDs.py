@@ -0,0 +1,168 @@
+"""
+HeadlessLEDs.py
+
+Function:
+Silent, sleep-free LED backend with the same interface and geometry as the real
+LEDs class. Every flush that changes the picture is recorded with its timestamp
+into one growing in-memory buffer, so the controller can be run, benchmarked and
+compared against golden recordings at thousands of frames per second
+(see frame_capture.py).
+"""
+
+import time
+from array import array
+from pixel_map import build_segment_tables, fill_slice, ring_pixel
+
+EMPTY_PIXELS = ()
+EMPTY_SLICE = slice(0, 0)
+
+
+class FrameRecording:
+    """Flushed frames packed back to back in one bytearray, with a timestamp per frame."""
+
+    def __init__(self, frame_size):
+        self.frame_size = frame_size
+        self.data = bytearray()
+        self.timestamps = array('d')
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def append(self, timestamp, frame):
+        """Record one frame."""
+        self.timestamps.append(timestamp)
+        self.data += frame
+
+    def frame(self, index):
+        """Get the bytes of one recorded frame."""
+        offset = index*self.frame_size
+        return bytes(self.data[offset:offset + self.frame_size])
+
+    def frames(self):
+        """Iterate over (timestamp, frame bytes) pairs."""
+        for index, timestamp in enumerate(self.timestamps):
+            yield timestamp, self.frame(index)
+
+    def clear(self):
+        """Drop everything recorded so far."""
+        self.data = bytearray()
+        self.timestamps = array('d')
+
+
+class HeadlessLEDs:
+    """LEDs stand-in that records frames instead of driving hardware or printing."""
+
+    def __init__(self, clock=time.time):
+        # Same strip configuration and ring positions as the real LEDs class
+        self.NUM_STRIPS = 20
+        self.NUM_LED_PER_STRIP = 18
+        self.LED_COUNT = self.NUM_STRIPS*self.NUM_LED_PER_STRIP
+
+        self.TRPL_RING = 9
+        self.DBL_RING = 0
+
+        self.DARTBOARD_MAPPING = {
+            20: 0, 1: 1, 18: 2, 4: 3, 13: 4,
+            6: 5, 10: 6, 15: 7, 2: 8, 17: 9,
+            3: 10, 19: 11, 7: 12, 16: 13, 8: 14,
+            11: 15, 14: 16, 9: 17, 12: 18, 5: 19
+        }
+
+        self.SEGMENT_PIXELS, self.SEGMENT_SLICES = build_segment_tables(
+            self.DARTBOARD_MAPPING, self.NUM_LED_PER_STRIP, self.DBL_RING, self.TRPL_RING
+        )
+
+        # Timestamps of recorded frames come from this clock (a simulated one in tests)
+        self.clock = clock
+        self.recording = FrameRecording(self.LED_COUNT*3)
+
+        self.frame = bytearray(self.LED_COUNT*3)
+        self.shown_frame = None
+        self.frame_dirty = True
+        self.bull_color = (0, 0, 0)
+
+        self.clear_board_state()
+
+    def clear_board_state(self):
+        """Turn every pixel in the framebuffer off."""
+        self.frame[:] = bytes(len(self.frame))
+        self.bull_color = (0, 0, 0)  # Black/off
+        self.frame_dirty = True
+
+    def getSegIndexes(self, strip_num):
+        """Get the start and end indices for a segment."""
+        start_seg = strip_num*self.NUM_LED_PER_STRIP
+        end_seg = start_seg + self.NUM_LED_PER_STRIP
+        return start_seg, end_seg
+
+    def ring_pixel(self, strip_num, ring):
+        """Get the strip pixel index of a ring on a strip (odd strips run inwards to outwards)."""
+        return ring_pixel(strip_num, ring, self.NUM_LED_PER_STRIP)
+
+    def segment_pixels(self, dartboard_num, segment_type):
+        """Get the precomputed pixel indexes of a segment."""
+        return self.SEGMENT_PIXELS.get((dartboard_num, segment_type), EMPTY_PIXELS)
+
+    def segment_slice(self, dartboard_num, segment_type):
+        """Get the precomputed framebuffer byte slice of a segment."""
+        return self.SEGMENT_SLICES.get((dartboard_num, segment_type), EMPTY_SLICE)
+
+    def pixel_color(self, pixel):
+        """Read back the RGB color of one pixel from the framebuffer."""
+        offset = pixel*3
+        return tuple(self.frame[offset:offset + 3])
+
+    def segment_color(self, dartboard_num, segment_type):
+        """Read back the color of a segment (its first pixel), or off if it has no pixels."""
+        pixels = self.segment_pixels(dartboard_num, segment_type)
+        return self.pixel_color(pixels[0]) if pixels else (0, 0, 0)
+
+    def fill_segment(self, dartboard_num, segment_type, color, label=None):
+        """Fill one segment in the framebuffer."""
+        if dartboard_num not in self.DARTBOARD_MAPPING:
+            return
+        fill_slice(self.frame, self.SEGMENT_SLICES[(dartboard_num, segment_type)], color)
+        self.frame_dirty = True
+
+    def flush(self, frame=None):
+        """Record a frame (the framebuffer by default) if it differs from the last one."""
+        if frame is None:
+            frame = self.frame
+
+        self.frame_dirty = False
+        if frame == self.shown_frame:
+            return False
+
+        self.shown_frame = bytearray(frame)
+        self.recording.append(self.clock(), frame)
+        return True
+
+    def colorWipe(self, strip_num, color, wait_ms=50):
+        """Fill a whole strip with a color."""
+        start_seg, end_seg = self.getSegIndexes(strip_num)
+        fill_slice(self.frame, slice(start_seg*3, end_seg*3), color)
+        self.frame_dirty = True
+
+    def clearAll(self, wait_ms=1):
+        """Turn off all LEDs."""
+        self.clear_board_state()
+
+    def tripleSeg(self, dartboard_num, color, wait_ms=5):
+        """Light up the triple segment for a number."""
+        self.fill_segment(dartboard_num, 'triple', color)
+
+    def doubleSeg(self, dartboard_num, color, wait_ms=5):
+        """Light up the double segment for a number."""
+        self.fill_segment(dartboard_num, 'double', color)
+
+    def outerSingleSeg(self, dartboard_num, color, wait_ms=5):
+        """Light up the outer single segment for a number."""
+        self.fill_segment(dartboard_num, 'outer_single', color)
+
+    def innerSingleSeg(self, dartboard_num, color, wait_ms=5):
+        """Light up the inner single segment for a number."""
+        self.fill_segment(dartboard_num, 'inner_single', color)
+
+    def bullseye(self, color=(250, 90, 0), wait_ms=50):
+        """Set the bullseye color (tracked only, like the real board)."""
+        self.bull_color = color
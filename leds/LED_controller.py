@@ -1,14 +1,23 @@
+import os
 import sqlite3
 import time
 from contextlib import contextmanager
 from LEDs import LEDs
+from compositor import Compositor, Effect
+from animations import AnimationLibrary, play
+from pixel_map import BULL
+from led_events import EventListener, SOCKET_PATH
+from led_frames import FramePublisher, PREVIEW_SOCKET
+import db_setup
 from datetime import datetime
-from LEDs_db_init import initialize_leds_database
+from LEDs_db_init import initialize_leds_database, VERSIONED_TABLES
 from moving_target_db_init import initialize_moving_target_database
 
 class LEDController:
     def __init__(self, db_path='LEDs.db', poll_interval=0.5, 
-                 blink_duration=2.0, blink_count=4):
+                 blink_duration=2.0, blink_count=4, fps=60, brightness=1.0,
+                 event_socket=SOCKET_PATH, preview_socket=PREVIEW_SOCKET, clock=time.time,
+                 reset_databases=True):
         """Initialize the LED Controller with configurable blinking parameters.
         
         Args:
@@ -16,26 +25,66 @@ class LEDController:
             poll_interval (float): How often to check for updates (seconds)
             blink_duration (float): How long to blink when a dart hits (seconds)
             blink_count (int): Number of times to blink the LED
+            fps (int): Frame rate of the LED render loop
+            brightness (float): Global brightness from 0.0 to 1.0
+            event_socket (str): Path of the LED event socket, or None to only poll the database
+            preview_socket (str): Path of the web app's live preview socket, or None to not publish frames
+            clock (callable): Time source (frame_capture.py swaps in a simulated clock)
+            reset_databases (bool): Reset LEDs.db and recreate moving_target.db on startup; pass False
+                when the caller has already created them (frame_capture.py)
         """
-        # Reset the database on startup
-        print("Resetting LEDs database...")
-        initialize_leds_database()
-        
-        # Initialize moving target database
-        initialize_moving_target_database()
+        if reset_databases:
+            # Reset the database on startup
+            print("Resetting LEDs database...")
+            initialize_leds_database(db_path)
+            
+            # Initialize moving target database
+            initialize_moving_target_database()
+        db_setup.verify_databases([db_path, 'moving_target.db'])
         
         self.db_path = db_path
         self.poll_interval = poll_interval
+        self.clock = clock
+        
+        # Long-lived connection used to check whether anything changed since the last poll
+        self.version_conn = None
+        self.version_inode = None  # The database is recreated on reset, so track which file we have open
+        self.data_version = None  # PRAGMA data_version at the last check
+        self.table_versions = {}  # table_versions rows at the last check
+        
         self.led_control = LEDs()  # Initialize real LED control class
+        self.compositor = Compositor(self.led_control, fps=fps, brightness=brightness, clock=clock)
+        self.animations = AnimationLibrary(self.led_control, fps=fps)
+        
+        # Segment painters used when redrawing a mode from its desired color map
+        self.segment_painters = {
+            'double': self.led_control.doubleSeg,
+            'triple': self.led_control.tripleSeg,
+            'outer_single': self.led_control.outerSingleSeg,
+            'inner_single': self.led_control.innerSingleSeg,
+        }
+        if hasattr(self.led_control, 'numSeg'):  # MockLEDs has a number ring
+            self.segment_painters['number'] = self.led_control.numSeg
+        
+        # Direct event channel from the web app and processors (LEDs.db is polled as a fallback)
+        self.event_listener = None
+        try:
+            if event_socket is not None:
+                self.event_listener = EventListener(event_socket)
+        except OSError as e:
+            print(f"LED event channel unavailable, relying on database polling: {e}")
+        
+        # What the strip shows is mirrored to the web app's /leds/preview page
+        self.frame_publisher = None
+        if preview_socket is not None:
+            self.frame_publisher = FramePublisher(self.led_control, preview_socket)
         self.current_mode = None
         self.previous_mode = None  # Track previous mode to detect changes
-        self.blinking_segments = {}  # To track segments that should be blinking
+        self.next_poll_time = 0.0
         
         # Blinking configuration
         self.blink_duration = blink_duration
         self.blink_count = blink_count
-        # Calculate frequency based on duration and count
-        self.blink_frequency = blink_count / blink_duration if blink_duration > 0 else 2.0
         
         # Define sets for different LED color schemes in classic mode
         self.white_red_segments = {1, 4, 6, 15, 17, 19, 16, 11, 9, 5}
@@ -63,7 +112,7 @@ class LEDController:
         # Moving target related attributes
         self.moving_target_db_path = 'moving_target.db'
         self.target_move_interval = 3.0  # seconds
-        self.last_target_move_time = time.time()
+        self.last_target_move_time = self.clock()
         self.moving_target_sequence = [20, 1, 18, 4, 13, 6, 10, 15, 2, 17, 3, 19, 7, 16, 8, 11, 14, 9, 12, 5]
         self.current_target_index = 0
         
@@ -75,8 +124,7 @@ class LEDController:
     @contextmanager
     def get_db_connection(self):
         """Get a connection to the LEDs database."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        conn = db_setup.connect(self.db_path, row_factory=sqlite3.Row)
         try:
             yield conn
         finally:
@@ -85,13 +133,49 @@ class LEDController:
     @contextmanager
     def get_moving_target_connection(self):
         """Get a connection to the Moving Target database."""
-        conn = sqlite3.connect(self.moving_target_db_path)
-        conn.row_factory = sqlite3.Row
+        conn = db_setup.connect(self.moving_target_db_path, row_factory=sqlite3.Row)
         try:
             yield conn
         finally:
             conn.close()
 
+    def get_changed_tables(self):
+        """Get the set of watched LEDs.db tables written since the last check.
+        
+        PRAGMA data_version only changes when another connection commits, so while
+        nothing is written a poll costs one pragma and no table reads.
+        """
+        try:
+            inode = os.stat(self.db_path).st_ino
+        except FileNotFoundError:
+            return set()
+        
+        # (Re)open after startup or a database reset; everything counts as changed then
+        if self.version_conn is None or inode != self.version_inode:
+            if self.version_conn is not None:
+                self.version_conn.close()
+            self.version_conn = db_setup.connect(self.db_path)
+            self.version_inode = inode
+            self.data_version = None
+            self.table_versions = {}
+        
+        try:
+            data_version = self.version_conn.execute('PRAGMA data_version').fetchone()[0]
+            if data_version == self.data_version:
+                return set()
+            self.data_version = data_version
+            
+            versions = dict(self.version_conn.execute('SELECT table_name, version FROM table_versions'))
+        except sqlite3.OperationalError as e:
+            # Database from before version counters: re-read everything like before
+            print(f"Error reading table versions, reloading all state: {e}")
+            self.data_version = None
+            return set(VERSIONED_TABLES)
+        
+        changed = {table for table, version in versions.items() if self.table_versions.get(table) != version}
+        self.table_versions = versions
+        return changed
+
     def get_current_mode(self):
         """Get current game mode from database."""
         with self.get_db_connection() as conn:
@@ -100,20 +184,7 @@ class LEDController:
             mode_row = cursor.fetchone()
             
             if mode_row:
-                mode = mode_row['mode']
-                
-                # Normalize mode string for comparison
-                normalized_mode = None
-                if mode.lower() in ['301', '501', 'classic']:
-                    normalized_mode = 'classic'
-                elif mode.lower() in ['cricket', 'american_cricket']:
-                    normalized_mode = 'cricket'
-                elif mode.lower() in ['around_clock', 'around_the_clock']:
-                    normalized_mode = 'around_clock'
-                elif mode.lower() in ['moving_target']:
-                    normalized_mode = 'moving_target'
-                else:
-                    normalized_mode = 'neutral'  # Default to neutral for unrecognized modes
+                normalized_mode = self.normalize_mode(mode_row['mode'])
                 
                 # Check if this is the first call or the mode has changed
                 if self.previous_mode is None or self.previous_mode != normalized_mode:
@@ -129,6 +200,18 @@ class LEDController:
                 
                 return 'neutral'  # Default to neutral if no mode is set
 
+    def normalize_mode(self, mode):
+        """Map a game mode name to the LED pattern it uses."""
+        if mode.lower() in ['301', '501', 'classic']:
+            return 'classic'
+        elif mode.lower() in ['cricket', 'american_cricket']:
+            return 'cricket'
+        elif mode.lower() in ['around_clock', 'around_the_clock']:
+            return 'around_clock'
+        elif mode.lower() in ['moving_target']:
+            return 'moving_target'
+        return 'neutral'  # Default to neutral for unrecognized modes
+
     def get_current_player(self):
         """Get current active player from database."""
         with self.get_db_connection() as conn:
@@ -174,13 +257,6 @@ class LEDController:
             with self.get_db_connection() as conn:
                 cursor = conn.cursor()
                 
-                # Check if the table exists
-                cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='around_clock_state'")
-                if cursor.fetchone() is None:
-                    # Table doesn't exist yet - return default
-                    print("Warning: around_clock_state table not found in LEDs database")
-                    return 1  # Default to target 1
-                
                 # Query the table for player's current target
                 cursor.execute(
                     'SELECT current_target FROM around_clock_state WHERE player_id = ?',
@@ -193,16 +269,20 @@ class LEDController:
                     return 1  # Default to target 1
                     
                 return row['current_target']
+        except sqlite3.OperationalError as e:
+            # Table doesn't exist yet - return default
+            print(f"Warning: around_clock_state table not readable in LEDs database: {e}")
+            return 1  # Default to target 1
         except Exception as e:
             print(f"Error getting Around the Clock target: {e}")
             return 1  # Default to target 1
 
     def update_moving_target(self):
         """Update the moving target by changing which segments are active."""
-        current_time = time.time()
+        current_time = self.clock()
         
         # Don't move the target if there are any blinking segments (animation in progress)
-        if self.blinking_segments:
+        if self.compositor.has_effects():
             # Reset the timer to prevent immediate movement after animation
             self.last_target_move_time = current_time
             return
@@ -273,11 +353,44 @@ class LEDController:
         # In classic mode, we now keep all LEDs off until hit by a dart
         # No LED segments are lit when the game starts
 
+    def apply_segment_colors(self, desired):
+        """Repaint only the segments whose color differs from a desired color map.
+        
+        Args:
+            desired (dict): (number, segment_type) -> RGB color, with (25, 'bullseye')
+                for the bull; segments not in the map are turned off
+        
+        Returns:
+            int: Number of segments repainted
+        """
+        off = (0, 0, 0)
+        repainted = 0
+        
+        for number in self.led_control.DARTBOARD_MAPPING:
+            for segment_type, paint in self.segment_painters.items():
+                color = desired.get((number, segment_type), off)
+                if self.led_control.segment_color(number, segment_type) != color:
+                    paint(number, color)
+                    repainted += 1
+        
+        bull_color = desired.get((BULL, 'bullseye'), off)
+        if self.led_control.bull_color != bull_color:
+            self.led_control.bullseye(bull_color)
+            repainted += 1
+        
+        return repainted
+
+    def number_colors(self, number, color):
+        """Desired color map entries lighting every segment of a number (or the bull) in one color."""
+        if number == BULL:
+            return {(BULL, 'bullseye'): color}
+        return {
+            (number, segment_type): color
+            for segment_type in ['double', 'triple', 'inner_single', 'outer_single']
+        }
+
     def setup_cricket_mode(self):
         """Set up LEDs for cricket mode."""
-        # Clear all LEDs first to reset
-        self.led_control.clearAll(wait_ms=1)
-        
         # Get current cricket state
         self.get_cricket_state()
         
@@ -285,9 +398,10 @@ class LEDController:
         self.get_current_player()
         
         # Set up cricket segments with appropriate colors
+        desired = {}
         for segment in self.cricket_segments:
             # Skip if not in mapping (though bullseye is a special case)
-            if segment != 25 and segment not in self.led_control.DARTBOARD_MAPPING:
+            if segment != BULL and segment not in self.led_control.DARTBOARD_MAPPING:
                 continue
             
             # Get segment state
@@ -296,24 +410,14 @@ class LEDController:
                 'all_closed': False
             })
             
-            # Determine color based on state
-            segment_color = self.get_segment_color_for_cricket(segment_state)
-            
-            # Apply color to all segment parts
-            if segment == 25:  # Bullseye
-                self.led_control.bullseye(segment_color)
-            else:
-                # All segments (single, double, triple) get the same color in cricket
-                self.led_control.innerSingleSeg(segment, segment_color)
-                self.led_control.outerSingleSeg(segment, segment_color)
-                self.led_control.doubleSeg(segment, segment_color)
-                self.led_control.tripleSeg(segment, segment_color)
+            # All segments (single, double, triple) get the same color in cricket
+            desired.update(self.number_colors(segment, self.get_segment_color_for_cricket(segment_state)))
+        
+        # Only segments whose color changed are repainted, so player switches don't flicker
+        self.apply_segment_colors(desired)
 
     def setup_around_clock_mode(self):
         """Set up LEDs for Around the Clock mode."""
-        # Clear all LEDs first to reset
-        self.led_control.clearAll(wait_ms=1)
-        
         # Get current player's target number
         current_player = self.get_current_player()
         current_target = self.get_around_clock_target(current_player)
@@ -323,22 +427,17 @@ class LEDController:
         
         print(f"Around the Clock: Current player {current_player}, target number {current_target}")
         
-        # Only light up the current target number, all other LEDs remain off
+        # Only light up the current target number in red, all other LEDs go off
+        desired = {}
         if current_target <= 20:  # Regular numbers 1-20
-            # For the target, light up all its segments in red
-            self.led_control.innerSingleSeg(current_target, (255, 0, 0))  # Red
-            self.led_control.outerSingleSeg(current_target, (255, 0, 0))  # Red
-            self.led_control.doubleSeg(current_target, (255, 0, 0))  # Red
-            self.led_control.tripleSeg(current_target, (255, 0, 0))  # Red
+            desired = self.number_colors(current_target, self.around_clock_colors['target'])
         elif current_target == 21:  # Bullseye (represented as 21)
-            # Light up only the bullseye in red
-            self.led_control.bullseye((255, 0, 0))  # Red
+            desired = self.number_colors(BULL, self.around_clock_colors['target'])
+        
+        self.apply_segment_colors(desired)
 
     def setup_moving_target_mode(self, target_number=None):
         """Set up LEDs for moving target mode."""
-        # Clear all LEDs first to reset
-        self.led_control.clearAll(wait_ms=1)
-        
         # If no target number specified, get it from the database
         if target_number is None:
             with self.get_moving_target_connection() as conn:
@@ -356,16 +455,12 @@ class LEDController:
         # Make sure target number is in the mapping
         if target_number not in self.led_control.DARTBOARD_MAPPING:
             print(f"Error: Target number {target_number} not in dartboard mapping")
+            self.apply_segment_colors({})
             return
         
-        # Make all segments white (as requested)
-        white_color = (255, 255, 255)  # White
-        
-        # Light up all segments for the target number with white color
-        self.led_control.doubleSeg(target_number, white_color)
-        self.led_control.tripleSeg(target_number, white_color)
-        self.led_control.innerSingleSeg(target_number, white_color)
-        self.led_control.outerSingleSeg(target_number, white_color)
+        # Light up all segments for the target number in white; a target move
+        # only repaints the old and the new number
+        self.apply_segment_colors(self.number_colors(target_number, (255, 255, 255)))
 
     def setup_neutral_mode(self):
         """Set up LEDs for neutral waiting state."""
@@ -413,75 +508,44 @@ class LEDController:
         # Otherwise, return white (open)
         return self.cricket_open_color
 
+    def play_animation(self, key, name, targets, color, start_time, end_time):
+        """Play a blink-style animation over target slices for the configured blink count."""
+        compiled = self.animations.compile(
+            name, targets, colors={'hit': color},
+            duration=(end_time - start_time) / self.blink_count, repeat=self.blink_count
+        )
+        self.compositor.add_effect(Effect(key, play, compiled, start_time=start_time))
+
     def _setup_target_blinking(self, target_number, blink_color, start_time, end_time):
         """Helper method to set up blinking for all segments of a target."""
         if target_number not in self.led_control.DARTBOARD_MAPPING:
             print(f"Error: Target number {target_number} not in dartboard mapping")
             return
         
-        # Set up blinking for all segments of the target
-        segment_types = ['double', 'triple', 'inner_single', 'outer_single']
+        # One overlay covering all segments of the target, so they blink in sync
+        slices = [
+            self.led_control.segment_slice(target_number, segment_type)
+            for segment_type in ['double', 'triple', 'inner_single', 'outer_single']
+        ]
         
-        for segment_type in segment_types:
-            segment_id = f'{segment_type}_{target_number}'
-            
-            self.blinking_segments[segment_id] = {
-                'start_time': start_time,
-                'end_time': end_time,
-                'original_color': (255, 255, 255),  # White (original color)
-                'blink_color': blink_color,
-                'score': target_number,
-                'segment_type': segment_type,
-                'blink_count': self.blink_count,
-                'blinks_completed': 0,
-                'current_state': 'off',  # Start in 'off' state
-                'last_toggle': start_time
-            }
-        
-        # Force an immediate update to start blinking
-        self.update_blinking_segments(True)
+        self.play_animation(f'target_{target_number}', 'blink', slices, blink_color, start_time, end_time)
         
     def _setup_segment_blinking(self, score, segment_type, blink_color, start_time, end_time):
         """Helper method to set up blinking for a single segment."""
         if segment_type == 'bullseye':
             segment_id = 'bullseye'
+            score = BULL
         elif score in self.led_control.DARTBOARD_MAPPING:
             segment_id = f'{segment_type}_{score}'
         else:
             print(f"Error: Score {score} not in dartboard mapping")
             return
-            
-        # Set the segment to the blink color first to ensure it displays immediately
-        if segment_type == 'double':
-            self.led_control.doubleSeg(score, blink_color)
-        elif segment_type == 'triple':
-            self.led_control.tripleSeg(score, blink_color)
-        elif segment_type == 'inner_single':
-            self.led_control.innerSingleSeg(score, blink_color)
-        elif segment_type == 'outer_single':
-            self.led_control.outerSingleSeg(score, blink_color)
-        elif segment_type == 'bullseye':
-            self.led_control.bullseye(blink_color)
-            
-        # Create the blinking entry
-        self.blinking_segments[segment_id] = {
-            'start_time': start_time,
-            'end_time': end_time,
-            'original_color': (255, 255, 255),  # White (original color)
-            'blink_color': blink_color,
-            'score': score,
-            'segment_type': segment_type,
-            'blink_count': self.blink_count,
-            'blinks_completed': 0,
-            'current_state': 'on',  # Start in 'on' state since we already turned it on
-            'last_toggle': start_time
-        }
         
-        # Add a slight delay before forcing an update to ensure the on->off transition is visible
-        time.sleep(0.1)
-        
-        # Force an update to continue the blinking sequence
-        self.update_blinking_segments(True)
+        # The overlay starts in its 'on' phase; when it ends the base layer shows through again
+        self.play_animation(
+            segment_id, 'blink', [self.led_control.segment_slice(score, segment_type)],
+            blink_color, start_time, end_time
+        )
 
     def process_dart_event(self, event):
         """Process a dart event and update LEDs accordingly."""
@@ -496,7 +560,7 @@ class LEDController:
         
         # For Moving Target mode with hit/miss info
         if self.current_mode == 'moving_target' and len(hit_miss_info) >= 3 and hit_miss_info[-2] == 'target':
-            base_segment_type = hit_miss_info[0]
+            base_segment_type = '_'.join(hit_miss_info[:-2])
             is_hit = hit_miss_info[-1] == 'hit'
             
             # Get current target number
@@ -507,7 +571,7 @@ class LEDController:
                 current_target = state['current_target'] if state else 20
             
             # Calculate blink timing
-            start_time = time.time()
+            start_time = self.clock()
             end_time = start_time + self.blink_duration
             
             if is_hit:
@@ -534,275 +598,216 @@ class LEDController:
         event_id = event['id']
         
         # Calculate blink timing
-        start_time = time.time()
+        start_time = self.clock()
         end_time = start_time + self.blink_duration
         
-        # Determine segment ID
-        if segment_type == 'bullseye':
-            segment_id = 'bullseye'
-        elif score in self.led_control.DARTBOARD_MAPPING:
-            if segment_type == 'double':
-                segment_id = f'double_{score}'
-            elif segment_type == 'triple':
-                segment_id = f'triple_{score}'
-            elif segment_type == 'inner_single':
-                segment_id = f'inner_single_{score}'
-            elif segment_type == 'outer_single':
-                segment_id = f'outer_single_{score}'
-            else:
+        # Only known segments can blink
+        if segment_type != 'bullseye':
+            if score not in self.led_control.DARTBOARD_MAPPING:
                 return
-        else:
+            if segment_type not in ('double', 'triple', 'inner_single', 'outer_single'):
+                return
+        
+        # The bull has no LEDs of its own, so a bull hit plays the burst animation instead
+        if segment_type == 'bullseye':
+            self.compositor.add_effect(Effect(
+                'bullseye', play, self.animations.compile('bull_burst'), start_time=start_time
+            ))
             return
         
-        # In classic mode, original color should always be OFF (0,0,0)
-        original_color = (0, 0, 0)  # Black/OFF
-        
-        # Store blinking information
-        self.blinking_segments[segment_id] = {
-            'start_time': start_time,
-            'end_time': end_time,
-            'original_color': original_color,
-            'score': score,
-            'segment_type': segment_type,
-            'blink_count': self.blink_count,
-            'blinks_completed': 0,
-            'current_state': 'off',  # Start in 'off' state
-            'last_toggle': start_time,
-            'blink_color': (0, 255, 0)  # Always use green for blinking
-        }
+        # Blink the hit segment in green over the base layer
+        self._setup_segment_blinking(score, segment_type, (0, 255, 0), start_time, end_time)
+
+    def apply_mode(self, new_mode, force=False):
+        """Switch the LED pattern when the game mode changes (or redraw it when forced)."""
+        if new_mode == self.current_mode and not force:
+            return
         
-        # Immediately light up the hit segment with first update
-        self.update_blinking_segments(True)  # Force update
+        print(f"Game mode changed from '{self.current_mode}' to '{new_mode}'")
+        self.current_mode = new_mode
+        
+        # Effects from the previous mode don't belong on the new pattern
+        self.compositor.clear_effects()
+        
+        # Update LED pattern based on new mode
+        if self.current_mode == 'classic':
+            self.setup_classic_mode()
+        elif self.current_mode == 'cricket':
+            self.setup_cricket_mode()
+        elif self.current_mode == 'around_clock':
+            self.setup_around_clock_mode()
+        elif self.current_mode == 'moving_target':
+            self.setup_moving_target_mode()
+        elif self.current_mode == 'neutral':
+            self.setup_neutral_mode()
 
-    def update_blinking_segments(self, force_update=False):
-        """Update any segments that should be blinking."""
-        current_time = time.time()
-        
-        # Process each blinking segment
-        to_remove = []
-        
-        for segment_id, info in self.blinking_segments.items():
-            # Check if this segment's blinking period has expired
-            if current_time > info['end_time']:
-                if self.current_mode == 'classic':
-                    # In classic mode, always turn segments OFF when done blinking
-                    off_color = (0, 0, 0)  # Black/OFF
-                    
-                    if segment_id == 'bullseye':
-                        self.led_control.bullseye(off_color)
-                    elif 'segment_type' in info:
-                        score = info['score']
-                        segment_type = info['segment_type']
-                        
-                        if segment_type == 'double':
-                            self.led_control.doubleSeg(score, off_color)
-                        elif segment_type == 'triple':
-                            self.led_control.tripleSeg(score, off_color)
-                        elif segment_type == 'inner_single':
-                            self.led_control.innerSingleSeg(score, off_color)
-                        elif segment_type == 'outer_single':
-                            self.led_control.outerSingleSeg(score, off_color)
-                else:
-                    # For other modes, restore original color
-                    if segment_id == 'bullseye':
-                        self.led_control.bullseye(info['original_color'])
-                    elif 'segment_type' in info:
-                        score = info['score']
-                        segment_type = info['segment_type']
-                        
-                        if segment_type == 'double':
-                            self.led_control.doubleSeg(score, info['original_color'])
-                        elif segment_type == 'triple':
-                            self.led_control.tripleSeg(score, info['original_color'])
-                        elif segment_type == 'inner_single':
-                            self.led_control.innerSingleSeg(score, info['original_color'])
-                        elif segment_type == 'outer_single':
-                            self.led_control.outerSingleSeg(score, info['original_color'])
-                
-                # Mark for removal
-                to_remove.append(segment_id)
-            else:
-                # Calculate if we need to toggle the blink state
-                blink_interval = 1.0 / (self.blink_frequency * 2)  # Each blink requires two toggles (on, off)
-                time_since_toggle = current_time - info['last_toggle']
+    def handle_event(self, event):
+        """Apply an event received over the LED event channel."""
+        event_type = event.get('type')
+        
+        if event_type == 'dart':
+            print(f"\nProcessing dart event: score={event['score']}, multiplier={event['multiplier']}, segment_type={event['segment_type']}")
+            self.process_dart_event(dict(event, id=None))
+        
+        elif event_type == 'mode':
+            # Sent when a game starts, so redraw even if the mode is unchanged (new game, fresh state)
+            self.previous_mode = self.normalize_mode(event['mode'])
+            self.apply_mode(self.previous_mode, force=True)
+        
+        elif event_type == 'player':
+            old_player = self.current_player
+            if event.get('current_player') is not None:
+                self.current_player = event['current_player']
+            if event.get('player_count') is not None:
+                self.player_count = event['player_count']
+            
+            if old_player != self.current_player:
+                print(f"Current player changed from {old_player} to {self.current_player}")
+                if self.current_mode == 'cricket':
+                    self.setup_cricket_mode()
+                elif self.current_mode == 'around_clock':
+                    self.setup_around_clock_mode()
+        
+        elif event_type == 'cricket' and self.current_mode == 'cricket':
+            # JSON turns the integer keys into strings
+            new_state = dict(self.cricket_state)
+            for segment, state in event['segments'].items():
+                new_state[int(segment)] = {
+                    'player_closed': {int(player): closed for player, closed in state['player_closed'].items()},
+                    'all_closed': state['all_closed']
+                }
+            if new_state != self.cricket_state:
+                print("Cricket state changed, updating display")
+                self.setup_cricket_mode()
+        
+        elif event_type == 'around_clock' and self.current_mode == 'around_clock':
+            if event['player_id'] == self.current_player and event['current_target'] != self.current_around_clock_target:
+                print(f"Target changed from {self.current_around_clock_target} to {event['current_target']}")
+                self.setup_around_clock_mode()
+
+    def poll(self):
+        """Check the database for mode, player and state changes and new dart events.
+        
+        Only the tables whose version counter moved since the last poll are re-read.
+        """
+        changed = self.get_changed_tables()
+        
+        # Check for game mode changes (a mode switch redraws from the full state)
+        mode_switched = False
+        if 'game_mode' in changed:
+            new_mode = self.get_current_mode()
+            mode_switched = new_mode != self.current_mode
+            self.apply_mode(new_mode)
+        
+        # Handle moving target mode updates
+        if self.current_mode == 'moving_target':
+            self.update_moving_target()
+        
+        # If in cricket mode, check for player/state changes
+        if self.current_mode == 'cricket' and not mode_switched:
+            old_player = self.current_player
+            if 'player_state' in changed:
+                self.get_current_player()
+            
+            # If player changed, update the display
+            if old_player != self.current_player:
+                print(f"Current player changed from {old_player} to {self.current_player}")
+                self.setup_cricket_mode()
+            elif 'cricket_state' in changed:
+                # Check for cricket state changes
+                old_state = self.cricket_state
+                self.get_cricket_state()
                 
-                if force_update or time_since_toggle >= blink_interval:
-                    # Time to toggle the state
-                    new_state = 'on' if info['current_state'] == 'off' else 'off'
-                    
-                    # Track completed blinks - a blink is completed when going from on->off
-                    if new_state == 'off' and info['current_state'] == 'on':
-                        info['blinks_completed'] += 1
-                        
-                        # If we've completed our blinks but still have time, end early
-                        if info['blinks_completed'] >= info['blink_count']:
-                            info['end_time'] = current_time
-                            continue
-                    
-                    # Toggle the color based on the new state
-                    if new_state == 'on':
-                        # In classic mode, always use green for blinking ON state
-                        if self.current_mode == 'classic':
-                            blink_color = (0, 255, 0)  # Green
-                        else:
-                            # For other modes, use custom blink color if set, otherwise green
-                            blink_color = info.get('blink_color', (0, 255, 0))
-                        
-                        if segment_id == 'bullseye':
-                            self.led_control.bullseye(blink_color)
-                        elif 'segment_type' in info:
-                            score = info['score']
-                            segment_type = info['segment_type']
-                            
-                            if segment_type == 'double':
-                                self.led_control.doubleSeg(score, blink_color)
-                            elif segment_type == 'triple':
-                                self.led_control.tripleSeg(score, blink_color)
-                            elif segment_type == 'inner_single':
-                                self.led_control.innerSingleSeg(score, blink_color)
-                            elif segment_type == 'outer_single':
-                                self.led_control.outerSingleSeg(score, blink_color)
-                    else:
-                        # For OFF state in classic mode, always use black/off
-                        if self.current_mode == 'classic':
-                            off_color = (0, 0, 0)  # Black/OFF
-                            
-                            if segment_id == 'bullseye':
-                                self.led_control.bullseye(off_color)
-                            elif 'segment_type' in info:
-                                score = info['score']
-                                segment_type = info['segment_type']
-                                
-                                if segment_type == 'double':
-                                    self.led_control.doubleSeg(score, off_color)
-                                elif segment_type == 'triple':
-                                    self.led_control.tripleSeg(score, off_color)
-                                elif segment_type == 'inner_single':
-                                    self.led_control.innerSingleSeg(score, off_color)
-                                elif segment_type == 'outer_single':
-                                    self.led_control.outerSingleSeg(score, off_color)
-                        else:
-                            # For other modes, use original color for OFF state
-                            if segment_id == 'bullseye':
-                                self.led_control.bullseye(info['original_color'])
-                            elif 'segment_type' in info:
-                                score = info['score']
-                                segment_type = info['segment_type']
-                                
-                                if segment_type == 'double':
-                                    self.led_control.doubleSeg(score, info['original_color'])
-                                elif segment_type == 'triple':
-                                    self.led_control.tripleSeg(score, info['original_color'])
-                                elif segment_type == 'inner_single':
-                                    self.led_control.innerSingleSeg(score, info['original_color'])
-                                elif segment_type == 'outer_single':
-                                    self.led_control.outerSingleSeg(score, info['original_color'])
-                    
-                    # Update segment info
-                    info['current_state'] = new_state
-                    info['last_toggle'] = current_time
+                # If state changed, update the display
+                if old_state != self.cricket_state:
+                    print("Cricket state changed, updating display")
+                    self.setup_cricket_mode()
+        # If in around_clock mode, check for player/target changes
+        elif self.current_mode == 'around_clock' and not mode_switched:
+            old_player = self.current_player
+            old_target = self.current_around_clock_target
+            if 'player_state' in changed:
+                self.get_current_player()
+            
+            # If player changed, update the display
+            if old_player != self.current_player:
+                print(f"Current player changed from {old_player} to {self.current_player}")
+                self.setup_around_clock_mode()
+            elif 'around_clock_state' in changed:
+                # Check for target changes
+                current_target = self.get_around_clock_target(self.current_player)
+                if old_target != current_target:
+                    print(f"Target changed from {old_target} to {current_target}")
+                    self.current_around_clock_target = current_target
+                    self.setup_around_clock_mode()
+        
+        # Get new dart events
+        if 'dart_events' not in changed:
+            return
+        events = self.get_new_dart_events()
         
-        # Remove expired segments
-        for segment_id in to_remove:
-            del self.blinking_segments[segment_id]
+        # Process each new event
+        for event in events:
+            print(f"\nProcessing dart event: score={event['score']}, multiplier={event['multiplier']}, segment_type={event['segment_type']}")
+            self.process_dart_event(event)
+            
+            # Print board state after processing an event if MockLEDs
+            if hasattr(self.led_control, 'print_board_state'):
+                self.led_control.print_board_state()
+
+    def start(self):
+        """Start in the neutral waiting state."""
+        print("Starting LED controller in neutral waiting state")
+        self.setup_neutral_mode()
+        self.current_mode = 'neutral'
+        self.next_poll_time = 0.0
+
+    def step(self, frame_start):
+        """Do one frame's work: handle pushed events, poll when due and render."""
+        # Events pushed by the web app and processors are handled within this frame
+        if self.event_listener is not None:
+            for event in self.event_listener.receive():
+                self.handle_event(event)
+        
+        if frame_start >= self.next_poll_time:
+            self.poll()
+            self.next_poll_time = frame_start + self.poll_interval
+        
+        # Composite base pattern, effects and brightness into one frame
+        self.compositor.render(frame_start)
+        
+        if self.frame_publisher is not None:
+            self.frame_publisher.publish(frame_start)
 
     def run(self):
-        """Main processing loop for the LED controller."""
+        """Main processing loop for the LED controller.
+        
+        Frames are rendered at a fixed rate; the database is only polled every
+        poll_interval seconds, so slow queries can't stretch blink timing.
+        """
         try:
-            # Start in neutral waiting state
-            print("Starting LED controller in neutral waiting state")
-            self.setup_neutral_mode()
-            self.current_mode = 'neutral'
+            self.start()
             
-            print("LED Controller running. Press Ctrl+C to stop...")
+            print(f"LED Controller running at {self.compositor.fps} fps. Press Ctrl+C to stop...")
             
-            # Main processing loop
+            # Main render loop
             while True:
-                # Check for game mode changes
-                new_mode = self.get_current_mode()
-                
-                if new_mode != self.current_mode:
-                    print(f"Game mode changed from '{self.current_mode}' to '{new_mode}'")
-                    self.current_mode = new_mode
-                    
-                    # Update LED pattern based on new mode
-                    if self.current_mode == 'classic':
-                        self.setup_classic_mode()
-                    elif self.current_mode == 'cricket':
-                        self.setup_cricket_mode()
-                    elif self.current_mode == 'around_clock':
-                        self.setup_around_clock_mode()
-                    elif self.current_mode == 'moving_target':
-                        self.setup_moving_target_mode()
-                    elif self.current_mode == 'neutral':
-                        self.setup_neutral_mode()
-                
-                # Handle moving target mode updates
-                if self.current_mode == 'moving_target':
-                    self.update_moving_target()
-                
-                # If in cricket mode, check for player/state changes
-                if self.current_mode == 'cricket':
-                    old_player = self.current_player
-                    self.get_current_player()
-                    
-                    # If player changed, update the display
-                    if old_player != self.current_player:
-                        print(f"Current player changed from {old_player} to {self.current_player}")
-                        self.setup_cricket_mode()
-                    else:
-                        # Check for cricket state changes
-                        old_state = self.cricket_state.copy()
-                        self.get_cricket_state()
-                        
-                        # If state changed, update the display
-                        if old_state != self.cricket_state:
-                            print("Cricket state changed, updating display")
-                            self.setup_cricket_mode()
-                # If in around_clock mode, check for player/target changes
-                elif self.current_mode == 'around_clock':
-                    old_player = self.current_player
-                    old_target = getattr(self, 'current_around_clock_target', 1)
-                    self.get_current_player()
-                    
-                    # If player changed, update the display
-                    if old_player != self.current_player:
-                        print(f"Current player changed from {old_player} to {self.current_player}")
-                        self.setup_around_clock_mode()
-                    else:
-                        try:
-                            # Check for target changes
-                            current_target = self.get_around_clock_target(self.current_player)
-                            if old_target != current_target:
-                                print(f"Target changed from {old_target} to {current_target}")
-                                self.current_around_clock_target = current_target
-                                self.setup_around_clock_mode()
-                        except Exception as e:
-                            print(f"Error checking target: {e}")
-                            # Continue with current state if there's an error
-                
-                # Get new dart events
-                events = self.get_new_dart_events()
-                
-                # Process each new event
-                for event in events:
-                    print(f"\nProcessing dart event: score={event['score']}, multiplier={event['multiplier']}, segment_type={event['segment_type']}")
-                    self.process_dart_event(event)
-                    
-                    # Print board state after processing an event if MockLEDs
-                    if hasattr(self.led_control, 'print_board_state'):
-                        self.led_control.print_board_state()
-                
-                # Update blinking segments
-                self.update_blinking_segments()
-                
-                # Sleep for a bit before next poll
-                time.sleep(self.poll_interval)
+                frame_start = self.clock()
+                self.step(frame_start)
+                self.compositor.wait_for_next_frame(frame_start)
                 
         except KeyboardInterrupt:
             print("\nLED Controller stopped.")
             # Clean up
+            self.compositor.clear_effects()
             self.led_control.clearAll()
+            self.led_control.flush()
+            if self.event_listener is not None:
+                self.event_listener.close()
+            if self.version_conn is not None:
+                self.version_conn.close()
+            if self.frame_publisher is not None:
+                self.frame_publisher.close()
             
             # Print final state and summary if MockLEDs
             if hasattr(self.led_control, 'print_board_state'):
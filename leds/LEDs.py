@@ -13,6 +13,10 @@ import argparse
 import colorama
 from colorama import Fore, Back, Style
 from datetime import datetime
+from pixel_map import BULL, build_segment_tables, fill_slice, ring_pixel
+
+EMPTY_PIXELS = ()
+EMPTY_SLICE = slice(0, 0)
 
 class LEDs:
 
@@ -50,11 +54,20 @@ class LEDs:
         )
         self.strip.begin()
         
-        # Board state representation (to track LED colors)
-        self.board_state = {}
+        # Pixel indexes and framebuffer slices of every segment, computed once
+        self.SEGMENT_PIXELS, self.SEGMENT_SLICES = build_segment_tables(
+            self.DARTBOARD_MAPPING, self.NUM_LED_PER_STRIP, self.DBL_RING, self.TRPL_RING
+        )
         
         # Blinking tracking
         self.blinking_segments = {}
+
+        # Board state: flat RGB framebuffer (3 bytes per pixel). Primitives only write
+        # here, flush() pushes it to the strip
+        self.frame = bytearray(self.LED_COUNT*3)
+        self.shown_frame = None  # What the strip currently holds (None until the first flush)
+        self.frame_dirty = True
+        self.bull_color = (0, 0, 0)  # Tracked only, the bull has no LEDs on this board
         
         self.clear_board_state()
         
@@ -62,15 +75,10 @@ class LEDs:
         print(f"Dartboard has {self.NUM_STRIPS} strips with {self.NUM_LED_PER_STRIP} LEDs each")
 
     def clear_board_state(self):
-        """Initialize the board state tracking dictionary."""
-        self.board_state = {
-            'strips': {},
-            'bullseye': (0, 0, 0)  # Black/off
-        }
-        
-        # Initialize all strips to off
-        for strip in range(self.NUM_STRIPS):
-            self.board_state['strips'][strip] = [(0, 0, 0) for _ in range(self.NUM_LED_PER_STRIP)]
+        """Turn every pixel in the framebuffer off."""
+        self.frame[:] = bytes(len(self.frame))
+        self.bull_color = (0, 0, 0)  # Black/off
+        self.frame_dirty = True
 
     def getSegIndexes(self, strip_num):
         """Get the start and end segment indices for a strip."""
@@ -183,19 +191,68 @@ class LEDs:
         """Format a timestamp for display."""
         return datetime.fromtimestamp(timestamp).strftime('%H:%M:%S.%f')[:-3]
 
+    def ring_pixel(self, strip_num, ring):
+        """Get the strip pixel index of a ring on a strip (odd strips run inwards to outwards)."""
+        return ring_pixel(strip_num, ring, self.NUM_LED_PER_STRIP)
+
+    def segment_pixels(self, dartboard_num, segment_type):
+        """Get the precomputed pixel indexes of a segment (empty for unknown segments and the bull)."""
+        return self.SEGMENT_PIXELS.get((dartboard_num, segment_type), EMPTY_PIXELS)
+
+    def segment_slice(self, dartboard_num, segment_type):
+        """Get the precomputed framebuffer byte slice of a segment."""
+        return self.SEGMENT_SLICES.get((dartboard_num, segment_type), EMPTY_SLICE)
+
+    def pixel_color(self, pixel):
+        """Read back the RGB color of one pixel from the framebuffer."""
+        offset = pixel*3
+        return tuple(self.frame[offset:offset + 3])
+
+    def segment_color(self, dartboard_num, segment_type):
+        """Read back the color of a segment (its first pixel), or off if it has no pixels."""
+        pixels = self.segment_pixels(dartboard_num, segment_type)
+        return self.pixel_color(pixels[0]) if pixels else (0, 0, 0)
+
+    def fill_segment(self, dartboard_num, segment_type, color, label):
+        """Fill one segment in the framebuffer with a single slice assignment."""
+        if dartboard_num not in self.DARTBOARD_MAPPING:
+            print(f"{Fore.RED}ERROR: Invalid dartboard number: {dartboard_num}{Style.RESET_ALL}")
+            return
+
+        fill_slice(self.frame, self.SEGMENT_SLICES[(dartboard_num, segment_type)], color)
+        self.frame_dirty = True
+        
+        # Track segment change for console output
+        self.track_segment_change(dartboard_num, segment_type, color)
+            
+        # Print console status
+        print(f"{self.get_fore_color(color)}{label}: Dartboard {dartboard_num} - {self.color_name(color)}{Style.RESET_ALL}")
+
+    def flush(self, frame=None):
+        """Push a frame (the framebuffer by default) to the strip with a single show() if any pixel changed."""
+        if frame is None:
+            frame = self.frame
+
+        self.frame_dirty = False
+        if frame == self.shown_frame:
+            return False
+
+        shown = self.shown_frame
+        for pixel in range(self.LED_COUNT):
+            offset = pixel*3
+            if shown is None or frame[offset:offset + 3] != shown[offset:offset + 3]:
+                self.strip.setPixelColor(pixel, Color(frame[offset], frame[offset + 1], frame[offset + 2]))
+
+        self.shown_frame = bytearray(frame)
+        self.strip.show()
+        return True
+
     # Sweep colors across strip     
     def colorWipe(self, strip_num, color, wait_ms=50):
-        """Wipe color across display a pixel at a time."""
-        # Control the real LEDs
-        start_seg, end_seg = self.getSegIndexes(strip_num) 
-        for i in range(start_seg, end_seg):
-            self.strip.setPixelColor(i, Color(*color))
-            self.strip.show()
-            time.sleep(wait_ms/1000.0)
-        
-        # Track in board state
-        for i in range(self.NUM_LED_PER_STRIP):
-            self.board_state['strips'][strip_num][i] = color
+        """Fill a whole strip with a color (shown on the next flush)."""
+        start_seg, end_seg = self.getSegIndexes(strip_num)
+        fill_slice(self.frame, slice(start_seg*3, end_seg*3), color)
+        self.frame_dirty = True
             
         # Print console status
         dartboard_num = None
@@ -208,224 +265,52 @@ class LEDs:
 
     # Turn off all LEDs
     def clearAll(self, wait_ms=1): 
-        """Clear all LEDs by turning them off."""
-        # Control the real LEDs
-        for i in range(self.strip.numPixels()):
-            self.strip.setPixelColor(i, Color(0,0,0))
-            self.strip.show()
-            time.sleep(wait_ms/1000.0)
-        
-        # Reset board state tracking
+        """Clear all LEDs by turning them off (shown on the next flush)."""
         print(f"{Fore.WHITE}Clearing all LEDs{Style.RESET_ALL}")
         self.clear_board_state()
         
     # Lights up triple segment 
     def tripleSeg(self, dartboard_num, color, wait_ms=5):
         """Light up the triple segment for a number."""
-        if dartboard_num not in self.DARTBOARD_MAPPING:
-            print(f"{Fore.RED}ERROR: Invalid dartboard number: {dartboard_num}{Style.RESET_ALL}")
-            return
-
-        strip_num = self.DARTBOARD_MAPPING[dartboard_num]
-
-        # light up triple segment - real LEDs
-        if(strip_num % 2 == 0): #even num strip 
-            pixel = self.TRPL_RING + self.NUM_LED_PER_STRIP*strip_num
-        else: # odd num strip 
-            pixel = self.NUM_LED_PER_STRIP*strip_num + (self.NUM_LED_PER_STRIP - self.TRPL_RING - 1)
-        
-        self.strip.setPixelColor(pixel, Color(*color))
-        self.strip.show()
-        time.sleep(wait_ms/1000.0)
-        
-        # Track segment change for console output
-        self.track_segment_change(dartboard_num, "triple", color)
-        
-        # Update board state tracking
-        if strip_num % 2 == 0:  # even num strip
-            self.board_state['strips'][strip_num][self.TRPL_RING] = color
-        else:  # odd num strip
-            self.board_state['strips'][strip_num][self.NUM_LED_PER_STRIP - self.TRPL_RING - 1] = color
-            
-        # Print console status
-        print(f"{self.get_fore_color(color)}Triple Segment: Dartboard {dartboard_num} - {self.color_name(color)}{Style.RESET_ALL}")
+        self.fill_segment(dartboard_num, 'triple', color, "Triple Segment")
         
     # Lights up double segment 
     def doubleSeg(self, dartboard_num, color, wait_ms=5):
         """Light up the double segment for a number."""
-        if dartboard_num not in self.DARTBOARD_MAPPING:
-            print(f"{Fore.RED}ERROR: Invalid dartboard number: {dartboard_num}{Style.RESET_ALL}")
-            return
-
-        strip_num = self.DARTBOARD_MAPPING[dartboard_num]
-
-        # light up double segment - real LEDs
-        if(strip_num % 2 == 0): #even num strip 
-            pixel = self.DBL_RING + self.NUM_LED_PER_STRIP*strip_num
-        else: # odd num strip 
-            pixel = self.NUM_LED_PER_STRIP*strip_num + (self.NUM_LED_PER_STRIP - self.DBL_RING - 1)
-        
-        self.strip.setPixelColor(pixel, Color(*color))
-        self.strip.show()
-        time.sleep(wait_ms/1000.0)
-        
-        # Track segment change for console output
-        self.track_segment_change(dartboard_num, "double", color)
-        
-        # Update board state tracking
-        if strip_num % 2 == 0:  # even num strip
-            self.board_state['strips'][strip_num][self.DBL_RING] = color
-        else:  # odd num strip
-            self.board_state['strips'][strip_num][self.NUM_LED_PER_STRIP - self.DBL_RING - 1] = color
-            
-        # Print console status
-        print(f"{self.get_fore_color(color)}Double Segment: Dartboard {dartboard_num} - {self.color_name(color)}{Style.RESET_ALL}")
+        self.fill_segment(dartboard_num, 'double', color, "Double Segment")
 
     # Lights up outer single segment (closest to circumference)
     def outerSingleSeg(self, dartboard_num, color, wait_ms=5):
         """Light up the outer single segment for a number."""
-        if dartboard_num not in self.DARTBOARD_MAPPING:
-            print(f"{Fore.RED}ERROR: Invalid dartboard number: {dartboard_num}{Style.RESET_ALL}")
-            return
-
-        strip_num = self.DARTBOARD_MAPPING[dartboard_num]
-        
-        # Control real LEDs
-        if(strip_num % 2 == 0): #even num strip 
-            start_seg = (self.DBL_RING + self.NUM_LED_PER_STRIP*strip_num) + 1
-            end_seg = self.TRPL_RING + self.NUM_LED_PER_STRIP*strip_num
-        else: # odd num strip
-            end_seg = self.NUM_LED_PER_STRIP*strip_num + (self.NUM_LED_PER_STRIP - self.DBL_RING) - 1
-            start_seg = self.NUM_LED_PER_STRIP*strip_num + (self.NUM_LED_PER_STRIP - self.TRPL_RING)
-        
-        for i in range(start_seg, end_seg):
-            self.strip.setPixelColor(i, Color(*color))
-            self.strip.show()
-            time.sleep(wait_ms/1000.0)
-        
-        # Track segment change for console output
-        self.track_segment_change(dartboard_num, "outer_single", color)
-        
-        # Update board state tracking
-        if strip_num % 2 == 0:  # even num strip
-            for i in range(self.DBL_RING + 1, self.TRPL_RING):
-                self.board_state['strips'][strip_num][i] = color
-        else:  # odd num strip
-            for i in range(self.NUM_LED_PER_STRIP - self.TRPL_RING, self.NUM_LED_PER_STRIP - self.DBL_RING - 1):
-                self.board_state['strips'][strip_num][i] = color
-        
-        # Print console status
-        print(f"{self.get_fore_color(color)}Outer Single Segment: Dartboard {dartboard_num} - {self.color_name(color)}{Style.RESET_ALL}")
+        self.fill_segment(dartboard_num, 'outer_single', color, "Outer Single Segment")
 
     # Lights up inner single segment (furthest from circumference)
     def innerSingleSeg(self, dartboard_num, color, wait_ms=5):
         """Light up the inner single segment for a number."""
-        if dartboard_num not in self.DARTBOARD_MAPPING:
-            print(f"{Fore.RED}ERROR: Invalid dartboard number: {dartboard_num}{Style.RESET_ALL}")
-            return
-
-        strip_num = self.DARTBOARD_MAPPING[dartboard_num]
-        
-        # Control real LEDs
-        if(strip_num % 2 == 0): #even num strip 
-            start_seg = self.NUM_LED_PER_STRIP*strip_num + self.TRPL_RING + 1 
-            end_seg = self.NUM_LED_PER_STRIP*strip_num + self.NUM_LED_PER_STRIP
-        else: # odd num strip
-            start_seg = self.NUM_LED_PER_STRIP*strip_num 
-            end_seg = self.NUM_LED_PER_STRIP*strip_num + (self.NUM_LED_PER_STRIP - self.TRPL_RING - 1)
-        
-        for i in range(start_seg, end_seg):
-            self.strip.setPixelColor(i, Color(*color))
-            self.strip.show()
-            time.sleep(wait_ms/1000.0)
-        
-        # Track segment change for console output
-        self.track_segment_change(dartboard_num, "inner_single", color)
-        
-        # Update board state tracking
-        if strip_num % 2 == 0:  # even num strip
-            for i in range(self.TRPL_RING + 1, self.NUM_LED_PER_STRIP):
-                self.board_state['strips'][strip_num][i] = color
-        else:  # odd num strip
-            for i in range(0, self.NUM_LED_PER_STRIP - self.TRPL_RING - 1):
-                self.board_state['strips'][strip_num][i] = color
-        
-        # Print console status
-        print(f"{self.get_fore_color(color)}Inner Single Segment: Dartboard {dartboard_num} - {self.color_name(color)}{Style.RESET_ALL}")
+        self.fill_segment(dartboard_num, 'inner_single', color, "Inner Single Segment")
     
-    def bullseye(self, wait_ms=50):
-        """Gold outward cumulative build, then synchronized inward ring flashes."""
-        gold = (250, 90, 0)
-        
-        # Track for console output
-        self.track_segment_change(25, "bullseye", gold)
-        
-        # Update board state
-        self.board_state['bullseye'] = gold
-        
-        # Print console status
-        print(f"{self.get_fore_color(gold)}Bullseye: {self.color_name(gold)}{Style.RESET_ALL}")
-        
-        # Control real LEDs
-        num_rings = self.NUM_LED_PER_STRIP
-        active_strips = [0, 5, 10, 15]  # 4 strips equally spaced out of 20
-
-        # Phase 1: Radiate outward (build-up)
-        for ring in range(num_rings):
-            for strip_num in active_strips:
-                if strip_num % 2 == 0:
-                    pixel = strip_num * num_rings + ring
-                else:
-                    pixel = strip_num * num_rings + (num_rings - ring - 1)
-                self.strip.setPixelColor(pixel, Color(*gold))
-            self.strip.show()  # show after setting full ring
-            time.sleep(wait_ms / 1000.0)
-
-        # Phase 2: Collapse inward one ring at a time, all at once
-        for ring in reversed(range(num_rings)):
-            self.clearAll(wait_ms=0)  # clear entire board first
-            for strip_num in active_strips:
-                if strip_num % 2 == 0:
-                    pixel = strip_num * num_rings + ring
-                else:
-                    pixel = strip_num * num_rings + (num_rings - ring - 1)
-                self.strip.setPixelColor(pixel, Color(*gold))
-            self.strip.show()  # synchronized flash
-            time.sleep(wait_ms / 1000.0)
-
-        self.clearAll(wait_ms=10)
+    def bullseye(self, color=(250, 90, 0), wait_ms=50):
+        """Set the bullseye color (the bull hit animation is animations.bull_burst)."""
+        # There is no LED inside the bull on this board, so the color is only tracked
+        self.track_segment_change(BULL, "bullseye", color)
+        self.bull_color = color
+        print(f"{self.get_fore_color(color)}Bullseye: {self.color_name(color)}{Style.RESET_ALL}")
     
     def print_board_state(self):
         """Print a representation of the current board state to the console."""
         print("\n--- Current Dartboard LED State ---")
         
         # Print bullseye
-        bullseye_color = self.color_name(self.board_state['bullseye'])
-        print(f"Bullseye: {self.get_fore_color(self.board_state['bullseye'])}{bullseye_color}{Style.RESET_ALL}")
+        bullseye_color = self.color_name(self.bull_color)
+        print(f"Bullseye: {self.get_fore_color(self.bull_color)}{bullseye_color}{Style.RESET_ALL}")
         
         # Print segments by dartboard number
         for dartboard_num in sorted(self.DARTBOARD_MAPPING.keys()):
-            strip_num = self.DARTBOARD_MAPPING[dartboard_num]
-            
-            # Get the colors for the different segments
-            double_idx = self.DBL_RING if strip_num % 2 == 0 else self.NUM_LED_PER_STRIP - self.DBL_RING - 1
-            triple_idx = self.TRPL_RING if strip_num % 2 == 0 else self.NUM_LED_PER_STRIP - self.TRPL_RING - 1
-            
-            double_color = self.board_state['strips'][strip_num][double_idx]
-            triple_color = self.board_state['strips'][strip_num][triple_idx]
-            
-            # For simplicity, just check one of the inner/outer single segments
-            inner_idx = self.TRPL_RING + 1 if strip_num % 2 == 0 else self.NUM_LED_PER_STRIP - self.TRPL_RING - 2
-            if 0 <= inner_idx < self.NUM_LED_PER_STRIP:
-                inner_color = self.board_state['strips'][strip_num][inner_idx]
-            else:
-                inner_color = (0, 0, 0)  # Default off
-                
-            outer_idx = self.DBL_RING + 1 if strip_num % 2 == 0 else self.NUM_LED_PER_STRIP - self.DBL_RING - 2
-            if 0 <= outer_idx < self.NUM_LED_PER_STRIP:
-                outer_color = self.board_state['strips'][strip_num][outer_idx]
-            else:
-                outer_color = (0, 0, 0)  # Default off
+            # Get the colors for the different segments (first pixel of each)
+            double_color, outer_color, triple_color, inner_color = [
+                self.segment_color(dartboard_num, segment_type)
+                for segment_type in ('double', 'outer_single', 'triple', 'inner_single')
+            ]
             
             print(f"Dartboard {dartboard_num:2d}: "
                   f"Double: {self.get_fore_color(double_color)}{self.color_name(double_color):<8}{Style.RESET_ALL} | "
@@ -1,31 +1,23 @@
 import sqlite3
 import os
 import pwd
-import grp
 
+# LEDs.db sits next to this module, whichever directory the caller runs from
+LEDS_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'LEDs.db')
 
-def initialize_leds_database():
-    """Initialize the LEDs database by creating necessary tables."""
-    print("Initializing LEDs database...")
-    
-    # Check if database file already exists and remove it if it exists
-    if os.path.exists('LEDs.db'):
-       os.remove('LEDs.db')
-       print("Deleted existing LEDs.db file")
-    
-    # Connect to the database (creates it if it doesn't exist)
-    conn = sqlite3.connect('LEDs.db')
-    cursor = conn.cursor()
+# Tables the LED controller watches, and the writes that count as a change.
+# Marking dart events processed is the controller's own write, so only inserts count there.
+VERSIONED_TABLES = {
+    'game_mode': ['INSERT', 'UPDATE', 'DELETE'],
+    'player_state': ['INSERT', 'UPDATE', 'DELETE'],
+    'cricket_state': ['INSERT', 'UPDATE', 'DELETE'],
+    'around_clock_state': ['INSERT', 'UPDATE', 'DELETE'],
+    'dart_events': ['INSERT'],
+}
 
-    db_path = "/home/grace/Desktop/YT_scoreboard/leds/LEDs.db"
 
-    # Change ownership to 'grace' if script is run as root
-    if os.geteuid() == 0:  # running as root
-        uid = pwd.getpwnam("grace").pw_uid
-        gid = grp.getgrnam("grace").gr_gid
-        os.chown(db_path, uid, gid)
-    
-    print("Creating tables...")
+def create_leds_schema(cursor):
+    """Create the LEDs.db tables, version counters and triggers."""
     # Create game_mode table
     cursor.execute('''
     CREATE TABLE game_mode (
@@ -84,17 +76,39 @@ def initialize_leds_database():
     )
     ''')
     
-    # Insert default game mode (neutral)
+    # Per-table version counters so the LED controller only re-reads what changed.
+    # Triggers bump them, so writers don't need to know about them.
     cursor.execute('''
-    INSERT INTO game_mode (id, mode, updated_at)
-    VALUES (1, 'neutral', CURRENT_TIMESTAMP)
+    CREATE TABLE table_versions (
+        table_name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+    )
     ''')
     
+    for table, operations in VERSIONED_TABLES.items():
+        cursor.execute('INSERT INTO table_versions (table_name, version) VALUES (?, 0)', (table,))
+        for operation in operations:
+            cursor.execute(f'''
+            CREATE TRIGGER {table}_{operation.lower()}_version AFTER {operation} ON {table}
+            BEGIN
+                UPDATE table_versions SET version = version + 1 WHERE table_name = '{table}';
+            END
+            ''')
+
+
+def insert_default_state(cursor, mode='neutral', player_count=4):
+    """Insert the state the LEDs start a game in."""
+    # Insert the game mode (neutral until a game starts)
+    cursor.execute('''
+    INSERT INTO game_mode (id, mode, updated_at)
+    VALUES (1, ?, CURRENT_TIMESTAMP)
+    ''', (mode,))
+    
     # Insert default player state
     cursor.execute('''
     INSERT INTO player_state (id, current_player, player_count)
-    VALUES (1, 1, 4)
-    ''')
+    VALUES (1, 1, ?)
+    ''', (player_count,))
     
     # Insert default cricket segments
     for segment in [15, 16, 17, 18, 19, 20, 25]:
@@ -103,16 +117,118 @@ def initialize_leds_database():
         VALUES (?, 0, CURRENT_TIMESTAMP)
         ''', (segment,))
     
-    # Initialize around_clock_state with defaults for 4 players
-    for player_id in range(1, 5):
+    # Initialize around_clock_state with defaults for every player
+    for player_id in range(1, player_count + 1):
         cursor.execute('''
         INSERT INTO around_clock_state (player_id, current_target, completed)
         VALUES (?, 1, 0)
         ''', (player_id,))
+
+
+# In-memory images of a freshly initialized LEDs.db, built once per
+# (mode, player count, page size) and copied over the live file with the backup API
+_templates = {}
+
+
+def leds_template(mode='neutral', player_count=4, page_size=4096):
+    """In-memory LEDs.db image for the start of a game in the given mode."""
+    key = (mode, player_count, page_size)
+    if key not in _templates:
+        template = sqlite3.connect(':memory:', check_same_thread=False)
+        # Backup can only write into a WAL database with the same page size
+        template.execute(f'PRAGMA page_size = {page_size}')
+        cursor = template.cursor()
+        create_leds_schema(cursor)
+        insert_default_state(cursor, mode, player_count)
+        template.commit()
+        _templates[key] = template
+    return _templates[key]
+
+
+def restore_leds_database(conn, mode='neutral', player_count=4):
+    """Replace the contents of an open LEDs.db with a fresh template in one step.
+    
+    Unlike deleting and recreating the file, the LED controller's and the
+    processors' open connections stay valid. The version counters carry on
+    from where they were so the LED controller reloads every table.
+    """
+    try:
+        versions = dict(conn.execute('SELECT table_name, version FROM table_versions'))
+    except sqlite3.OperationalError:
+        versions = {}  # New database, or one from before version counters
+    page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+    
+    leds_template(mode, player_count, page_size).backup(conn)
     
-    # Commit changes and close connection
+    conn.executemany(
+        'UPDATE table_versions SET version = ? WHERE table_name = ?',
+        [(versions.get(table, 0) + 1, table) for table in VERSIONED_TABLES]
+    )
     conn.commit()
-    conn.close()
+
+
+def leds_state_is_neutral(cursor):
+    """Whether LEDs.db already holds exactly the neutral state insert_default_state() writes."""
+    closed_columns = ' OR '.join([f'player{n}_closed' for n in range(1, 9)] + ['all_closed'])
+    cursor.execute(f'''
+    SELECT (SELECT mode FROM game_mode WHERE id = 1) = 'neutral'
+        AND EXISTS (SELECT 1 FROM player_state WHERE id = 1 AND current_player = 1 AND player_count = 4)
+        AND (SELECT COUNT(*) FROM cricket_state) = 7
+        AND NOT EXISTS (SELECT 1 FROM cricket_state WHERE {closed_columns})
+        AND (SELECT COUNT(*) FROM around_clock_state) = 4
+        AND NOT EXISTS (SELECT 1 FROM around_clock_state WHERE player_id > 4 OR current_target != 1 OR completed)
+        AND NOT EXISTS (SELECT 1 FROM dart_events WHERE processed = 0)
+    ''')
+    return bool(cursor.fetchone()[0])
+
+
+def reset_leds_state(conn):
+    """Put an open LEDs.db back into the neutral state in one transaction.
+    
+    The tables are rewritten in place, so the file and everyone's connections
+    stay as they are, and nothing is written when the state is already neutral.
+    Returns True if anything changed.
+    """
+    cursor = conn.cursor()
+    cursor.execute('BEGIN IMMEDIATE')
+    try:
+        if leds_state_is_neutral(cursor):
+            conn.rollback()
+            return False
+        
+        # The version triggers see these writes, so the LED controller reloads the tables
+        for table in ('game_mode', 'player_state', 'cricket_state', 'around_clock_state', 'dart_events'):
+            cursor.execute(f'DELETE FROM {table}')
+        insert_default_state(cursor)
+        conn.commit()
+        return True
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def initialize_leds_database(db_path=LEDS_DB_PATH, owner=None):
+    """Put LEDs.db into the neutral starting state, creating it if it doesn't exist.
+    
+    The database is restored in place, so a running LED controller or dart
+    processor keeps a valid connection. When run as root the file is handed to
+    owner (default: the LEDS_DB_OWNER environment variable) so the unprivileged
+    processes can still write it.
+    """
+    print("Initializing LEDs database...")
+    
+    conn = sqlite3.connect(db_path)
+    try:
+        restore_leds_database(conn)
+    finally:
+        conn.close()
+    
+    owner = owner or os.environ.get('LEDS_DB_OWNER')
+    if owner and os.geteuid() == 0:  # running as root
+        user = pwd.getpwnam(owner)
+        for path in (db_path, db_path + '-wal', db_path + '-shm'):
+            if os.path.exists(path):
+                os.chown(path, user.pw_uid, user.pw_gid)
     
     print("LEDs database initialization complete!")
 
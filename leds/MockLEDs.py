@@ -10,6 +10,10 @@ import time
 import colorama
 from colorama import Fore, Back, Style
 from datetime import datetime
+from pixel_map import BULL, build_segment_tables, fill_slice, ring_pixel
+
+EMPTY_PIXELS = ()
+EMPTY_SLICE = slice(0, 0)
 
 class MockLEDs:
     """A mock implementation of the LEDs class that prints status messages instead of controlling hardware."""
@@ -36,11 +40,23 @@ class MockLEDs:
             11: 15, 14: 16, 9: 17, 12: 18, 5: 19
         }
         
-        # Board state representation (to track LED colors)
-        self.board_state = {}
+        # Pixel indexes and framebuffer slices of every segment, computed once.
+        # The extra last pixel of the mock board is the bull.
+        self.SEGMENT_PIXELS, self.SEGMENT_SLICES = build_segment_tables(
+            self.DARTBOARD_MAPPING, self.NUM_LED_PER_STRIP, self.DBL_RING, self.TRPL_RING,
+            num_ring=self.NUM_RING, bull_pixels=[self.LED_COUNT - 1]
+        )
         
         # Blinking tracking
         self.blinking_segments = {}
+
+        # Mirrors the framebuffer of the real LEDs class: primitives write a flat RGB
+        # bytearray and flush() stands in for the single strip.show() per frame
+        self.frame = bytearray(self.LED_COUNT*3)
+        self.frame_dirty = True
+        self.frames_shown = 0
+        self.shown_frame = None
+        self.bull_color = (0, 0, 0)
         
         self.clear_board_state()
         
@@ -48,15 +64,10 @@ class MockLEDs:
         print(f"Dartboard has {self.NUM_STRIPS} strips with {self.NUM_LED_PER_STRIP} LEDs each")
         
     def clear_board_state(self):
-        """Initialize the board state tracking dictionary."""
-        self.board_state = {
-            'strips': {},
-            'bullseye': (0, 0, 0)  # Black/off
-        }
-        
-        # Initialize all strips to off
-        for strip in range(self.NUM_STRIPS):
-            self.board_state['strips'][strip] = [(0, 0, 0) for _ in range(self.NUM_LED_PER_STRIP)]
+        """Turn every pixel in the framebuffer off."""
+        self.frame[:] = bytes(len(self.frame))
+        self.bull_color = (0, 0, 0)  # Black/off
+        self.frame_dirty = True
 
     def getSegIndexes(self, strip_num):
         """Get the start and end indices for a segment."""
@@ -169,13 +180,58 @@ class MockLEDs:
         """Format a timestamp for display."""
         return datetime.fromtimestamp(timestamp).strftime('%H:%M:%S.%f')[:-3]
     
+    def ring_pixel(self, strip_num, ring):
+        """Get the strip pixel index of a ring on a strip (odd strips run inwards to outwards)."""
+        return ring_pixel(strip_num, ring, self.NUM_LED_PER_STRIP)
+
+    def segment_pixels(self, dartboard_num, segment_type):
+        """Get the precomputed pixel indexes of a segment (empty for unknown segments)."""
+        return self.SEGMENT_PIXELS.get((dartboard_num, segment_type), EMPTY_PIXELS)
+
+    def segment_slice(self, dartboard_num, segment_type):
+        """Get the precomputed framebuffer byte slice of a segment."""
+        return self.SEGMENT_SLICES.get((dartboard_num, segment_type), EMPTY_SLICE)
+
+    def pixel_color(self, pixel):
+        """Read back the RGB color of one pixel from the framebuffer."""
+        offset = pixel*3
+        return tuple(self.frame[offset:offset + 3])
+
+    def segment_color(self, dartboard_num, segment_type):
+        """Read back the color of a segment (its first pixel), or off if it has no pixels."""
+        pixels = self.segment_pixels(dartboard_num, segment_type)
+        return self.pixel_color(pixels[0]) if pixels else (0, 0, 0)
+
+    def fill_segment(self, dartboard_num, segment_type, color, label):
+        """Fill one segment in the framebuffer with a single slice assignment."""
+        if dartboard_num not in self.DARTBOARD_MAPPING:
+            print(f"{Fore.RED}ERROR: Invalid dartboard number: {dartboard_num}{Style.RESET_ALL}")
+            return
+
+        print(f"{self.get_fore_color(color)}{label}: Dartboard {dartboard_num} - {self.color_name(color)}{Style.RESET_ALL}")
+        
+        self.track_segment_change(dartboard_num, segment_type, color)
+        
+        fill_slice(self.frame, self.SEGMENT_SLICES[(dartboard_num, segment_type)], color)
+        self.frame_dirty = True
+
+    def flush(self, frame=None):
+        """Count a shown frame if any pixel changed since the last flush."""
+        if frame is None:
+            frame = self.frame
+
+        self.frame_dirty = False
+        if frame == self.shown_frame:
+            return False
+
+        self.shown_frame = bytearray(frame)
+        self.frames_shown += 1
+        return True
+
     def colorWipe(self, strip_num, color, wait_ms=50):
-        """Simulate color wipe effect by updating the board state."""
+        """Simulate color wipe effect by filling the strip in the framebuffer."""
         start_seg, end_seg = self.getSegIndexes(strip_num)
-        
-        # Update in board state
-        for i in range(self.NUM_LED_PER_STRIP):
-            self.board_state['strips'][strip_num][i] = color
+        fill_slice(self.frame, slice(start_seg*3, end_seg*3), color)
             
         dartboard_num = None
         for num, strip in self.DARTBOARD_MAPPING.items():
@@ -184,155 +240,61 @@ class MockLEDs:
                 break
                 
         print(f"{self.get_fore_color(color)}Color Wipe: Strip {strip_num} (Dartboard {dartboard_num}) - {self.color_name(color)}{Style.RESET_ALL}")
-        time.sleep(wait_ms/1000.0)
+        self.frame_dirty = True
 
     def clearAll(self, wait_ms=1): 
         """Turn off all LEDs in the mock."""
         print(f"{Fore.WHITE}Clearing all LEDs{Style.RESET_ALL}")
         self.clear_board_state()
-        time.sleep(wait_ms/1000.0)
 
     def numSeg(self, dartboard_num, color, wait_ms=5):
         """Light up number segment on outer circumference of dartboard."""
-        if dartboard_num not in self.DARTBOARD_MAPPING:
-            print(f"{Fore.RED}ERROR: Invalid dartboard number: {dartboard_num}{Style.RESET_ALL}")
-            return
-
-        strip_num = self.DARTBOARD_MAPPING[dartboard_num]
-        print(f"{self.get_fore_color(color)}Number Segment: Dartboard {dartboard_num} - {self.color_name(color)}{Style.RESET_ALL}")
-        
-        self.track_segment_change(dartboard_num, "number", color)
-        
-        # Update in board state
-        if strip_num % 2 == 0:  # even num strip
-            self.board_state['strips'][strip_num][self.NUM_RING] = color
-        else:  # odd num strip
-            self.board_state['strips'][strip_num][self.NUM_LED_PER_STRIP - 1] = color
-            
-        time.sleep(wait_ms/1000.0)
+        self.fill_segment(dartboard_num, 'number', color, "Number Segment")
         
     def tripleSeg(self, dartboard_num, color, wait_ms=5):
         """Light up triple segment."""
-        if dartboard_num not in self.DARTBOARD_MAPPING:
-            print(f"{Fore.RED}ERROR: Invalid dartboard number: {dartboard_num}{Style.RESET_ALL}")
-            return
-
-        strip_num = self.DARTBOARD_MAPPING[dartboard_num]
-        print(f"{self.get_fore_color(color)}Triple Segment: Dartboard {dartboard_num} - {self.color_name(color)}{Style.RESET_ALL}")
-        
-        self.track_segment_change(dartboard_num, "triple", color)
-        
-        # Update in board state
-        if strip_num % 2 == 0:  # even num strip
-            self.board_state['strips'][strip_num][self.TRPL_RING] = color
-        else:  # odd num strip
-            self.board_state['strips'][strip_num][self.NUM_LED_PER_STRIP - self.TRPL_RING - 1] = color
-            
-        time.sleep(wait_ms/1000.0)
+        self.fill_segment(dartboard_num, 'triple', color, "Triple Segment")
         
     def doubleSeg(self, dartboard_num, color, wait_ms=5):
         """Light up double segment."""
-        if dartboard_num not in self.DARTBOARD_MAPPING:
-            print(f"{Fore.RED}ERROR: Invalid dartboard number: {dartboard_num}{Style.RESET_ALL}")
-            return
-
-        strip_num = self.DARTBOARD_MAPPING[dartboard_num]
-        print(f"{self.get_fore_color(color)}Double Segment: Dartboard {dartboard_num} - {self.color_name(color)}{Style.RESET_ALL}")
-        
-        self.track_segment_change(dartboard_num, "double", color)
-        
-        # Update in board state
-        if strip_num % 2 == 0:  # even num strip
-            self.board_state['strips'][strip_num][self.DBL_RING] = color
-        else:  # odd num strip
-            self.board_state['strips'][strip_num][self.NUM_LED_PER_STRIP - self.DBL_RING - 1] = color
-            
-        time.sleep(wait_ms/1000.0)
+        self.fill_segment(dartboard_num, 'double', color, "Double Segment")
 
     def outerSingleSeg(self, dartboard_num, color, wait_ms=5):
         """Light up outer single segment (closest to circumference)."""
-        if dartboard_num not in self.DARTBOARD_MAPPING:
-            print(f"{Fore.RED}ERROR: Invalid dartboard number: {dartboard_num}{Style.RESET_ALL}")
-            return
-
-        strip_num = self.DARTBOARD_MAPPING[dartboard_num]
-        print(f"{self.get_fore_color(color)}Outer Single Segment: Dartboard {dartboard_num} - {self.color_name(color)}{Style.RESET_ALL}")
-        
-        self.track_segment_change(dartboard_num, "outer_single", color)
-        
-        # Update in board state - simplified just to show the concept
-        if strip_num % 2 == 0:  # even num strip
-            for i in range(self.DBL_RING + 1, self.TRPL_RING):
-                self.board_state['strips'][strip_num][i] = color
-        else:  # odd num strip
-            for i in range(self.NUM_LED_PER_STRIP - self.TRPL_RING, self.NUM_LED_PER_STRIP - self.DBL_RING - 1):
-                self.board_state['strips'][strip_num][i] = color
-                
-        time.sleep(wait_ms/1000.0)
+        self.fill_segment(dartboard_num, 'outer_single', color, "Outer Single Segment")
 
     def innerSingleSeg(self, dartboard_num, color, wait_ms=5):
         """Light up inner single segment (furthest from circumference)."""
-        if dartboard_num not in self.DARTBOARD_MAPPING:
-            print(f"{Fore.RED}ERROR: Invalid dartboard number: {dartboard_num}{Style.RESET_ALL}")
-            return
-
-        strip_num = self.DARTBOARD_MAPPING[dartboard_num]
-        print(f"{self.get_fore_color(color)}Inner Single Segment: Dartboard {dartboard_num} - {self.color_name(color)}{Style.RESET_ALL}")
-        
-        self.track_segment_change(dartboard_num, "inner_single", color)
-        
-        # Update in board state - simplified just to show the concept
-        if strip_num % 2 == 0:  # even num strip
-            for i in range(self.TRPL_RING + 1, self.NUM_LED_PER_STRIP):
-                self.board_state['strips'][strip_num][i] = color
-        else:  # odd num strip
-            for i in range(0, self.NUM_LED_PER_STRIP - self.TRPL_RING - 1):
-                self.board_state['strips'][strip_num][i] = color
-                
-        time.sleep(wait_ms/1000.0)
+        self.fill_segment(dartboard_num, 'inner_single', color, "Inner Single Segment")
     
-    def bullseye(self, color, wait_ms=5):
-        """Light up the bullseye (centre LED)."""
+    def bullseye(self, color=None, wait_ms=5):
+        """Light up the bullseye (centre LED), gold when no color is given."""
+        if color is None:
+            color = (250, 90, 0)
         print(f"{self.get_fore_color(color)}Bullseye: {self.color_name(color)}{Style.RESET_ALL}")
         
-        self.track_segment_change(25, "bullseye", color)
+        self.track_segment_change(BULL, "bullseye", color)
         
-        # Update in board state
-        self.board_state['bullseye'] = color
-        
-        time.sleep(wait_ms / 1000.0)
+        # The mock's extra last pixel is the bull
+        self.bull_color = color
+        fill_slice(self.frame, self.SEGMENT_SLICES[(BULL, 'bullseye')], color)
+        self.frame_dirty = True
 
     def print_board_state(self):
         """Print a representation of the current board state."""
         print("\n--- Current Dartboard LED State ---")
         
         # Print bullseye
-        bullseye_color = self.color_name(self.board_state['bullseye'])
-        print(f"Bullseye: {self.get_fore_color(self.board_state['bullseye'])}{bullseye_color}{Style.RESET_ALL}")
+        bullseye_color = self.color_name(self.bull_color)
+        print(f"Bullseye: {self.get_fore_color(self.bull_color)}{bullseye_color}{Style.RESET_ALL}")
         
         # Print segments by dartboard number
         for dartboard_num in sorted(self.DARTBOARD_MAPPING.keys()):
-            strip_num = self.DARTBOARD_MAPPING[dartboard_num]
-            
-            # Get the colors for the different segments
-            double_idx = self.DBL_RING if strip_num % 2 == 0 else self.NUM_LED_PER_STRIP - self.DBL_RING - 1
-            triple_idx = self.TRPL_RING if strip_num % 2 == 0 else self.NUM_LED_PER_STRIP - self.TRPL_RING - 1
-            
-            double_color = self.board_state['strips'][strip_num][double_idx]
-            triple_color = self.board_state['strips'][strip_num][triple_idx]
-            
-            # For simplicity, just check one of the inner/outer single segments
-            inner_idx = self.TRPL_RING + 1 if strip_num % 2 == 0 else self.NUM_LED_PER_STRIP - self.TRPL_RING - 2
-            if 0 <= inner_idx < self.NUM_LED_PER_STRIP:
-                inner_color = self.board_state['strips'][strip_num][inner_idx]
-            else:
-                inner_color = (0, 0, 0)  # Default off
-                
-            outer_idx = self.DBL_RING + 1 if strip_num % 2 == 0 else self.NUM_LED_PER_STRIP - self.DBL_RING - 2
-            if 0 <= outer_idx < self.NUM_LED_PER_STRIP:
-                outer_color = self.board_state['strips'][strip_num][outer_idx]
-            else:
-                outer_color = (0, 0, 0)  # Default off
+            # Get the colors for the different segments (first pixel of each)
+            double_color, outer_color, triple_color, inner_color = [
+                self.segment_color(dartboard_num, segment_type)
+                for segment_type in ('double', 'outer_single', 'triple', 'inner_single')
+            ]
             
             print(f"Dartboard {dartboard_num:2d}: "
                   f"Double: {self.get_fore_color(double_color)}{self.color_name(double_color):<8}{Style.RESET_ALL} | "
@@ -0,0 +1,200 @@
+"""
+animations.py
+
+Function:
+Declarative LED animations. Each animation is a small definition (duration, repeat
+count and tracks of keyframes over segment selectors) that is compiled ahead of time
+into a list of frames, each frame being the (framebuffer slice, fill bytes) operations
+of an overlay layer. Playing a compiled animation only swaps the layer's operation
+list on every step, so the cost per frame is constant no matter how the animation
+was defined.
+
+Definition format:
+    'duration'  seconds for one cycle (can be overridden when played)
+    'repeat'    number of cycles (can be overridden when played)
+    'tracks'    list of tracks, later tracks draw on top of earlier ones:
+        'select'     a selector (see resolve_selector)
+        'keyframes'  [(time, color), ...] with time from 0.0 to 1.0 of the track's
+                     window and color a PALETTE name, an RGB tuple or None (transparent)
+        'easing'     'step' (default), 'linear' or 'ease_in_out' between keyframes
+        'start'/'end'  window of the cycle the track is active in (default 0.0-1.0)
+        'sweep'      'build' lights the selector's groups one after another and keeps
+                     them lit, 'chase' lights only the current group
+        'reverse'    sweep through the groups in reverse order
+"""
+
+from pixel_map import build_ring_slices
+
+# Named colors animations can refer to; callers may override them when playing
+PALETTE = {
+    'off': (0, 0, 0),
+    'white': (255, 255, 255),
+    'hit': (0, 255, 0),     # Green
+    'miss': (255, 0, 0),    # Red
+    'gold': (250, 90, 0),
+}
+
+ANIMATIONS = {
+    # Segments blink on and off, showing the base pattern when off (hits, target flashes)
+    'blink': {
+        'duration': 0.5,
+        'repeat': 4,
+        'tracks': [
+            {'select': 'target', 'keyframes': [(0.0, 'hit'), (0.5, None)]},
+        ],
+    },
+    # Gold outward cumulative build on 4 spokes, then synchronized inward ring flashes
+    'bull_burst': {
+        'duration': 1.8,
+        'repeat': 1,
+        'tracks': [
+            {'select': 'spokes', 'sweep': 'build', 'end': 0.5, 'keyframes': [(0.0, 'gold')]},
+            {'select': 'board', 'start': 0.5, 'keyframes': [(0.0, 'off')]},
+            {'select': 'spokes', 'sweep': 'chase', 'reverse': True, 'start': 0.5,
+             'keyframes': [(0.0, 'gold')]},
+        ],
+    },
+    # Wipe a color across the target pixels one at a time
+    'color_wipe': {
+        'duration': 0.9,
+        'repeat': 1,
+        'tracks': [
+            {'select': 'target_pixels', 'sweep': 'build', 'keyframes': [(0.0, 'white')]},
+        ],
+    },
+}
+
+SPOKE_STRIPS = [0, 5, 10, 15]  # 4 strips equally spaced out of 20
+
+
+def ease(easing, x):
+    """Map linear progress (0-1) between two keyframes through an easing curve."""
+    if easing == 'linear':
+        return x
+    if easing == 'ease_in_out':
+        return x * x * (3 - 2 * x)
+    return 0.0  # 'step': hold the previous keyframe
+
+
+def keyframe_color(keyframes, t, easing, colors):
+    """Color of a track at time t (0-1 of its window), or None when transparent."""
+    previous_time, previous = keyframes[0][0], keyframes[0][1]
+    for time_point, color in keyframes:
+        if time_point > t:
+            # Only blend between two real colors
+            start, end = colors.get(previous, previous), colors.get(color, color)
+            if start is None or end is None or time_point == previous_time:
+                break
+            x = ease(easing, (t - previous_time) / (time_point - previous_time))
+            return tuple(int(a + (b - a) * x) for a, b in zip(start, end))
+        previous_time, previous = time_point, color
+    return colors.get(previous, previous)
+
+
+def resolve_selector(selector, led_control, targets):
+    """Turn a selector into an ordered list of groups, each a list of framebuffer slices.
+
+    Selectors:
+        'board'          the whole board
+        'spokes'         per ring, outermost first, the pixels of the 4 spoke strips
+        'target'         the segment slices passed in when playing
+        'target_pixels'  the same, one group per pixel (for sweeps)
+        'type:number'    e.g. 'triple:20', 'triple:*' or '*:20'
+    """
+    if selector == 'board':
+        return [[slice(0, len(led_control.frame))]]
+    if selector == 'spokes':
+        return build_ring_slices(SPOKE_STRIPS, led_control.NUM_LED_PER_STRIP)
+    if selector == 'target':
+        return [list(targets)]
+    if selector == 'target_pixels':
+        return [[slice(offset, offset + 3)] for target in targets
+                for offset in range(target.start, target.stop, 3)]
+
+    segment_type, _, number = selector.partition(':')
+    return [[
+        byte_slice for (table_number, table_type), byte_slice in sorted(led_control.SEGMENT_SLICES.items())
+        if segment_type in ('*', table_type) and number in ('*', str(table_number))
+    ]]
+
+
+def compile_animation(definition, led_control, fps, targets=(), colors=None, duration=None, repeat=None):
+    """Compile a definition into [(layer operations, seconds to hold them), ...]."""
+    colors = dict(PALETTE, **(colors or {}))
+    duration = definition['duration'] if duration is None else duration
+    repeat = definition.get('repeat', 1) if repeat is None else repeat
+
+    tracks = []
+    for track in definition['tracks']:
+        groups = resolve_selector(track['select'], led_control, targets)
+        if track.get('reverse'):
+            groups = groups[::-1]
+        tracks.append((track, groups))
+
+    cycle_frames = max(1, int(round(duration * fps)))
+    cycle = []
+    for frame_index in range(cycle_frames):
+        t = frame_index / cycle_frames
+        ops = []
+        for track, groups in tracks:
+            start, end = track.get('start', 0.0), track.get('end', 1.0)
+            if not start <= t < end or not groups:
+                continue
+            local = (t - start) / (end - start)
+
+            color = keyframe_color(track['keyframes'], local, track.get('easing', 'step'), colors)
+            if color is None:
+                continue
+
+            # Sweeps split the window into one slot per group
+            if track.get('sweep'):
+                slot = min(len(groups) - 1, int(local * len(groups)))
+                selected = groups[:slot + 1] if track['sweep'] == 'build' else [groups[slot]]
+            else:
+                selected = groups
+
+            for group in selected:
+                for byte_slice in group:
+                    ops.append((byte_slice, bytes(color) * ((byte_slice.stop - byte_slice.start) // 3)))
+        cycle.append(ops)
+
+    # Merge runs of identical frames so playback only wakes up when the picture changes
+    frame_time = duration / cycle_frames
+    compiled = []
+    for ops in cycle * max(1, repeat):
+        if compiled and compiled[-1][0] == ops:
+            compiled[-1][1] += frame_time
+        else:
+            compiled.append([ops, frame_time])
+    return [(ops, hold) for ops, hold in compiled]
+
+
+def play(layer, compiled):
+    """Generator for compositor.Effect that steps through a compiled animation."""
+    for ops, hold in compiled:
+        layer.ops = ops
+        yield hold
+
+
+class AnimationLibrary:
+    """Compiles animations for one LED backend and caches the results."""
+
+    def __init__(self, led_control, fps=60, animations=None):
+        self.led_control = led_control
+        self.fps = fps
+        self.animations = ANIMATIONS if animations is None else animations
+        self.cache = {}
+
+    def compile(self, name, targets=(), colors=None, duration=None, repeat=None):
+        """Compiled frames of a named animation, reused for identical arguments."""
+        targets = tuple(targets)
+        cache_key = (
+            name, tuple((t.start, t.stop) for t in targets),
+            tuple(sorted((colors or {}).items())), duration, repeat,
+        )
+        if cache_key not in self.cache:
+            self.cache[cache_key] = compile_animation(
+                self.animations[name], self.led_control, self.fps,
+                targets, colors, duration, repeat
+            )
+        return self.cache[cache_key]
@@ -0,0 +1,148 @@
+"""
+compositor.py
+
+Function:
+Fixed-rate frame compositor for the dartboard LEDs. Every frame is built from the
+base layer (the mode pattern the setup_* methods draw into the LEDs framebuffer),
+the active overlay effects in the order they were added, and a global brightness
+stage. The result is pushed to the strip with a single flush.
+
+Effects are generators (see animations.play) advanced by the render tick against the
+clock, so blink timing no longer depends on how long a database poll took and
+nothing on the control path ever sleeps.
+"""
+
+import time
+
+
+class Layer:
+    """Overlay pixels of one effect, kept as precomputed (framebuffer slice, fill bytes) operations."""
+
+    def __init__(self):
+        self.ops = []
+
+    def fill(self, slices, color):
+        """Paint framebuffer slices with a color, on top of what the layer already holds."""
+        for byte_slice in slices:
+            self.ops.append((byte_slice, bytes(color) * ((byte_slice.stop - byte_slice.start) // 3)))
+
+    def clear(self):
+        """Make the whole layer transparent again."""
+        self.ops = []
+
+    def draw(self, frame):
+        """Apply the layer to a frame."""
+        for byte_slice, fill in self.ops:
+            frame[byte_slice] = fill
+
+
+class Effect:
+    """Overlay driven by a generator that draws into its layer and yields how long to hold it.
+
+    The render tick resumes the generator whenever its wake time has passed, so an
+    animation never blocks the controller and can be cancelled between any two steps.
+    Wake times are accumulated rather than measured, so a late tick doesn't stretch
+    the animation: overdue steps are caught up within the same frame.
+    """
+
+    def __init__(self, key, animation, *args, start_time=None):
+        self.key = key
+        self.layer = Layer()
+        self.steps = animation(self.layer, *args)
+        self.wake_time = time.time() if start_time is None else start_time
+        self.finished = False
+
+    def advance(self, now):
+        """Run every step that is due; returns False once the animation has finished."""
+        while not self.finished and now >= self.wake_time:
+            try:
+                self.wake_time += next(self.steps)
+            except StopIteration:
+                self.finished = True
+        return not self.finished
+
+    def cancel(self):
+        """Stop the animation where it is."""
+        self.steps.close()
+        self.finished = True
+
+
+class Compositor:
+    """Composite the base layer, overlay effects and brightness into one frame per tick."""
+
+    def __init__(self, led_control, fps=60, brightness=1.0, clock=time.time):
+        self.led_control = led_control
+        self.clock = clock
+        self.fps = fps
+        self.frame_interval = 1.0 / fps
+        self.brightness = brightness
+        self.effects = []  # Overlay layers, drawn in order (last one on top)
+        self.effects_changed = False  # An effect was added or removed since the last frame
+        self.rendered_brightness = None  # Brightness of the last frame pushed
+        self.brightness_table = None  # Byte translation table for the current brightness
+
+    def add_effect(self, effect):
+        """Add an overlay on top of the others, superseding any effect with the same key."""
+        self.remove_effect(effect.key)
+        self.effects.append(effect)
+        self.effects_changed = True
+        return effect
+
+    def remove_effect(self, key):
+        """Cancel and remove the overlay with the given key, if any."""
+        for effect in self.effects:
+            if effect.key == key:
+                effect.cancel()
+                self.effects_changed = True
+        self.effects = [effect for effect in self.effects if effect.key != key]
+
+    def clear_effects(self):
+        """Cancel every overlay (e.g. when the game mode changes)."""
+        for effect in self.effects:
+            effect.cancel()
+        self.effects_changed = bool(self.effects)
+        self.effects = []
+
+    def has_effects(self):
+        """Check whether any overlay is still running."""
+        return bool(self.effects)
+
+    def set_brightness(self, brightness):
+        """Set the global brightness, from 0.0 (off) to 1.0 (full)."""
+        self.brightness = min(1.0, max(0.0, brightness))
+
+    def render(self, now=None):
+        """Composite and push one frame; returns True if the strip was updated."""
+        if now is None:
+            now = self.clock()
+
+        # Layers only change when an effect step is due, so between steps the strip
+        # already shows the right frame unless the base layer was redrawn
+        steps_due = any(effect.wake_time <= now for effect in self.effects)
+        if (not steps_due and not self.effects_changed and not self.led_control.frame_dirty
+                and self.brightness == self.rendered_brightness):
+            return False
+
+        # Advance the effects; finished ones drop out
+        self.effects = [effect for effect in self.effects if effect.advance(now)]
+        self.effects_changed = False
+
+        # Overlays draw on top of the base layer
+        frame = bytearray(self.led_control.frame)
+        for effect in self.effects:
+            effect.layer.draw(frame)
+
+        # Global brightness stage
+        if self.brightness < 1.0:
+            if self.brightness != self.rendered_brightness or self.brightness_table is None:
+                self.brightness_table = bytes(int(value * self.brightness) for value in range(256))
+            frame = frame.translate(self.brightness_table)
+        self.rendered_brightness = self.brightness
+
+        return self.led_control.flush(frame)
+
+    def wait_for_next_frame(self, frame_start):
+        """Sleep for whatever is left of the current frame period."""
+        remaining = self.frame_interval - (self.clock() - frame_start)
+        if remaining > 0:
+            time.sleep(remaining)
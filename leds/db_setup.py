@@ -0,0 +1,242 @@
+"""
+db_setup.py
+
+Function:
+Shared SQLite connection setup for the databases the scoreboard processes share:
+game.db (processor writes, web app reads), cv_data.db (CV writer writes,
+processor and web app read), LEDs.db (processors and web app write, LED
+controller reads) and moving_target.db.
+
+Every connection gets the same tuned settings:
+    journal_mode = WAL   readers never block the writer and the writer never
+                         blocks readers, so a throw doesn't stall behind a page load
+    synchronous = NORMAL safe with WAL; a power cut can lose the last commits but
+                         never corrupts the database, and commits skip an fsync
+    busy_timeout         writers queue behind each other instead of failing with
+                         "database is locked"
+    cache_size           page cache per connection
+
+WAL is stored in the database file, the other settings are per connection.
+
+AttachedDatabases keeps one long-lived connection with the auxiliary databases
+ATTACHed, so a dart processor can commit everything a throw changes in game.db,
+LEDs.db and moving_target.db as one transaction.
+
+Optional RAM-backed live state: with LIVE_DB_DIR set (e.g. a tmpfs directory
+such as /dev/shm/scoreboard), connect() opens game.db there instead, so darts
+never touch the SD card. The game.db next to the code becomes a durable
+snapshot that live_state.py restores from at startup and writes back at turn
+boundaries and on shutdown.
+
+Lives next to led_events.py so the web app, the processors (from leds import
+db_setup) and the LED controller (import db_setup) share one copy.
+"""
+
+import os
+import sqlite3
+from contextlib import contextmanager
+
+BUSY_TIMEOUT_MS = int(os.environ.get('DB_BUSY_TIMEOUT_MS', '5000'))
+SYNCHRONOUS = 'NORMAL'
+CACHE_SIZE_KIB = 2048
+
+# Directory holding the live copies of LIVE_DATABASES, or None to use the files in place
+LIVE_DB_DIR = os.environ.get('LIVE_DB_DIR') or None
+LIVE_DATABASES = ('game.db',)
+
+# PRAGMA synchronous reads back as a number
+SYNCHRONOUS_LEVELS = {0: 'OFF', 1: 'NORMAL', 2: 'FULL', 3: 'EXTRA'}
+
+
+def configure_connection(conn):
+    """Apply the shared settings to an open connection."""
+    conn.execute(f'PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}')
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute(f'PRAGMA synchronous = {SYNCHRONOUS}')
+    conn.execute(f'PRAGMA cache_size = -{CACHE_SIZE_KIB}')
+    return conn
+
+
+def live_path(db_path):
+    """Path a database is really opened at: its RAM copy in live mode, otherwise db_path."""
+    name = os.path.basename(db_path)
+    if LIVE_DB_DIR and name in LIVE_DATABASES:
+        return os.path.join(LIVE_DB_DIR, name)
+    return db_path
+
+
+def connect(db_path, row_factory=None, **kwargs):
+    """Open a database with the shared settings (same arguments as sqlite3.connect)."""
+    conn = sqlite3.connect(live_path(db_path), timeout=BUSY_TIMEOUT_MS / 1000, **kwargs)
+    if row_factory is not None:
+        conn.row_factory = row_factory
+    return configure_connection(conn)
+
+
+def remove_database(db_path):
+    """Delete a database file together with its WAL and shared-memory files."""
+    # A stale -wal left next to a recreated database would be replayed into it
+    for path in (db_path, db_path + '-wal', db_path + '-shm'):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def verify_database(db_path):
+    """Check that a database runs with the shared settings; returns a list of problems."""
+    conn = connect(db_path)
+    try:
+        journal_mode = conn.execute('PRAGMA journal_mode').fetchone()[0]
+        synchronous = SYNCHRONOUS_LEVELS.get(conn.execute('PRAGMA synchronous').fetchone()[0])
+        busy_timeout = conn.execute('PRAGMA busy_timeout').fetchone()[0]
+        cache_size = conn.execute('PRAGMA cache_size').fetchone()[0]
+    finally:
+        conn.close()
+
+    problems = []
+    if journal_mode.lower() != 'wal':
+        problems.append(f"journal_mode is {journal_mode}, expected wal")
+    if synchronous != SYNCHRONOUS:
+        problems.append(f"synchronous is {synchronous}, expected {SYNCHRONOUS}")
+    if busy_timeout != BUSY_TIMEOUT_MS:
+        problems.append(f"busy_timeout is {busy_timeout}, expected {BUSY_TIMEOUT_MS}")
+    if cache_size != -CACHE_SIZE_KIB:
+        problems.append(f"cache_size is {cache_size}, expected {-CACHE_SIZE_KIB}")
+    return problems
+
+
+def verify_databases(db_paths):
+    """Verify several databases at startup and print the outcome for each."""
+    all_ok = True
+    for db_path in db_paths:
+        if not os.path.exists(live_path(db_path)):
+            print(f"Database {db_path}: not created yet")
+            continue
+        try:
+            problems = verify_database(db_path)
+        except sqlite3.Error as e:
+            problems = [str(e)]
+        if problems:
+            all_ok = False
+            print(f"Database {db_path}: {'; '.join(problems)}")
+        else:
+            where = f" (live copy in {LIVE_DB_DIR})" if live_path(db_path) != db_path else ""
+            print(f"Database {db_path}: WAL, synchronous={SYNCHRONOUS}, busy_timeout={BUSY_TIMEOUT_MS}ms{where}")
+    return all_ok
+
+
+class DeferredCommitConnection:
+    """Connection handed out inside a transaction: commit and close are left to the transaction."""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class AttachedDatabases:
+    """One long-lived connection to a main database with others ATTACHed.
+
+    Table names are unique across the scoreboard databases, so queries keep using
+    unqualified names. Outside transaction() each helper commits on its own as
+    before; inside it their commits are deferred, and every database is committed
+    together when the transaction ends.
+
+    Note that in WAL mode SQLite only guarantees atomicity per database file if
+    the machine loses power in the middle of the commit.
+    """
+
+    def __init__(self, main_path, attached, row_factory=sqlite3.Row):
+        self.main_path = main_path
+        self.attached = attached  # Schema name -> database path
+        self.row_factory = row_factory
+        self.conn = None
+        self.inodes = None
+        self.depth = 0  # Nesting level of transaction()
+        self.after_commit_callbacks = []
+
+    def current_inodes(self):
+        """Inode of every database file (None if missing), to notice recreated databases."""
+        inodes = []
+        for path in [self.main_path] + list(self.attached.values()):
+            try:
+                inodes.append(os.stat(live_path(path)).st_ino)
+            except FileNotFoundError:
+                inodes.append(None)
+        return inodes
+
+    def open(self):
+        """Open the connection, reopening it if a database file was deleted and recreated."""
+        if self.depth == 0:
+            inodes = self.current_inodes()
+            if self.conn is not None and inodes != self.inodes:
+                self.close()
+            self.inodes = inodes
+
+        if self.conn is None:
+            conn = connect(self.main_path, row_factory=self.row_factory)
+            for schema, path in self.attached.items():
+                conn.execute(f'ATTACH DATABASE ? AS {schema}', (live_path(path),))
+                conn.execute(f'PRAGMA {schema}.journal_mode = WAL')
+                conn.execute(f'PRAGMA {schema}.synchronous = {SYNCHRONOUS}')
+                conn.execute(f'PRAGMA {schema}.cache_size = -{CACHE_SIZE_KIB}')
+            self.conn = conn
+        return self.conn
+
+    def close(self):
+        """Close the connection (it is reopened on next use)."""
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    @contextmanager
+    def connection(self):
+        """Use the shared connection, the way the per-database connection helpers used to."""
+        conn = self.open()
+        if self.depth:
+            yield DeferredCommitConnection(conn)
+            return
+
+        try:
+            yield conn
+        finally:
+            # Closing used to discard anything a helper didn't commit
+            if conn.in_transaction:
+                conn.rollback()
+
+    @contextmanager
+    def transaction(self):
+        """Group every write made inside the block into a single commit."""
+        conn = self.open()
+        if self.depth == 0:
+            # Take the write locks up front so reads and writes see one snapshot
+            conn.execute('BEGIN IMMEDIATE')
+        self.depth += 1
+        try:
+            yield conn
+        except BaseException:
+            self.depth -= 1
+            if self.depth == 0:
+                conn.rollback()
+                self.after_commit_callbacks = []
+            raise
+
+        self.depth -= 1
+        if self.depth == 0:
+            conn.commit()
+            callbacks, self.after_commit_callbacks = self.after_commit_callbacks, []
+            for callback in callbacks:
+                callback()
+
+    def after_commit(self, callback):
+        """Run a callback once the current transaction has committed (right away outside one)."""
+        if self.depth:
+            self.after_commit_callbacks.append(callback)
+        else:
+            callback()
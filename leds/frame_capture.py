@@ -0,0 +1,262 @@
+"""
+frame_capture.py
+
+Function:
+Run the LED controller headless against a scripted scenario on a simulated clock,
+record every frame it pushes (HeadlessLEDs), and dump or compare the recordings
+against golden files. Nothing sleeps, so a minute of play renders in well under
+a second.
+
+A scenario is a JSON file:
+    {
+        "fps": 60,
+        "duration": 4.0,
+        "poll_interval": 0.5,
+        "blink_duration": 2.0,
+        "blink_count": 4,
+        "steps": [
+            {"t": 0.0, "event": {"type": "mode", "mode": "classic"}},
+            {"t": 0.5, "event": {"type": "dart", "score": 20, "multiplier": 3, "segment_type": "triple"}},
+            {"t": 1.0, "sql": "UPDATE player_state SET current_player = ?", "params": [2]}
+        ]
+    }
+"event" steps go through the same handler as the LED event channel, "sql" steps are
+run against the scenario's own LEDs.db and picked up by the next poll.
+
+Usage:
+    python frame_capture.py record scenario.json golden.frames.gz
+    python frame_capture.py compare scenario.json golden.frames.gz
+    python frame_capture.py dump golden.frames.gz
+    python frame_capture.py bench scenario.json
+"""
+
+import os
+import io
+import sys
+import gzip
+import json
+import time
+import base64
+import sqlite3
+import argparse
+import tempfile
+import contextlib
+from HeadlessLEDs import HeadlessLEDs, FrameRecording
+from LEDs_db_init import create_leds_schema, insert_default_state
+from moving_target_db_init import create_moving_target_schema
+
+
+class SimulatedClock:
+    """Clock that only moves when told to."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def load_controller_module():
+    """Import LED_controller with HeadlessLEDs in place of the hardware class."""
+    # Same module swap as mock_test.py, so rpi_ws281x is never imported
+    if 'LEDs' not in sys.modules:
+        class HeadlessModule:
+            LEDs = HeadlessLEDs
+        sys.modules['LEDs'] = HeadlessModule
+
+    import LED_controller
+    LED_controller.LEDs = HeadlessLEDs
+    return LED_controller
+
+
+def create_scenario_databases():
+    """Fresh LEDs.db and moving_target.db in the working directory.
+
+    The controller's own reset also hands the files to the Pi's user when run
+    as root, which fails anywhere else (CI containers often run as root).
+    """
+    conn = sqlite3.connect('LEDs.db')
+    create_leds_schema(conn.cursor())
+    insert_default_state(conn.cursor())
+    conn.commit()
+    conn.close()
+
+    conn = sqlite3.connect('moving_target.db')
+    create_moving_target_schema(conn.cursor())
+    conn.commit()
+    conn.close()
+
+
+def run_scenario(scenario, quiet=True):
+    """Run a scenario and return the recording of every frame pushed to the strip."""
+    LED_controller = load_controller_module()
+    fps = scenario.get('fps', 60)
+    steps = sorted(scenario.get('steps', []), key=lambda step: step['t'])
+    clock = SimulatedClock()
+
+    output = io.StringIO() if quiet else sys.stdout
+    previous_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as work_dir, contextlib.redirect_stdout(output):
+        # The controller opens its databases in the working directory
+        os.chdir(work_dir)
+        try:
+            create_scenario_databases()
+            controller = LED_controller.LEDController(
+                poll_interval=scenario.get('poll_interval', 0.5),
+                blink_duration=scenario.get('blink_duration', 2.0),
+                blink_count=scenario.get('blink_count', 4),
+                fps=fps,
+                event_socket=None,
+                preview_socket=None,
+                clock=clock,
+                reset_databases=False,
+            )
+            controller.led_control.clock = clock
+            conn = sqlite3.connect(controller.db_path)
+
+            controller.start()
+            frame_count = int(round(scenario.get('duration', 1.0)*fps))
+            next_step = 0
+            for frame_index in range(frame_count + 1):
+                clock.now = frame_index / fps
+
+                # Apply every scripted step that is due by this frame
+                while next_step < len(steps) and steps[next_step]['t'] <= clock.now:
+                    step = steps[next_step]
+                    if 'event' in step:
+                        controller.handle_event(step['event'])
+                    if 'sql' in step:
+                        conn.execute(step['sql'], step.get('params', []))
+                        conn.commit()
+                    next_step += 1
+
+                controller.step(clock.now)
+
+            conn.close()
+            if controller.version_conn is not None:
+                controller.version_conn.close()
+        finally:
+            os.chdir(previous_dir)
+
+    return controller.led_control.recording
+
+
+def save_recording(recording, path):
+    """Write a recording as gzipped JSON lines: a header, then one line per frame."""
+    with gzip.open(path, 'wt') as f:
+        f.write(json.dumps({'frame_size': recording.frame_size, 'frames': len(recording)}) + '\n')
+        for timestamp, frame in recording.frames():
+            f.write(json.dumps({'t': round(timestamp, 6), 'frame': base64.b64encode(frame).decode('ascii')}) + '\n')
+
+
+def load_recording(path):
+    """Read a recording written by save_recording."""
+    with gzip.open(path, 'rt') as f:
+        header = json.loads(f.readline())
+        recording = FrameRecording(header['frame_size'])
+        for line in f:
+            entry = json.loads(line)
+            recording.append(entry['t'], base64.b64decode(entry['frame']))
+    return recording
+
+
+def changed_pixels(frame, previous):
+    """Pixel indexes that differ between two frames."""
+    return [
+        offset // 3 for offset in range(0, len(frame), 3)
+        if previous is None or frame[offset:offset + 3] != previous[offset:offset + 3]
+    ]
+
+
+def compare_recordings(actual, golden, time_tolerance=1e-3):
+    """Compare two recordings; returns a list of human readable differences (empty if equal)."""
+    if actual.frame_size != golden.frame_size:
+        return [f"Frame size {actual.frame_size} != golden {golden.frame_size}"]
+
+    differences = []
+    if len(actual) != len(golden):
+        differences.append(f"{len(actual)} frames recorded, golden has {len(golden)}")
+
+    for index in range(min(len(actual), len(golden))):
+        actual_time, golden_time = actual.timestamps[index], golden.timestamps[index]
+        if abs(actual_time - golden_time) > time_tolerance:
+            differences.append(f"Frame {index}: at {actual_time:.4f}s, golden at {golden_time:.4f}s")
+            break
+
+        actual_frame, golden_frame = actual.frame(index), golden.frame(index)
+        if actual_frame != golden_frame:
+            pixels = changed_pixels(actual_frame, golden_frame)
+            differences.append(
+                f"Frame {index} ({actual_time:.4f}s): {len(pixels)} pixels differ, first {pixels[:10]}"
+            )
+            break
+
+    return differences
+
+
+def dump_recording(recording):
+    """Print one line per frame: time, lit pixels and pixels changed since the previous frame."""
+    previous = None
+    for index, (timestamp, frame) in enumerate(recording.frames()):
+        lit = sum(1 for offset in range(0, len(frame), 3) if frame[offset:offset + 3] != b'\x00\x00\x00')
+        print(f"{index:5d}  {timestamp:8.4f}s  lit={lit:4d}  changed={len(changed_pixels(frame, previous)):4d}")
+        previous = frame
+
+
+def load_scenario(path):
+    """Read a scenario JSON file."""
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record, compare and benchmark headless LED controller runs")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    record = commands.add_parser('record', help="Run a scenario and save its frames as a golden recording")
+    record.add_argument('scenario')
+    record.add_argument('output')
+
+    compare = commands.add_parser('compare', help="Run a scenario and compare its frames against a golden recording")
+    compare.add_argument('scenario')
+    compare.add_argument('golden')
+
+    dump = commands.add_parser('dump', help="Print a per-frame summary of a recording")
+    dump.add_argument('recording')
+
+    bench = commands.add_parser('bench', help="Time a scenario run")
+    bench.add_argument('scenario')
+    bench.add_argument('--runs', type=int, default=5)
+
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        recording = run_scenario(load_scenario(args.scenario))
+        save_recording(recording, args.output)
+        print(f"Recorded {len(recording)} frames to {args.output}")
+
+    elif args.command == 'compare':
+        differences = compare_recordings(run_scenario(load_scenario(args.scenario)), load_recording(args.golden))
+        for difference in differences:
+            print(difference)
+        print("MATCH" if not differences else "MISMATCH")
+        sys.exit(1 if differences else 0)
+
+    elif args.command == 'dump':
+        dump_recording(load_recording(args.recording))
+
+    elif args.command == 'bench':
+        scenario = load_scenario(args.scenario)
+        frames = int(round(scenario.get('duration', 1.0)*scenario.get('fps', 60))) + 1
+        timings = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            recording = run_scenario(scenario)
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        print(f"{frames} ticks, {len(recording)} frames pushed: best {best*1000:.1f} ms "
+              f"({frames/best:.0f} ticks/s)")
+
+
+if __name__ == "__main__":
+    main()
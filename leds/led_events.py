@@ -0,0 +1,89 @@
+"""
+led_events.py
+
+Function:
+Local event channel from the web app and dart processors to the LED controller,
+over a Unix datagram socket. Each event is one small JSON datagram, so the
+controller sees a dart hit, mode change, player change or cricket/around-the-clock
+state change within one LED frame instead of on its next database poll.
+
+LEDs.db stays the source of truth for state (the controller re-reads it on
+startup and keeps polling it as a fallback). Dart events are only written to the
+dart_events table when the controller is not listening, or as an audit log when
+LED_EVENT_AUDIT is set.
+
+Event types and fields:
+    dart          score, multiplier, segment_type
+    mode          mode
+    player        current_player, player_count (either may be omitted)
+    cricket       segments: {segment: {'player_closed': {player: bool}, 'all_closed': bool}}
+    around_clock  player_id, current_target
+"""
+
+import os
+import json
+import socket
+
+SOCKET_PATH = os.environ.get('LED_EVENT_SOCKET', '/tmp/dartboard_leds.sock')
+
+# Keep a dart_events row for every dart even when it was delivered over the socket
+AUDIT_LOG = os.environ.get('LED_EVENT_AUDIT', '') not in ('', '0')
+
+_sender = None
+
+
+def publish(event_type, **fields):
+    """Send an event to the LED controller; returns False if it could not be delivered."""
+    global _sender
+
+    payload = json.dumps(dict(fields, type=event_type)).encode('utf-8')
+    try:
+        if _sender is None:
+            _sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            # Never let a busy controller block scoring
+            _sender.setblocking(False)
+        _sender.sendto(payload, SOCKET_PATH)
+        return True
+    except (FileNotFoundError, ConnectionRefusedError, BlockingIOError):
+        # Controller not running (or its queue is full)
+        return False
+    except OSError as e:
+        print(f"Error publishing LED event '{event_type}': {e}")
+        return False
+
+
+class EventListener:
+    """Receiving end of the channel, owned by the LED controller."""
+
+    def __init__(self, path=SOCKET_PATH):
+        self.path = path
+
+        # Remove a socket file left behind by a previous run
+        if os.path.exists(path):
+            os.remove(path)
+
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.bind(path)
+        self.sock.setblocking(False)
+
+        # The controller may run as root for the LED driver; let the web app and processors send
+        os.chmod(path, 0o666)
+
+    def receive(self):
+        """Drain every pending event without blocking."""
+        events = []
+        while True:
+            try:
+                payload = self.sock.recv(65536)
+            except BlockingIOError:
+                return events
+            try:
+                events.append(json.loads(payload))
+            except ValueError:
+                print(f"Ignoring malformed LED event: {payload[:80]!r}")
+
+    def close(self):
+        """Close the socket and remove its file."""
+        self.sock.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
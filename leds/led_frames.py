@@ -0,0 +1,146 @@
+"""
+led_frames.py
+
+Function:
+Local channel that carries what the LED strip is showing from the LED controller
+to the web app's live preview (/leds/preview). The controller sends the frame it
+last pushed to the strip as one datagram (board geometry header + raw RGB bytes),
+at most a few times a second and only when it changed. The web app binds the
+socket the first time someone opens the preview, so nothing is sent anywhere until
+then, and sends the browser only run-length encoded pixel changes.
+
+Works the same for LEDs, MockLEDs and HeadlessLEDs, since all of them keep the
+shown frame in shown_frame.
+"""
+
+import os
+import json
+import socket
+import threading
+
+PREVIEW_SOCKET = os.environ.get('LED_PREVIEW_SOCKET', '/tmp/dartboard_led_preview.sock')
+
+
+def board_geometry(led_control):
+    """Describe the strip layout of an LED backend so the preview can place its pixels."""
+    return {
+        'led_count': led_control.LED_COUNT,
+        'leds_per_strip': led_control.NUM_LED_PER_STRIP,
+        'mapping': {str(number): strip for number, strip in led_control.DARTBOARD_MAPPING.items()},
+        'dbl_ring': led_control.DBL_RING,
+        'trpl_ring': led_control.TRPL_RING,
+        'num_ring': getattr(led_control, 'NUM_RING', None),  # Only the mock has a number ring
+        # Pixels past the last strip are the bull (the mock has one, the real board none)
+        'bull_pixels': list(range(led_control.NUM_STRIPS*led_control.NUM_LED_PER_STRIP, led_control.LED_COUNT)),
+    }
+
+
+class FramePublisher:
+    """Controller side: send the shown frame to the preview when it changed."""
+
+    def __init__(self, led_control, path=PREVIEW_SOCKET, fps=20, keyframe_interval=1.0):
+        self.led_control = led_control
+        self.path = path
+        self.frame_interval = 1.0 / fps
+        self.keyframe_interval = keyframe_interval  # Resend an unchanged frame this often so a restarted web app catches up
+        self.header = json.dumps(board_geometry(led_control)).encode('utf-8') + b'\n'
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        self.last_sent_time = 0.0
+        self.last_sent_frame = None
+
+    def publish(self, now):
+        """Send the shown frame if it changed (or a keyframe is due), at most fps times a second."""
+        if now - self.last_sent_time < self.frame_interval:
+            return
+
+        frame = self.led_control.shown_frame
+        if frame is None:
+            return
+        if frame == self.last_sent_frame and now - self.last_sent_time < self.keyframe_interval:
+            return
+
+        self.last_sent_time = now
+        try:
+            self.sock.sendto(self.header + frame, self.path)
+            self.last_sent_frame = bytes(frame)
+        except (FileNotFoundError, ConnectionRefusedError, BlockingIOError):
+            # Nobody has opened the preview yet (or the web app is busy)
+            self.last_sent_frame = None
+        except OSError as e:
+            print(f"Error publishing LED preview frame: {e}")
+            self.last_sent_frame = None
+
+    def close(self):
+        """Close the sending socket."""
+        self.sock.close()
+
+
+class FrameReceiver:
+    """Web app side: keep the latest frame sent by the controller."""
+
+    def __init__(self, path=PREVIEW_SOCKET):
+        self.path = path
+
+        # Remove a socket file left behind by a previous run
+        if os.path.exists(path):
+            os.remove(path)
+
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.bind(path)
+        self.sock.setblocking(False)
+
+        # The controller may run as root for the LED driver
+        os.chmod(path, 0o666)
+
+        self.lock = threading.Lock()
+        self.sequence = 0  # Bumped for every frame received
+        self.geometry = None
+        self.frame = None
+        self.header = None
+
+    def poll(self):
+        """Drain pending datagrams without blocking; returns (sequence, geometry, frame)."""
+        with self.lock:
+            while True:
+                try:
+                    payload = self.sock.recv(65536)
+                except BlockingIOError:
+                    break
+
+                header, _, frame = payload.partition(b'\n')
+                if header != self.header:
+                    try:
+                        self.geometry = json.loads(header)
+                    except ValueError:
+                        print("Ignoring malformed LED preview frame")
+                        continue
+                    self.header = header
+                self.frame = frame
+                self.sequence += 1
+
+            return self.sequence, self.geometry, self.frame
+
+
+def encode_runs(frame, previous=None):
+    """Run-length encode the pixels that differ from the previous frame.
+
+    Returns [[first_pixel, count, 'rrggbb'], ...] with one run per stretch of
+    consecutive changed pixels of the same color. Segments are consecutive pixels,
+    so a segment fill is a single run.
+    """
+    runs = []
+    run = None
+    for offset in range(0, len(frame), 3):
+        pixel = frame[offset:offset + 3]
+        if previous is not None and len(previous) == len(frame) and previous[offset:offset + 3] == pixel:
+            run = None
+            continue
+
+        color = pixel.hex()
+        if run is not None and run[2] == color:
+            run[1] += 1
+        else:
+            run = [offset // 3, 1, color]
+            runs.append(run)
+    return runs
@@ -3,33 +3,8 @@ import os
 import pwd
 import grp
 
-def initialize_moving_target_database():
-    """Initialize the Moving Target database by creating necessary tables."""
-    print("Initializing Moving Target database...")
-    
-    # Define the database path
-    db_path = 'moving_target.db'
-    
-    # Check if database file already exists and remove it if it exists
-    if os.path.exists(db_path):
-        os.remove(db_path)
-        print(f"Deleted existing {db_path} file")
-    
-    
-    # Connect to the database (creates it if it doesn't exist)
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-
-    db_path = "/home/grace/Desktop/YT_scoreboard/leds/moving_target.db"
-
-    # Change ownership to 'grace' if script is run as root
-    if os.geteuid() == 0:  # running as root
-        uid = pwd.getpwnam("grace").pw_uid
-        gid = grp.getgrnam("grace").gr_gid
-        os.chown(db_path, uid, gid)
-    
-    print("Creating tables...")
-    
+def create_moving_target_schema(cursor):
+    """Create the Moving Target tables, starting with the target on 20."""
     # Create active_segments table to track which segments are currently active
     cursor.execute('''
     CREATE TABLE active_segments (
@@ -66,6 +41,40 @@ def initialize_moving_target_database():
         (20, 'inner_single'),
         (20, 'outer_single')
     ''')
+
+
+def initialize_moving_target_database():
+    """Initialize the Moving Target database by creating necessary tables."""
+    print("Initializing Moving Target database...")
+    
+    # Define the database path
+    db_path = 'moving_target.db'
+    
+    # Check if database file already exists and remove it if it exists
+    if os.path.exists(db_path):
+        os.remove(db_path)
+        print(f"Deleted existing {db_path} file")
+    
+    # Remove the old database's WAL files too, or they would be replayed into the new one
+    for suffix in ('-wal', '-shm'):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    
+    
+    # Connect to the database (creates it if it doesn't exist)
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    db_path = "/home/grace/Desktop/YT_scoreboard/leds/moving_target.db"
+
+    # Change ownership to 'grace' if script is run as root
+    if os.geteuid() == 0:  # running as root
+        uid = pwd.getpwnam("grace").pw_uid
+        gid = grp.getgrnam("grace").gr_gid
+        os.chown(db_path, uid, gid)
+    
+    print("Creating tables...")
+    create_moving_target_schema(cursor)
     
     # Commit changes and close connection
     conn.commit()
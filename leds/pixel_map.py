@@ -0,0 +1,69 @@
+"""
+pixel_map.py
+
+Function:
+Precomputed segment-to-pixel tables for the dartboard LED strips. Every segment of
+every number is a run of consecutive pixels on its strip, so next to the pixel
+indexes each segment also gets the byte slice it covers in a flat RGB framebuffer
+(3 bytes per pixel). Filling a segment, a strip or the whole board is then a single
+slice assignment.
+"""
+
+from array import array
+
+BULL = 25  # Dartboard number used for the bullseye throughout the LED code
+
+
+def ring_pixel(strip_num, ring, leds_per_strip):
+    """Get the strip pixel index of a ring (odd strips are wired inwards to outwards)."""
+    if strip_num % 2 == 0:  # even num strip
+        return leds_per_strip*strip_num + ring
+    return leds_per_strip*strip_num + (leds_per_strip - ring - 1)
+
+
+def pixel_slice(pixels):
+    """Framebuffer byte slice covering a sorted run of consecutive pixels."""
+    if not pixels:
+        return slice(0, 0)
+    return slice(pixels[0]*3, (pixels[-1] + 1)*3)
+
+
+def build_segment_tables(mapping, leds_per_strip, dbl_ring, trpl_ring, num_ring=None, bull_pixels=()):
+    """Build the (number, segment_type) -> pixel index array and -> framebuffer slice tables."""
+    ring_ranges = {
+        'double': range(dbl_ring, dbl_ring + 1),
+        'outer_single': range(dbl_ring + 1, trpl_ring),
+        'triple': range(trpl_ring, trpl_ring + 1),
+        'inner_single': range(trpl_ring + 1, leds_per_strip),
+    }
+    if num_ring is not None:
+        ring_ranges['number'] = range(num_ring, num_ring + 1)
+
+    segment_pixels = {}
+    segment_slices = {}
+    for number, strip_num in mapping.items():
+        for segment_type, rings in ring_ranges.items():
+            pixels = array('H', sorted(ring_pixel(strip_num, ring, leds_per_strip) for ring in rings))
+            segment_pixels[(number, segment_type)] = pixels
+            segment_slices[(number, segment_type)] = pixel_slice(pixels)
+
+    # The bull is only lit on boards that have LEDs for it
+    bull = array('H', sorted(bull_pixels))
+    segment_pixels[(BULL, 'bullseye')] = bull
+    segment_slices[(BULL, 'bullseye')] = pixel_slice(bull)
+
+    return segment_pixels, segment_slices
+
+
+def fill_slice(frame, byte_slice, color):
+    """Fill a framebuffer slice with one RGB color."""
+    frame[byte_slice] = bytes(color) * ((byte_slice.stop - byte_slice.start) // 3)
+
+
+def build_ring_slices(strips, leds_per_strip):
+    """Per ring (outermost first), the framebuffer slices of that ring's pixel on each given strip."""
+    rings = []
+    for ring in range(leds_per_strip):
+        pixels = [ring_pixel(strip_num, ring, leds_per_strip) for strip_num in strips]
+        rings.append([slice(pixel*3, pixel*3 + 3) for pixel in pixels])
+    return rings
@@ -0,0 +1,57 @@
+"""
+test_frame_capture.py
+
+Replays every scenario in scenarios/ that has a golden recording next to it
+(scenario.json -> scenario.frames.gz) and compares the frames with
+frame_capture.compare_recordings. Runs under pytest or on its own.
+
+Re-record a golden after an intended change to the LED output with:
+    python frame_capture.py record scenarios/mixed_modes.json scenarios/mixed_modes.frames.gz
+
+Usage:
+    python test_frame_capture.py
+"""
+
+import os
+import sys
+import glob
+
+LEDS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, LEDS_DIR)
+
+from frame_capture import run_scenario, load_scenario, load_recording, compare_recordings
+
+
+def golden_scenarios():
+    """(scenario path, golden path) for every scenario with a golden recording."""
+    pairs = []
+    for scenario_path in sorted(glob.glob(os.path.join(LEDS_DIR, 'scenarios', '*.json'))):
+        golden_path = scenario_path[:-len('.json')] + '.frames.gz'
+        if os.path.exists(golden_path):
+            pairs.append((scenario_path, golden_path))
+    return pairs
+
+
+def test_scenarios_match_golden():
+    """Every scenario renders exactly the frames of its golden recording."""
+    pairs = golden_scenarios()
+    assert pairs, "No golden recordings found in scenarios/"
+
+    for scenario_path, golden_path in pairs:
+        differences = compare_recordings(run_scenario(load_scenario(scenario_path)), load_recording(golden_path))
+        assert not differences, f"{os.path.basename(scenario_path)}: " + "; ".join(differences)
+
+
+def main():
+    failed = 0
+    for scenario_path, golden_path in golden_scenarios():
+        differences = compare_recordings(run_scenario(load_scenario(scenario_path)), load_recording(golden_path))
+        print(f"{os.path.basename(scenario_path)}: {'MATCH' if not differences else 'MISMATCH'}")
+        for difference in differences:
+            print(f"  {difference}")
+        failed += bool(differences)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+live_state.py
+
+Snapshots for the optional RAM-backed live state (see LIVE_DB_DIR in
+leds/db_setup.py). In live mode every process opens game.db from a tmpfs
+directory, so darts cost no SD card writes. This module keeps the game.db
+next to the code as the durable copy: it is restored into RAM at startup and
+written back with the SQLite backup API whenever a turn ends, a game starts
+or ends, a correction is made, and on shutdown. A power cut loses at most the
+turn in progress.
+
+Each snapshot copies the whole database, so its cost grows with the game
+history; GAME_HISTORY_KEEP (see game_history.py) bounds it.
+
+Usage:
+    LIVE_DB_DIR=/dev/shm/scoreboard python serve.py
+    LIVE_DB_DIR=/dev/shm/scoreboard python live_state.py    # snapshot by hand
+"""
+
+import atexit
+import os
+import sqlite3
+import threading
+import time
+
+from db_pool import run_in_db_pool
+from leds import db_setup
+
+SNAPSHOT_POLL_INTERVAL = 1.0  # Seconds between checks for a turn boundary
+
+
+def open_durable(db_path):
+    """Open the durable copy itself, bypassing the live-mode redirect"""
+    conn = sqlite3.connect(db_path, timeout=db_setup.BUSY_TIMEOUT_MS / 1000)
+    db_setup.configure_connection(conn)
+    # A snapshot is only worth taking if it survives a power cut
+    conn.execute('PRAGMA synchronous = FULL')
+    return conn
+
+
+def restore_live_database(db_path='game.db'):
+    """Copy the durable game.db into RAM unless the live copy already exists; returns whether it copied"""
+    live_path = db_setup.live_path(db_path)
+    if live_path == db_path or os.path.exists(live_path):
+        return False  # Not in live mode, or the live copy outlived a restart of the app
+
+    os.makedirs(os.path.dirname(live_path), exist_ok=True)
+    if not os.path.exists(db_path):
+        return False  # First run: initialize_database creates the live copy
+
+    durable = open_durable(db_path)
+    live = db_setup.connect(db_path)
+    try:
+        durable.backup(live)
+    finally:
+        live.close()
+        durable.close()
+    print(f"Restored {db_path} into {live_path}")
+    return True
+
+
+def snapshot_live_database(db_path='game.db'):
+    """Write the live game.db back to the durable copy in one step"""
+    if db_setup.live_path(db_path) == db_path:
+        return  # Not in live mode; the file is durable already
+
+    live = db_setup.connect(db_path)
+    durable = open_durable(db_path)
+    try:
+        live.backup(durable)
+    finally:
+        durable.close()
+        live.close()
+
+
+def turn_marker(db_path='game.db'):
+    """Values that change at every turn boundary, game start, game end and correction"""
+    conn = db_setup.connect(db_path)
+    try:
+        return conn.execute('''
+            SELECT game_id, current_turn, current_player, game_over,
+                   (SELECT version FROM state_version WHERE id = 1)
+            FROM game_state WHERE id = 1
+        ''').fetchone()
+    finally:
+        conn.close()
+
+
+def snapshot_loop(db_path, interval):
+    """Snapshot the live database whenever the turn marker moves"""
+    last_marker = None
+    while True:
+        time.sleep(interval)
+        try:
+            marker = run_in_db_pool(turn_marker, db_path)
+            if marker != last_marker:
+                run_in_db_pool(snapshot_live_database, db_path)
+                last_marker = marker
+        except sqlite3.Error as e:
+            print(f"Error snapshotting live game state: {e}")
+
+
+def snapshot_on_exit(db_path):
+    """Final snapshot when the app shuts down"""
+    try:
+        snapshot_live_database(db_path)
+        print(f"Snapshotted live {db_path} to durable storage")
+    except sqlite3.Error as e:
+        print(f"Error snapshotting live game state on shutdown: {e}")
+
+
+def start_snapshots(db_path='game.db', interval=SNAPSHOT_POLL_INTERVAL):
+    """Start the snapshot thread and the shutdown snapshot; does nothing outside live mode"""
+    if db_setup.live_path(db_path) == db_path:
+        return None
+
+    atexit.register(snapshot_on_exit, db_path)
+    thread = threading.Thread(target=snapshot_loop, args=(db_path, interval), name='live-snapshots', daemon=True)
+    thread.start()
+    return thread
+
+
+if __name__ == '__main__':
+    if not db_setup.LIVE_DB_DIR:
+        print("LIVE_DB_DIR is not set; game.db is already on durable storage")
+    else:
+        snapshot_live_database()
+        print(f"Snapshotted {db_setup.live_path('game.db')} to game.db")
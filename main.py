@@ -5,53 +5,40 @@ import threading
 import os
 import signal 
 import atexit
-from initialize_db import initialize_database
+from initialize_db import initialize_database, CURRENT_GAME
+from db_pool import offload_db, run_in_db_pool
+from assets import init_assets
+from led_preview import init_led_preview
+from game_history import start_retention
+from live_state import restore_live_database, start_snapshots
+import player_stats
+import event_log
+from leds import led_events, db_setup
+from leds.LEDs_db_init import restore_leds_database, reset_leds_state
 from datetime import datetime
-import importlib.util
 
 # Function to reset the LEDs database when home screen is accessed
 def reset_leds_database():
-    """Reset the LEDs database when returning to the home screen."""
+    """Reset the LEDs to the neutral state when returning to the home screen."""
     try:
-        # Ensure the leds directory exists
-        os.makedirs('leds', exist_ok=True)
-        
-        # Get absolute path to the LEDs_db_init.py file
-        leds_init_path = os.path.join(os.getcwd(), 'leds', 'LEDs_db_init.py')
-        
-        if not os.path.exists(leds_init_path):
-            print(f"Error: LEDs_db_init.py not found at {leds_init_path}")
-            return
-            
-        # Import the module programmatically from its file path
-        spec = importlib.util.spec_from_file_location("LEDs_db_init", leds_init_path)
-        leds_db_init = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(leds_db_init)
-        
-        # Call the initialization function
-        leds_db_init.initialize_leds_database()
-        
-        # After resetting, explicitly update game mode to 'neutral'
+        leds_conn = db_setup.connect('leds/LEDs.db')
         try:
-            with sqlite3.connect('leds/LEDs.db') as leds_conn:
-                leds_cursor = leds_conn.cursor()
-                leds_cursor.execute("""
-                    UPDATE game_mode 
-                    SET mode = 'neutral', updated_at = CURRENT_TIMESTAMP
-                    WHERE id = 1
-                """)
-                leds_conn.commit()
-                print("Set LEDs.db game mode to 'neutral'")
-        except Exception as e:
-            print(f"Error updating game mode in LEDs database: {e}")
-            
-        print("LEDs database reset successfully")
-    except Exception as e:
+            changed = reset_leds_state(leds_conn)
+        finally:
+            leds_conn.close()
+        
+        # A refresh of the home page finds the LEDs neutral already and writes nothing
+        if changed:
+            print("LEDs database reset to neutral")
+            led_events.publish('mode', mode='neutral')
+    except sqlite3.Error as e:
         print(f"Error resetting LEDs database: {e}")
 
 
 app = Flask(__name__)
 app.secret_key = os.urandom(24)  # Add secret key for flash messages
+init_assets(app)  # Fingerprint and precompress static files
+init_led_preview(app)  # Live LED preview at /leds/preview
 dart_processor = None  # Define the global variable
 ANIMATION_DURATION = 3.0  # Animation duration in seconds
 
@@ -108,7 +95,7 @@ def stop_dart_processor():
 
 def get_db_connection():
     """Create a connection to the SQLite database"""
-    conn = sqlite3.connect('game.db')
+    conn = db_setup.connect('game.db')
     conn.row_factory = sqlite3.Row  # This enables column access by name
     return conn
     
@@ -120,7 +107,7 @@ def initialize_game_with_custom_names(player_names, starting_score=301, game_mod
         starting_score (int): Starting score for the game (e.g., 301, 501)
         game_mode (str, optional): Game mode to initialize. If None, will use the score.
     """
-    conn = sqlite3.connect('game.db')
+    conn = db_setup.connect('game.db')
     cursor = conn.cursor()
     
     # Get player count
@@ -148,45 +135,34 @@ def initialize_game_with_custom_names(player_names, starting_score=301, game_mod
         processor_mode = 'moving_target'
     
     try:
-        # Clear existing data first
-        cursor.execute("DELETE FROM turn_scores")
+        # Earlier games stay in the database; only the live state is cleared
         cursor.execute("DELETE FROM current_throws")
         cursor.execute("DELETE FROM game_state")
-        cursor.execute("DELETE FROM turns")
         cursor.execute("DELETE FROM animation_state")
         
-        # Clear game mode specific tables
-        if game_mode == 'cricket':
-            cursor.execute("DELETE FROM cricket_scores")
-        elif game_mode == 'around_clock':
-            cursor.execute("DELETE FROM around_clock_progress")
+        # Start a new game
+        cursor.execute('INSERT INTO games (game_mode, player_count) VALUES (?, ?)', (game_mode, player_count))
+        game_id = cursor.lastrowid
         
-        # Reset player scores but keep names
-        for player_id, name in player_names.items():
-            # Check if player exists
-            cursor.execute('SELECT 1 FROM players WHERE id = ?', (player_id,))
-            if cursor.fetchone():
-                # Update existing player
-                cursor.execute('UPDATE players SET name = ?, total_score = ? WHERE id = ?', 
-                              (name, starting_score, player_id))
-            else:
-                # Insert new player
-                cursor.execute('INSERT INTO players (id, name, total_score) VALUES (?, ?, ?)', 
-                              (player_id, name, starting_score))
-                              
-        # Remove any players that are no longer needed
-        cursor.execute('DELETE FROM players WHERE id > ?', (player_count,))
+        # Add the players to the new game
+        cursor.executemany(
+            'INSERT INTO players (game_id, id, name, total_score) VALUES (?, ?, ?, ?)',
+            [(game_id, player_id, name, starting_score) for player_id, name in player_names.items()]
+        )
+        log_game_started(conn, player_names, starting_score, game_mode, game_id)
         
         # Store player count, game mode, and processor mode in config
-        cursor.execute('CREATE TABLE IF NOT EXISTS game_config (id INTEGER PRIMARY KEY CHECK (id = 1), player_count INTEGER, game_mode TEXT, processor_mode TEXT)')
         cursor.execute('INSERT OR REPLACE INTO game_config (id, player_count, game_mode, processor_mode) VALUES (1, ?, ?, ?)', 
                       (player_count, game_mode, processor_mode))
         
+        # State version only ever moves forward so clients can spot any change
+        cursor.execute('UPDATE state_version SET version = version + 1 WHERE id = 1')
+        
         # Insert first turn
-        cursor.execute('INSERT INTO turns (turn_number) VALUES (?)', (1,))
+        cursor.execute('INSERT INTO turns (game_id, turn_number) VALUES (?, ?)', (game_id, 1))
         
-        # Insert game state
-        cursor.execute('INSERT OR REPLACE INTO game_state (id, current_turn, current_player, game_over) VALUES (1, 1, 1, 0)')
+        # Insert game state pointing at the new game
+        cursor.execute('INSERT OR REPLACE INTO game_state (id, game_id, current_turn, current_player, game_over) VALUES (1, ?, 1, 1, 0)', (game_id,))
         
         # Insert current throws - MODIFIED to use NULL for score and multiplier
         cursor.executemany('INSERT OR REPLACE INTO current_throws (throw_number, points, score, multiplier) VALUES (?, ?, ?, ?)', [
@@ -217,9 +193,9 @@ def initialize_game_with_custom_names(player_names, starting_score=301, game_mod
                 for number in cricket_numbers:
                     cursor.execute('''
                         INSERT OR REPLACE INTO cricket_scores
-                        (player_id, number, marks, points, closed)
-                        VALUES (?, ?, 0, 0, 0)
-                    ''', (player_id, number))
+                        (game_id, player_id, number, marks, points, closed)
+                        VALUES (?, ?, ?, 0, 0, 0)
+                    ''', (game_id, player_id, number))
                     
         elif game_mode == 'around_clock':
             # Initialize around_clock_progress table
@@ -227,51 +203,39 @@ def initialize_game_with_custom_names(player_names, starting_score=301, game_mod
             for player_id in player_names:
                 cursor.execute('''
                     INSERT OR REPLACE INTO around_clock_progress
-                    (player_id, current_number, completed, last_update)
-                    VALUES (?, 1, 0, ?)
-                ''', (player_id, current_time))
+                    (game_id, player_id, current_number, completed, last_update)
+                    VALUES (?, ?, 1, 0, ?)
+                ''', (game_id, player_id, current_time))
         
         # Commit changes
         conn.commit()
         print(f"Game reinitialized with {player_count} players, game mode: {game_mode}, processor mode: {processor_mode}")
         
+        # Swap in a fresh LEDs.db for the new game instead of clearing it table by table
+        leds_conn = db_setup.connect('leds/LEDs.db')
+        try:
+            restore_leds_database(leds_conn, processor_mode, player_count)
+        finally:
+            leds_conn.close()
+        
     except sqlite3.Error as e:
         print(f"Error initializing game with custom names: {e}")
     finally:
         conn.close()
 
-def get_player_score_before_turn(conn, player_id, turn_number):
-    """Get a player's score before a specific turn"""
-    cursor = conn.cursor()
-    
-    # Get the game mode (starting score) from the game_config table
-    cursor.execute('SELECT game_mode FROM game_config WHERE id = 1')
-    result = cursor.fetchone()
-    starting_score = 301  # Default to 301
-    if result and result['game_mode']:
-        try:
-            starting_score = int(result['game_mode'])
-        except ValueError:
-            # If game_mode is not an integer, default to 301
-            starting_score = 301
-    
-    # Get the total points scored by this player before this turn (excluding busted turns)
-    cursor.execute(
-        'SELECT SUM(points) as total_points FROM turn_scores WHERE player_id = ? AND turn_number < ? AND bust = 0',
-        (player_id, turn_number)
-    )
-    
-    total_previous_points = cursor.fetchone()['total_points'] or 0
-    
-    # Calculate the score before this turn (starting_score - previous points)
-    score_before_turn = starting_score - total_previous_points
-    
-    return score_before_turn
+def log_game_started(conn, player_names, starting_score, game_mode, game_id=None):
+    """Log the mode, starting score and players of the game in play (or game_id) without committing"""
+    event_log.append_event(conn, event_log.GAME_STARTED, game_id=game_id, game_mode=game_mode, starting_score=starting_score,
+                           players=[[player_id, name] for player_id, name in player_names.items()])
 
 def get_animation_state(conn):
     """Get the current animation state"""
     cursor = conn.cursor()
-    cursor.execute('SELECT * FROM animation_state WHERE id = 1')
+    cursor.execute('''
+        SELECT animating, animation_type, turn_number, player_id, throw_number, timestamp,
+               next_turn, next_player, target_hit, cricket_event
+        FROM animation_state WHERE id = 1
+    ''')
     state = cursor.fetchone()
     
     # Check if animation is active and not expired
@@ -288,7 +252,7 @@ def get_animation_state(conn):
     # No active animation or expired
     return None
 
-def reset_animation_state(conn):
+def reset_animation_state(conn, commit=True):
     """Reset the animation state in the database"""
     cursor = conn.cursor()
     cursor.execute('''
@@ -300,85 +264,259 @@ def reset_animation_state(conn):
             throw_number = NULL, 
             timestamp = NULL,
             next_turn = NULL,
-            next_player = NULL
+            next_player = NULL,
+            target_hit = 0,
+            cricket_event = NULL
         WHERE id = 1
     ''')
-    conn.commit()
+    if commit:
+        conn.commit()
 
-def recalculate_player_scores(conn):
-    """Recalculate all player scores based on turn_scores data"""
+def bump_state_version(conn):
+    """Increment the game state version and return the new value (caller commits)"""
     cursor = conn.cursor()
+    cursor.execute('UPDATE state_version SET version = version + 1 WHERE id = 1')
+    cursor.execute('SELECT version FROM state_version WHERE id = 1')
+    row = cursor.fetchone()
+    return row['version'] if row else 0
+
+def get_turn_throws(conn, turn_number, player_id, min_darts=3, empty=0):
+    """Darts of one turn from the throws table, padded with empty darts up to min_darts
     
-    # Get all players
-    cursor.execute('SELECT id FROM players')
-    players = cursor.fetchall()
+    Missing darts get empty as their score and multiplier; pass None when
+    copying into current_throws, where NULL marks a dart not thrown yet.
+    """
+    darts = {
+        row['dart_index']: {
+            "throw_number": row['dart_index'],
+            "score": row['score'],
+            "multiplier": row['multiplier'],
+            "points": row['points']
+        }
+        for row in conn.execute(
+            f'SELECT dart_index, score, multiplier, points FROM throws WHERE game_id = {CURRENT_GAME} AND turn_number = ? AND player_id = ? ORDER BY dart_index',
+            (turn_number, player_id)
+        )
+    }
     
-    # Get the game mode (starting score) from the game_config table
-    cursor.execute('SELECT game_mode FROM game_config WHERE id = 1')
-    result = cursor.fetchone()
-    starting_score = 301  # Default to 301
-    if result and result['game_mode']:
-        try:
-            starting_score = int(result['game_mode'])
-        except ValueError:
-            # If game_mode is not an integer, default to 301
-            starting_score = 301
+    # The scoreboard always shows at least three slots per turn
+    for dart_index in range(1, min_darts + 1):
+        darts.setdefault(dart_index, {"throw_number": dart_index, "score": empty, "multiplier": empty, "points": 0})
+    return [darts[dart_index] for dart_index in sorted(darts)]
+
+def save_turn_throw(conn, turn_number, player_id, dart_index, score, multiplier, points):
+    """Insert or correct one dart in the throws table (caller commits)
+    
+    A correction keeps the dart's recorded position and timestamp.
+    """
+    conn.execute(
+        f'''INSERT INTO throws (game_id, turn_number, player_id, dart_index, score, multiplier, points)
+        VALUES ({CURRENT_GAME}, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (game_id, turn_number, player_id, dart_index)
+        DO UPDATE SET score = excluded.score, multiplier = excluded.multiplier, points = excluded.points''',
+        (turn_number, player_id, dart_index, score, multiplier, points)
+    )
+
+def parse_throw_correction(correction):
+    """Check one manual throw correction
     
-    # Track if any player has a winning score
-    any_player_won = False
+    Returns ((turn_number, player_id, throw_number, score, multiplier), None),
+    or (None, what is wrong with it).
+    """
+    values = [correction.get(field) for field in ('turn_number', 'player_id', 'throw_number', 'score', 'multiplier')]
+    if not all(values):
+        return None, 'is missing required fields'
     
-    for player in players:
-        player_id = player['id']
-        
-        # Calculate total points from non-busted turns only
+    try:
+        turn_number, player_id, throw_number, score, multiplier = (int(value) for value in values)
+    except (TypeError, ValueError):
+        return None, 'has a value that is not a whole number'
+    if throw_number not in (1, 2, 3):
+        return None, 'has an invalid throw number'
+    if not (1 <= score <= 20 or score == 25) or multiplier not in (1, 2, 3) or (score == 25 and multiplier == 3):
+        return None, 'has an invalid score or multiplier'
+    
+    return (turn_number, player_id, throw_number, score, multiplier), None
+
+def correction_game_error(player_ids, current_turn, turn_number, player_id):
+    """What is wrong with correcting this turn of the game in play, or None"""
+    # Corrections may only touch players of this game and turns it has reached
+    if player_id not in player_ids:
+        return 'is for a player who is not in this game'
+    if not 1 <= turn_number <= current_turn:
+        return 'is for a turn that has not been played'
+    return None
+
+def apply_throw_correction(conn, turn_number, player_id, throw_number, score, multiplier, live_turn=False, hit_target=None):
+    """Write and log a single corrected throw without committing
+    
+    Points and bust flags are left for event_log.rebuild_projections so a
+    batch of corrections only rebuilds the game once.
+    
+    Args:
+        live_turn (bool): True if the throw belongs to the turn currently in play,
+            in which case current_throws is updated as well.
+        hit_target (bool): Whether a Moving Target dart hit the target; None keeps
+            what was recorded for the dart.
+    """
+    cursor = conn.cursor()
+    points = score * multiplier
+    
+    # Make sure the turn exists
+    cursor.execute(f'INSERT OR IGNORE INTO turns (game_id, turn_number) VALUES ({CURRENT_GAME}, ?)', (turn_number,))
+    
+    # Overwrite just the corrected throw, keeping the other darts as they were
+    save_turn_throw(conn, turn_number, player_id, throw_number, score, multiplier, points)
+    hit = {} if hit_target is None else {'hit_target': bool(hit_target)}
+    event_log.append_event(conn, event_log.THROW_CORRECTED, turn_number, player_id, throw_number, score, multiplier, **hit)
+    
+    # Keep the on-screen throws in step with the turn being played
+    if live_turn:
         cursor.execute(
-            'SELECT SUM(points) as total_points FROM turn_scores WHERE player_id = ? AND bust = 0',
-            (player_id,)
+            'UPDATE current_throws SET score = ?, multiplier = ?, points = ? WHERE throw_number = ?',
+            (score, multiplier, points, throw_number)
         )
-        total_points = cursor.fetchone()['total_points'] or 0
-        
-        # Update player's score (starting_score - total points)
-        new_score = starting_score - total_points
-        cursor.execute(
-            'UPDATE players SET total_score = ? WHERE id = ?',
-            (new_score, player_id)
+    
+    return points
+
+def rebuild_corrected_game(conn, player_ids):
+    """Rebuild the game in play from its event log after manual changes (caller commits)
+    
+    Also sets game_over and the given players' stats from the rebuilt game,
+    and returns its projection.
+    """
+    projection = event_log.rebuild_projections(conn)
+    conn.execute('UPDATE game_state SET game_over = ? WHERE id = 1', (1 if projection['game_over'] else 0,))
+    
+    for player_id in player_ids:
+        player_stats.rebuild_player_stats(conn, player_id)
+    return projection
+
+def show_turn_throws(conn, turn_number, player_id):
+    """Fill current_throws with the darts thrown so far in a turn (caller commits)"""
+    conn.execute('UPDATE current_throws SET points = 0, score = NULL, multiplier = NULL')
+    for throw in get_turn_throws(conn, turn_number, player_id, min_darts=0):
+        conn.execute(
+            'UPDATE current_throws SET score = ?, multiplier = ?, points = ? WHERE throw_number = ?',
+            (throw['score'], throw['multiplier'], throw['points'], throw['throw_number'])
         )
-        
-        # Check if player has won (score exactly 0)
-        if new_score == 0:
-            any_player_won = True
+
+def game_and_leds_db():
+    """game.db with LEDs.db attached, so a change and the LED state it implies commit together"""
+    return db_setup.AttachedDatabases('game.db', {'leds': 'leds/LEDs.db'})
+
+def sync_leds_state(db, conn, current_player, projection):
+    """Write the LED state of a rebuilt game into the attached LEDs.db (inside db.transaction())
     
-    # Update game_over flag based on whether any player has won
-    if any_player_won:
-        cursor.execute('UPDATE game_state SET game_over = 1 WHERE id = 1')
-    else:
-        cursor.execute('UPDATE game_state SET game_over = 0 WHERE id = 1')
-        
-        # Also reset any win animation state if we're un-winning
-        cursor.execute('''
-            UPDATE animation_state 
-            SET animating = 0, 
-                animation_type = NULL, 
-                turn_number = NULL, 
-                player_id = NULL, 
-                throw_number = NULL, 
-                timestamp = NULL,
-                next_turn = NULL,
-                next_player = NULL
-            WHERE id = 1 AND animation_type = 'win'
-        ''')
+    The LED controller is told once the transaction commits, the way the dart
+    processors do it.
+    """
+    player_count = len(projection['totals'])
+    conn.execute(
+        'UPDATE player_state SET current_player = ?, player_count = ?, updated_at = CURRENT_TIMESTAMP WHERE id = 1',
+        (current_player, player_count)
+    )
+    db.after_commit(lambda: led_events.publish('player', current_player=current_player, player_count=player_count))
+    
+    if 'cricket_scores' in projection:
+        segments = {}
+        for number in event_log.CRICKET_NUMBERS:
+            player_closed = {i: projection['cricket_scores'].get((i, number), (0, 0, False))[2] for i in range(1, 9)}
+            
+            # Number is globally closed if at least 2 players have closed it
+            all_closed = sum(player_closed.values()) >= 2
+            conn.execute(
+                'UPDATE cricket_state SET all_closed = ?, '
+                + ', '.join(f'player{i}_closed = ?' for i in range(1, 9))
+                + ', updated_at = CURRENT_TIMESTAMP WHERE segment = ?',
+                [1 if all_closed else 0] + [1 if player_closed[i] else 0 for i in range(1, 9)] + [number]
+            )
+            segments[number] = {'player_closed': player_closed, 'all_closed': all_closed}
+        db.after_commit(lambda: led_events.publish('cricket', segments=segments))
+    
+    if 'around_clock_progress' in projection:
+        for player_id, (current_number, completed) in projection['around_clock_progress'].items():
+            conn.execute(
+                'INSERT OR REPLACE INTO around_clock_state (player_id, current_target, completed, updated_at) VALUES (?, ?, ?, CURRENT_TIMESTAMP)',
+                (player_id, current_number, 1 if completed else 0)
+            )
+            db.after_commit(lambda player_id=player_id, current_number=current_number: led_events.publish(
+                'around_clock', player_id=player_id, current_target=current_number
+            ))
+
+def corrected_position(conn, state, projection, turn_number, player_id, was_previously_bust):
+    """Where play moves to after correcting a throw, or None if it stays put
     
-    conn.commit()
+    The turn in play ends on its third dart or on an X01 bust. Correcting the
+    bust that ended the turn just before hands that turn back if it ended early.
+    """
+    if projection['game_over']:
+        return None
+    
+    x01 = state['game_mode'] not in ('cricket', 'around_clock', 'moving_target')
+    player_count = len(state['players'])
+    current_turn, current_player = state['current_turn'], state['current_player']
+    live_darts = get_turn_throws(conn, current_turn, current_player, min_darts=0)
+    
+    # The turn in play is unscored, so the player's total is still the score before it
+    live_bust = x01 and sum(throw['points'] for throw in live_darts) > projection['totals'].get(current_player, 0)
+    if len(live_darts) >= 3 or live_bust:
+        next_player = current_player % player_count + 1  # Cycle to next player (1-based)
+        return current_turn + (1 if next_player == 1 else 0), next_player
+    
+    previous_player = (current_player - 2) % player_count + 1
+    previous_turn = current_turn - (1 if current_player == 1 else 0)
+    if (x01 and was_previously_bust and not live_darts
+            and (turn_number, player_id) == (previous_turn, previous_player)
+            and not projection['turn_scores'].get((turn_number, player_id), (0, True))[1]
+            and len(get_turn_throws(conn, turn_number, player_id, min_darts=0)) < 3):
+        return turn_number, player_id
+    return None
+
+
+def move_play_after_correction(conn, turn_number, player_id, was_previously_bust=False):
+    """Move play on (or back) if corrected darts ended or reopened a turn (caller commits)
+    
+    Logs the move, shows the darts of the turn now in play and returns its
+    (turn_number, player_id).
+    """
+    state = event_log.replay_game(conn, event_log.current_game_id(conn))
+    position = corrected_position(conn, state, event_log.project(state), turn_number, player_id, was_previously_bust)
+    if position:
+        conn.execute('UPDATE game_state SET current_turn = ?, current_player = ? WHERE id = 1', position)
+        event_log.append_event(conn, event_log.TURN_ADVANCED, *position)
+        print(f"Manual override: Moved play to Player {position[1]}, Turn {position[0]}")
+    else:
+        position = (state['current_turn'], state['current_player'])
+    show_turn_throws(conn, *position)
+    return position
+
+def start_win_animation(conn, turn_number, player_id, throw_number):
+    """Celebrate a correction that won the game (caller commits)"""
+    current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    conn.execute('''
+        UPDATE animation_state 
+        SET animating = 1, 
+            animation_type = ?, 
+            turn_number = ?, 
+            player_id = ?, 
+            throw_number = ?, 
+            timestamp = ?,
+            next_turn = NULL,
+            next_player = NULL
+        WHERE id = 1
+    ''', ('win', turn_number, player_id, throw_number, current_time))
 
 
 @app.route('/')
 def home():
     """Display the home page with player name input form"""
     # Reset the LEDs database when the home screen is accessed
-    reset_leds_database()
+    run_in_db_pool(reset_leds_database)
     return render_template('home.html')
 
 @app.route('/start_game', methods=['POST'])
+@offload_db
 def start_game():
     """Process the player names and redirect to game selection"""
     # Get player count from form
@@ -403,25 +541,24 @@ def start_game():
     
     try:
         # Clear existing players if we're changing player count
-        current_player_count_result = cursor.execute('SELECT COUNT(*) as count FROM players').fetchone()
+        current_player_count_result = cursor.execute(f'SELECT COUNT(*) as count FROM players WHERE game_id = {CURRENT_GAME}').fetchone()
         current_player_count = current_player_count_result['count'] if current_player_count_result else 0
         
         if current_player_count != player_count:
             # Player count has changed, we need to reset the players table
-            cursor.execute("DELETE FROM players")
+            cursor.execute(f"DELETE FROM players WHERE game_id = {CURRENT_GAME}")
             reset_scores = True  # Force a reset when player count changes
             
             # Insert new players
             for player_id, name in player_names.items():
-                cursor.execute('INSERT INTO players (id, name, total_score) VALUES (?, ?, ?)', 
+                cursor.execute(f'INSERT INTO players (game_id, id, name, total_score) VALUES ({CURRENT_GAME}, ?, ?, ?)', 
                               (player_id, name, 301))  # Default to 301
         else:
             # Just update names for existing players
             for player_id, name in player_names.items():
-                cursor.execute('UPDATE players SET name = ? WHERE id = ?', (name, player_id))
+                cursor.execute(f'UPDATE players SET name = ? WHERE game_id = {CURRENT_GAME} AND id = ?', (name, player_id))
         
         # Store player count in game_config table
-        cursor.execute('CREATE TABLE IF NOT EXISTS game_config (id INTEGER PRIMARY KEY CHECK (id = 1), player_count INTEGER, game_mode TEXT)')
         cursor.execute('INSERT OR REPLACE INTO game_config (id, player_count) VALUES (1, ?)', (player_count,))
         
         # Commit the changes
@@ -438,18 +575,8 @@ def start_game():
                           player_count=player_count,
                           reset_scores=reset_scores)
 
-@app.route('/start_game_301', methods=['POST'])
-def start_game_301():
-    """Initialize 301 game with the provided player names"""
-    player_count = int(request.form.get('player_count', 4))
-    reset_scores = request.form.get('reset_scores') == 'on'
-    
-    # Get player names from the form
-    player_names = {}
-    for i in range(1, player_count + 1):
-        name = request.form.get(f'player{i}', '').strip() or f'Player {i}'
-        player_names[i] = name
-    
+def write_301_game(player_names, player_count, reset_scores):
+    """Store a 301 game in game.db and LEDs.db (runs on the DB pool)"""
     # If reset_scores is checked, reinitialize the database
     if reset_scores:
         # Reinitialize the database with custom player names and 301 starting score
@@ -461,10 +588,12 @@ def start_game_301():
         
         # Update game mode in config
         cursor.execute('UPDATE game_config SET game_mode = ?, processor_mode = ? WHERE id = 1', ('301', 'classic'))
+        cursor.execute(f'UPDATE games SET game_mode = ? WHERE id = {CURRENT_GAME}', ('301',))
+        log_game_started(conn, player_names, 301, '301')
         
         # IMPORTANT: Also update all player scores to 301 even when not resetting
         for player_id, name in player_names.items():
-            cursor.execute('UPDATE players SET name = ?, total_score = ? WHERE id = ?', 
+            cursor.execute(f'UPDATE players SET name = ?, total_score = ? WHERE game_id = {CURRENT_GAME} AND id = ?', 
                           (name, 301, player_id))
                           
         conn.commit()
@@ -472,7 +601,7 @@ def start_game_301():
     
     # IMPORTANT: Update LEDs database with the game mode
     try:
-        with sqlite3.connect('leds/LEDs.db') as leds_conn:
+        with db_setup.connect('leds/LEDs.db') as leds_conn:
             leds_cursor = leds_conn.cursor()
             leds_cursor.execute("""
                 UPDATE game_mode 
@@ -481,18 +610,13 @@ def start_game_301():
             """, ('classic',))
             leds_conn.commit()
             print("Updated LEDs.db game mode to 'classic' for 301 game")
+            led_events.publish('mode', mode='classic')
     except Exception as e:
         print(f"Error updating LEDs database: {e}")
-    
-    # Start the classic dart processor
-    start_dart_processor(game_mode='classic')
-    
-    flash('301 game has been started!', 'success')
-    return redirect(url_for('game'))
 
-@app.route('/start_game_501', methods=['POST'])
-def start_game_501():
-    """Initialize 501 game with the provided player names"""
+@app.route('/start_game_301', methods=['POST'])
+def start_game_301():
+    """Initialize 301 game with the provided player names"""
     player_count = int(request.form.get('player_count', 4))
     reset_scores = request.form.get('reset_scores') == 'on'
     
@@ -502,6 +626,18 @@ def start_game_501():
         name = request.form.get(f'player{i}', '').strip() or f'Player {i}'
         player_names[i] = name
     
+    # The SQLite work runs on the DB pool; the processor is started from here
+    # because gevent only notices child processes exiting on its main loop
+    run_in_db_pool(write_301_game, player_names, player_count, reset_scores)
+    
+    # Start the classic dart processor
+    start_dart_processor(game_mode='classic')
+    
+    flash('301 game has been started!', 'success')
+    return redirect(url_for('game'))
+
+def write_501_game(player_names, player_count, reset_scores):
+    """Store a 501 game in game.db and LEDs.db (runs on the DB pool)"""
     # If reset_scores is checked, reinitialize the database
     if reset_scores:
         # Reinitialize the database with custom player names and 501 starting score
@@ -513,10 +649,12 @@ def start_game_501():
         
         # Update game mode in config
         cursor.execute('UPDATE game_config SET game_mode = ?, processor_mode = ? WHERE id = 1', ('501', 'classic'))
+        cursor.execute(f'UPDATE games SET game_mode = ? WHERE id = {CURRENT_GAME}', ('501',))
+        log_game_started(conn, player_names, 501, '501')
         
         # IMPORTANT: Also update all player scores to 501 even when not resetting
         for player_id, name in player_names.items():
-            cursor.execute('UPDATE players SET name = ?, total_score = ? WHERE id = ?', 
+            cursor.execute(f'UPDATE players SET name = ?, total_score = ? WHERE game_id = {CURRENT_GAME} AND id = ?', 
                           (name, 501, player_id))
                           
         conn.commit()
@@ -524,7 +662,7 @@ def start_game_501():
     
     # IMPORTANT: Update LEDs database with the game mode
     try:
-        with sqlite3.connect('leds/LEDs.db') as leds_conn:
+        with db_setup.connect('leds/LEDs.db') as leds_conn:
             leds_cursor = leds_conn.cursor()
             leds_cursor.execute("""
                 UPDATE game_mode 
@@ -533,18 +671,13 @@ def start_game_501():
             """, ('classic',))
             leds_conn.commit()
             print("Updated LEDs.db game mode to 'classic' for 501 game")
+            led_events.publish('mode', mode='classic')
     except Exception as e:
         print(f"Error updating LEDs database: {e}")
-    
-    # Start the classic dart processor
-    start_dart_processor(game_mode='classic')
-    
-    flash('501 game has been started!', 'success')
-    return redirect(url_for('game'))
 
-@app.route('/start_game_cricket', methods=['POST'])
-def start_game_cricket():
-    """Initialize American Cricket game with the provided player names"""
+@app.route('/start_game_501', methods=['POST'])
+def start_game_501():
+    """Initialize 501 game with the provided player names"""
     player_count = int(request.form.get('player_count', 4))
     reset_scores = request.form.get('reset_scores') == 'on'
     
@@ -554,6 +687,18 @@ def start_game_cricket():
         name = request.form.get(f'player{i}', '').strip() or f'Player {i}'
         player_names[i] = name
     
+    # The SQLite work runs on the DB pool; the processor is started from here
+    # because gevent only notices child processes exiting on its main loop
+    run_in_db_pool(write_501_game, player_names, player_count, reset_scores)
+    
+    # Start the classic dart processor
+    start_dart_processor(game_mode='classic')
+    
+    flash('501 game has been started!', 'success')
+    return redirect(url_for('game'))
+
+def write_cricket_game(player_names, player_count, reset_scores):
+    """Store a American Cricket game in game.db and LEDs.db (runs on the DB pool)"""
     # If reset_scores is checked, reinitialize the database
     if reset_scores:
         # Reinitialize the database with custom player names
@@ -565,38 +710,40 @@ def start_game_cricket():
         
         # Update game mode in config
         cursor.execute('UPDATE game_config SET game_mode = ?, processor_mode = ? WHERE id = 1', ('cricket', 'cricket'))
+        cursor.execute(f'UPDATE games SET game_mode = ? WHERE id = {CURRENT_GAME}', ('cricket',))
+        log_game_started(conn, player_names, 0, 'cricket')
         
         # IMPORTANT: Also update all player scores to 0 even when not resetting
         for player_id, name in player_names.items():
             # Check if player exists
-            cursor.execute('SELECT 1 FROM players WHERE id = ?', (player_id,))
+            cursor.execute(f'SELECT 1 FROM players WHERE game_id = {CURRENT_GAME} AND id = ?', (player_id,))
             if cursor.fetchone():
                 # Update existing player
-                cursor.execute('UPDATE players SET name = ?, total_score = ? WHERE id = ?', 
+                cursor.execute(f'UPDATE players SET name = ?, total_score = ? WHERE game_id = {CURRENT_GAME} AND id = ?', 
                               (name, 0, player_id))
             else:
                 # Insert new player with score 0
-                cursor.execute('INSERT INTO players (id, name, total_score) VALUES (?, ?, ?)', 
+                cursor.execute(f'INSERT INTO players (game_id, id, name, total_score) VALUES ({CURRENT_GAME}, ?, ?, ?)', 
                               (player_id, name, 0))
             
             # Ensure cricket scores are initialized for this player
             cricket_numbers = [15, 16, 17, 18, 19, 20, 25]  # Traditional cricket numbers
             for number in cricket_numbers:
-                cursor.execute('''
+                cursor.execute(f'''
                     INSERT OR REPLACE INTO cricket_scores
-                    (player_id, number, marks, points, closed)
-                    VALUES (?, ?, 0, 0, 0)
+                    (game_id, player_id, number, marks, points, closed)
+                    VALUES ({CURRENT_GAME}, ?, ?, 0, 0, 0)
                 ''', (player_id, number))
         
         # Remove any players that are no longer needed
-        cursor.execute('DELETE FROM players WHERE id > ?', (player_count,))
+        cursor.execute(f'DELETE FROM players WHERE game_id = {CURRENT_GAME} AND id > ?', (player_count,))
                           
         conn.commit()
         conn.close()
     
     # IMPORTANT: Update LEDs database with the game mode
     try:
-        with sqlite3.connect('leds/LEDs.db') as leds_conn:
+        with db_setup.connect('leds/LEDs.db') as leds_conn:
             leds_cursor = leds_conn.cursor()
             leds_cursor.execute("""
                 UPDATE game_mode 
@@ -631,18 +778,13 @@ def start_game_cricket():
             
             leds_conn.commit()
             print("Updated LEDs.db game mode to 'cricket'")
+            led_events.publish('mode', mode='cricket')
     except Exception as e:
         print(f"Error updating LEDs database: {e}")
-    
-    # Start the cricket dart processor
-    start_dart_processor(game_mode='cricket')
-    
-    flash('American Cricket game has been started!', 'success')
-    return redirect(url_for('game'))
 
-@app.route('/start_game_around_clock', methods=['POST'])
-def start_game_around_clock():
-    """Initialize Around the Clock game with the provided player names"""
+@app.route('/start_game_cricket', methods=['POST'])
+def start_game_cricket():
+    """Initialize American Cricket game with the provided player names"""
     player_count = int(request.form.get('player_count', 4))
     reset_scores = request.form.get('reset_scores') == 'on'
     
@@ -652,6 +794,18 @@ def start_game_around_clock():
         name = request.form.get(f'player{i}', '').strip() or f'Player {i}'
         player_names[i] = name
     
+    # The SQLite work runs on the DB pool; the processor is started from here
+    # because gevent only notices child processes exiting on its main loop
+    run_in_db_pool(write_cricket_game, player_names, player_count, reset_scores)
+    
+    # Start the cricket dart processor
+    start_dart_processor(game_mode='cricket')
+    
+    flash('American Cricket game has been started!', 'success')
+    return redirect(url_for('game'))
+
+def write_around_clock_game(player_names, player_count, reset_scores):
+    """Store a Around the Clock game in game.db and LEDs.db (runs on the DB pool)"""
     # If reset_scores is checked, reinitialize the database
     if reset_scores:
         # Reinitialize the database with custom player names
@@ -663,19 +817,21 @@ def start_game_around_clock():
         
         # Update game mode in config
         cursor.execute('UPDATE game_config SET game_mode = ?, processor_mode = ? WHERE id = 1', ('around_clock', 'around_clock'))
+        cursor.execute(f'UPDATE games SET game_mode = ? WHERE id = {CURRENT_GAME}', ('around_clock',))
+        log_game_started(conn, player_names, 0, 'around_clock')
         
         # IMPORTANT: Also update all player scores to 0 even when not resetting
         for player_id, name in player_names.items():
-            cursor.execute('UPDATE players SET name = ?, total_score = ? WHERE id = ?', 
+            cursor.execute(f'UPDATE players SET name = ?, total_score = ? WHERE game_id = {CURRENT_GAME} AND id = ?', 
                           (name, 0, player_id))
                           
         # Also initialize around_clock_progress
         current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         for player_id in player_names:
-            cursor.execute('''
+            cursor.execute(f'''
                 INSERT OR REPLACE INTO around_clock_progress
-                (player_id, current_number, completed, last_update)
-                VALUES (?, 1, 0, ?)
+                (game_id, player_id, current_number, completed, last_update)
+                VALUES ({CURRENT_GAME}, ?, 1, 0, ?)
             ''', (player_id, current_time))
         
         conn.commit()
@@ -683,7 +839,7 @@ def start_game_around_clock():
     
     # IMPORTANT: Update LEDs database with the game mode
     try:
-        with sqlite3.connect('leds/LEDs.db') as leds_conn:
+        with db_setup.connect('leds/LEDs.db') as leds_conn:
             leds_cursor = leds_conn.cursor()
             leds_cursor.execute("""
                 UPDATE game_mode 
@@ -700,8 +856,25 @@ def start_game_around_clock():
             
             leds_conn.commit()
             print("Updated LEDs.db game mode to 'around_clock'")
+            led_events.publish('mode', mode='around_clock')
     except Exception as e:
         print(f"Error updating LEDs database: {e}")
+
+@app.route('/start_game_around_clock', methods=['POST'])
+def start_game_around_clock():
+    """Initialize Around the Clock game with the provided player names"""
+    player_count = int(request.form.get('player_count', 4))
+    reset_scores = request.form.get('reset_scores') == 'on'
+    
+    # Get player names from the form
+    player_names = {}
+    for i in range(1, player_count + 1):
+        name = request.form.get(f'player{i}', '').strip() or f'Player {i}'
+        player_names[i] = name
+    
+    # The SQLite work runs on the DB pool; the processor is started from here
+    # because gevent only notices child processes exiting on its main loop
+    run_in_db_pool(write_around_clock_game, player_names, player_count, reset_scores)
     
     # Start the around the clock dart processor
     start_dart_processor(game_mode='around_clock')
@@ -738,8 +911,8 @@ def game():
         template=template
     )
 
-@app.route('/data_json')
-def data_json():
+def build_game_data():
+    """Build the game data dictionary used by the game screens"""
     # Create a connection to the database
     conn = get_db_connection()
     
@@ -757,7 +930,7 @@ def data_json():
     
     # Get players
     players = []
-    for row in conn.execute('SELECT id, name, total_score FROM players ORDER BY id'):
+    for row in conn.execute(f'SELECT id, name, total_score FROM players WHERE game_id = {CURRENT_GAME} ORDER BY id'):
         players.append({
             "id": row['id'],
             "name": row['name'],
@@ -776,18 +949,12 @@ def data_json():
         game_data["animating"] = True
         game_data["animation_type"] = animation_type
         
-        # Pass target_hit flag if it exists in the animation_state table (for Around the Clock)
-        try:
-            game_data["target_hit"] = bool(animation_state['target_hit'])
-        except (KeyError, sqlite3.OperationalError):
-            game_data["target_hit"] = False
+        # Pass the target_hit flag (for Around the Clock)
+        game_data["target_hit"] = bool(animation_state['target_hit'])
             
-        # Pass cricket_event if it exists in the animation_state table (for Cricket)
-        try:
-            if animation_state['cricket_event']:
-                game_data["cricket_event"] = animation_state['cricket_event']
-        except (KeyError, sqlite3.OperationalError):
-            pass  # Skip if the column doesn't exist
+        # Pass the cricket_event if there is one (for Cricket)
+        if animation_state['cricket_event']:
+            game_data["cricket_event"] = animation_state['cricket_event']
         
         if animation_type in ['bust', 'third_throw', 'win']:
             # For these animations, we want to show the throw but not advance player yet
@@ -820,29 +987,20 @@ def data_json():
     current_throws = []
     
     if animation_state and animation_state['animating'] == 1 and animation_state['animation_type'] == 'third_throw':
-        # IMPORTANT: For third throw animation, we need to get the throw data from turn_scores
+        # IMPORTANT: For third throw animation, we need to get the throw data from throws
         # This ensures the third throw is visible during animation
         anim_turn = animation_state['turn_number']
         anim_player = animation_state['player_id']
         
         cursor = conn.cursor()
-        cursor.execute('''
-            SELECT 
-                throw1, throw1_multiplier, throw1_points,
-                throw2, throw2_multiplier, throw2_points,
-                throw3, throw3_multiplier, throw3_points
-            FROM turn_scores
-            WHERE turn_number = ? AND player_id = ?
-        ''', (anim_turn, anim_player))
-        
-        row = cursor.fetchone()
-        if row:
-            # Create throw objects from turn_scores data
-            current_throws = [
-                {"throw_number": 1, "score": row['throw1'], "multiplier": row['throw1_multiplier'], "points": row['throw1_points']},
-                {"throw_number": 2, "score": row['throw2'], "multiplier": row['throw2_multiplier'], "points": row['throw2_points']},
-                {"throw_number": 3, "score": row['throw3'], "multiplier": row['throw3_multiplier'], "points": row['throw3_points']}
-            ]
+        cursor.execute(
+            f'SELECT 1 FROM turn_scores WHERE game_id = {CURRENT_GAME} AND turn_number = ? AND player_id = ?',
+            (anim_turn, anim_player)
+        )
+        
+        if cursor.fetchone():
+            # Create throw objects from the recorded darts
+            current_throws = get_turn_throws(conn, anim_turn, anim_player, empty=None)
         else:
             # Fall back to current_throws if no turn_scores data
             for throw_row in conn.execute('SELECT throw_number, points, score, multiplier FROM current_throws ORDER BY throw_number'):
@@ -883,12 +1041,12 @@ def data_json():
     
     # Get turns and scores
     turns = []
-    for turn_row in conn.execute('SELECT turn_number FROM turns ORDER BY turn_number'):
+    for turn_row in conn.execute(f'SELECT turn_number FROM turns WHERE game_id = {CURRENT_GAME} ORDER BY turn_number'):
         turn_number = turn_row['turn_number']
         
         # Get scores for this turn
         scores = []
-        for score_row in conn.execute('SELECT player_id, points, bust FROM turn_scores WHERE turn_number = ? ORDER BY player_id', (turn_number,)):
+        for score_row in conn.execute(f'SELECT player_id, points, bust FROM turn_scores WHERE game_id = {CURRENT_GAME} AND turn_number = ? ORDER BY player_id', (turn_number,)):
             scores.append({
                 "player_id": score_row['player_id'],
                 "points": score_row['points'],
@@ -904,492 +1062,349 @@ def data_json():
     # Close the connection
     conn.close()
     
-    return jsonify(game_data)
+    return game_data
 
-@app.route('/update_throw', methods=['POST'])
-def update_throw():
-    """Update a specific throw for a player in a turn"""
+def build_system_state():
+    """Read the CV system state, treating a missing state as ready"""
     try:
-        # Get the data from the request
-        data = request.json
-        turn_number = data.get('turn_number')
-        player_id = data.get('player_id')
-        throw_number = data.get('throw_number')
-        score = data.get('score')
-        multiplier = data.get('multiplier')
-        
-        # Validate inputs
-        if not all([turn_number, player_id, throw_number, score, multiplier]):
-            return jsonify({'error': 'Missing required fields'}), 400
-            
-        # Calculate points
-        points = score * multiplier
+        conn = db_setup.connect('simulation/cv_data.db')
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        cursor.execute('SELECT ready_for_throw, last_updated FROM system_state WHERE id = 1')
+        state = cursor.fetchone()
+        conn.close()
         
-        # Get connection to database
-        conn = get_db_connection()
+        if state:
+            return {
+                'ready_for_throw': bool(state['ready_for_throw']),
+                'last_updated': state['last_updated']
+            }
+        return {'ready_for_throw': True, 'error': 'No state found'}
+    except Exception as e:
+        return {'ready_for_throw': True, 'error': str(e)}
+
+def build_cricket_scores():
+    """Get all cricket scores for all players in format needed by the UI"""
+    with get_db_connection() as conn:
         cursor = conn.cursor()
         
-        # Update the last throw table to reflect this manual override
-        cursor.execute('''
-            UPDATE last_throw
-            SET score = ?, multiplier = ?, points = ?, player_id = ?
-            WHERE id = 1
-        ''', (score, multiplier, points, player_id))
-        
-        # Get current game state
-        game_state = cursor.execute('SELECT current_turn, current_player, game_over FROM game_state WHERE id = 1').fetchone()
-        current_turn = game_state['current_turn']
-        current_player = game_state['current_player']
-        game_over = game_state['game_over']
-        
-        # Store the initial game_over state to detect transitions
-        was_previously_game_over = game_over
-        
-        # First, clear any active animations since we're manually overriding
-        reset_animation_state(conn)
-        
-        # Make sure the turn exists
-        cursor.execute('SELECT 1 FROM turns WHERE turn_number = ?', (turn_number,))
-        if not cursor.fetchone():
-            cursor.execute('INSERT INTO turns (turn_number) VALUES (?)', (turn_number,))
-        
-        # Check if this is a current turn override or past turn modification
-        is_current_turn_override = (turn_number == current_turn and player_id == current_player and not game_over)
-        
-        # Store original bust status if modifying existing turn
-        was_previously_bust = False
-        score_before_turn = get_player_score_before_turn(conn, player_id, turn_number)
-        
-        # Different handling based on whether this is for the current turn or a past turn
-        if is_current_turn_override:
-            # This is the current player's current turn
-            # Update the throw in current_throws
-            cursor.execute(
-                'UPDATE current_throws SET score = ?, multiplier = ?, points = ? WHERE throw_number = ?',
-                (score, multiplier, points, throw_number)
-            )
-            
-            # Calculate total points for current throws
-            cursor.execute('SELECT SUM(points) as total_points FROM current_throws')
-            total_current_points = cursor.fetchone()['total_points'] or 0
+        # Get all cricket scores for the current game
+        cursor.execute(f'''
+            SELECT cs.player_id, cs.number, cs.marks, cs.points, cs.closed, p.name
+            FROM cricket_scores cs
+            JOIN players p ON p.game_id = cs.game_id AND p.id = cs.player_id
+            WHERE cs.game_id = {CURRENT_GAME}
+            ORDER BY cs.player_id, cs.number
+        ''')
+        
+        # Create a structured response
+        scores_by_player = {}
+        for row in cursor.fetchall():
+            player_id = row['player_id']
+            if player_id not in scores_by_player:
+                scores_by_player[player_id] = {
+                    'name': row['name'],
+                    'numbers': {},
+                    'total_points': 0
+                }
             
-            # Check if there's an existing score for this turn/player
-            cursor.execute(
-                'SELECT bust FROM turn_scores WHERE turn_number = ? AND player_id = ?',
-                (turn_number, player_id)
-            )
-            existing_score = cursor.fetchone()
+            # Add the number's details
+            number = row['number']
+            scores_by_player[player_id]['numbers'][number] = {
+                'marks': row['marks'],
+                'points': row['points'],
+                'closed': row['closed'] == 1
+            }
             
-            if existing_score:
-                was_previously_bust = existing_score['bust']
+            # Update total points
+            scores_by_player[player_id]['total_points'] += row['points']
+        
+        return scores_by_player
+
+def get_state_version():
+    """Get the current game state version"""
+    conn = get_db_connection()
+    try:
+        row = conn.execute('SELECT version FROM state_version WHERE id = 1').fetchone()
+        return row['version'] if row else 0
+    finally:
+        conn.close()
+
+@app.route('/data_json')
+@offload_db
+def data_json():
+    return jsonify(build_game_data())
+
+@app.route('/sync')
+@offload_db
+def sync():
+    """Combined game data, system state and cricket scores for the client sync loop"""
+    game_data = build_game_data()
+    payload = {
+        'game': game_data,
+        'system_state': build_system_state(),
+        'state_version': get_state_version()
+    }
+    
+    # Only cricket screens need the per-number scoreboard
+    if game_data['game_mode'] == 'cricket':
+        payload['cricket_scores'] = build_cricket_scores()
+    
+    payload['stats'] = build_player_stats()
+    
+    # Let the browser revalidate with an ETag so unchanged polls come back as 304s
+    response = jsonify(payload)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.add_etag()
+    return response.make_conditional(request)
+
+@app.route('/update_throw', methods=['POST'])
+@offload_db
+def update_throw():
+    """Update a specific throw for a player in a turn"""
+    try:
+        data = request.json or {}
+        correction, error = parse_throw_correction(data)
+        if error:
+            return jsonify({'error': f'Throw {error}'}), 400
+        turn_number, player_id, throw_number, score, multiplier = correction
+        points = score * multiplier
+        
+        db = game_and_leds_db()
+        try:
+            with db.transaction() as conn:
+                cursor = conn.cursor()
                 
-                # Get current throw details
-                cursor.execute(
-                    '''SELECT 
-                        throw_number, score, multiplier, points 
-                    FROM current_throws 
-                    ORDER BY throw_number'''
-                )
-                throw_details = cursor.fetchall()
+                game_state = cursor.execute('SELECT current_turn, current_player, game_over FROM game_state WHERE id = 1').fetchone()
+                current_turn = game_state['current_turn']
+                current_player = game_state['current_player']
+                was_previously_game_over = bool(game_state['game_over'])
                 
-                # Check if this would result in a bust
-                new_score = score_before_turn - total_current_points
-                is_bust = (new_score < 0)
+                player_ids = {row['id'] for row in cursor.execute(f'SELECT id FROM players WHERE game_id = {CURRENT_GAME}')}
+                error = correction_game_error(player_ids, current_turn, turn_number, player_id)
+                if error:
+                    return jsonify({'error': f'Throw {error}'}), 400
                 
-                # If it's a bust, the points for the turn should be 0
-                points_to_record = 0 if is_bust else total_current_points
+                row = cursor.execute(
+                    f'SELECT bust FROM turn_scores WHERE game_id = {CURRENT_GAME} AND turn_number = ? AND player_id = ?',
+                    (turn_number, player_id)
+                ).fetchone()
+                was_previously_bust = bool(row and row['bust'])
                 
-                # Update existing score with all throw details
-                cursor.execute(
-                    '''UPDATE turn_scores 
-                    SET points = ?,
-                        throw1 = ?, throw1_multiplier = ?, throw1_points = ?,
-                        throw2 = ?, throw2_multiplier = ?, throw2_points = ?,
-                        throw3 = ?, throw3_multiplier = ?, throw3_points = ?,
-                        bust = ?
-                    WHERE turn_number = ? AND player_id = ?''',
-                    (
-                        points_to_record,  # 0 if bust, otherwise the actual points
-                        throw_details[0]['score'], throw_details[0]['multiplier'], throw_details[0]['points'],
-                        throw_details[1]['score'], throw_details[1]['multiplier'], throw_details[1]['points'],
-                        throw_details[2]['score'], throw_details[2]['multiplier'], throw_details[2]['points'],
-                        1 if is_bust else 0,
-                        turn_number, player_id
-                    )
-                )
-            else:
-                # Get current throw details
-                cursor.execute(
-                    '''SELECT 
-                        throw_number, score, multiplier, points 
-                    FROM current_throws 
-                    ORDER BY throw_number'''
-                )
-                throw_details = cursor.fetchall()
+                # Manual corrections cancel any animation in progress
+                reset_animation_state(conn, commit=False)
                 
-                # Check if this would result in a bust
-                new_score = score_before_turn - total_current_points
-                is_bust = (new_score < 0)
+                live_turn = (turn_number == current_turn and player_id == current_player and not was_previously_game_over)
+                apply_throw_correction(conn, turn_number, player_id, throw_number, score, multiplier, live_turn, data.get('hit_target'))
                 
-                # If it's a bust, the points for the turn should be 0
-                points_to_record = 0 if is_bust else total_current_points
+                # A correction can end the turn in play or hand back one a bust cut short
+                position = move_play_after_correction(conn, turn_number, player_id, was_previously_bust)
                 
-                # Insert new score entry with all throw details
-                cursor.execute(
-                    '''INSERT INTO turn_scores (
-                        turn_number, player_id, points,
-                        throw1, throw1_multiplier, throw1_points,
-                        throw2, throw2_multiplier, throw2_points,
-                        throw3, throw3_multiplier, throw3_points,
-                        bust
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-                    (
-                        turn_number, player_id, points_to_record,  # 0 if bust, otherwise the actual points
-                        throw_details[0]['score'], throw_details[0]['multiplier'], throw_details[0]['points'],
-                        throw_details[1]['score'], throw_details[1]['multiplier'], throw_details[1]['points'],
-                        throw_details[2]['score'], throw_details[2]['multiplier'], throw_details[2]['points'],
-                        1 if is_bust else 0
-                    )
-                )
+                # Busts and standings depend on earlier darts, so the game is rebuilt
+                # from its event log whatever the mode
+                projection = rebuild_corrected_game(conn, [player_id])
                 
-            # Handle bust status change
-            bust_status_changed = (was_previously_bust != is_bust)
-            
-            # Handle "rewind" if a bust is corrected and it wasn't the third throw
-            if bust_status_changed and was_previously_bust and not is_bust and throw_number < 3:
-                # We corrected a bust, and it's not the third throw, so player can continue their turn
+                cursor.execute('''
+                    UPDATE last_throw
+                    SET score = ?, multiplier = ?, points = ?, player_id = ?
+                    WHERE id = 1
+                ''', (score, multiplier, points, player_id))
                 
-                # We don't need to change anything - player is already the current player
-                # Just indicate in the response that the turn should continue
-                continue_turn = True
+                won = projection['game_over'] and not was_previously_game_over
+                if won:
+                    start_win_animation(conn, turn_number, player_id, throw_number)
                 
-                print(f"Bust corrected via manual override! Player {player_id} can continue their turn.")
-            else:
-                continue_turn = False
+                # Light the board for where play is now
+                sync_leds_state(db, conn, position[1], projection)
                 
-                # Check if we need to advance to the next turn/player
-                should_advance = False
+                state_version = bump_state_version(conn)
+        finally:
+            db.close()
+        
+        is_bust = projection['turn_scores'].get((turn_number, player_id), (0, False))[1]
+        response_data = {
+            'message': f'Throw updated successfully! Points: {points}',
+            'score': score,
+            'points': points,
+            'new_total': projection['totals'].get(player_id),
+            'is_bust': is_bust,
+            'was_previously_bust': was_previously_bust,
+            'bust_status_changed': (was_previously_bust != is_bust),
+            'was_previously_game_over': was_previously_game_over,
+            'state_version': state_version
+        }
+        
+        if won:
+            response_data['game_over'] = True
+            response_data['winner'] = player_id
+        elif position == (turn_number, player_id) and not projection['game_over']:
+            # The corrected turn is still being played
+            response_data['continue_turn'] = True
+            if position != (current_turn, current_player):
+                # This is for correcting a previous player's bust
+                response_data['rewound_turn'] = True
+                response_data['current_turn'] = turn_number
+                response_data['current_player'] = player_id
+        elif position != (current_turn, current_player):
+            response_data['advanced_turn'] = True
+            response_data['next_turn'], response_data['next_player'] = position
+        
+        return jsonify(response_data)
+        
+    except Exception as e:
+        # Log the error
+        print(f"Error updating throw: {e}")
+        
+        # Return error response
+        return jsonify({'error': str(e)}), 500
+    
+
+@app.route('/update_throws_batch', methods=['POST'])
+@offload_db
+def update_throws_batch():
+    """Apply a list of throw corrections in one transaction and recalculate scores once"""
+    try:
+        data = request.json or {}
+        corrections = data.get('corrections') or []
+        
+        if not corrections:
+            return jsonify({'error': 'No corrections supplied'}), 400
+        
+        # Validate everything up front so a bad entry never leaves a half-applied batch
+        parsed = []
+        for index, correction in enumerate(corrections):
+            parsed_correction, error = parse_throw_correction(correction)
+            if error:
+                return jsonify({'error': f'Correction {index + 1} {error}'}), 400
+            parsed.append(parsed_correction)
+        
+        db = game_and_leds_db()
+        try:
+            with db.transaction() as conn:
+                cursor = conn.cursor()
                 
-                if is_bust:
-                    # If it's a bust, always advance IMMEDIATELY regardless of throw number
-                    should_advance = True
-                    print(f"Bust detected via manual override! Immediately advancing to next player.")
-                elif throw_number == 3:
-                    # If it's the third throw and not a bust, advance
-                    should_advance = True
-                    print(f"Third throw via manual override. Advancing to next player.")
+                game_state = cursor.execute('SELECT current_turn, current_player, game_over FROM game_state WHERE id = 1').fetchone()
+                current_turn = game_state['current_turn']
+                current_player = game_state['current_player']
                 
-                if should_advance:
-                    # Calculate next player and turn
-                    player_count = cursor.execute('SELECT COUNT(*) as count FROM players').fetchone()['count']
-                    next_player = current_player % player_count + 1  # Cycle to next player (1-based)
-                    next_turn = current_turn + (1 if next_player == 1 else 0)  # Increment turn if we wrapped around
-                    
-                    # Update game state
-                    cursor.execute(
-                        'UPDATE game_state SET current_player = ?, current_turn = ? WHERE id = 1',
-                        (next_player, next_turn)
-                    )
-                    
-                    # Reset current throws
-                    cursor.execute('UPDATE current_throws SET points = 0, score = 0, multiplier = 0')
-                    
-                    print(f"Manual override: Advanced to Player {next_player}, Turn {next_turn}")
+                player_ids = {row['id'] for row in cursor.execute(f'SELECT id FROM players WHERE game_id = {CURRENT_GAME}')}
+                for index, (turn_number, player_id, _, _, _) in enumerate(parsed):
+                    error = correction_game_error(player_ids, current_turn, turn_number, player_id)
+                    if error:
+                        return jsonify({'error': f'Correction {index + 1} {error}'}), 400
                 
-        else:
-            # This is a past turn or different player
-            # Get existing turn data and check if it was previously a bust
-            cursor.execute(
-                'SELECT bust, throw1_points, throw2_points, throw3_points FROM turn_scores WHERE turn_number = ? AND player_id = ?',
-                (turn_number, player_id)
-            )
-            existing_turn = cursor.fetchone()
-            if existing_turn:
-                was_previously_bust = existing_turn['bust']
-            
-            # Get existing turn data
-            cursor.execute(
-                '''SELECT 
-                    throw1, throw1_multiplier, throw1_points,
-                    throw2, throw2_multiplier, throw2_points,
-                    throw3, throw3_multiplier, throw3_points,
-                    points, bust
-                FROM turn_scores 
-                WHERE turn_number = ? AND player_id = ?''',
-                (turn_number, player_id)
-            )
-            
-            row = cursor.fetchone()
-            
-            if row:
-                # Update the specific throw while keeping other throws the same
-                throw_column = f'throw{throw_number}'
-                multiplier_column = f'throw{throw_number}_multiplier'
-                points_column = f'throw{throw_number}_points'
+                # Manual corrections cancel any animation in progress
+                reset_animation_state(conn, commit=False)
                 
-                # Calculate the new total points directly from all throws
-                # First, get current throw details
-                throw1_points = row['throw1_points']
-                throw2_points = row['throw2_points']
-                throw3_points = row['throw3_points']
+                # Apply and log every throw, remembering whose darts changed
+                corrected_players = set()
+                for turn_number, player_id, throw_number, score, multiplier in parsed:
+                    live_turn = (turn_number == current_turn and player_id == current_player and not game_state['game_over'])
+                    apply_throw_correction(conn, turn_number, player_id, throw_number, score, multiplier, live_turn)
+                    corrected_players.add(player_id)
                 
-                # Replace the specified throw with new points
-                if throw_number == 1:
-                    new_total_points = points + throw2_points + throw3_points
-                elif throw_number == 2:
-                    new_total_points = throw1_points + points + throw3_points
-                else:  # throw_number == 3
-                    new_total_points = throw1_points + throw2_points + points
+                # Darts filled in or changed in the turn in play can end it
+                position = move_play_after_correction(conn, current_turn, current_player)
                 
-                # Check if this update would cause a bust
-                new_score = score_before_turn - new_total_points
-                is_bust = (new_score < 0)
+                # Busts and standings depend on earlier darts, so the whole game is
+                # rebuilt from its event log once for the batch, whatever the mode
+                projection = rebuild_corrected_game(conn, corrected_players)
+                sync_leds_state(db, conn, position[1], projection)
                 
-                # If busted, set recorded points to 0, otherwise use the calculated sum
-                points_to_record = 0 if is_bust else new_total_points
+                # Show the last correction in the last throw panel
+                turn_number, player_id, throw_number, score, multiplier = parsed[-1]
+                if projection['game_over'] and not game_state['game_over']:
+                    start_win_animation(conn, turn_number, player_id, throw_number)
+                cursor.execute('''
+                    UPDATE last_throw
+                    SET score = ?, multiplier = ?, points = ?, player_id = ?
+                    WHERE id = 1
+                ''', (score, multiplier, score * multiplier, player_id))
+                
+                state_version = bump_state_version(conn)
+            
+            players = cursor.execute(f'SELECT id, total_score FROM players WHERE game_id = {CURRENT_GAME} ORDER BY id').fetchall()
+            game_over = cursor.execute('SELECT game_over FROM game_state WHERE id = 1').fetchone()['game_over']
+        finally:
+            db.close()
+        
+        return jsonify({
+            'message': f'{len(parsed)} throws updated successfully!',
+            'applied': len(parsed),
+            'state_version': state_version,
+            'game_over': bool(game_over),
+            'current_turn': position[0],
+            'current_player': position[1],
+            'players': [{'id': player['id'], 'total_score': player['total_score']} for player in players]
+        })
+        
+    except Exception as e:
+        # Log the error
+        print(f"Error applying batch throw update: {e}")
+        
+        # Return error response
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/undo_throw', methods=['POST'])
+@offload_db
+def undo_throw():
+    """Take back the last dart of the game in play, rebuilding the scores from the event log"""
+    try:
+        db = game_and_leds_db()
+        try:
+            with db.transaction() as conn:
+                cursor = conn.cursor()
                 
-                # Update query with specific throw fields
-                update_query = f'''
-                UPDATE turn_scores 
-                SET {throw_column} = ?, 
-                    {multiplier_column} = ?, 
-                    {points_column} = ?,
-                    points = ?,
-                    bust = ?
-                WHERE turn_number = ? AND player_id = ?
-                '''
+                undone = event_log.undo_last_throw(conn)
+                if undone is None:
+                    return jsonify({'error': 'No throw to undo'}), 400
+                (turn_number, player_id, throw_number), state, projection = undone
                 
+                # Remove the dart and put play back on its turn
                 cursor.execute(
-                    update_query,
-                    (score, multiplier, points, points_to_record, 1 if is_bust else 0, turn_number, player_id)
+                    f'DELETE FROM throws WHERE game_id = {CURRENT_GAME} AND turn_number = ? AND player_id = ? AND dart_index = ?',
+                    (turn_number, player_id, throw_number)
                 )
-                
-                # Special handling for correcting a past bust
-                if was_previously_bust and not is_bust:
-                    print(f"Corrected bust for player {player_id}, turn {turn_number}")
-                    
-                    # If this wasn't the third throw, and it's the previous turn, we might need to "rewind"
-                    # Check if this is the turn right before the current turn
-                    if (throw_number < 3 and 
-                        ((turn_number == current_turn - 1) or 
-                         (turn_number == current_turn and player_id < current_player))):
-                        
-                        print(f"This was a recent bust correction. Allowing player {player_id} to continue their turn.")
-                        
-                        # We need to rewind the game state to allow this player to continue their turn
-                        cursor.execute(
-                            'UPDATE game_state SET current_turn = ?, current_player = ? WHERE id = 1',
-                            (turn_number, player_id)
-                        )
-                        
-                        # Re-query the database to get the UPDATED throw data
-                        cursor.execute(
-                            '''SELECT 
-                                throw1, throw1_multiplier, throw1_points,
-                                throw2, throw2_multiplier, throw2_points,
-                                throw3, throw3_multiplier, throw3_points
-                            FROM turn_scores 
-                            WHERE turn_number = ? AND player_id = ?''',
-                            (turn_number, player_id)
-                        )
-                        updated_row = cursor.fetchone()
-                        
-                        # Update current_throws to reflect the UPDATED throws
-                        cursor.execute('DELETE FROM current_throws')
-                        cursor.execute('INSERT INTO current_throws (throw_number, points, score, multiplier) VALUES (1, ?, ?, ?)', 
-                                      (updated_row['throw1_points'], updated_row['throw1'], updated_row['throw1_multiplier']))
-                        cursor.execute('INSERT INTO current_throws (throw_number, points, score, multiplier) VALUES (2, ?, ?, ?)', 
-                                      (updated_row['throw2_points'], updated_row['throw2'], updated_row['throw2_multiplier']))
-                        cursor.execute('INSERT INTO current_throws (throw_number, points, score, multiplier) VALUES (3, ?, ?, ?)', 
-                                      (updated_row['throw3_points'], updated_row['throw3'], updated_row['throw3_multiplier']))
-                        
-                        # Set response flag to indicate turn was rewound
-                        rewound_turn = True
-            else:
-                # Create a new record with just this throw
-                throw1 = 0
-                throw1_multiplier = 0
-                throw1_points = 0
-                throw2 = 0
-                throw2_multiplier = 0
-                throw2_points = 0
-                throw3 = 0
-                throw3_multiplier = 0
-                throw3_points = 0
-                
-                # Set the appropriate throw values
-                if throw_number == 1:
-                    throw1 = score
-                    throw1_multiplier = multiplier
-                    throw1_points = points
-                elif throw_number == 2:
-                    throw2 = score
-                    throw2_multiplier = multiplier
-                    throw2_points = points
-                elif throw_number == 3:
-                    throw3 = score
-                    throw3_multiplier = multiplier
-                    throw3_points = points
-                
-                # Check if this would result in a bust
-                new_score = score_before_turn - points
-                is_bust = (new_score < 0)
-                
-                # Set points to 0 if busted
-                points_to_record = 0 if is_bust else points
-                
                 cursor.execute(
-                    '''INSERT INTO turn_scores (
-                        turn_number, player_id, points,
-                        throw1, throw1_multiplier, throw1_points,
-                        throw2, throw2_multiplier, throw2_points,
-                        throw3, throw3_multiplier, throw3_points,
-                        bust
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-                    (
-                        turn_number, player_id, points_to_record,
-                        throw1, throw1_multiplier, throw1_points,
-                        throw2, throw2_multiplier, throw2_points,
-                        throw3, throw3_multiplier, throw3_points,
-                        1 if is_bust else 0
-                    )
+                    'UPDATE game_state SET current_turn = ?, current_player = ?, game_over = ? WHERE id = 1',
+                    (state['current_turn'], state['current_player'], 1 if projection['game_over'] else 0)
                 )
-            
-            # Recalculate all player scores after modifying past turn
-            recalculate_player_scores(conn)
-            
-            # Check if we transitioned from game-over to active game
-            cursor.execute('SELECT game_over FROM game_state WHERE id = 1')
-            new_game_over = cursor.fetchone()['game_over']
-            
-            if was_previously_game_over and not new_game_over and turn_number == current_turn and player_id == current_player:
-                # We've un-won the game on the current turn/player
-                # We need to sync current_throws with the updated turn_scores
-                cursor.execute('''
-                    SELECT 
-                        throw1, throw1_multiplier, throw1_points,
-                        throw2, throw2_multiplier, throw2_points,
-                        throw3, throw3_multiplier, throw3_points,
-                        bust
-                    FROM turn_scores
-                    WHERE turn_number = ? AND player_id = ?
-                ''', (turn_number, player_id))
                 
-                updated_throws = cursor.fetchone()
-                if updated_throws:
-                    # Update current_throws with the actual values from turn_scores
-                    cursor.execute('UPDATE current_throws SET score = ?, multiplier = ?, points = ? WHERE throw_number = ?',
-                                  (updated_throws['throw1'], updated_throws['throw1_multiplier'], updated_throws['throw1_points'], 1))
-                    cursor.execute('UPDATE current_throws SET score = ?, multiplier = ?, points = ? WHERE throw_number = ?',
-                                  (updated_throws['throw2'], updated_throws['throw2_multiplier'], updated_throws['throw2_points'], 2))
-                    cursor.execute('UPDATE current_throws SET score = ?, multiplier = ?, points = ? WHERE throw_number = ?',
-                                  (updated_throws['throw3'], updated_throws['throw3_multiplier'], updated_throws['throw3_points'], 3))
+                # Show the darts left in that turn again
+                show_turn_throws(conn, turn_number, player_id)
                 
-                    # Check if we need to advance to the next player
-                    should_advance_after_unwin = False
-                    
-                    # If it was the third throw or it's a bust, we should advance to the next player
-                    if throw_number == 3 or updated_throws['bust'] == 1:
-                        should_advance_after_unwin = True
-                        
-                    if should_advance_after_unwin:
-                        # Calculate next player and turn
-                        player_count = cursor.execute('SELECT COUNT(*) as count FROM players').fetchone()['count']
-                        next_player = player_id % player_count + 1  # Cycle to next player (1-based)
-                        next_turn = turn_number + (1 if next_player == 1 else 0)  # Increment turn if we wrapped around
-                        
-                        # Update game state
-                        cursor.execute(
-                            'UPDATE game_state SET current_player = ?, current_turn = ? WHERE id = 1',
-                            (next_player, next_turn)
-                        )
-                        
-                        # Reset current throws
-                        cursor.execute('UPDATE current_throws SET points = 0, score = 0, multiplier = 0')
-                        
-                        print(f"Un-won game: Advanced to Player {next_player}, Turn {next_turn}")
-                        
-                        # Set flag for the response
-                        advanced_after_unwin = True
+                cursor.execute('UPDATE last_throw SET score = 0, multiplier = 0, points = 0, player_id = NULL WHERE id = 1')
+                reset_animation_state(conn, commit=False)
+                player_stats.rebuild_player_stats(conn, player_id)
                 
-                print(f"Game un-won! Current throws updated to match modified throw data.")
-        
-        # Commit changes
-        conn.commit()
-        
-        # Check for game over after all updates
-        cursor.execute('SELECT total_score FROM players WHERE id = ?', (player_id,))
-        player_score = cursor.fetchone()['total_score']
-        
-        # Initialize response data
-        response_data = {
-            'message': f'Throw updated successfully! Points: {points}',
-            'points': points,
-            'new_total': player_score,
-            'is_bust': is_bust,
-            'was_previously_bust': was_previously_bust,
-            'bust_status_changed': (was_previously_bust != is_bust),
-            'was_previously_game_over': was_previously_game_over
-        }
-        
-        # Add info about advancing after un-winning if applicable
-        if 'advanced_after_unwin' in locals() and advanced_after_unwin:
-            response_data['advanced_after_unwin'] = True
-            response_data['next_player'] = next_player
-            response_data['next_turn'] = next_turn
-        
-        # Check if player has won (score exactly 0)
-        if player_score == 0:
-            cursor.execute('UPDATE game_state SET game_over = 1 WHERE id = 1')
-            
-            # Set win animation state
-            current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            cursor.execute('''
-                UPDATE animation_state 
-                SET animating = 1, 
-                    animation_type = ?, 
-                    turn_number = ?, 
-                    player_id = ?, 
-                    throw_number = ?, 
-                    timestamp = ?,
-                    next_turn = NULL,
-                    next_player = NULL
-                WHERE id = 1
-            ''', ('win', turn_number, player_id, throw_number, current_time))
-            
-            conn.commit()
+                # Unlight whatever the undone dart closed or advanced on the board
+                sync_leds_state(db, conn, state['current_player'], projection)
+                
+                state_version = bump_state_version(conn)
             
-            # Add info about win to response data
-            response_data['game_over'] = True
-            response_data['winner'] = player_id
-        
-        # Add info about turn advancement if applicable
-        if is_current_turn_override:
-            if is_bust or throw_number == 3:
-                response_data['advanced_turn'] = True
-                response_data['next_player'] = (current_player % cursor.execute('SELECT COUNT(*) FROM players').fetchone()[0]) + 1
-            elif 'continue_turn' in locals() and continue_turn:
-                response_data['continue_turn'] = True
-        elif 'rewound_turn' in locals() and rewound_turn:
-            # This is for correcting a previous player's bust
-            response_data['rewound_turn'] = True
-            response_data['current_turn'] = turn_number
-            response_data['current_player'] = player_id
-        
-        # Close connection
-        conn.close()
+            players = cursor.execute(f'SELECT id, total_score FROM players WHERE game_id = {CURRENT_GAME} ORDER BY id').fetchall()
+        finally:
+            db.close()
         
-        return jsonify(response_data)
+        return jsonify({
+            'message': f'Undid throw {throw_number} of Player {player_id}, Turn {turn_number}',
+            'turn_number': turn_number,
+            'player_id': player_id,
+            'throw_number': throw_number,
+            'state_version': state_version,
+            'game_over': projection['game_over'],
+            'players': [{'id': player['id'], 'total_score': player['total_score']} for player in players]
+        })
         
     except Exception as e:
         # Log the error
-        print(f"Error updating throw: {e}")
+        print(f"Error undoing throw: {e}")
         
         # Return error response
         return jsonify({'error': str(e)}), 500
-    
 
 @app.route('/get_throw_details', methods=['GET'])
+@offload_db
 def get_throw_details():
     """Get details of individual throws for a specific turn and player"""
     try:
@@ -1421,41 +1436,23 @@ def get_throw_details():
             
             # Check if there's a bust for the current turn/player
             cursor.execute(
-                'SELECT bust FROM turn_scores WHERE turn_number = ? AND player_id = ?',
+                f'SELECT bust FROM turn_scores WHERE game_id = {CURRENT_GAME} AND turn_number = ? AND player_id = ?',
                 (turn_number, player_id)
             )
             row = cursor.fetchone()
             if row:
                 bust = row['bust']
         else:
-            # For past turns, get from turn_scores
-            cursor.execute('''
-                SELECT 
-                    throw1 as score1, throw1_multiplier as multiplier1, throw1_points as points1,
-                    throw2 as score2, throw2_multiplier as multiplier2, throw2_points as points2,
-                    throw3 as score3, throw3_multiplier as multiplier3, throw3_points as points3,
-                    bust
-                FROM turn_scores 
-                WHERE turn_number = ? AND player_id = ?
-            ''', (turn_number, player_id))
+            # For past turns, get the recorded darts
+            throws = get_turn_throws(conn, turn_number, player_id)
             
+            cursor.execute(
+                f'SELECT bust FROM turn_scores WHERE game_id = {CURRENT_GAME} AND turn_number = ? AND player_id = ?',
+                (turn_number, player_id)
+            )
             row = cursor.fetchone()
-            
             if row:
-                # Convert row data to throw objects
-                throws = [
-                    {"throw_number": 1, "score": row['score1'], "multiplier": row['multiplier1'], "points": row['points1']},
-                    {"throw_number": 2, "score": row['score2'], "multiplier": row['multiplier2'], "points": row['points2']},
-                    {"throw_number": 3, "score": row['score3'], "multiplier": row['multiplier3'], "points": row['points3']}
-                ]
                 bust = row['bust']
-            else:
-                # No data found, return empty throws
-                throws = [
-                    {"throw_number": 1, "score": 0, "multiplier": 0, "points": 0},
-                    {"throw_number": 2, "score": 0, "multiplier": 0, "points": 0},
-                    {"throw_number": 3, "score": 0, "multiplier": 0, "points": 0}
-                ]
         
         conn.close()
         
@@ -1470,43 +1467,22 @@ def get_throw_details():
         print(f"Error getting throw details: {e}")
         return jsonify({'error': str(e)}), 500
 
+def build_player_stats():
+    """Live stats of every player in the current game, read from the running counters"""
+    with get_db_connection() as conn:
+        return player_stats.get_player_stats(conn)
+
+@app.route('/stats')
+@offload_db
+def stats():
+    """Live per-player stats (3-dart and first-9 averages, checkout %, doubles/trebles, cricket and Around the Clock rates)"""
+    return jsonify(build_player_stats())
+
 @app.route('/get_cricket_scores')
+@offload_db
 def get_cricket_scores():
     """Get all cricket scores for all players in format needed by the UI"""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        
-        # Get all cricket scores
-        cursor.execute('''
-            SELECT cs.player_id, cs.number, cs.marks, cs.points, cs.closed, p.name
-            FROM cricket_scores cs
-            JOIN players p ON cs.player_id = p.id
-            ORDER BY cs.player_id, cs.number
-        ''')
-        
-        # Create a structured response
-        scores_by_player = {}
-        for row in cursor.fetchall():
-            player_id = row['player_id']
-            if player_id not in scores_by_player:
-                scores_by_player[player_id] = {
-                    'name': row['name'],
-                    'numbers': {},
-                    'total_points': 0
-                }
-            
-            # Add the number's details
-            number = row['number']
-            scores_by_player[player_id]['numbers'][number] = {
-                'marks': row['marks'],
-                'points': row['points'],
-                'closed': row['closed'] == 1
-            }
-            
-            # Update total points
-            scores_by_player[player_id]['total_points'] += row['points']
-        
-        return jsonify(scores_by_player)
+    return jsonify(build_cricket_scores())
     
 @app.route('/reset_and_home')
 def reset_and_home():
@@ -1518,8 +1494,9 @@ def reset_and_home():
         # Reset the dart processor first if it's running
         stop_dart_processor()
         
-        # Reset the game database
-        initialize_database()
+        # Reset the game database on the DB pool; the processor is stopped from here
+        # because gevent only notices child processes exiting on its main loop
+        run_in_db_pool(initialize_database)
         
         # Flash a success message
         flash('Game database has been reset successfully!', 'success')
@@ -1546,39 +1523,28 @@ def index():
     )
 
 @app.route('/system_state')
+@offload_db
 def system_state():
     """Get the current system state"""
-    try:
-        conn = sqlite3.connect('simulation/cv_data.db')
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute('SELECT ready_for_throw, last_updated FROM system_state WHERE id = 1')
-        state = cursor.fetchone()
-        conn.close()
-        
-        if state:
-            return jsonify({
-                'ready_for_throw': bool(state['ready_for_throw']),
-                'last_updated': state['last_updated']
-            })
-        return jsonify({'ready_for_throw': True, 'error': 'No state found'})
-    except Exception as e:
-        return jsonify({'ready_for_throw': True, 'error': str(e)})
+    return jsonify(build_system_state())
     
 
 @app.route('/record_miss', methods=['POST'])
+@offload_db
 def record_miss():
     """Record a missed dart throw (one that went completely off the board)"""
     try:
         # Get current game state to determine player
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT current_player FROM game_state WHERE id = 1')
-            current_player = cursor.fetchone()['current_player']
+            cursor.execute('SELECT current_turn, current_player FROM game_state WHERE id = 1')
+            state = cursor.fetchone()
+            current_turn = state['current_turn']
+            current_player = state['current_player']
 
         # Connect to CV database to record the miss
         cv_db_path = 'simulation/cv_data.db'
-        conn = sqlite3.connect(cv_db_path)
+        conn = db_setup.connect(cv_db_path)
         cursor = conn.cursor()
         
         # Get current local time as a string in the format SQLite expects
@@ -1600,7 +1566,7 @@ def record_miss():
         
         # Also set the system as not ready for the next throw (just like a real throw)
         try:
-            conn = sqlite3.connect(cv_db_path)
+            conn = db_setup.connect(cv_db_path)
             cursor = conn.cursor()
             cursor.execute('''
                 UPDATE system_state 
@@ -1612,6 +1578,14 @@ def record_miss():
         except sqlite3.Error:
             pass  # If system_state table doesn't exist, that's okay
         
+        # Log the miss; the dart itself reaches the log through the dart processor like any other
+        conn = get_db_connection()
+        try:
+            event_log.append_event(conn, event_log.MISS_RECORDED, current_turn, current_player)
+            conn.commit()
+        finally:
+            conn.close()
+        
         # Return success response
         return jsonify({
             'success': True, 
@@ -1623,18 +1597,8 @@ def record_miss():
     
 
 
-@app.route('/start_game_moving_target', methods=['POST'])
-def start_game_moving_target():
-    """Initialize Moving Target game with the provided player names"""
-    player_count = int(request.form.get('player_count', 4))
-    reset_scores = request.form.get('reset_scores') == 'on'
-    
-    # Get player names from the form
-    player_names = {}
-    for i in range(1, player_count + 1):
-        name = request.form.get(f'player{i}', '').strip() or f'Player {i}'
-        player_names[i] = name
-    
+def write_moving_target_game(player_names, player_count, reset_scores):
+    """Store a Moving Target game in game.db and LEDs.db (runs on the DB pool)"""
     # If reset_scores is checked, reinitialize the database
     if reset_scores:
         # Reinitialize the database with custom player names and starting score 0
@@ -1646,10 +1610,12 @@ def start_game_moving_target():
         
         # Update game mode in config
         cursor.execute('UPDATE game_config SET game_mode = ?, processor_mode = ? WHERE id = 1', ('moving_target', 'moving_target'))
+        cursor.execute(f'UPDATE games SET game_mode = ? WHERE id = {CURRENT_GAME}', ('moving_target',))
+        log_game_started(conn, player_names, 0, 'moving_target')
         
         # Reset all player scores to 0 for Moving Target mode
         for player_id, name in player_names.items():
-            cursor.execute('UPDATE players SET name = ?, total_score = ? WHERE id = ?', 
+            cursor.execute(f'UPDATE players SET name = ?, total_score = ? WHERE game_id = {CURRENT_GAME} AND id = ?', 
                           (name, 0, player_id))
                           
         conn.commit()
@@ -1657,7 +1623,7 @@ def start_game_moving_target():
     
     # Update LEDs database with the game mode
     try:
-        with sqlite3.connect('leds/LEDs.db') as leds_conn:
+        with db_setup.connect('leds/LEDs.db') as leds_conn:
             leds_cursor = leds_conn.cursor()
             leds_cursor.execute("""
                 UPDATE game_mode 
@@ -1674,8 +1640,25 @@ def start_game_moving_target():
             
             leds_conn.commit()
             print("Updated LEDs.db game mode to 'moving_target'")
+            led_events.publish('mode', mode='moving_target')
     except Exception as e:
         print(f"Error updating LEDs database: {e}")
+
+@app.route('/start_game_moving_target', methods=['POST'])
+def start_game_moving_target():
+    """Initialize Moving Target game with the provided player names"""
+    player_count = int(request.form.get('player_count', 4))
+    reset_scores = request.form.get('reset_scores') == 'on'
+    
+    # Get player names from the form
+    player_names = {}
+    for i in range(1, player_count + 1):
+        name = request.form.get(f'player{i}', '').strip() or f'Player {i}'
+        player_names[i] = name
+    
+    # The SQLite work runs on the DB pool; the processor is started from here
+    # because gevent only notices child processes exiting on its main loop
+    run_in_db_pool(write_moving_target_game, player_names, player_count, reset_scores)
     
     # Start the moving target dart processor
     start_dart_processor(game_mode='moving_target')
@@ -1685,36 +1668,52 @@ def start_game_moving_target():
 
 
 
+def startup():
+    """Initialize the database and start the dart processor for the stored game mode"""
+    # In live mode, bring the durable game.db into RAM first (see live_state.py)
+    restore_live_database()
+    
+    # Initialize database before starting the app
+    initialize_database()
+    
+    # Every shared database should run in WAL mode with the shared connection settings
+    db_setup.verify_databases(['game.db', 'simulation/cv_data.db', 'leds/LEDs.db', 'leds/moving_target.db'])
+    
+    # Trim old games from the history in the background
+    start_retention()
+    
+    # In live mode, write game.db back to durable storage at turn boundaries and on exit
+    start_snapshots()
+    
+    # Get current game mode from the database
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('SELECT game_mode FROM game_config WHERE id = 1')
+    result = cursor.fetchone()
+    game_mode = result['game_mode'] if result else '301'
+    conn.close()
+    
+    # Determine the processor mode based on game_mode value
+    processor_mode = 'classic'  # Default
+    if game_mode in ['301', '501']:
+        processor_mode = 'classic'
+    elif game_mode == 'cricket':
+        processor_mode = 'cricket'
+    elif game_mode == 'around_clock':
+        processor_mode = 'around_clock'
+    
+    # Start the appropriate dart processor based on the current game mode
+    start_dart_processor(game_mode=processor_mode)
+    
+    # Register cleanup function to ensure dart processor is stopped on exit
+    atexit.register(stop_dart_processor)
+
 if __name__ == '__main__':
     try:
-        # Initialize database before starting the app
-        initialize_database()
-        
-        # Get current game mode from the database
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT game_mode FROM game_config WHERE id = 1')
-        result = cursor.fetchone()
-        game_mode = result['game_mode'] if result else '301'
-        conn.close()
-        
-        # Determine the processor mode based on game_mode value
-        processor_mode = 'classic'  # Default
-        if game_mode in ['301', '501']:
-            processor_mode = 'classic'
-        elif game_mode == 'cricket':
-            processor_mode = 'cricket'
-        elif game_mode == 'around_clock':
-            processor_mode = 'around_clock'
-        
-        # Start the appropriate dart processor based on the current game mode
-        start_dart_processor(game_mode=processor_mode)
-        
-        # Register cleanup function to ensure dart processor is stopped on exit
-        atexit.register(stop_dart_processor)
+        startup()
         
         # Run the Flask app
         app.run(debug=False)
     finally:
         # Make sure to clean up the dart processor when the app exits
-        stop_dart_processor()
\ No newline at end of file
+        stop_dart_processor()
@@ -0,0 +1,214 @@
+"""
+player_stats.py
+
+Live per-player statistics. The player_stats table holds one row of running
+counters per player per game. The dart processors add each dart's increments
+in the same transaction as the dart itself, so the stats cost one primary key
+upsert per throw and reading them never scans the throws table.
+
+The increments come from throw_stats(). The rebuild replays the throws table
+through the same function, so a rebuilt row always matches the live one.
+
+Usage:
+    python player_stats.py [--game GAME_ID]    # rebuild from the throws table
+"""
+
+import argparse
+
+from initialize_db import CURRENT_GAME
+from leds import db_setup
+
+# Counter columns of the player_stats table
+STAT_COLUMNS = ['darts', 'points', 'first9_darts', 'first9_points', 'doubles', 'trebles',
+                'checkout_darts', 'checkouts', 'turns', 'marks', 'targets_hit']
+
+# Scores that can be finished with a single dart (singles, doubles, trebles and both bulls)
+SINGLE_DART_FINISHES = frozenset(
+    [n * m for n in range(1, 21) for m in (1, 2, 3)] + [25, 50]
+)
+
+CRICKET_NUMBERS = (15, 16, 17, 18, 19, 20, 25)  # 25 is bullseye
+
+
+def cricket_marks(score, multiplier):
+    """Marks a dart scores on the cricket board"""
+    return multiplier if score in CRICKET_NUMBERS else 0
+
+
+def around_clock_hit(target, score):
+    """Whether a dart hits the around-the-clock target (21 stands for the bullseye)"""
+    if target is None:
+        return False
+    return score == (25 if target == 21 else target)
+
+
+def throw_stats(turn_number, dart_index, score, multiplier, points, remaining=None, turn_points=0, marks=0, hit_target=False):
+    """Counter increments for one dart
+
+    Args:
+        remaining (int, optional): X01 score left before this dart, used for busts and checkouts.
+        turn_points (int): X01 points already scored earlier in this turn.
+        marks (int): Cricket marks scored by this dart.
+        hit_target (bool): Around the Clock target hit by this dart.
+    """
+    # A bust throws away the turn, so the darts already counted this turn are taken back
+    scored = points
+    if remaining is not None and points > remaining:
+        scored = -turn_points
+
+    first9 = turn_number <= 3
+    checkout_dart = remaining is not None and remaining in SINGLE_DART_FINISHES
+    return {
+        'darts': 1,
+        'points': scored,
+        'first9_darts': 1 if first9 else 0,
+        'first9_points': scored if first9 else 0,
+        'doubles': 1 if multiplier == 2 else 0,
+        'trebles': 1 if multiplier == 3 else 0,
+        'checkout_darts': 1 if checkout_dart else 0,
+        'checkouts': 1 if checkout_dart and points == remaining else 0,
+        'turns': 1 if dart_index == 1 else 0,
+        'marks': marks,
+        'targets_hit': 1 if hit_target else 0
+    }
+
+
+def add_player_stats(conn, player_id, stats):
+    """Add increments to a player's counters in the current game (caller commits)"""
+    columns = ', '.join(STAT_COLUMNS)
+    placeholders = ', '.join('?' for _ in STAT_COLUMNS)
+    updates = ', '.join(f'{column} = {column} + excluded.{column}' for column in STAT_COLUMNS)
+    conn.execute(
+        f'''INSERT INTO player_stats (game_id, player_id, {columns})
+        VALUES ({CURRENT_GAME}, ?, {placeholders})
+        ON CONFLICT (game_id, player_id) DO UPDATE SET {updates}''',
+        [player_id] + [stats[column] for column in STAT_COLUMNS]
+    )
+
+
+def derive_stats(counters):
+    """Averages and rates shown on screen, None until there is something to divide by"""
+    def ratio(numerator, denominator, scale=1):
+        return round(numerator * scale / denominator, 2) if denominator else None
+
+    return {
+        'darts': counters['darts'],
+        'three_dart_average': ratio(counters['points'], counters['darts'], 3),
+        'first9_average': ratio(counters['first9_points'], counters['first9_darts'], 3),
+        'checkout_percentage': ratio(counters['checkouts'], counters['checkout_darts'], 100),
+        'doubles_rate': ratio(counters['doubles'], counters['darts'], 100),
+        'trebles_rate': ratio(counters['trebles'], counters['darts'], 100),
+        'marks_per_round': ratio(counters['marks'], counters['turns']),
+        'darts_per_number': ratio(counters['darts'], counters['targets_hit'])
+    }
+
+
+def get_player_stats(conn):
+    """Derived stats of every player in the current game, keyed by player id"""
+    rows = conn.execute(
+        f'SELECT player_id, {", ".join(STAT_COLUMNS)} FROM player_stats WHERE game_id = {CURRENT_GAME} ORDER BY player_id'
+    ).fetchall()
+    return {row[0]: derive_stats(dict(zip(STAT_COLUMNS, row[1:]))) for row in rows}
+
+
+def replay_player_stats(conn, game_id, player_id, game_mode):
+    """Counters for one player rebuilt by replaying their darts through throw_stats"""
+    try:
+        starting_score = int(game_mode)  # X01 modes are named after their starting score
+    except (ValueError, TypeError):
+        starting_score = None
+
+    totals = dict.fromkeys(STAT_COLUMNS, 0)
+    running_score = starting_score
+    target = 1
+    turn_number = None
+    turn_points = 0
+    busted = False
+
+    darts = conn.execute('''
+        SELECT turn_number, dart_index, score, multiplier, points FROM throws
+        WHERE game_id = ? AND player_id = ?
+        ORDER BY turn_number, dart_index
+    ''', (game_id, player_id)).fetchall()
+
+    for dart_turn, dart_index, score, multiplier, points in darts:
+        if dart_turn != turn_number:
+            # Bank the finished turn before starting the next one
+            if running_score is not None and not busted:
+                running_score -= turn_points
+            turn_number, turn_points, busted = dart_turn, 0, False
+
+        remaining = None
+        if running_score is not None and not busted:
+            remaining = running_score - turn_points
+        hit = game_mode == 'around_clock' and around_clock_hit(target, score)
+
+        stats = throw_stats(
+            dart_turn, dart_index, score, multiplier,
+            0 if busted else points,  # Darts after a bust score nothing
+            remaining=remaining,
+            turn_points=turn_points,
+            marks=cricket_marks(score, multiplier) if game_mode == 'cricket' else 0,
+            hit_target=hit
+        )
+        for column in STAT_COLUMNS:
+            totals[column] += stats[column]
+
+        if remaining is not None and points > remaining:
+            busted = True
+        turn_points += points
+        if hit:
+            target = None if target == 21 else target + 1
+
+    return totals
+
+
+def rebuild_player_stats(conn, player_id, game_id=None):
+    """Replace a player's counters with ones rebuilt from the throws table (caller commits)"""
+    if game_id is None:
+        game_id = conn.execute('SELECT game_id FROM game_state WHERE id = 1').fetchone()[0]
+    row = conn.execute('SELECT game_mode FROM games WHERE id = ?', (game_id,)).fetchone()
+    totals = replay_player_stats(conn, game_id, player_id, row[0] if row else None)
+
+    # Like the live table, players who have not thrown yet have no row
+    if not totals['darts']:
+        conn.execute('DELETE FROM player_stats WHERE game_id = ? AND player_id = ?', (game_id, player_id))
+        return
+
+    conn.execute(
+        f'INSERT OR REPLACE INTO player_stats (game_id, player_id, {", ".join(STAT_COLUMNS)}) '
+        f'VALUES (?, ?, {", ".join("?" for _ in STAT_COLUMNS)})',
+        [game_id, player_id] + [totals[column] for column in STAT_COLUMNS]
+    )
+
+
+def rebuild_all_stats(db_path='game.db', game_id=None):
+    """Rebuild the counters of every player in every game (or one game); returns the number of rows"""
+    conn = db_setup.connect(db_path)
+    try:
+        if game_id is None:
+            players = conn.execute('SELECT game_id, id FROM players ORDER BY game_id, id').fetchall()
+        else:
+            players = conn.execute('SELECT game_id, id FROM players WHERE game_id = ? ORDER BY id', (game_id,)).fetchall()
+
+        # One transaction per game keeps each write lock short
+        current_game = None
+        for player_game, player_id in players:
+            if player_game != current_game:
+                conn.commit()
+                current_game = player_game
+            rebuild_player_stats(conn, player_id, player_game)
+        conn.commit()
+        return len(players)
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Rebuild player_stats from the throws table')
+    parser.add_argument('--game', type=int, help='Only rebuild this game')
+    parser.add_argument('--db', default='game.db', help='Path to game.db')
+    args = parser.parse_args()
+
+    count = rebuild_all_stats(args.db, args.game)
+    print(f"Rebuilt stats for {count} players")
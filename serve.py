@@ -0,0 +1,53 @@
+"""Production server for the scoreboard.
+
+Runs the Flask app on gevent's WSGI server so each viewer connection is a cheap
+greenlet, while SQLite work runs on the bounded DB thread pool (see db_pool.py).
+
+Usage:
+    python serve.py [--host 0.0.0.0] [--port 5000] [--no-processor]
+
+Set DB_POOL_SIZE to change how many database calls may run at once (default 4).
+Set LIVE_DB_DIR to a tmpfs directory to keep game.db in RAM with durable snapshots
+(see live_state.py).
+"""
+try:
+    from gevent import monkey
+    monkey.patch_all()
+    from gevent.pywsgi import WSGIServer
+    HAVE_GEVENT = True
+except ImportError:
+    HAVE_GEVENT = False
+
+import argparse
+
+import main
+from db_pool import DB_POOL_SIZE
+
+
+def serve(host='0.0.0.0', port=5000, start_processor=True):
+    """Start the scoreboard server, falling back to the threaded Flask server without gevent"""
+    try:
+        if start_processor:
+            main.startup()
+
+        if HAVE_GEVENT:
+            print(f"Serving on http://{host}:{port} with gevent (DB pool size {DB_POOL_SIZE})")
+            # log=None keeps per-request access logging off the hot path
+            WSGIServer((host, port), main.app, log=None).serve_forever()
+        else:
+            print("gevent not installed, falling back to the threaded Flask server")
+            main.app.run(host=host, port=port, debug=False, threaded=True)
+    finally:
+        # Make sure to clean up the dart processor when the server exits
+        main.stop_dart_processor()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the scoreboard web server')
+    parser.add_argument('--host', default='0.0.0.0', help='Interface to listen on')
+    parser.add_argument('--port', type=int, default=5000, help='Port to listen on')
+    parser.add_argument('--no-processor', action='store_true',
+                        help='Do not reset the game database or start a dart processor')
+    args = parser.parse_args()
+
+    serve(args.host, args.port, start_processor=not args.no_processor)
@@ -1,9 +1,15 @@
 import sqlite3
+import os
+import sys
 from datetime import datetime
 from contextlib import contextmanager
 from darts_cv_simulation import DartDetection
 import time
 
+# The shared SQLite settings live in leds/db_setup.py at the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from leds import db_setup
+
 class CVDatabaseWriter:
     def __init__(self, db_path='cv_data.db'):
         self.db_path = db_path
@@ -12,8 +18,7 @@ class CVDatabaseWriter:
 
     @contextmanager
     def get_db_connection(self):
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        conn = db_setup.connect(self.db_path, row_factory=sqlite3.Row)
         try:
             yield conn
         finally:
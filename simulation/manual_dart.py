@@ -1,9 +1,14 @@
 import sqlite3
 import os
+import sys
 import random
 from datetime import datetime
 from contextlib import contextmanager
 
+# The shared SQLite settings live in leds/db_setup.py at the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from leds import db_setup
+
 class ManualDartEntry:
     def __init__(self, db_path='cv_data.db'):
         self.db_path = db_path
@@ -12,8 +17,7 @@ class ManualDartEntry:
     @contextmanager
     def get_db_connection(self):
         """Create a connection to the SQLite database"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        conn = db_setup.connect(self.db_path, row_factory=sqlite3.Row)
         try:
             yield conn
         finally:
@@ -0,0 +1,249 @@
+// Function to update player highlights
+function updatePlayerHighlights(game_data) {
+  // Update player names and highlights
+  for (let i = 0; i < game_data.players.length; i++) {
+    const player = game_data.players[i];
+    const nameElement = document.getElementById(`player${player.id}_name`);
+
+    if (nameElement) {
+      patchText(nameElement, player.name);
+
+      // Highlight current player
+      patchClass(nameElement, 'active-player', player.id === game_data.current_player);
+    }
+
+    // Update target display
+    const totalElement = document.getElementById(`player${player.id}_total`);
+    if (totalElement) {
+      if (player.total_score === 20) {
+        patchText(totalElement, 'BULL');
+      } else {
+        patchText(totalElement, (player.total_score + 1).toString());
+      }
+    }
+  }
+}
+
+// Function to update score table
+function updateScoreTable(game_data) {
+  // In Around the Clock mode, points represent the target number
+  updateTurnsTable(game_data, score => score.points === 21 ? "BULL" : score.points);
+}
+
+// Function to update throws normally
+function updateNormalThrows(game_data) {
+  // Update all throws
+  for (let i = 0; i < game_data.current_throws.length; i++) {
+    const throwData = game_data.current_throws[i];
+    const throwElement = document.getElementById(`throw${throwData.throw_number}_points`);
+
+    if (throwElement) {
+      if (throwData.score === null) {
+        // If score is null, display nothing (non-breaking space for layout)
+        patchText(throwElement, '\u00A0');  // Non-breaking space
+      } else {
+        // Only blink update if value has changed
+        if (throwElement.textContent !== throwData.points.toString()) {
+          // Use a different color for zero values vs non-zero
+          const blinkColor = throwData.points > 0 ? '#00ff00' : '#333333';
+          blinkUpdate(throwElement, throwData.points.toString(), blinkColor);
+        }
+      }
+    }
+  }
+}
+
+  // Function to show a target hit notification
+  function showTargetHitNotification(duration = 3000) {
+  const targetHitBanner = document.getElementById('target-hit-banner');
+  const targetHitOverlay = document.getElementById('target-hit-overlay');
+
+  if (targetHitBanner) targetHitBanner.style.visibility = 'visible';
+  // Only show the green notification, hide the overlay
+
+  // Hide the banner after the duration
+  setTimeout(() => {
+    if (targetHitBanner) targetHitBanner.style.visibility = 'hidden';
+    if (targetHitOverlay) targetHitOverlay.style.visibility = 'hidden';
+  }, duration);
+}
+
+// Handle Manual Override response for Around the Clock mode
+window.handleManualOverrideResponse = function(data, manualOverrideModal) {
+  // We'll need to customize this for Around the Clock logic
+  manualOverrideModal.hide();
+
+  // Refresh the game data regardless
+  requestSync();
+
+  // Alert with throw information
+  alert(`Throw updated successfully! Score: ${data.score}, Points: ${data.points}`);
+};
+
+// Function to update the game with new data
+function updateGame(game_data) {
+  // Apply styling based on player count
+  updatePlayerCountStyle(game_data);
+
+  // Store current game data globally for delayed updates
+  window.currentGameData = game_data;
+
+  // Update the last throw display
+  updateLastThrow(game_data.last_throw, game_data.players, game_data);
+
+  // Check if game is over and update banner
+  if (game_data.game_over) {
+    // For Around the Clock, check animation state for the winner
+    if (game_data.animating && game_data.animation_type === 'win') {
+      const winner = game_data.players.find(player => player.id === game_data.current_player);
+      if (winner) {
+        // Set the winner's name in both banners
+        patchText(document.getElementById('winner-name'), winner.name);
+        patchText(document.getElementById('winner-name-overlay'), winner.name);
+
+        // Show the overlay
+        document.getElementById('win-message-overlay').style.visibility = 'visible';
+
+        // Highlight the winner's name and target in the table
+        const nameElement = document.getElementById(`player${winner.id}_name`);
+        const totalElement = document.getElementById(`player${winner.id}_total`);
+
+        if (nameElement) {
+          nameElement.style.backgroundColor = 'rgba(40, 167, 69, 0.7)';
+          nameElement.style.color = 'white';
+          nameElement.style.fontWeight = 'bold';
+        }
+
+        if (totalElement) {
+          totalElement.style.backgroundColor = 'rgba(40, 167, 69, 0.7)';
+          totalElement.style.color = 'white';
+          totalElement.style.fontWeight = 'bold';
+        }
+      }
+    }
+  } else {
+    document.getElementById('win-message-overlay').style.visibility = 'hidden';
+  }
+
+  // Handle animation based on type
+  if (game_data.animating) {
+    if (game_data.animation_type === 'target_hit') {
+      // Show target hit notification
+      showTargetHitNotification();
+
+      // Continue with normal updates
+      updatePlayerHighlights(game_data);
+      updateScoreTable(game_data);
+      updateNormalThrows(game_data);
+    } else if (game_data.animation_type === 'third_throw') {
+      // IMPORTANT: Check if this third throw also hit a target
+      const targetHit = game_data.target_hit;
+
+      // If target was hit, show the notification
+      if (targetHit) {
+        showTargetHitNotification();
+      }
+
+      // For third throw animations, only update the throw display initially
+      // and delay the scoreboard update - similar to classic mode
+      const thirdThrow = game_data.current_throws.find(t => t.throw_number === 3);
+      if (thirdThrow) {
+        const throwElement = document.getElementById(`throw3_points`);
+        if (throwElement) {
+          // Check if we already started this animation
+          if (!window.animatingThirdThrow) {
+            window.animatingThirdThrow = true;
+
+            // Set the throw immediately to the new value but with green color
+            patchText(throwElement, thirdThrow.points.toString());
+            throwElement.style.color = '#00ff00';
+
+            // Also update other throws without blinking (but don't update scoreboard yet)
+            for (let i = 1; i <= 2; i++) {
+              const throw_data = game_data.current_throws.find(t => t.throw_number === i);
+              if (throw_data) {
+                const element = document.getElementById(`throw${i}_points`);
+                if (element) {
+                  patchText(element, throw_data.points.toString());
+                }
+              }
+            }
+
+            // After 2 seconds, reset the color back to black
+            setTimeout(() => {
+              throwElement.style.color = '#000000';
+
+              // After another brief delay, update the rest of the UI
+              setTimeout(() => {
+                // Update player highlights
+                updatePlayerHighlights(game_data);
+
+                // Update the score table
+                updateScoreTable(game_data);
+
+                // Reset animation flag
+                window.animatingThirdThrow = false;
+              }, 500); // 500ms after color change (total 2.5s)
+            }, 2000); // 2s for the green highlight
+          }
+        }
+      }
+    } else if (game_data.animation_type === 'win') {
+      // Show game over banner for win animations
+      const winner = game_data.players.find(player => player.id === game_data.current_player);
+      if (winner) {
+        // Update both winner displays
+        patchText(document.getElementById('winner-name'), winner.name);
+        patchText(document.getElementById('winner-name-overlay'), winner.name);
+        document.getElementById('win-message-overlay').style.visibility = 'visible';
+      }
+
+      // Find the winning throw
+      const throwNumber = game_data.throw_number;
+      const throwElement = document.getElementById(`throw${throwNumber}_points`);
+
+      if (throwElement) {
+        // Check if we already started this animation
+        if (!window.animatingWin) {
+          window.animatingWin = true;
+
+          // Set the throw to a gold color to indicate it's the winning throw
+          const winThrow = game_data.current_throws.find(t => t.throw_number === parseInt(throwNumber));
+          if (winThrow) {
+            patchText(throwElement, winThrow.points.toString());
+            throwElement.style.color = '#ffd700'; // Gold color
+          }
+
+          // Update the rest of the UI
+          updatePlayerHighlights(game_data);
+          updateScoreTable(game_data);
+
+          // Reset animation flag after a delay
+          setTimeout(() => {
+            window.animatingWin = false;
+          }, 3000);
+        }
+      }
+    }
+  } else {
+    // Standard non-animation updates
+    document.getElementById('target-hit-banner').style.visibility = 'hidden';
+    document.getElementById('target-hit-overlay').style.visibility = 'hidden';
+
+    // If we're not in an animation, update everything normally
+    if (!window.animatingThirdThrow && !window.animatingWin) {
+      updatePlayerHighlights(game_data);
+      updateScoreTable(game_data);
+      updateNormalThrows(game_data);
+    }
+  }
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+  // Initialize animation state flags
+  window.animatingThirdThrow = false;
+  window.animatingWin = false;
+
+  // Start polling for updates
+  updateGame(window.currentGameData || {});
+});
@@ -0,0 +1,961 @@
+// Global variables for tracking last throw state
+let currentLastThrowState = "normal"; // can be "normal", "bust", or "win"
+let previousLastThrow = null;
+
+// Keyed DOM patching shared by every game mode. Each helper only touches the
+// DOM when the new value differs from what is already shown, so a sync tick
+// with unchanged data causes no writes, reflows or repaints.
+const patchedValues = new WeakMap();
+
+// Remember the last value written to an element for a given slot
+function patchChanged(element, slot, value) {
+  let values = patchedValues.get(element);
+  if (!values) {
+    values = {};
+    patchedValues.set(element, values);
+  }
+  if (values[slot] === value) return false;
+  values[slot] = value;
+  return true;
+}
+
+// Set text content if it changed
+function patchText(element, text) {
+  if (!element) return;
+  text = String(text);
+  if (element.textContent !== text) {
+    element.textContent = text;
+  }
+}
+
+// Set markup if it differs from the markup we last wrote
+function patchHTML(element, html) {
+  if (!element) return;
+  html = String(html);
+  if (patchChanged(element, 'html', html)) {
+    element.innerHTML = html;
+  }
+}
+
+// Add or remove a class only when its state changes
+function patchClass(element, className, enabled) {
+  if (!element) return;
+  if (element.classList.contains(className) !== enabled) {
+    element.classList.toggle(className, enabled);
+  }
+}
+
+// Apply inline style properties that differ from the ones we last wrote
+function patchStyle(element, styles) {
+  if (!element) return;
+  for (const [property, value] of Object.entries(styles)) {
+    if (patchChanged(element, `style:${property}`, value)) {
+      element.style[property] = value;
+    }
+  }
+}
+
+// Reconcile a tbody against a list of keyed rows, reusing existing <tr>s
+// rows: [{ key, cells: [{ id, html }] }]
+function reconcileRows(tbody, rows) {
+  if (!tbody) return;
+
+  // Index the rows already on screen by key
+  const existing = new Map();
+  for (const tr of Array.from(tbody.children)) {
+    if (tr.dataset.key !== undefined) {
+      existing.set(tr.dataset.key, tr);
+    } else {
+      // Rows from the server-rendered template have no key yet
+      tr.remove();
+    }
+  }
+
+  rows.forEach((row, index) => {
+    const key = String(row.key);
+    let tr = existing.get(key);
+
+    if (tr) {
+      existing.delete(key);
+    } else {
+      tr = document.createElement('tr');
+      tr.dataset.key = key;
+    }
+
+    // Match the cell count, then patch each cell
+    while (tr.children.length < row.cells.length) {
+      const td = document.createElement('td');
+      td.className = 'text-center';
+      tr.appendChild(td);
+    }
+    while (tr.children.length > row.cells.length) {
+      tr.lastElementChild.remove();
+    }
+
+    row.cells.forEach((cell, cellIndex) => {
+      const td = tr.children[cellIndex];
+      const id = cell.id || '';
+      if (td.id !== id) td.id = id;
+      patchHTML(td, cell.html);
+    });
+
+    // Only move the row if it is out of place
+    if (tbody.children[index] !== tr) {
+      tbody.insertBefore(tr, tbody.children[index] || null);
+    }
+  });
+
+  // Drop rows that are no longer shown
+  for (const tr of existing.values()) {
+    tr.remove();
+  }
+}
+
+// Shared turns table: the last 10 turns plus empty rows to fill the table.
+// renderScore(score) returns the cell markup for a player's turn score.
+function updateTurnsTable(game_data, renderScore) {
+  const maxTurnsToShow = 10;
+  const turnsToDisplay = game_data.turns.slice(-maxTurnsToShow);
+  const rows = [];
+
+  for (const turn of turnsToDisplay) {
+    const cells = [{ html: turn.turn_number }];
+    for (const player of game_data.players) {
+      const score = turn.scores.find(s => s.player_id === player.id);
+      cells.push({
+        id: `turn_${turn.turn_number}_player_${player.id}`,
+        html: score ? renderScore(score) : ''
+      });
+    }
+    rows.push({ key: turn.turn_number, cells: cells });
+  }
+
+  // Add empty rows if we have fewer than 10 turns
+  const nextTurnNumber = game_data.turns.length > 0
+    ? Math.max(...game_data.turns.map(t => t.turn_number)) + 1
+    : 1;
+
+  for (let i = 0; i < maxTurnsToShow - turnsToDisplay.length; i++) {
+    const turnNumber = nextTurnNumber + i;
+    const cells = [{ html: turnNumber }];
+    for (const player of game_data.players) {
+      cells.push({ id: `turn_${turnNumber}_player_${player.id}`, html: '' });
+    }
+    rows.push({ key: turnNumber, cells: cells });
+  }
+
+  reconcileRows(document.getElementById('turns_body'), rows);
+}
+
+// Function to update the player count styling
+function updatePlayerCountStyle(game_data) {
+  const playerCount = game_data.players.length;
+  const container = document.querySelector('.container-fluid');
+
+  // Only the matching player count class should be set
+  for (let count = 1; count <= 8; count++) {
+    patchClass(container, `players-${count}`, count === playerCount);
+  }
+}
+
+// Function to update the last throw display
+function updateLastThrow(lastThrow, players, game_data) {
+  if (!lastThrow) return;
+
+  // Get the card body element for the last throw
+  const lastThrowCard = document.querySelector('.last-throw-card');
+  const pointsElement = document.getElementById('last-throw-points');
+
+  // Check if this is a new throw by comparing with previous data
+  const isNewThrow = !previousLastThrow || 
+                    previousLastThrow.score !== lastThrow.score || 
+                    previousLastThrow.multiplier !== lastThrow.multiplier ||
+                    previousLastThrow.player_id !== lastThrow.player_id;
+
+  // Update the score, multiplier and points
+  patchText(document.getElementById('last-throw-score'), lastThrow.score);
+  patchText(document.getElementById('last-throw-multiplier'), lastThrow.multiplier);
+  patchText(document.getElementById('last-throw-points'), lastThrow.points);
+
+  // Find the player name
+  if (lastThrow.player_id) {
+    const player = players.find(p => p.id === lastThrow.player_id);
+    if (player) {
+      patchText(document.getElementById('last-throw-player'), 'Player: ' + player.name);
+
+      // Check if this is a win
+      if (game_data.game_over && game_data.animating && game_data.animation_type === 'win') {
+        // Set background to yellow for win
+        lastThrowCard.style.backgroundColor = '#fff3cd'; // Light yellow
+        pointsElement.style.color = '#ffc107'; // Yellow/gold text
+        currentLastThrowState = "win";
+      }
+      // If this is a new throw (not a win), reset colors
+      else if (isNewThrow) {
+        // Reset to normal styles for a new throw
+        lastThrowCard.style.backgroundColor = '#f8f9fa'; // Default light gray
+
+        if (lastThrow.points > 0) {
+          pointsElement.style.color = '#28a745'; // Green for positive points
+        } else {
+          pointsElement.style.color = '#212529'; // Default color for zero
+        }
+
+        currentLastThrowState = "normal";
+      }
+    } else {
+      patchText(document.getElementById('last-throw-player'), 'Player: ' + lastThrow.player_id);
+    }
+  } else {
+    patchText(document.getElementById('last-throw-player'), 'Player: -');
+  }
+
+  // Save this throw data for future comparison
+  previousLastThrow = { ...lastThrow };
+}
+
+function blinkUpdate(element, newValue, newColor='#00ff00') {
+  // Always make sure to capture the previous color properly
+  const previousColor = element.style.color || '#000000';
+
+  // Update the text
+  patchText(element, newValue);
+  element.style.color = newColor;
+
+  // Set back to original color after timeout ms
+  setTimeout(() => {
+    element.style.color = '#000000'; // Explicitly set to black to ensure consistency
+  }, 2000);
+}
+
+// Function to update the throw status indicator
+function updateThrowStatus(data) {
+  const indicator = document.getElementById('throw-status-indicator');
+  const message = document.getElementById('throw-status-message');
+
+  if (indicator && message) {
+    patchStyle(indicator, { display: 'block' });
+
+    const alert = indicator.querySelector('.alert');
+    patchClass(alert, 'alert-success', !!data.ready_for_throw);
+    patchClass(alert, 'alert-warning', !data.ready_for_throw);
+    patchText(message, data.ready_for_throw ? 'READY - Please throw your dart' : 'WAIT - System processing dart');
+  }
+}
+
+// Shared sync loop: one /sync request per tick, with a cadence that follows the game
+const SYNC_LIVE_MS = 1000;        // While a turn is live
+const SYNC_IDLE_MAX_MS = 5000;    // Backoff ceiling when nothing has changed for a while
+const SYNC_GAME_OVER_MS = 10000;  // Once the game is over
+const SYNC_IDLE_AFTER_MS = 60000; // Quiet time before backing off
+
+let syncTimer = null;
+let syncInFlight = false;
+let syncPending = false;
+let syncDelay = SYNC_LIVE_MS;
+let lastSyncBody = null;
+let lastSyncChangeAt = Date.now();
+
+// Work out how long to wait before the next sync
+function nextSyncDelay(sync) {
+  const game = sync.game;
+
+  // Keep up while a dart is being processed or animated
+  if (game.animating || !sync.system_state.ready_for_throw) return SYNC_LIVE_MS;
+
+  if (game.game_over) return SYNC_GAME_OVER_MS;
+
+  // Stay fast while the game is active, then back off gradually
+  if (Date.now() - lastSyncChangeAt < SYNC_IDLE_AFTER_MS) return SYNC_LIVE_MS;
+  return Math.min(syncDelay * 2, SYNC_IDLE_MAX_MS);
+}
+
+// Schedule the next sync unless the page is hidden
+function scheduleSync(delay) {
+  clearTimeout(syncTimer);
+  syncTimer = null;
+  if (document.hidden) return;
+  syncDelay = delay;
+  syncTimer = setTimeout(runSync, delay);
+}
+
+// Fetch game data, system state and cricket scores in one request
+function runSync() {
+  // Queue one more sync if a request is already on its way
+  if (syncInFlight) {
+    syncPending = true;
+    return;
+  }
+  syncInFlight = true;
+
+  fetch('/sync', { cache: 'no-cache' })
+    .then(response => response.text())
+    .then(body => {
+      const sync = JSON.parse(body);
+      if (body !== lastSyncBody) {
+        lastSyncBody = body;
+        lastSyncChangeAt = Date.now();
+      }
+
+      const gameData = sync.game;
+      if (sync.cricket_scores) {
+        gameData.cricket_scores = sync.cricket_scores;
+      }
+
+      updateGame(gameData);
+      updateThrowStatus(sync.system_state);
+      scheduleSync(nextSyncDelay(sync));
+    })
+    .catch(error => {
+      console.error('Error syncing game data:', error);
+      scheduleSync(Math.min(syncDelay * 2, SYNC_IDLE_MAX_MS));
+    })
+    .finally(() => {
+      syncInFlight = false;
+      if (syncPending) {
+        syncPending = false;
+        requestSync();
+      }
+    });
+}
+
+// Sync right away and go back to the live cadence (after user actions)
+function requestSync() {
+  lastSyncChangeAt = Date.now();
+  clearTimeout(syncTimer);
+  syncTimer = null;
+  runSync();
+}
+window.requestSync = requestSync;
+
+// Pause while the page is hidden and catch up as soon as it is visible again
+document.addEventListener('visibilitychange', function() {
+  if (document.hidden) {
+    clearTimeout(syncTimer);
+    syncTimer = null;
+  } else {
+    requestSync();
+  }
+});
+window.addEventListener('focus', function() {
+  if (!syncTimer && !syncInFlight) requestSync();
+});
+
+// Start syncing once the page has loaded
+document.addEventListener('DOMContentLoaded', function() {
+  scheduleSync(SYNC_LIVE_MS);
+});
+
+// Initialize animation state flags
+window.animatingThirdThrow = false;
+window.animatingWin = false;
+
+// Common Manual Override functionality
+document.addEventListener('DOMContentLoaded', function() {
+  const manualOverrideBtn = document.getElementById('manual-override-btn');
+  const saveOverrideBtn = document.getElementById('saveOverrideBtn');
+  const scoreInput = document.getElementById('scoreInput');
+  const multiplierInput = document.getElementById('multiplierInput');
+  const totalPoints = document.getElementById('totalPoints');
+  const turnSelect = document.getElementById('turnSelect');
+  const playerSelect = document.getElementById('playerSelect');
+  const throwSelect = document.getElementById('throwSelect');
+
+  // Initialize the Bootstrap modal
+  const manualOverrideModal = new bootstrap.Modal(document.getElementById('manualOverrideModal'));
+
+  // Populate the total points when score or multiplier changes
+  function updateTotalPoints() {
+    const score = parseInt(scoreInput.value) || 0;
+    const multiplier = parseInt(multiplierInput.value) || 0;
+    patchText(totalPoints, score * multiplier);
+  }
+
+  scoreInput.addEventListener('input', updateTotalPoints);
+  multiplierInput.addEventListener('change', updateTotalPoints);
+
+  // When the bullseye (25) is selected, limit multiplier to 1 or 2
+  scoreInput.addEventListener('change', function() {
+    if (parseInt(this.value) === 25) {
+      // Bullseye can only have multiplier 1 or 2
+      multiplierInput.innerHTML = `
+        <option value="1">1 (Single)</option>
+        <option value="2">2 (Double)</option>
+      `;
+
+      // If multiplier was 3, reset to 1
+      if (parseInt(multiplierInput.value) === 3) {
+        multiplierInput.value = 1;
+      }
+    } else {
+      // Regular score can have multiplier 1, 2, or 3
+      multiplierInput.innerHTML = `
+        <option value="1">1 (Single)</option>
+        <option value="2">2 (Double)</option>
+        <option value="3">3 (Triple)</option>
+      `;
+    }
+    updateTotalPoints();
+  });
+
+  // Function to fetch throw details for a turn and player
+  function fetchThrowDetails(turnNumber, playerId) {
+    fetch(`/get_throw_details?turn_number=${turnNumber}&player_id=${playerId}`)
+      .then(response => response.json())
+      .then(data => {
+        // Update the throw display with the fetched throw data
+        updateThrowDisplay(data);
+      })
+      .catch(error => {
+        console.error('Error fetching throw details:', error);
+      });
+  }
+
+  // Function to update the throw display with current throw values
+  function updateThrowDisplay(data) {
+    const throwData = data.throws;
+    const isBust = data.bust;
+
+    // Update the display for each throw
+    for (let i = 1; i <= 3; i++) {
+      const displayElement = document.getElementById(`displayThrow${i}`);
+      if (displayElement) {
+        // Find the throw data for this throw number
+        const throwInfo = throwData.find(t => t.throw_number === i);
+        const points = throwInfo ? throwInfo.points : 0;
+
+        // Update the display
+        patchText(displayElement, points);
+
+        // Highlight the throw if it has points (non-zero)
+        if (points > 0) {
+          displayElement.classList.add('has-points');
+        } else {
+          displayElement.classList.remove('has-points');
+        }
+      }
+    }
+
+    // Update the bust indicator if present
+    const bustIndicator = document.getElementById('bustIndicator');
+    if (bustIndicator) {
+      bustIndicator.style.display = isBust ? 'block' : 'none';
+    }
+
+    // Update the pre-filled values for the currently selected throw
+    if (throwSelect) {
+      const selectedThrowNumber = parseInt(throwSelect.value);
+      const selectedThrow = throwData.find(t => t.throw_number === selectedThrowNumber);
+
+      if (selectedThrow && selectedThrow.points > 0) {
+        // Use the actual score and multiplier values
+        document.getElementById('scoreInput').value = selectedThrow.score || '';
+        document.getElementById('multiplierInput').value = selectedThrow.multiplier || '1';
+        patchText(document.getElementById('totalPoints'), selectedThrow.points || '0');
+      } else {
+        // Reset form values if no throw data or zero points
+        document.getElementById('scoreInput').value = '';
+        document.getElementById('multiplierInput').value = '1';
+        patchText(document.getElementById('totalPoints'), '0');
+      }
+    }
+  }
+
+  // When turn selection changes
+  if (turnSelect) {
+    turnSelect.addEventListener('change', function() {
+      const turnNumber = parseInt(this.value);
+      const playerId = parseInt(playerSelect.value);
+      fetchThrowDetails(turnNumber, playerId);
+    });
+  }
+
+  // When player selection changes
+  if (playerSelect) {
+    playerSelect.addEventListener('change', function() {
+      const playerId = parseInt(this.value);
+      const turnNumber = parseInt(turnSelect.value);
+      fetchThrowDetails(turnNumber, playerId);
+    });
+  }
+
+  // When throw selection changes
+  if (throwSelect) {
+    throwSelect.addEventListener('change', function() {
+      const turnNumber = parseInt(turnSelect.value);
+      const playerId = parseInt(playerSelect.value);
+
+      fetch(`/get_throw_details?turn_number=${turnNumber}&player_id=${playerId}`)
+        .then(response => response.json())
+        .then(data => {
+          const selectedThrow = data.throws.find(t => t.throw_number === parseInt(this.value));
+          if (selectedThrow) {
+            // Use score and multiplier values from the selected throw
+            document.getElementById('scoreInput').value = selectedThrow.score || '';
+            document.getElementById('multiplierInput').value = selectedThrow.multiplier || '1';
+            patchText(document.getElementById('totalPoints'), selectedThrow.points || '0');
+          } else {
+            // Reset form if throw not found
+            document.getElementById('scoreInput').value = '';
+            document.getElementById('multiplierInput').value = '1';
+            patchText(document.getElementById('totalPoints'), '0');
+          }
+        })
+        .catch(error => {
+          console.error('Error fetching throw details:', error);
+        });
+    });
+  }
+
+  // When the manual override button is clicked
+  if (manualOverrideBtn) {
+    manualOverrideBtn.addEventListener('click', function() {
+      // Fetch current game data to populate the form
+      fetch('/data_json')
+        .then(response => response.json())
+        .then(data => {
+          // Populate turn select dropdown
+          turnSelect.innerHTML = '';
+
+          // Create options for existing turns and the current turn
+          const existingTurns = new Set(data.turns.map(turn => turn.turn_number));
+
+          // Add current turn if not in existing turns
+          if (!existingTurns.has(data.current_turn)) {
+            existingTurns.add(data.current_turn);
+          }
+
+          // Sort turns numerically
+          const sortedTurns = Array.from(existingTurns).sort((a, b) => a - b);
+
+          // Add options to select
+          sortedTurns.forEach(turn => {
+            const option = document.createElement('option');
+            option.value = turn;
+            patchText(option, `Turn ${turn}`);
+            if (turn === data.current_turn) {
+              option.textContent += ' (Current)';
+              option.selected = true;
+            }
+            turnSelect.appendChild(option);
+          });
+
+          // Populate player select dropdown
+          playerSelect.innerHTML = '';
+
+          data.players.forEach(player => {
+            const option = document.createElement('option');
+            option.value = player.id;
+            patchText(option, `${player.name} (${player.total_score})`);
+            if (player.id === data.current_player) {
+              option.textContent += ' (Current)';
+              option.selected = true;
+            }
+            playerSelect.appendChild(option);
+          });
+
+          // Reset throw selection to first throw
+          throwSelect.value = "1";
+
+          // Fetch throw details for the selected turn/player
+          const initialTurnNumber = parseInt(turnSelect.value);
+          const initialPlayerId = parseInt(playerSelect.value);
+          fetchThrowDetails(initialTurnNumber, initialPlayerId);
+
+          // Show the modal
+          manualOverrideModal.show();
+        })
+        .catch(error => {
+          console.error('Error fetching game data:', error);
+          alert('Failed to load game data. Please try again.');
+        });
+    });
+  }
+
+  // Read and validate the override form, returning null if it is incomplete
+  function readOverrideForm() {
+    const turnNumber = turnSelect.value;
+    const playerId = playerSelect.value;
+    const throwNumber = throwSelect.value;
+    const score = scoreInput.value;
+    const multiplier = multiplierInput.value;
+
+    if (!turnNumber || !playerId || !throwNumber || !score || !multiplier) {
+      alert('Please fill in all fields');
+      return null;
+    }
+
+    // Validate score range
+    const scoreVal = parseInt(score);
+    if (isNaN(scoreVal) || (scoreVal < 1 || scoreVal > 20) && scoreVal !== 25) {
+      alert('Score must be between 1-20 or 25 for bullseye');
+      return null;
+    }
+
+    // Validate multiplier for bullseye
+    if (scoreVal === 25 && parseInt(multiplier) > 2) {
+      alert('Bullseye can only have a multiplier of 1 or 2');
+      return null;
+    }
+
+    return {
+      turn_number: parseInt(turnNumber),
+      player_id: parseInt(playerId),
+      throw_number: parseInt(throwNumber),
+      score: scoreVal,
+      multiplier: parseInt(multiplier)
+    };
+  }
+
+  // Queue of corrections waiting to be submitted together
+  const pendingCorrections = [];
+
+  // Add the batch controls to the modal
+  const modalFooter = document.querySelector('#manualOverrideModal .modal-footer');
+  const modalBody = document.querySelector('#manualOverrideModal .modal-body');
+  const pendingList = document.createElement('ul');
+  pendingList.id = 'pendingCorrectionsList';
+  pendingList.className = 'list-group mb-2';
+  const addToBatchBtn = document.createElement('button');
+  addToBatchBtn.type = 'button';
+  addToBatchBtn.id = 'addToBatchBtn';
+  addToBatchBtn.className = 'btn btn-outline-light';
+  patchText(addToBatchBtn, 'Add to Batch');
+  const submitBatchBtn = document.createElement('button');
+  submitBatchBtn.type = 'button';
+  submitBatchBtn.id = 'submitBatchBtn';
+  submitBatchBtn.className = 'btn btn-success';
+  submitBatchBtn.style.display = 'none';
+
+  if (modalBody && modalFooter && saveOverrideBtn) {
+    modalBody.appendChild(pendingList);
+    modalFooter.insertBefore(addToBatchBtn, saveOverrideBtn);
+    modalFooter.appendChild(submitBatchBtn);
+  }
+
+  // Redraw the queued corrections
+  function renderPendingCorrections() {
+    pendingList.innerHTML = '';
+
+    pendingCorrections.forEach((correction, index) => {
+      const item = document.createElement('li');
+      item.className = 'list-group-item list-group-item-dark d-flex justify-content-between align-items-center';
+      item.textContent = `Turn ${correction.turn_number}, Player ${correction.player_id}, Throw ${correction.throw_number}: ` +
+        `${correction.score} x ${correction.multiplier} = ${correction.score * correction.multiplier}`;
+
+      const removeBtn = document.createElement('button');
+      removeBtn.type = 'button';
+      removeBtn.className = 'btn btn-sm btn-outline-danger';
+      patchText(removeBtn, 'Remove');
+      removeBtn.addEventListener('click', function() {
+        pendingCorrections.splice(index, 1);
+        renderPendingCorrections();
+      });
+
+      item.appendChild(removeBtn);
+      pendingList.appendChild(item);
+    });
+
+    patchText(submitBatchBtn, `Submit Batch (${pendingCorrections.length})`);
+    submitBatchBtn.style.display = pendingCorrections.length > 0 ? '' : 'none';
+  }
+
+  // Queue the current form values, replacing any earlier edit of the same throw
+  addToBatchBtn.addEventListener('click', function() {
+    const correction = readOverrideForm();
+    if (!correction) return;
+
+    const existingIndex = pendingCorrections.findIndex(c =>
+      c.turn_number === correction.turn_number &&
+      c.player_id === correction.player_id &&
+      c.throw_number === correction.throw_number
+    );
+
+    if (existingIndex >= 0) {
+      pendingCorrections[existingIndex] = correction;
+    } else {
+      pendingCorrections.push(correction);
+    }
+
+    renderPendingCorrections();
+  });
+
+  // Send every queued correction in one request
+  submitBatchBtn.addEventListener('click', function() {
+    if (pendingCorrections.length === 0) return;
+
+    submitBatchBtn.disabled = true;
+
+    fetch('/update_throws_batch', {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({ corrections: pendingCorrections }),
+    })
+    .then(response => {
+      if (!response.ok) {
+        return response.json().then(err => { throw new Error(err.error || 'Unknown error'); });
+      }
+      return response.json();
+    })
+    .then(data => {
+      // Clear the queue now that the server has applied it
+      pendingCorrections.length = 0;
+      renderPendingCorrections();
+      manualOverrideModal.hide();
+      alert(data.message);
+
+      // Refresh the game data
+      requestSync();
+    })
+    .catch(error => {
+      console.error('Error updating throws:', error);
+      alert(`Failed to update throws: ${error.message}`);
+    })
+    .finally(() => {
+      submitBatchBtn.disabled = false;
+    });
+  });
+
+  // When the save button is clicked
+  if (saveOverrideBtn) {
+    saveOverrideBtn.addEventListener('click', function() {
+      // Validate the form
+      const correction = readOverrideForm();
+      if (!correction) return;
+
+      // Send the update request to the server
+      fetch('/update_throw', {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        body: JSON.stringify(correction),
+      })
+      .then(response => {
+        if (!response.ok) {
+          return response.json().then(err => { throw new Error(err.error || 'Unknown error'); });
+        }
+        return response.json();
+      })
+      .then(data => {
+        // Handle the specific game mode response
+        if (window.handleManualOverrideResponse) {
+          window.handleManualOverrideResponse(data, manualOverrideModal);
+        } else {
+          // Default handling
+          manualOverrideModal.hide();
+          alert(`Throw updated successfully! Points: ${data.points}`);
+
+          // Refresh the game data
+          requestSync();
+        }
+      })
+      .catch(error => {
+        console.error('Error updating throw:', error);
+        alert(`Failed to update throw: ${error.message}`);
+      });
+    });
+  }
+
+  // Handle "I Missed" button click
+  const missedBtn = document.getElementById('i-missed-btn');
+  if (missedBtn) {
+    missedBtn.addEventListener('click', function() {
+      // Disable the button to prevent double-clicks
+      missedBtn.disabled = true;
+
+      // Show confirmation dialog
+      if (confirm('Are you sure you want to record a missed throw?')) {
+        // Send request to record missed throw
+        fetch('/record_miss', {
+          method: 'POST',
+          headers: {
+            'Content-Type': 'application/json',
+          }
+        })
+        .then(response => response.json())
+        .then(data => {
+          if (data.success) {
+            // Show a brief notification
+            alert('Recorded missed throw. Try harder next time lol.');
+
+            // Refresh game data
+            requestSync();
+          } else {
+            alert('Error recording missed throw: ' + (data.error || 'Unknown error'));
+          }
+        })
+        .catch(error => {
+          console.error('Error recording missed throw:', error);
+          alert('Failed to record missed throw. Please try again.');
+        })
+        .finally(() => {
+          // Re-enable the button after processing
+          setTimeout(() => {
+            missedBtn.disabled = false;
+          }, 1000);
+        });
+      } else {
+        // Re-enable the button if user cancelled
+        missedBtn.disabled = false;
+      }
+    });
+  }
+});
+
+// Function to adjust player name font sizes based on longest name
+function adjustPlayerNameFontSizes() {
+    // Get all player name headers
+    const playerHeaders = document.querySelectorAll('.player-header');
+
+    if (playerHeaders.length === 0) return;
+
+    // Reset all font sizes to measure with default size
+    playerHeaders.forEach(header => {
+        header.style.fontSize = '';
+    });
+
+    // Get base font size
+    const baseFontSize = parseInt(window.getComputedStyle(playerHeaders[0]).fontSize);
+
+    // Create a temp span for measuring
+    const tempSpan = document.createElement('span');
+    tempSpan.style.visibility = 'hidden';
+    tempSpan.style.position = 'absolute';
+    tempSpan.style.whiteSpace = 'nowrap';
+    tempSpan.style.fontSize = `${baseFontSize}px`;
+    document.body.appendChild(tempSpan);
+
+    // Find which player name has the worst fit ratio
+    let maxRatio = 0;
+    let longestName = '';
+
+    playerHeaders.forEach(header => {
+        const originalText = header.textContent.trim();
+        if (!originalText) return;
+
+        const headerWidth = header.offsetWidth;
+        if (!headerWidth) return;
+
+        tempSpan.textContent = originalText;
+        const textWidth = tempSpan.offsetWidth;
+
+        const ratio = textWidth / headerWidth;
+        if (ratio > maxRatio) {
+            maxRatio = ratio;
+            longestName = originalText;
+        }
+    });
+
+    document.body.removeChild(tempSpan);
+
+    console.log(`Longest name: "${longestName}" with ratio ${maxRatio.toFixed(2)}`);
+
+    // Calculate appropriate font size to make worst case fit at 75%
+    let newFontSize = baseFontSize;
+    if (maxRatio > 0.75) {
+        // Text is too big, scale it down
+        newFontSize = Math.max(12, Math.floor(baseFontSize * (0.75 / maxRatio)));
+        console.log(`Scaling down font from ${baseFontSize}px to ${newFontSize}px`);
+    } else if (maxRatio < 0.7 && maxRatio > 0) {
+        // Text is too small, scale it up (but not too much)
+        newFontSize = Math.floor(baseFontSize * (0.75 / maxRatio));
+        console.log(`Scaling up font from ${baseFontSize}px to ${newFontSize}px`);
+    }
+
+    // Apply this font size to all player headers
+    playerHeaders.forEach(header => {
+        header.style.fontSize = `${newFontSize}px`;
+    });
+}
+
+// Function to set up equal column widths
+function setupEqualColumnWidths() {
+    // Get scoreTable
+    const scoreTable = document.getElementById('scoreTable');
+    if (!scoreTable) return;
+
+    // Get number of players 
+    const playerCount = document.querySelectorAll('.player-header').length;
+    if (playerCount === 0) return;
+
+    // Set table layout to fixed
+    scoreTable.style.tableLayout = 'fixed';
+
+    // Calculate column widths
+    // First column (turn number) gets 15% of the width
+    // Remaining width is distributed equally among player columns
+    const playerColWidth = (85 / playerCount).toFixed(2);
+
+    // Get thead row
+    const headerRow = scoreTable.querySelector('thead tr');
+    if (!headerRow) return;
+
+    // Set the turn header width
+    const turnHeader = headerRow.querySelector('th:first-child');
+    if (turnHeader) {
+        turnHeader.style.width = '15%';
+    }
+
+    // Set equal width for all player columns
+    const playerHeaders = headerRow.querySelectorAll('.player-header');
+    playerHeaders.forEach(header => {
+        header.style.width = `${playerColWidth}%`;
+    });
+
+    console.log(`Set up table with ${playerCount} players, each column width: ${playerColWidth}%`);
+}
+
+// Add window resize handler
+window.addEventListener('resize', function() {
+    // Debounce to prevent performance issues
+    if (window.resizeTimer) clearTimeout(window.resizeTimer);
+    window.resizeTimer = setTimeout(() => {
+        setupEqualColumnWidths();
+        adjustPlayerNameFontSizes();
+    }, 250);
+});
+
+// Call adjustPlayerNameFontSizes after the DOM is fully loaded
+document.addEventListener('DOMContentLoaded', function() {
+    // Add styles for player headers
+    const styleEl = document.createElement('style');
+    styleEl.textContent = `
+        .player-header {
+            white-space: nowrap;
+            overflow: hidden;
+            text-overflow: ellipsis;
+            transition: font-size 0.2s ease;
+        }
+
+        /* Force fixed table layout */
+        #scoreTable, #cricketTable {
+            table-layout: fixed;
+            width: 100%;
+        }
+    `;
+    document.head.appendChild(styleEl);
+
+    // Initial setup
+    setTimeout(() => {
+        setupEqualColumnWidths();
+        adjustPlayerNameFontSizes();
+    }, 100);
+});
+
+// Store reference to the original function
+const originalUpdatePlayerCountStyle = updatePlayerCountStyle;
+
+// Replace with our enhanced version
+updatePlayerCountStyle = function(game_data) {
+    // Call the original function
+    originalUpdatePlayerCountStyle(game_data);
+
+    // Now set up column widths and adjust font sizes after a short delay
+    setTimeout(() => {
+        setupEqualColumnWidths();
+        adjustPlayerNameFontSizes();
+    }, 50);
+};
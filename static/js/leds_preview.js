@@ -0,0 +1,77 @@
+// Live LED preview: draws the frames the LED controller pushes to the strip over
+// the dartboard image. The server sends pixel positions and a full frame first,
+// then only runs of changed pixels: [firstPixel, count, 'rrggbb'].
+const PREVIEW_FPS = 15;
+
+const canvas = document.getElementById('led-preview-canvas');
+const context = canvas.getContext('2d');
+const statusText = document.getElementById('led-preview-status');
+
+let positions = [];  // [x, y] of each LED as fractions of the image size
+let colors = [];     // Current 'rrggbb' color of each LED
+let drawPending = false;
+
+// Keep the canvas resolution in step with its displayed size
+function resizeCanvas() {
+  const ratio = window.devicePixelRatio || 1;
+  canvas.width = Math.round(canvas.clientWidth * ratio);
+  canvas.height = Math.round(canvas.clientHeight * ratio);
+  scheduleDraw();
+}
+
+// Draw at most once per animation frame, however many messages arrive
+function scheduleDraw() {
+  if (drawPending) return;
+  drawPending = true;
+  requestAnimationFrame(draw);
+}
+
+function draw() {
+  drawPending = false;
+  context.clearRect(0, 0, canvas.width, canvas.height);
+  const radius = Math.max(2, canvas.width / 110);
+
+  for (let pixel = 0; pixel < positions.length; pixel++) {
+    const color = colors[pixel];
+    if (!color || color === '000000') continue;  // Off LEDs let the board show through
+    context.fillStyle = '#' + color;
+    context.beginPath();
+    context.arc(positions[pixel][0] * canvas.width, positions[pixel][1] * canvas.height, radius, 0, 2 * Math.PI);
+    context.fill();
+  }
+}
+
+function applyMessage(message) {
+  if (message.status === 'waiting') {
+    statusText.textContent = 'Waiting for the LED controller...';
+    return;
+  }
+  if (message.status === 'unavailable') {
+    statusText.textContent = 'LED preview is unavailable on this server';
+    return;
+  }
+
+  if (message.positions) {
+    positions = message.positions;
+    colors = new Array(positions.length).fill('000000');
+  }
+  for (const [first, count, color] of message.runs || []) {
+    colors.fill(color, first, first + count);
+  }
+  statusText.textContent = 'Live';
+  scheduleDraw();
+}
+
+function connect() {
+  const source = new EventSource('/leds/preview/stream?fps=' + PREVIEW_FPS);
+  source.onmessage = (event) => applyMessage(JSON.parse(event.data));
+  source.onerror = () => {
+    // EventSource reconnects on its own; the server resends positions and a full frame
+    statusText.textContent = 'Reconnecting...';
+  };
+}
+
+window.addEventListener('resize', resizeCanvas);
+window.addEventListener('load', resizeCanvas);
+resizeCanvas();
+connect();
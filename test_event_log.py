@@ -0,0 +1,205 @@
+"""
+test_event_log.py
+
+Plays a short 301 game through the classic dart processor and the web app's
+undo and correction routes, and checks after every step that the live tables
+match what the event log rebuilds: player_stats against
+player_stats.rebuild_player_stats, and turn_scores, totals and game_state
+against event_log.project(event_log.replay_game(...)). Runs under pytest or
+on its own.
+
+Usage:
+    python test_event_log.py
+"""
+
+import os
+import sys
+import tempfile
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, REPO_DIR)
+
+import main as scoreboard
+import event_log
+import player_stats
+from initialize_db import initialize_database
+from leds.LEDs_db_init import initialize_leds_database
+from dart_processor_classic import DartProcessor
+
+
+def start_game(directory):
+    """Fresh game.db and leds/LEDs.db in directory with a two player 301 game in play"""
+    os.chdir(directory)
+    os.makedirs('leds', exist_ok=True)
+    initialize_database()
+    initialize_leds_database('leds/LEDs.db')
+    scoreboard.initialize_game_with_custom_names({1: 'P1', 2: 'P2'}, starting_score=301, game_mode='301')
+
+
+def throw(processor, score, multiplier):
+    """Score one dart the way the processor does when the CV system sees it"""
+    with processor.db.transaction():
+        processor.process_throw({'score': score, 'multiplier': multiplier,
+                                 'position_x': 150.0, 'position_y': 2.0, 'timestamp': 'test'})
+    processor.reset_animation_state()
+
+
+def post(client, path, payload=None):
+    response = client.post(path, json=payload or {})
+    assert response.status_code == 200, f"{path}: {response.get_json()}"
+    return response.get_json()
+
+
+def stats_rows(conn, game_id):
+    return conn.execute('SELECT * FROM player_stats WHERE game_id = ? ORDER BY player_id', (game_id,)).fetchall()
+
+
+def consistency_errors(label):
+    """How the live tables of the game in play differ from the ones rebuilt from its log"""
+    errors = []
+    conn = scoreboard.get_db_connection()
+    try:
+        game_id = event_log.current_game_id(conn)
+        state = event_log.replay_game(conn, game_id)
+        projection = event_log.project(state)
+
+        live_turns = [tuple(row) for row in conn.execute(
+            'SELECT turn_number, player_id, points, bust FROM turn_scores WHERE game_id = ? ORDER BY turn_number, player_id',
+            (game_id,))]
+        replayed_turns = [(turn_number, player_id, points, 1 if bust else 0)
+                          for (turn_number, player_id), (points, bust) in sorted(projection['turn_scores'].items())]
+        if live_turns != replayed_turns:
+            errors.append(f"{label}: turn_scores {live_turns} != replayed {replayed_turns}")
+
+        live_totals = dict(conn.execute('SELECT id, total_score FROM players WHERE game_id = ?', (game_id,)).fetchall())
+        if live_totals != projection['totals']:
+            errors.append(f"{label}: totals {live_totals} != replayed {projection['totals']}")
+
+        game_state = conn.execute('SELECT current_turn, current_player, game_over FROM game_state WHERE id = 1').fetchone()
+        replayed_state = (state['current_turn'], state['current_player'], 1 if projection['game_over'] else 0)
+        if tuple(game_state) != replayed_state:
+            errors.append(f"{label}: game_state {tuple(game_state)} != replayed {replayed_state}")
+
+        live_darts = {(row[0], row[1], row[2]): (row[3], row[4]) for row in conn.execute(
+            'SELECT turn_number, player_id, dart_index, score, multiplier FROM throws WHERE game_id = ?', (game_id,))}
+        replayed_darts = {key: (score, multiplier) for key, (score, multiplier, _) in state['darts'].items()}
+        if live_darts != replayed_darts:
+            errors.append(f"{label}: throws {live_darts} != replayed {replayed_darts}")
+
+        # Rebuild the counters in a transaction that is rolled back, so the live rows stay as they were
+        live_stats = [tuple(row) for row in stats_rows(conn, game_id)]
+        for player_id in live_totals:
+            player_stats.rebuild_player_stats(conn, player_id, game_id)
+        rebuilt_stats = [tuple(row) for row in stats_rows(conn, game_id)]
+        conn.rollback()
+        if live_stats != rebuilt_stats:
+            errors.append(f"{label}: player_stats {live_stats} != rebuilt {rebuilt_stats}")
+    finally:
+        conn.close()
+    return errors
+
+
+def bust_turns():
+    conn = scoreboard.get_db_connection()
+    try:
+        return conn.execute(f'SELECT turn_number, player_id FROM turn_scores WHERE game_id = {scoreboard.CURRENT_GAME} AND bust = 1').fetchall()
+    finally:
+        conn.close()
+
+
+def replay_bust_undo_correction(directory):
+    """Play the game step by step; returns every mismatch between the live tables and the log"""
+    start_game(directory)
+    processor = DartProcessor()
+    client = scoreboard.app.test_client()
+    errors = []
+
+    try:
+        # P1 leaves 121, P2 leaves 275
+        for score, multiplier in [(20, 3), (20, 3), (20, 3), (20, 1), (5, 1), (1, 1)]:
+            throw(processor, score, multiplier)
+        errors += consistency_errors('first round')
+
+        # P1 needs 121 and throws 180, so the turn busts
+        for score, multiplier in [(20, 3), (20, 3), (20, 3)]:
+            throw(processor, score, multiplier)
+        errors += consistency_errors('bust')
+        assert [tuple(row) for row in bust_turns()] == [(2, 1)], "P1's second turn should be a bust"
+
+        # P2 throws two darts and takes the second back
+        throw(processor, 19, 1)
+        throw(processor, 19, 3)
+        post(client, '/undo_throw')
+        errors += consistency_errors('undo')
+
+        # Correcting P1's first bust dart to a single 20 leaves 121 - 20 - 60 - 60 = -19, still a bust;
+        # a single 1 on the last dart then turns it into a scoring turn
+        post(client, '/update_throw', {'turn_number': 2, 'player_id': 1, 'throw_number': 1, 'score': 20, 'multiplier': 1})
+        errors += consistency_errors('correction keeping the bust')
+        post(client, '/update_throw', {'turn_number': 2, 'player_id': 1, 'throw_number': 3, 'score': 1, 'multiplier': 1})
+        errors += consistency_errors('correction removing the bust')
+        assert not bust_turns(), "Corrected turn should no longer be a bust"
+
+        # The game carries on from where the corrections left it
+        throw(processor, 5, 1)
+        throw(processor, 5, 1)
+        errors += consistency_errors('after corrections')
+    finally:
+        processor.db.close()
+    return errors
+
+
+def replay_batch_filling_live_turn(directory):
+    """Fill P2's live turn with a batch correction; returns every mismatch and where play went"""
+    start_game(directory)
+    processor = DartProcessor()
+    client = scoreboard.app.test_client()
+
+    try:
+        for score, multiplier in [(20, 1), (20, 1), (20, 1), (7, 1)]:
+            throw(processor, score, multiplier)
+        response = post(client, '/update_throws_batch', {'corrections': [
+            {'turn_number': 1, 'player_id': 2, 'throw_number': 2, 'score': 5, 'multiplier': 1},
+            {'turn_number': 1, 'player_id': 2, 'throw_number': 3, 'score': 19, 'multiplier': 3},
+        ]})
+    finally:
+        processor.db.close()
+    return consistency_errors('batch'), (response['current_turn'], response['current_player'])
+
+
+def test_bust_undo_and_correction_match_event_log(tmp_path, monkeypatch):
+    """Live scores, game state and player_stats match the event log after a bust, an undo and corrections."""
+    monkeypatch.chdir(tmp_path)
+    errors = replay_bust_undo_correction(str(tmp_path))
+    assert not errors, "; ".join(errors)
+
+
+def test_batch_filling_live_turn_moves_play_on(tmp_path, monkeypatch):
+    """A batch that completes the live turn hands play to the next player, as the log does."""
+    monkeypatch.chdir(tmp_path)
+    errors, position = replay_batch_filling_live_turn(str(tmp_path))
+    assert not errors, "; ".join(errors)
+    assert position == (2, 1)
+
+
+def main():
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        results.append(('bust, undo and correction', replay_bust_undo_correction(directory)))
+        os.chdir(REPO_DIR)
+    with tempfile.TemporaryDirectory() as directory:
+        errors, position = replay_batch_filling_live_turn(directory)
+        if position != (2, 1):
+            errors.append(f"batch: play went to turn {position[0]} player {position[1]}, not turn 2 player 1")
+        results.append(('batch filling the live turn', errors))
+        os.chdir(REPO_DIR)
+
+    for name, errors in results:
+        print(f"{name}: {'MATCH' if not errors else 'MISMATCH'}")
+        for error in errors:
+            print(f"  {error}")
+    sys.exit(1 if any(errors for _, errors in results) else 0)
+
+
+if __name__ == "__main__":
+    main()
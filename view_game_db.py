@@ -1,10 +1,11 @@
 import sqlite3
 import sys
+from leds import db_setup
 from tabulate import tabulate  # Optional: for prettier table formatting
 
 def get_db_connection(db_path='game.db'):
     """Create a connection to the SQLite database with row factory enabled"""
-    conn = sqlite3.connect(db_path)
+    conn = db_setup.connect(db_path)
     conn.row_factory = sqlite3.Row  # This enables column access by name
     return conn
 